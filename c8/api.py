@@ -1,3 +1,5 @@
+from c8.cursor import AsyncCursor, Cursor
+
 __all__ = ["APIWrapper"]
 
 
@@ -73,8 +75,8 @@ class APIWrapper(object):
     def context(self):
         """Return the API execution context.
 
-        :return: API execution context. Possible values are "default", "async",
-            "batch" and "transaction".
+        :return: API execution context. Possible values are "default", "asyncio",
+            "async", "batch" and "transaction".
         :rtype: str | unicode
         """
         return self._executor.context
@@ -92,3 +94,24 @@ class APIWrapper(object):
         return self._executor.execute(
             request, response_handler, custom_prefix=custom_prefix
         )
+
+    def _cursor(self, init_data, cursor_type="cursor", prefetch=0, url=None):
+        """Return a cursor suited to the execution context.
+
+        :param init_data: Cursor initialization data.
+        :type init_data: dict | list
+        :param cursor_type: Cursor type ("cursor" or "export").
+        :type cursor_type: str | unicode
+        :param prefetch: Number of batches to fetch ahead on a background
+            thread. Ignored in the asyncio execution context.
+        :type prefetch: int
+        :param url: URL of the request which created the cursor. Its batches
+            are fetched from the same region.
+        :type url: str | unicode | None
+        :return: Cursor.
+        :rtype: c8.cursor.Cursor | c8.cursor.AsyncCursor
+        """
+        origin = self._conn._origin(url) if url is not None else None
+        if self.context == "asyncio":
+            return AsyncCursor(self._conn, init_data, cursor_type, origin=origin)
+        return Cursor(self._conn, init_data, cursor_type, prefetch, origin)
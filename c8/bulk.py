@@ -0,0 +1,268 @@
+from __future__ import absolute_import, unicode_literals
+
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from c8.api import APIWrapper
+from c8.exceptions import C8ServerError, DocumentInsertError
+from c8.request import Request
+
+__all__ = ["BulkImporter"]
+
+# Error details of the import API refer to the documents by their position.
+_POSITION = re.compile(r"at position (\d+)")
+
+
+class BulkImporter(APIWrapper):
+    """Ingest documents into a collection in concurrent chunks.
+
+    Documents are read lazily from any iterable and packed into chunks limited
+    both by document count and by payload size. Each document is serialized
+    exactly once, and up to **concurrency** chunks are in flight at any time,
+    so memory usage is bounded regardless of the number of documents.
+
+    :param connection: HTTP connection.
+    :type connection: c8.connection.Connection
+    :param executor: API executor.
+    :type executor: c8.executor.Executor
+    :param collection: Target collection.
+    :type collection: c8.collection.StandardCollection
+    :param method: API used to write the chunks, "import" (see
+        :func:`c8.collection.StandardCollection.import_bulk`) or "insert" (see
+        :func:`c8.collection.StandardCollection.insert_many`).
+    :type method: str | unicode
+    :param chunk_size: Max number of documents per chunk.
+    :type chunk_size: int
+    :param chunk_bytes: Max size of the serialized documents of a chunk in
+        bytes. A single document larger than this is sent in its own chunk.
+    :type chunk_bytes: int
+    :param concurrency: Max number of chunks in flight.
+    :type concurrency: int
+    :param details: Include the detailed error messages in the result. Applies
+        only to the "import" method.
+    :type details: bool
+    :param primary_key: Field used as the primary key of the documents.
+        Applies only to the "import" method.
+    :type primary_key: str | unicode
+    :param replace: Replace existing documents on unique key constraint
+        violations. Applies only to the "import" method.
+    :type replace: bool
+    :param sync: Block until operation is synchronized to disk. Applies only
+        to the "insert" method.
+    :type sync: bool
+    :param progress: Callback invoked with the ingest statistics (see
+        :func:`stats`) each time a chunk completes.
+    :type progress: callable
+    :param compress: Compression of the chunks, overriding the compression
+        policy of the connection: False disables it, True, "gzip" or
+        "deflate" compresses every chunk.
+    :type compress: bool | str | unicode
+    """
+
+    def __init__(
+        self,
+        connection,
+        executor,
+        collection,
+        method="import",
+        chunk_size=1000,
+        chunk_bytes=4 * 1024 * 1024,
+        concurrency=4,
+        details=True,
+        primary_key=None,
+        replace=False,
+        sync=None,
+        progress=None,
+        compress=None,
+    ):
+        super(BulkImporter, self).__init__(connection, executor)
+        if method not in ("import", "insert"):
+            raise ValueError('method must be "import" or "insert"')
+        if chunk_size < 1 or chunk_bytes < 1 or concurrency < 1:
+            raise ValueError("chunk_size, chunk_bytes and concurrency must be positive")
+        self._collection = collection
+        self._method = method
+        self._chunk_size = chunk_size
+        self._chunk_bytes = chunk_bytes
+        self._concurrency = concurrency
+        self._details = details
+        self._primary_key = primary_key
+        self._replace = replace
+        self._sync = sync
+        self._progress = progress
+        self._compress = compress
+        self._reset()
+
+    def __repr__(self):
+        return "<BulkImporter {}>".format(self._collection.name)
+
+    def _reset(self):
+        self._started = None
+        self._documents = 0
+        self._bytes = 0
+        self._chunks = 0
+        self._in_flight = 0
+
+    def stats(self):
+        """Return the statistics of the running (or last) ingest.
+
+        :returns: Number of documents, bytes and chunks acknowledged by the
+            server, number of chunks in flight, elapsed seconds and throughput
+            in documents and bytes per second.
+        :rtype: dict
+        """
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {
+            "documents": self._documents,
+            "bytes": self._bytes,
+            "chunks": self._chunks,
+            "in_flight": self._in_flight,
+            "elapsed": elapsed,
+            "docs_per_sec": self._documents / elapsed if elapsed else 0.0,
+            "bytes_per_sec": self._bytes / elapsed if elapsed else 0.0,
+        }
+
+    def _chunk(self, documents):
+        """Yield (offset, serialized documents, size) of each chunk."""
+        encode = self._conn.json_codec.encode
+        offset = 0
+        fragments = []
+        size = 0
+        for index, document in enumerate(documents):
+            fragment = encode(self._collection._ensure_key_from_id(document))
+            if fragments and (
+                len(fragments) >= self._chunk_size
+                or size + len(fragment) > self._chunk_bytes
+            ):
+                yield offset, fragments, size
+                offset, fragments, size = index, [], 0
+            fragments.append(fragment)
+            size += len(fragment) + 1
+        if fragments:
+            yield offset, fragments, size
+
+    def _request(self, fragments):
+        documents = b"[" + b",".join(fragments) + b"]"
+        if self._method == "insert":
+            params = {"returnNew": False, "silent": False}
+            if self._sync is not None:
+                params["waitForSync"] = self._sync
+            return Request(
+                method="post",
+                endpoint="/document/{}".format(self._collection.name),
+                data=documents,
+                params=params,
+                write=self._collection.name,
+                compress=self._compress,
+            )
+
+        options = {"details": self._details, "replace": self._replace}
+        if self._primary_key is not None:
+            options["primaryKey"] = self._primary_key
+        return Request(
+            method="post",
+            endpoint="/import/{}".format(self._collection.name),
+            data=b'{"data":'
+            + documents
+            + b","
+            + self._conn.json_codec.encode(options)[1:-1]
+            + b"}",
+            compress=self._compress,
+        )
+
+    def _send(self, offset, fragments, size):
+        request = self._request(fragments)
+
+        def response_handler(resp):
+            if not resp.is_success:
+                raise DocumentInsertError(resp, request)
+            return resp.body
+
+        return offset, len(fragments), size, self._execute(request, response_handler)
+
+    def _collect(self, future, chunk, result):
+        offset, count, size = chunk
+        self._in_flight -= 1
+        try:
+            _, _, _, body = future.result()
+        except C8ServerError as err:
+            # The whole chunk was rejected.
+            result["errors"] += count
+            result["details"].extend(
+                {"index": offset + index, "message": err.message}
+                for index in range(count)
+            )
+        else:
+            if self._method == "insert":
+                for index, item in enumerate(body):
+                    if "_id" in item:
+                        result["created"] += 1
+                    else:
+                        result["errors"] += 1
+                        result["details"].append(
+                            {
+                                "index": offset + index,
+                                "message": item.get("errorMessage"),
+                            }
+                        )
+            else:
+                for field in ("created", "errors", "empty", "updated", "ignored"):
+                    result[field] += body.get(field, 0)
+                for detail in body.get("details", []):
+                    match = _POSITION.search(detail)
+                    index = offset + int(match.group(1)) if match else None
+                    result["details"].append({"index": index, "message": detail})
+
+        self._documents += count
+        self._bytes += size
+        self._chunks += 1
+        if self._progress is not None:
+            self._progress(self.stats())
+
+    def run(self, documents):
+        """Ingest the documents.
+
+        :param documents: Documents to insert. If they contain the "_key" or
+            "_id" fields, the values are used as the keys of the new documents
+            (auto-generated otherwise). Any "_rev" field is ignored.
+        :type documents: collections.abc.Iterable[dict]
+        :returns: Number of documents created, failed, empty, updated and
+            ignored, the failures as a list of dicts with the position of the
+            document in the input ("index") and the error message ("message"),
+            and the ingest statistics ("stats").
+        :rtype: dict
+        :raise c8.exceptions.DocumentParseError: If a document is not a dict.
+        """
+        self._reset()
+        self._started = time.monotonic()
+        result = {
+            "created": 0,
+            "errors": 0,
+            "empty": 0,
+            "updated": 0,
+            "ignored": 0,
+            "details": [],
+        }
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self._concurrency) as pool:
+            try:
+                for offset, fragments, size in self._chunk(documents):
+                    while len(pending) >= self._concurrency:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._collect(future, pending.pop(future), result)
+                    future = pool.submit(self._send, offset, fragments, size)
+                    pending[future] = (offset, len(fragments), size)
+                    self._in_flight += 1
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._collect(future, pending.pop(future), result)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        result["details"].sort(key=lambda d: (d["index"] is None, d["index"]))
+        result["stats"] = self.stats()
+        return result
@@ -3,7 +3,6 @@ from __future__ import absolute_import, unicode_literals
 from json import dumps
 
 from c8.api import APIWrapper
-from c8.cursor import Cursor
 from c8.exceptions import (
     C8QLGetAllBatchesError,
     C8QLQueryClearError,
@@ -14,7 +13,7 @@ from c8.exceptions import (
     C8QLQueryValidateError,
 )
 from c8.request import Request
-from c8.utils import clean_doc
+from c8.utils import clean_doc, iter_clean_docs
 
 __all__ = ["C8QL"]
 
@@ -141,6 +140,7 @@ class C8QL(APIWrapper):
         skip_inaccessible_collections=None,
         stream=None,
         sql=False,
+        prefetch=0,
     ):
         """Execute the query and return the result cursor.
 
@@ -197,6 +197,10 @@ class C8QL(APIWrapper):
         :type stream: bool
         :param sql: Specify *true* and write sql query.
         :type sql: bool
+        :param prefetch: Number of batches the cursor fetches ahead on a
+            background thread while the current batch is consumed. 0 (default)
+            disables prefetching.
+        :type prefetch: int
         :return: Result cursor.
         :rtype: c8.cursor.Cursor
         :raise c8.exceptions.C8QLQueryExecuteError: If execute fails.
@@ -249,12 +253,19 @@ class C8QL(APIWrapper):
         else:
             end_point = "/cursor"
 
-        request = Request(method="post", endpoint=end_point, data=data, command=command)
+        # Read-only queries are routed as reads, to the nearest region.
+        read = None
+        if not self._is_transaction and self._is_read_only(query, sql):
+            read = True
+
+        request = Request(
+            method="post", endpoint=end_point, data=data, command=command, read=read
+        )
 
         def response_handler(resp):
             if not resp.is_success:
                 raise C8QLQueryExecuteError(resp, request)
-            return Cursor(self._conn, resp.body)
+            return self._cursor(resp.body, prefetch=prefetch, url=resp.url)
 
         return self._execute(request, response_handler)
 
@@ -349,12 +360,13 @@ class C8QL(APIWrapper):
 
         return self._execute(request, response_handler)
 
-    def get_all_batches(self, query, bind_vars=None, batch_size=1000):
+    def get_all_batches(self, query, bind_vars=None, batch_size=1000, prefetch=0):
         """Returns all batches for a query. It should only be used for Read operations. Query cannot contain
          the following keywords: INSERT, UPDATE, REPLACE, REMOVE and UPSERT.
 
          Note: Please make sure there is more than enough memory available on your system (RAM + Swap(if swap is enabled))
          to be able fetch total size of the documents to be returned. This will help avoid any Out-Of-Memory problems.
+         For large result sets, stream the documents with stream_documents() instead.
 
         :param query: Query to execute
         :type query: str
@@ -363,21 +375,114 @@ class C8QL(APIWrapper):
         :param batch_size: Batch size is a configurable number. Results are retieved by continuously
             calling the next batch of cursor of size batch_size
         :type batch_size: int
+        :param prefetch: Number of batches fetched ahead on a background
+            thread while the current batch is processed.
+        :type prefetch: int
         :returns: Documents, or None if not found.
         :rtype: dict | None
         :raise c8.exceptions.C8QLQueryExecuteError: If retrieval fails.
         """
+        return list(
+            self.stream_documents(
+                query=query,
+                bind_vars=bind_vars,
+                batch_size=batch_size,
+                prefetch=prefetch,
+            )
+        )
+
+    def stream_batches(self, query, bind_vars=None, batch_size=1000, prefetch=0):
+        """Stream the result batches of a read-only query. Query cannot contain
+        the following keywords: INSERT, UPDATE, REPLACE, REMOVE and UPSERT.
+
+        Unlike :func:`get_all_batches`, batches are yielded as they arrive and
+        the next batch is fetched only when the consumer asks for it, so
+        memory usage stays flat regardless of the size of the result set.
+        The query is run when the first batch is requested, so a generator
+        which is never iterated leaves no cursor on the server. The cursor is
+        closed on the server once the generator is exhausted or closed.
+
+        :param query: Query to execute
+        :type query: str
+        :param bind_vars: Bind variables for the query.
+        :type bind_vars: dict
+        :param batch_size: Number of documents fetched per round trip.
+        :type batch_size: int
+        :param prefetch: Number of batches fetched ahead on a background
+            thread. At most **prefetch** + 1 batches are held in memory.
+        :type prefetch: int
+        :returns: Generator of batches, each a list of documents with the
+            system keys stripped.
+        :rtype: collections.abc.Iterator[list]
+        :raise c8.exceptions.C8QLGetAllBatchesError: If the query is not
+            read-only.
+        :raise c8.exceptions.C8QLQueryExecuteError: If execute fails, when
+            the first batch is requested.
+        """
+        self._check_read_only(query)
+        return self._stream(query, bind_vars, batch_size, prefetch, documents=False)
+
+    def stream_documents(self, query, bind_vars=None, batch_size=1000, prefetch=0):
+        """Stream the result documents of a read-only query. Query cannot
+        contain the following keywords: INSERT, UPDATE, REPLACE, REMOVE and
+        UPSERT.
+
+        Documents are fetched batch by batch and the system keys are stripped
+        lazily per document. The query is run when the first document is
+        requested, so a generator which is never iterated leaves no cursor on
+        the server. The cursor is closed on the server once the generator is
+        exhausted or closed.
+
+        :param query: Query to execute
+        :type query: str
+        :param bind_vars: Bind variables for the query.
+        :type bind_vars: dict
+        :param batch_size: Number of documents fetched per round trip.
+        :type batch_size: int
+        :param prefetch: Number of batches fetched ahead on a background
+            thread. At most **prefetch** + 1 batches are held in memory.
+        :type prefetch: int
+        :returns: Generator of documents with the system keys stripped.
+        :rtype: collections.abc.Iterator[dict]
+        :raise c8.exceptions.C8QLGetAllBatchesError: If the query is not
+            read-only.
+        :raise c8.exceptions.C8QLQueryExecuteError: If execute fails, when
+            the first document is requested.
+        """
+        self._check_read_only(query)
+        return self._stream(query, bind_vars, batch_size, prefetch, documents=True)
+
+    @staticmethod
+    def _is_read_only(query, sql=False):
         write_ops = ["INSERT", "UPDATE", "REPLACE", "REMOVE", "UPSERT"]
-        if any(ele in query.upper() for ele in write_ops):
+        if sql:
+            write_ops += ["DELETE", "CREATE", "DROP", "ALTER", "TRUNCATE"]
+        return not any(ele in query.upper() for ele in write_ops)
+
+    @staticmethod
+    def _check_read_only(query):
+        if not C8QL._is_read_only(query):
             raise C8QLGetAllBatchesError(
                 "Write operations provided in the query. Only read operations can be provided"
             )
 
+    def _stream(self, query, bind_vars, batch_size, prefetch, documents):
+        # The query runs on the first iteration, so that the cursor is always
+        # closed by the finally clause.
         cursor = self.execute(
-            query=query, bind_vars=bind_vars, batch_size=batch_size, stream=True
+            query=query,
+            bind_vars=bind_vars,
+            batch_size=batch_size,
+            stream=True,
+            prefetch=prefetch,
         )
-        while cursor.has_more():
-            cursor.fetch()
-
-        result = clean_doc(cursor.batch())
-        return result
+        try:
+            for batch in cursor.batches():
+                if documents:
+                    for doc in iter_clean_docs(batch):
+                        yield doc
+                else:
+                    yield clean_doc(batch)
+        finally:
+            if cursor.has_more():
+                cursor.close(ignore_missing=True)
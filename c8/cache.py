@@ -0,0 +1,216 @@
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+
+__all__ = ["MetadataCache"]
+
+
+class MetadataCache(object):
+    """Cache of the names of the resources (e.g. collections, streams) which
+    exist in each fabric, and of other slowly changing metadata such as the
+    details of the local data center.
+
+    Existence checks such as :func:`c8.fabric.Fabric.has_collection` consult
+    the cache before downloading the full resource listing. Only positive
+    lookups are answered from the cache: a name which is not cached always
+    triggers a fresh listing, which then replaces the cached entry. Entries
+    expire after **ttl** seconds and are updated by the create and delete
+    calls made through the same connection.
+
+    The cache is thread-safe and shared by all API wrappers of a connection.
+    Listings are keyed by fabric name, so connections to different tenants
+    must not share a cache.
+
+    :param ttl: Time to live of the cached listings in seconds. 0 or None
+        disables the cache.
+    :type ttl: int | float | None
+    """
+
+    def __init__(self, ttl=60):
+        self._ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __repr__(self):
+        return "<MetadataCache ttl={}>".format(self._ttl)
+
+    @property
+    def ttl(self):
+        """Return the time to live of the cached listings.
+
+        :returns: Time to live in seconds.
+        :rtype: int | float | None
+        """
+        return self._ttl
+
+    @property
+    def enabled(self):
+        """Return True if the cache is enabled.
+
+        :returns: True if the cache is enabled, False otherwise.
+        :rtype: bool
+        """
+        return bool(self._ttl)
+
+    def _fresh(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, names = entry
+        if expires <= now:
+            del self._entries[key]
+            return None
+        return names
+
+    def contains(self, fabric, kind, name, scope=None):
+        """Check if the name is in the cached listing.
+
+        :param fabric: Fabric name.
+        :type fabric: str | unicode
+        :param kind: Resource kind (e.g. "collections", "streams").
+        :type kind: str | unicode
+        :param name: Resource name.
+        :type name: str | unicode
+        :param scope: Listing scope (e.g. local or global streams).
+        :type scope: str | unicode | bool | None
+        :returns: True if the name is cached, False if it is not or the cache
+            is disabled.
+        :rtype: bool
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            names = self._fresh((fabric, kind, scope), time.monotonic())
+            if names is not None and name in names:
+                self._hits += 1
+                return True
+            self._misses += 1
+            return False
+
+    def update(self, fabric, kind, names, scope=None):
+        """Replace the cached listing.
+
+        :param fabric: Fabric name.
+        :type fabric: str | unicode
+        :param kind: Resource kind (e.g. "collections", "streams").
+        :type kind: str | unicode
+        :param names: Names of all existing resources of the kind.
+        :type names: iterable
+        :param scope: Listing scope (e.g. local or global streams).
+        :type scope: str | unicode | bool | None
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(fabric, kind, scope)] = (
+                time.monotonic() + self._ttl,
+                set(names),
+            )
+
+    def get_value(self, fabric, kind, scope=None):
+        """Return a cached value.
+
+        :param fabric: Fabric name, or None for values shared by all fabrics.
+        :type fabric: str | unicode | None
+        :param kind: Value kind (e.g. "localdc").
+        :type kind: str | unicode
+        :param scope: Value scope.
+        :type scope: str | unicode | bool | None
+        :returns: Cached value, or None if it is not cached, expired or the
+            cache is disabled.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._fresh((fabric, kind, scope), time.monotonic())
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return value
+
+    def set_value(self, fabric, kind, value, scope=None):
+        """Cache a value.
+
+        :param fabric: Fabric name, or None for values shared by all fabrics.
+        :type fabric: str | unicode | None
+        :param kind: Value kind (e.g. "localdc").
+        :type kind: str | unicode
+        :param value: Value, which must not be None.
+        :param scope: Value scope.
+        :type scope: str | unicode | bool | None
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(fabric, kind, scope)] = (
+                time.monotonic() + self._ttl,
+                value,
+            )
+
+    def add(self, fabric, kind, name):
+        """Add a newly created resource to the cached listings of its kind.
+
+        Listings which are not cached are left untouched.
+
+        :param fabric: Fabric name.
+        :type fabric: str | unicode
+        :param kind: Resource kind (e.g. "collections", "streams").
+        :type kind: str | unicode
+        :param name: Resource name.
+        :type name: str | unicode
+        """
+        with self._lock:
+            for key, (_, names) in self._entries.items():
+                if key[:2] == (fabric, kind):
+                    names.add(name)
+
+    def discard(self, fabric, kind, name):
+        """Remove a deleted resource from the cached listings of its kind.
+
+        :param fabric: Fabric name.
+        :type fabric: str | unicode
+        :param kind: Resource kind (e.g. "collections", "streams").
+        :type kind: str | unicode
+        :param name: Resource name.
+        :type name: str | unicode
+        """
+        with self._lock:
+            for key, (_, names) in self._entries.items():
+                if key[:2] == (fabric, kind):
+                    names.discard(name)
+
+    def invalidate(self, fabric=None, kind=None):
+        """Drop cached listings.
+
+        :param fabric: Fabric name. If not set, listings of all fabrics are
+            dropped.
+        :type fabric: str | unicode
+        :param kind: Resource kind. If not set, listings of all kinds are
+            dropped.
+        :type kind: str | unicode
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if fabric is not None and key[0] != fabric:
+                    continue
+                if kind is not None and key[1] != kind:
+                    continue
+                del self._entries[key]
+
+    def stats(self):
+        """Return the cache statistics.
+
+        :returns: Number of hits, misses and cached entries, and the TTL.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": len(self._entries),
+                "ttl": self._ttl,
+            }
@@ -0,0 +1,370 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+import websocket
+
+from c8.exceptions import GetValueError
+from c8.stream_serde import MessageCodec
+
+__all__ = ["ChangeFeed", "FileCheckpointStore", "KVCheckpointStore"]
+
+
+class FileCheckpointStore(object):
+    """Checkpoint store keeping the checkpoints of all subscriptions in a
+    local JSON file.
+
+    The file is replaced atomically, so a crash never leaves a partially
+    written checkpoint behind.
+
+    :param path: File path.
+    :type path: str | unicode
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<FileCheckpointStore {}>".format(self._path)
+
+    def _read(self):
+        try:
+            with open(self._path) as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return {}
+
+    def load(self, subscription):
+        """Return the checkpoint of a subscription.
+
+        :param subscription: Subscription name.
+        :type subscription: str | unicode
+        :returns: Checkpoint, or None if there is none.
+        :rtype: dict | None
+        """
+        with self._lock:
+            return self._read().get(subscription)
+
+    def save(self, subscription, checkpoint):
+        """Save the checkpoint of a subscription.
+
+        :param subscription: Subscription name.
+        :type subscription: str | unicode
+        :param checkpoint: Checkpoint.
+        :type checkpoint: dict
+        """
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[subscription] = checkpoint
+            directory = os.path.dirname(os.path.abspath(self._path))
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".checkpoint")
+            try:
+                with os.fdopen(fd, "w") as fp:
+                    json.dump(checkpoints, fp)
+                    fp.flush()
+                    os.fsync(fp.fileno())
+                os.replace(tmp, self._path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+
+class KVCheckpointStore(object):
+    """Checkpoint store keeping checkpoints in a key-value collection, keyed
+    by subscription name.
+
+    :param key_value: Key-value API wrapper.
+    :type key_value: c8.keyvalue.KV
+    :param collection: Key-value collection name. The collection must exist.
+    :type collection: str | unicode
+    """
+
+    def __init__(self, key_value, collection):
+        self._kv = key_value
+        self._collection = collection
+
+    def __repr__(self):
+        return "<KVCheckpointStore {}>".format(self._collection)
+
+    def load(self, subscription):
+        """Return the checkpoint of a subscription.
+
+        :param subscription: Subscription name.
+        :type subscription: str | unicode
+        :returns: Checkpoint, or None if there is none.
+        :rtype: dict | None
+        :raise c8.exceptions.GetValueError: If retrieval fails.
+        """
+        try:
+            entry = self._kv.get_value_for_key(self._collection, subscription)
+        except GetValueError as err:
+            if err.http_code == 404:
+                return None
+            raise
+        return json.loads(entry["value"])
+
+    def save(self, subscription, checkpoint):
+        """Save the checkpoint of a subscription.
+
+        :param subscription: Subscription name.
+        :type subscription: str | unicode
+        :param checkpoint: Checkpoint.
+        :type checkpoint: dict
+        :raise c8.exceptions.InsertKVError: If the checkpoint cannot be saved.
+        """
+        self._kv.insert_key_value_pair(
+            self._collection,
+            [{"_key": subscription, "value": json.dumps(checkpoint)}],
+        )
+
+
+class ChangeFeed(object):
+    """Change data capture feed of a collection.
+
+    The feed consumes the stream of the collection through a durable,
+    named subscription, so that a restarted feed resumes where it stopped.
+    Several feeds may run on the same subscription: it is a Failover one, so
+    a single feed receives the changes and the others take over if it fails.
+
+    Processed changes are checkpointed every **checkpoint_every** changes or
+    **checkpoint_interval** seconds, and only acknowledged once their
+    checkpoint is saved. The checkpoint records the IDs of the changes it
+    covers, so changes redelivered after a crash between saving a checkpoint
+    and acknowledging its changes are skipped. Changes processed after the
+    last checkpoint are delivered again, so handlers must tolerate
+    duplicates of at most one checkpoint worth of changes, or save their own
+    state from the **on_checkpoint** hook.
+
+    :param stream_collection: Stream API wrapper.
+    :type stream_collection: c8.stream_collection.StreamCollection
+    :param collection: Collection name.
+    :type collection: str | unicode
+    :param subscription_name: Subscription name, shared by the runs and the
+        replicas of the feed.
+    :type subscription_name: str | unicode
+    :param handler: Callable called with each change, a message whose payload
+        is decoded by the serializer.
+    :type handler: callable
+    :param checkpoint_store: Checkpoint store, e.g.
+        :class:`c8.cdc.FileCheckpointStore` or
+        :class:`c8.cdc.KVCheckpointStore`. Changes are acknowledged as soon
+        as they are processed if not set.
+    :param checkpoint_every: Number of changes between checkpoints.
+    :type checkpoint_every: int
+    :param checkpoint_interval: Max time in seconds between checkpoints.
+    :type checkpoint_interval: int | float
+    :param on_checkpoint: Callable called with the checkpoint before it is
+        saved, e.g. to commit the side effects of the changes it covers. If
+        it raises, the checkpoint is not saved and the feed stops.
+    :type on_checkpoint: callable
+    :param serializer: Payload serializer, or its name. Change payloads are
+        JSON documents.
+    :type serializer: c8.stream_serde.Serializer | str | unicode
+    :param recv_timeout: Time in seconds after which waiting for a change is
+        interrupted, e.g. to save a checkpoint or check whether the feed is
+        stopped.
+    :type recv_timeout: int | float
+    :param connect: Function opening a websocket, called with its URL and
+        the keyword arguments **header** and **timeout**.
+    :type connect: callable
+    """
+
+    def __init__(
+        self,
+        stream_collection,
+        collection,
+        subscription_name,
+        handler,
+        checkpoint_store=None,
+        checkpoint_every=1000,
+        checkpoint_interval=5,
+        on_checkpoint=None,
+        serializer="json",
+        recv_timeout=1,
+        connect=websocket.create_connection,
+    ):
+        self._streams = stream_collection
+        self._collection = collection
+        self._subscription = subscription_name
+        self._handler = handler
+        self._store = checkpoint_store
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_interval = checkpoint_interval
+        self._on_checkpoint = on_checkpoint
+        self._serde = MessageCodec(serializer)
+        self._recv_timeout = recv_timeout
+        self._connect = connect
+        self._stop = threading.Event()
+
+        # IDs of the changes processed since the last checkpoint.
+        self._uncommitted = []
+        # IDs of the changes covered by the last checkpoint.
+        self._committed = set()
+        self._last_checkpoint = None
+        self._processed = 0
+        self._skipped = 0
+        self._checkpoints = 0
+        self._started = None
+        self._window_start = None
+        self._window_count = 0
+        self._rate = 0.0
+
+    def __repr__(self):
+        return "<ChangeFeed {} {}>".format(self._collection, self._subscription)
+
+    @property
+    def checkpoint(self):
+        """Return the last checkpoint saved or loaded.
+
+        :returns: Checkpoint, with the ID of the last change processed
+            ("message_id"), the IDs of the changes it covers ("message_ids"),
+            the number of changes processed by the subscription
+            ("processed") and the time it was saved ("time").
+        :rtype: dict | None
+        """
+        return self._last_checkpoint
+
+    def _open(self):
+        url = self._streams._consumer_url(
+            self._collection,
+            True,
+            True,
+            self._subscription,
+            "Failover",
+            1000,
+            None,
+        )
+        header = {"Authorization": self._streams.header["Authorization"]}
+        return self._connect(url, header=header, timeout=self._recv_timeout)
+
+    def _commit(self, ws):
+        if not self._uncommitted:
+            return
+        if self._store is not None:
+            total = (self._last_checkpoint or {}).get("processed", 0)
+            checkpoint = {
+                "message_id": self._uncommitted[-1],
+                "message_ids": self._uncommitted,
+                "processed": total + len(self._uncommitted),
+                "time": time.time(),
+            }
+            if self._on_checkpoint is not None:
+                self._on_checkpoint(checkpoint)
+            self._store.save(self._subscription, checkpoint)
+            self._last_checkpoint = checkpoint
+            self._checkpoints += 1
+        self._committed = set(self._uncommitted)
+        for message_id in self._uncommitted:
+            ws.send(json.dumps({"messageId": message_id}))
+        self._uncommitted = []
+
+    def run(self, max_changes=None, idle_timeout=None):
+        """Process changes until the feed is stopped.
+
+        :param max_changes: Stop after processing this many changes.
+        :type max_changes: int
+        :param idle_timeout: Stop after waiting this many seconds for a
+            change.
+        :type idle_timeout: int | float
+        :returns: Number of changes processed.
+        :rtype: int
+        :raise c8.exceptions.StreamSubscriberError: If the collection has no
+            stream.
+        """
+        self._stop.clear()
+        if self._store is not None and self._last_checkpoint is None:
+            self._last_checkpoint = self._store.load(self._subscription)
+            if self._last_checkpoint:
+                self._committed = set(self._last_checkpoint["message_ids"])
+
+        ws = self._open()
+        now = time.monotonic()
+        self._started = self._started or now
+        self._window_start, self._window_count = now, 0
+        count = 0
+        last_change = last_commit = now
+        try:
+            while not self._stop.is_set():
+                if max_changes is not None and count >= max_changes:
+                    break
+                try:
+                    raw = ws.recv()
+                except websocket.WebSocketTimeoutException:
+                    raw = None
+                now = time.monotonic()
+                if raw is not None:
+                    message = self._serde.decode(raw)
+                    message_id = message.get("messageId")
+                    if message_id is not None:
+                        last_change = now
+                        if message_id in self._committed:
+                            # Checkpointed before a crash, but never acked.
+                            self._skipped += 1
+                            ws.send(json.dumps({"messageId": message_id}))
+                        else:
+                            self._handler(message)
+                            self._uncommitted.append(message_id)
+                            self._processed += 1
+                            self._window_count += 1
+                            count += 1
+                if self._store is None or (
+                    len(self._uncommitted) >= self._checkpoint_every
+                    or now - last_commit >= self._checkpoint_interval
+                ):
+                    self._commit(ws)
+                    last_commit = now
+                if now - self._window_start >= 1:
+                    self._rate = self._window_count / (now - self._window_start)
+                    self._window_start, self._window_count = now, 0
+                idle = now - last_change
+                if raw is None and idle_timeout is not None and idle >= idle_timeout:
+                    break
+            self._commit(ws)
+        except BaseException:
+            # Changes not checkpointed are redelivered to the next run.
+            self._uncommitted = []
+            raise
+        finally:
+            ws.close()
+        return count
+
+    def stop(self):
+        """Stop the feed. It saves a last checkpoint before returning."""
+        self._stop.set()
+
+    def stats(self):
+        """Return the feed statistics.
+
+        :returns: Number of changes processed and skipped as duplicates,
+            number of checkpoints saved, changes processed per second over
+            the last second ("rate") and since the feed started
+            ("average_rate"), and changes not checkpointed yet.
+        :rtype: dict
+        """
+        elapsed = time.monotonic() - self._started if self._started else 0
+        return {
+            "processed": self._processed,
+            "skipped": self._skipped,
+            "checkpoints": self._checkpoints,
+            "rate": self._rate,
+            "average_rate": self._processed / elapsed if elapsed else 0.0,
+            "uncommitted": len(self._uncommitted),
+        }
+
+    def backlog(self):
+        """Return the number of changes the feed has not received yet.
+
+        :returns: Backlog of the subscription, or None if it does not exist.
+        :rtype: int | None
+        :raise c8.exceptions.StreamPermissionError: If retrieval fails.
+        """
+        stats = self._streams.get_stream_stats(
+            self._collection, isCollectionStream=True, local=True
+        )
+        subscriptions = stats.get("subscriptions") or {}
+        return subscriptions.get(self._subscription, {}).get("msgBacklog")
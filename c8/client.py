@@ -4,9 +4,15 @@ from enum import Enum
 
 from c8 import constants
 from c8.billing.billing_interface import BillingInterface
+from c8.cache import MetadataCache
+from c8.codec import get_codec
+from c8.compression import CompressionPolicy
 from c8.connection import TenantConnection
 from c8.function.function_interface import FunctionInterface
+from c8.hedging import HedgePolicy
+from c8.http import DefaultHTTPClient
 from c8.redis.redis_commands import RedisCommands
+from c8.retry import RetryPolicy
 from c8.tenant import Tenant
 from c8.version import __version__
 
@@ -44,6 +50,59 @@ class C8Client(object):
     :type port: int
     :param http_client: User-defined HTTP client.
     :type http_client: c8.http.HTTPClient
+    :param metadata_cache_ttl: Time to live in seconds of the cached resource
+        listings used by existence checks (e.g. whether a collection exists).
+        0 or None disables the cache.
+    :type metadata_cache_ttl: int | float | None
+    :param json_codec: JSON codec, or its name ("orjson", "ujson" or "json"),
+        used to serialize requests and deserialize responses. The fastest
+        codec available is used if not set.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    :param retry_policy: Retry policy of the HTTP requests, shared by all the
+        connections of the client. A policy with the default settings is
+        created if not set.
+    :type retry_policy: c8.retry.RetryPolicy
+    :param redis_near_cache: Near cache of the Redis reads made through
+        :attr:`redis`.
+    :type redis_near_cache: c8.redis.near_cache.NearCache
+    :param compression: Compression policy of the HTTP requests and
+        responses, shared by all the connections of the client. A policy
+        leaving request bodies uncompressed is created if not set.
+    :type compression: c8.compression.CompressionPolicy
+    :param region_router: Router of the HTTP requests across the regions of
+        the fabric, shared by all the connections of the client. The regions
+        are discovered and probed when the client connects. Requests are sent
+        to **host** if not set.
+    :type region_router: c8.routing.RegionRouter
+    :param hedge_policy: Hedging of the latency-critical reads, shared by all
+        the connections of the client. Reads are only hedged when they ask
+        for it if not set.
+    :type hedge_policy: c8.hedging.HedgePolicy
+    :param pool_connections: Number of hosts whose HTTP connection pools are
+        kept. Ignored if **http_client** is set.
+    :type pool_connections: int
+    :param pool_maxsize: Max number of HTTP connections kept per host, which
+        should be at least the number of threads sending requests
+        concurrently. Ignored if **http_client** is set.
+    :type pool_maxsize: int
+    :param pool_block: Make requests wait for a free connection when
+        **pool_maxsize** connections to the host are in use, instead of
+        opening a connection which is closed after use. Ignored if
+        **http_client** is set.
+    :type pool_block: bool
+    :param pool_idle_timeout: Time in seconds after which idle HTTP
+        connections are closed instead of being reused. Not set means never.
+        Ignored if **http_client** is set.
+    :type pool_idle_timeout: int | float
+    :param tcp_nodelay: Disable Nagle's algorithm on HTTP connections.
+        Ignored if **http_client** is set.
+    :type tcp_nodelay: bool
+    :param keepalive_idle: Idle time in seconds before TCP keepalive probes
+        are sent. Ignored if **http_client** is set.
+    :type keepalive_idle: int
+    :param keepalive_interval: Time in seconds between TCP keepalive probes.
+        Ignored if **http_client** is set.
+    :type keepalive_interval: int
     """
 
     def __init__(
@@ -59,6 +118,20 @@ class C8Client(object):
         token=None,
         apikey=None,
         skip_tenant=False,
+        metadata_cache_ttl=60,
+        json_codec=None,
+        retry_policy=None,
+        redis_near_cache=None,
+        compression=None,
+        region_router=None,
+        hedge_policy=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        pool_idle_timeout=None,
+        tcp_nodelay=True,
+        keepalive_idle=None,
+        keepalive_interval=None,
     ):
 
         self._protocol = protocol.strip("/")
@@ -72,8 +145,31 @@ class C8Client(object):
         self._stream_port = int(stream_port)
         self.set_port()
         self.set_url()
+        self._metadata_cache_ttl = metadata_cache_ttl
+        self._metadata_cache = MetadataCache(metadata_cache_ttl)
+        self._json_codec = get_codec(json_codec)
+        # A single client, and therefore a single set of connection pools,
+        # is shared by all the connections of the client.
+        if http_client is None:
+            http_client = DefaultHTTPClient(
+                json_codec=self._json_codec,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                idle_timeout=pool_idle_timeout,
+                tcp_nodelay=tcp_nodelay,
+                keepalive_idle=keepalive_idle,
+                keepalive_interval=keepalive_interval,
+            )
         self._http_client = http_client
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._compression = compression or CompressionPolicy()
+        self._redis_near_cache = redis_near_cache
+        self._region_router = region_router
+        self._hedge_policy = hedge_policy or HedgePolicy(enabled=False)
         self.get_tenant(skip_tenant)
+        if self._region_router is not None:
+            self._region_router.start(self._fabric)
         # Domains
         self._redis = None
         self._billing = None
@@ -107,6 +203,7 @@ class C8Client(object):
             self._tenant = self.tenant(apikey=self._apikey, skip_tenant=skip_tenant)
             self._fabric = self._tenant.useFabric(self._fabric_name)
         if self._fabric:
+            self._metadata_cache = self._fabric._conn.metadata_cache
             self._search = self._fabric.search()
 
     def __repr__(self):
@@ -121,9 +218,64 @@ class C8Client(object):
         :rtype: c8.redis.redis_commands.RedisCommands
         """
         if self._redis is None:
-            self._redis = RedisCommands(self._tenant._conn)
+            self._redis = RedisCommands(
+                self._tenant._conn, near_cache=self._redis_near_cache
+            )
         return self._redis
 
+    @property
+    def metadata_cache(self):
+        """
+        Access the cache of fabric resource names of the client tenant. Each
+        tenant returned by tenant() caches its own listings.
+
+        :returns: Metadata cache, with hit/miss counters available via stats()
+        :rtype: c8.cache.MetadataCache
+        """
+        return self._metadata_cache
+
+    @property
+    def compression(self):
+        """
+        Access the compression policy of the HTTP requests and responses
+
+        :returns: Compression policy, with byte counters available via stats()
+        :rtype: c8.compression.CompressionPolicy
+        """
+        return self._compression
+
+    @property
+    def region_router(self):
+        """
+        Access the router of the HTTP requests across regions
+
+        :returns: Region router, with the health of the regions available via
+            regions(), or None if requests are sent to the configured host
+        :rtype: c8.routing.RegionRouter | None
+        """
+        return self._region_router
+
+    @property
+    def hedge_policy(self):
+        """
+        Access the hedging policy of the latency-critical reads
+
+        :returns: Hedging policy, with hedge counters available via stats()
+        :rtype: c8.hedging.HedgePolicy
+        """
+        return self._hedge_policy
+
+    @property
+    def http_client(self):
+        """
+        Access the HTTP client shared by the connections of the client
+
+        :returns: HTTP client. The default one reports its connection pool
+            statistics via pool_stats()
+        :rtype: c8.http.HTTPClient
+        """
+        return self._http_client
+
     @property
     def billing(self):
         """
@@ -218,6 +370,14 @@ class C8Client(object):
             apikey=apikey,
             http_client=self._http_client,
             skip_tenant=skip_tenant,
+            # Tenants may have fabrics of the same name (e.g. _system), so
+            # every tenant connection caches its own listings.
+            metadata_cache=MetadataCache(self._metadata_cache_ttl),
+            json_codec=self._json_codec,
+            retry_policy=self._retry_policy,
+            compression=self._compression,
+            router=self._region_router,
+            hedge_policy=self._hedge_policy,
         )
         tenant = Tenant(connection)
 
@@ -225,6 +385,17 @@ class C8Client(object):
 
     # Reducing steps
 
+    def begin_asyncio_execution(self, http_client=None):
+        """Begin asyncio execution on the client fabric.
+
+        :param http_client: User-defined asyncio HTTP client. Defaults to
+            :class:`c8.http.DefaultAsyncHTTPClient`.
+        :type http_client: c8.http.AsyncHTTPClient
+        :returns: Fabric API wrapper built specifically for asyncio execution.
+        :rtype: c8.fabric.AsyncioFabric
+        """
+        return self._fabric.begin_asyncio_execution(http_client)
+
     # client.get_fabric_details
     def get_fabric_details(self):
         return self._fabric.fabrics_detail()
@@ -577,7 +748,13 @@ class C8Client(object):
     # client.import_bulk
 
     def import_bulk(
-        self, collection_name, documents, details=True, primaryKey=None, replace=False
+        self,
+        collection_name,
+        documents,
+        details=True,
+        primaryKey=None,
+        replace=False,
+        compress=None,
     ):
         """Insert multiple documents into the collection.
 
@@ -601,13 +778,91 @@ class C8Client(object):
             the existing documents with new ones else it won't replace the documents and
             count it as "error".
         :type replace: bool
+        :param compress: Compression of the request payload, overriding the
+            compression policy of the client: False disables it, True, "gzip"
+            or "deflate" compresses the payload whatever its size.
+        :type compress: bool | str | unicode
         :returns: Result of the bulk import.
         :rtype: dict
         :raise c8.exceptions.DocumentInsertError: If import fails.
         """
         _collection = self.get_collection(collection_name)
         return _collection.import_bulk(
-            documents=documents, details=details, primaryKey=primaryKey, replace=replace
+            documents=documents,
+            details=details,
+            primaryKey=primaryKey,
+            replace=replace,
+            compress=compress,
+        )
+
+    # client.bulk_import
+
+    def bulk_import(
+        self,
+        collection_name,
+        documents,
+        method="import",
+        chunk_size=1000,
+        chunk_bytes=4 * 1024 * 1024,
+        concurrency=4,
+        details=True,
+        primary_key=None,
+        replace=False,
+        sync=None,
+        progress=None,
+        compress=None,
+    ):
+        """Insert documents from any iterable in concurrent chunks.
+
+        :param collection_name: Collection name to import documents in.
+        :type collection_name: str | unicode
+        :param documents: New documents to insert.
+        :type documents: collections.abc.Iterable[dict]
+        :param method: API used to write the chunks, "import" or "insert".
+        :type method: str | unicode
+        :param chunk_size: Max number of documents per chunk.
+        :type chunk_size: int
+        :param chunk_bytes: Max size of the serialized documents of a chunk in
+            bytes.
+        :type chunk_bytes: int
+        :param concurrency: Max number of chunks in flight.
+        :type concurrency: int
+        :param details: If set to True, the result includes the detailed error
+            messages. Applies only to the "import" method.
+        :type details: bool
+        :param primary_key: If not None then uses this field as the primary
+            key for the documents to be inserted. Applies only to the "import"
+            method.
+        :type primary_key: str | unicode
+        :param replace: Replace existing documents on unique key constraint
+            violations. Applies only to the "import" method.
+        :type replace: bool
+        :param sync: Block until operation is synchronized to disk. Applies
+            only to the "insert" method.
+        :type sync: bool
+        :param progress: Callback invoked with the ingest statistics each time
+            a chunk completes.
+        :type progress: callable
+        :param compress: Compression of the chunks, overriding the
+            compression policy of the client: False disables it, True, "gzip"
+            or "deflate" compresses every chunk.
+        :type compress: bool | str | unicode
+        :returns: Result of the bulk import.
+        :rtype: dict
+        """
+        _collection = self.get_collection(collection_name)
+        return _collection.bulk_import(
+            documents,
+            method=method,
+            chunk_size=chunk_size,
+            chunk_bytes=chunk_bytes,
+            concurrency=concurrency,
+            details=details,
+            primary_key=primary_key,
+            replace=replace,
+            sync=sync,
+            progress=progress,
+            compress=compress,
         )
 
     # client.export
@@ -632,6 +887,47 @@ class C8Client(object):
         _collection = self.get_collection(collection_name)
         return _collection.export(offset=offset, limit=limit, order=order)
 
+    # client.export_parallel
+
+    def export_parallel(
+        self,
+        collection_name,
+        partitions=4,
+        batch_size=1000,
+        ordered=True,
+        max_pending_batches=2,
+        progress=None,
+    ):
+        """Export all documents in the collection over concurrent cursors.
+
+        :param collection_name: Collection name.
+        :type collection_name: str | unicode
+        :param partitions: Number of key ranges read concurrently.
+        :type partitions: int
+        :param batch_size: Number of documents fetched per round trip.
+        :type batch_size: int
+        :param ordered: If set to True, documents are yielded sorted by key.
+        :type ordered: bool
+        :param max_pending_batches: Max number of fetched batches per
+            partition waiting to be consumed.
+        :type max_pending_batches: int
+        :param progress: Callback invoked after each batch is consumed with the
+            partition index, the number of documents consumed from the
+            partition so far and whether the partition is complete.
+        :type progress: callable
+        :returns: Generator of documents.
+        :rtype: collections.abc.Iterator[dict]
+        :raise c8.exceptions.C8QLQueryExecuteError: If a query fails.
+        """
+        _collection = self.get_collection(collection_name)
+        return _collection.export_parallel(
+            partitions=partitions,
+            batch_size=batch_size,
+            ordered=ordered,
+            max_pending_batches=max_pending_batches,
+            progress=progress,
+        )
+
     # client.has_collection
 
     def has_collection(self, name):
@@ -672,12 +968,61 @@ class C8Client(object):
 
     # client.on_change
 
-    def on_change(self, collection, callback, timeout=60):
-        resp = self._fabric.on_change(collection, callback, timeout)
+    def on_change(self, collection, callback, timeout=60, subscription_name=None):
+        resp = self._fabric.on_change(
+            collection, callback, timeout, subscription_name=subscription_name
+        )
         return resp
 
+    # client.change_feed
+
+    def change_feed(
+        self,
+        collection,
+        subscription_name,
+        handler,
+        checkpoint_store=None,
+        checkpoint_every=1000,
+        checkpoint_interval=5,
+        on_checkpoint=None,
+    ):
+        """Return a change data capture feed of a collection, resuming where
+        it stopped.
+
+        See :class:`c8.cdc.ChangeFeed`.
+
+        :param collection: Collection name.
+        :type collection: str | unicode
+        :param subscription_name: Subscription name, shared by the runs and
+            the replicas of the feed.
+        :type subscription_name: str | unicode
+        :param handler: Function called with each change.
+        :type handler: callable
+        :param checkpoint_store: Checkpoint store, e.g.
+            :class:`c8.cdc.FileCheckpointStore` or
+            :class:`c8.cdc.KVCheckpointStore`.
+        :param checkpoint_every: Number of changes between checkpoints.
+        :type checkpoint_every: int
+        :param checkpoint_interval: Max time in seconds between checkpoints.
+        :type checkpoint_interval: int | float
+        :param on_checkpoint: Function called with each checkpoint before it
+            is saved.
+        :type on_checkpoint: callable
+        :returns: Change feed.
+        :rtype: c8.cdc.ChangeFeed
+        """
+        return self._fabric.change_feed(
+            collection,
+            subscription_name,
+            handler,
+            checkpoint_store=checkpoint_store,
+            checkpoint_every=checkpoint_every,
+            checkpoint_interval=checkpoint_interval,
+            on_checkpoint=on_checkpoint,
+        )
+
     # client.get_document
-    def get_document(self, collection, document, rev=None, check_rev=True):
+    def get_document(self, collection, document, rev=None, check_rev=True, hedge=None):
         """Return a document.
 
         :param collection: Collection Name
@@ -691,28 +1036,39 @@ class C8Client(object):
         :param check_rev: If set to True, revision of **document** (if given)
             is compared against the revision of target document.
         :type check_rev: bool
+        :param hedge: If set to True, the read is sent again (to another
+            region if possible) when it is slow, see
+            :class:`c8.hedging.HedgePolicy`. False disables it. Not set means
+            the hedging policy of the client applies.
+        :type hedge: bool | None
         :returns: Document, or None if not found.
         :rtype: dict | None
         :raise c8.exceptions.DocumentGetError: If retrieval fails.
         :raise c8.exceptions.DocumentRevisionError: If revisions mismatch.
         """
         _collection = self.get_collection(collection)
-        resp = _collection.get(document=document, rev=rev, check_rev=check_rev)
+        resp = _collection.get(
+            document=document, rev=rev, check_rev=check_rev, hedge=hedge
+        )
         return resp
 
     # client.get_all_documents
 
-    def get_all_documents(self, collection_name, batch_size=1000):
+    def get_all_documents(self, collection_name, batch_size=1000, prefetch=0):
         """Return all the documents inside the given collection.
 
          Note: Please make sure there is more than enough memory available on your system (RAM + Swap(if swap is enabled))
          to be able fetch total size of the documents to be returned. This will help avoid any Out-Of-Memory problems.
+         For large collections, stream the documents with stream_all_documents() instead.
 
         :param collection_name: Collection Name
         :type collection_name: str
         :param batch_size: Batch size is a configurable number. Results are retieved by continuously
             calling the next batch of cursor of size batch_size
         :type batch_size: int
+        :param prefetch: Number of batches fetched ahead on a background
+            thread while the current batch is processed.
+        :type prefetch: int
         :returns: Documents, or None if not found.
         :rtype: dict | None
         :raise c8.exceptions.C8QLQueryExecuteError: If retrieval fails.
@@ -720,16 +1076,18 @@ class C8Client(object):
         return self._fabric.c8ql.get_all_batches(
             query="FOR doc IN {} RETURN doc".format(collection_name),
             batch_size=batch_size,
+            prefetch=prefetch,
         )
 
     # client.get_all_batches
 
-    def get_all_batches(self, query, bind_vars=None, batch_size=1000):
+    def get_all_batches(self, query, bind_vars=None, batch_size=1000, prefetch=0):
         """Returns all batches for a query. It should only be used for Read operations. Query cannot contain
          the following keywords: INSERT, UPDATE, REPLACE, REMOVE and UPSERT.
 
          Note: Please make sure there is more than enough memory available on your system (RAM + Swap(if swap is enabled))
          to be able fetch total size of the documents to be returned. This will help avoid any Out-Of-Memory problems.
+         For large result sets, stream the batches with stream_batches() instead.
 
         :param query: Query to Execute
         :type query: str
@@ -738,6 +1096,9 @@ class C8Client(object):
         :param batch_size: Batch size is a configurable number. Results are retieved by continuously
             calling the next batch of cursor of size batch_size
         :type batch_size: int
+        :param prefetch: Number of batches fetched ahead on a background
+            thread while the current batch is processed.
+        :type prefetch: int
         :returns: Documents, or None if not found.
         :rtype: dict | None
         :raise c8.exceptions.C8QLQueryExecuteError: If retrieval fails.
@@ -747,6 +1108,59 @@ class C8Client(object):
             query=query,
             bind_vars=bind_vars,
             batch_size=batch_size,
+            prefetch=prefetch,
+        )
+
+    # client.stream_all_documents
+
+    def stream_all_documents(self, collection_name, batch_size=1000, prefetch=0):
+        """Stream all the documents inside the given collection.
+
+        Documents are yielded as batches arrive, so memory usage stays flat
+        regardless of the size of the collection.
+
+        :param collection_name: Collection Name
+        :type collection_name: str
+        :param batch_size: Number of documents fetched per round trip.
+        :type batch_size: int
+        :param prefetch: Number of batches fetched ahead on a background
+            thread while the current batch is processed.
+        :type prefetch: int
+        :returns: Generator of documents with the system keys stripped.
+        :rtype: collections.abc.Iterator[dict]
+        :raise c8.exceptions.C8QLQueryExecuteError: If retrieval fails.
+        """
+        return self._fabric.c8ql.stream_documents(
+            query="FOR doc IN {} RETURN doc".format(collection_name),
+            batch_size=batch_size,
+            prefetch=prefetch,
+        )
+
+    # client.stream_batches
+
+    def stream_batches(self, query, bind_vars=None, batch_size=1000, prefetch=0):
+        """Stream the result batches of a read-only query. Query cannot contain
+        the following keywords: INSERT, UPDATE, REPLACE, REMOVE and UPSERT.
+
+        :param query: Query to Execute
+        :type query: str
+        :param bind_vars: Bind variables for the query.
+        :type bind_vars: dict
+        :param batch_size: Number of documents fetched per round trip.
+        :type batch_size: int
+        :param prefetch: Number of batches fetched ahead on a background
+            thread while the current batch is processed.
+        :type prefetch: int
+        :returns: Generator of batches, each a list of documents with the
+            system keys stripped.
+        :rtype: collections.abc.Iterator[list]
+        :raise c8.exceptions.C8QLQueryExecuteError: If retrieval fails.
+        """
+        return self._fabric.c8ql.stream_batches(
+            query=query,
+            bind_vars=bind_vars,
+            batch_size=batch_size,
+            prefetch=prefetch,
         )
 
     # client.insert_document
@@ -795,13 +1209,21 @@ class C8Client(object):
 
     # client.insert_document_from_file()
     def insert_document_from_file(
-        self, collection_name, filepath, return_new=False, sync=None, silent=False
+        self,
+        collection_name,
+        filepath,
+        return_new=False,
+        sync=None,
+        silent=False,
+        chunk_size=1000,
+        coerce=None,
     ):
-        """Insert a documents from csv file.
+        """Insert documents from a CSV, JSON or JSON Lines file.
 
         :param collection_name: Collection name.
         :type collection_name: str | unicode
-        :param filepath: CSV or JSON file path which contains documents
+        :param filepath: CSV, JSON or JSON Lines file path which contains
+            documents. Files ending with ".gz" are decompressed on the fly.
         :type filepath: str
         :param return_new: Include body of the new document in the returned
             metadata. Ignored if parameter **silent** is set to True.
@@ -811,15 +1233,89 @@ class C8Client(object):
         :param silent: If set to True, no document metadata is returned. This
             can be used to save resources.
         :type silent: bool
+        :param chunk_size: Number of documents inserted per request.
+        :type chunk_size: int
+        :param coerce: If set to True, CSV values that look like numbers,
+            booleans or nulls are converted. A dict maps field names to
+            callables applied to the values of the field instead.
+        :type coerce: bool | dict
         :returns: Document metadata (e.g. document key, revision) or True if
-            parameter **silent** was set to True.
+            parameter **silent** was set to True, for each chunk.
         """
         _collection = self.get_collection(collection_name)
         resp = _collection.insert_from_file(
-            filepath=filepath, return_new=return_new, sync=sync, silent=silent
+            filepath=filepath,
+            return_new=return_new,
+            sync=sync,
+            silent=silent,
+            chunk_size=chunk_size,
+            coerce=coerce,
         )
         return resp
 
+    # client.import_from_file
+    def import_from_file(
+        self,
+        collection_name,
+        filepath,
+        file_format=None,
+        coerce=None,
+        chunk_size=1000,
+        concurrency=4,
+        details=True,
+        primary_key=None,
+        replace=False,
+        progress=None,
+    ):
+        """Import documents from a CSV, JSON or JSON Lines file in constant
+        memory.
+
+        :param collection_name: Collection name.
+        :type collection_name: str | unicode
+        :param filepath: File path. Files ending with ".gz" are decompressed
+            on the fly.
+        :type filepath: str | unicode
+        :param file_format: "csv", "json" or "jsonl". Detected from the file
+            extension if not set.
+        :type file_format: str | unicode
+        :param coerce: If set to True, CSV values that look like numbers,
+            booleans or nulls are converted. A dict maps field names to
+            callables applied to the values of the field instead.
+        :type coerce: bool | dict
+        :param chunk_size: Max number of documents per chunk.
+        :type chunk_size: int
+        :param concurrency: Max number of chunks in flight.
+        :type concurrency: int
+        :param details: If set to True, the result includes the detailed error
+            messages.
+        :type details: bool
+        :param primary_key: If not None then uses this field as the primary
+            key for the documents to be inserted.
+        :type primary_key: str | unicode
+        :param replace: Replace existing documents on unique key constraint
+            violations.
+        :type replace: bool
+        :param progress: Callback invoked with the ingest statistics each time
+            a chunk completes.
+        :type progress: callable
+        :returns: Result of the bulk import.
+        :rtype: dict
+        :raise c8.exceptions.CollectionImportFromFileError: If the file is
+            invalid.
+        """
+        _collection = self.get_collection(collection_name)
+        return _collection.import_from_file(
+            filepath,
+            file_format=file_format,
+            coerce=coerce,
+            chunk_size=chunk_size,
+            concurrency=concurrency,
+            details=details,
+            primary_key=primary_key,
+            replace=replace,
+            progress=progress,
+        )
+
     # client.update_document
 
     def update_document(
@@ -1228,6 +1724,7 @@ class C8Client(object):
         count=False,
         bind_vars=None,
         profile=None,
+        prefetch=0,
     ):
         """Execute the query and return the result cursor.
 
@@ -1243,6 +1740,9 @@ class C8Client(object):
         :param profile: Return additional profiling details in the cursor,
             unless the query cache is used.
         :type profile: bool
+        :param prefetch: Number of batches the cursor fetches ahead on a
+            background thread. 0 (default) disables prefetching.
+        :type prefetch: int
         :returns: Result cursor.
         :rtype: c8.cursor.Cursor
         :raise c8.exceptions.C8QLQueryExecuteError: If execute fails.
@@ -1253,6 +1753,7 @@ class C8Client(object):
             count=count,
             bind_vars=bind_vars,
             profile=profile,
+            prefetch=prefetch,
         )
         return resp
 
@@ -1544,6 +2045,72 @@ class C8Client(object):
             message_routing_mode=message_routing_mode,
         )
 
+    # client.create_batch_producer
+
+    def create_batch_producer(
+        self,
+        stream,
+        isCollectionStream=False,
+        local=False,
+        producer_name=None,
+        send_timeout_millis=30000,
+        compression_type=CompressionType.NONE.value,
+        max_pending_messages=1000,
+        message_routing_mode=RoutingMode.ROUND_ROBIN_PARTITION.value,
+        batch_max_messages=1000,
+        batch_max_bytes=1024 * 1024,
+        linger_ms=5,
+        block_if_queue_full=True,
+        serializer=None,
+        compression=None,
+    ):
+        """Create a producer buffering messages client side.
+
+        Messages are written to the websocket in batches and acknowledged
+        through futures, see :class:`c8.stream_producer.BatchProducer`.
+
+        **Args**
+
+        * `stream`: The stream name
+
+        **Options**
+
+        * `local`: If the stream_stream is local or global default its global
+        * `producer_name`: Specify a name for the producer.
+        * `send_timeout_millis`: Time after which a message which is not
+                                 acknowledged fails.
+        * `compression_type`: Set the compression type for the producer.
+        * `max_pending_messages`: Max number of messages buffered or awaiting
+                                  their acknowledgment.
+        * `message_routing_mode`: Set the message routing mode for the
+                                  partitioned producer.
+        * `batch_max_messages`: Max number of messages per write.
+        * `batch_max_bytes`: Max number of encoded bytes per write.
+        * `linger_ms`: Max time in milliseconds a message is buffered.
+        * `block_if_queue_full`: Set whether `send` should block when the max
+                                 number of pending messages is reached.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        * `compression`: Payload compression, "zlib" or "lz4".
+        """
+        _stream = self._fabric.stream()
+        return _stream.create_batch_producer(
+            stream,
+            isCollectionStream=isCollectionStream,
+            local=local,
+            producer_name=producer_name,
+            send_timeout_millis=send_timeout_millis,
+            compression_type=compression_type,
+            max_pending_messages=max_pending_messages,
+            message_routing_mode=message_routing_mode,
+            batch_max_messages=batch_max_messages,
+            batch_max_bytes=batch_max_bytes,
+            linger_ms=linger_ms,
+            block_if_queue_full=block_if_queue_full,
+            serializer=serializer,
+            compression=compression,
+        )
+
     # client.subscribe
 
     def subscribe(
@@ -1660,6 +2227,179 @@ class C8Client(object):
             reader_name=reader_name,
         )
 
+    # client.asyncio_subscribe
+
+    def asyncio_subscribe(
+        self,
+        stream,
+        isCollectionStream=False,
+        local=False,
+        subscription_name=None,
+        consumer_type=ConsumerTypes.EXCLUSIVE.value,
+        receiver_queue_size=1000,
+        consumer_name=None,
+        ack_batch_size=100,
+        ack_interval_ms=50,
+        serializer=None,
+    ):
+        """Subscribe to the given topic and subscription combination, for use
+        with asyncio.
+
+        See :func:`c8.stream_collection.StreamCollection.asyncio_subscribe`.
+
+        **Args**
+
+        * `stream`: The name of the stream.
+
+        **Options**
+
+        * `local`: If the stream_stream is local or global default its global
+        * `subscription_name`: The name of the subscription.
+        * `consumer_type`: Select the subscription type to be used when
+                           subscribing to the topic.
+        * `receiver_queue_size`: Sets the size of the consumer receive queue.
+        * `consumer_name`: Sets the consumer name.
+        * `ack_batch_size`: Number of queued acknowledgements triggering a
+                            write.
+        * `ack_interval_ms`: Max time in milliseconds an acknowledgement is
+                             queued.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        """
+        _stream = self._fabric.stream()
+        return _stream.asyncio_subscribe(
+            stream=stream,
+            isCollectionStream=isCollectionStream,
+            local=local,
+            subscription_name=subscription_name,
+            consumer_type=consumer_type,
+            receiver_queue_size=receiver_queue_size,
+            consumer_name=consumer_name,
+            ack_batch_size=ack_batch_size,
+            ack_interval_ms=ack_interval_ms,
+            serializer=serializer,
+        )
+
+    # client.create_asyncio_stream_reader
+
+    def create_asyncio_stream_reader(
+        self,
+        stream,
+        start_message_id="latest",
+        local=False,
+        isCollectionStream=False,
+        receiver_queue_size=1000,
+        reader_name=None,
+        serializer=None,
+    ):
+        """Create a reader on a particular topic, for use with asyncio.
+
+        See :func:`c8.stream_collection.StreamCollection.create_asyncio_reader`.
+
+        **Args**
+
+        * `stream`: The name of the stream.
+
+        **Options**
+        * `start_message_id`: The initial reader positioning is done by
+                              specifying a message id. ("latest" or "earliest")
+        * `local`: If the stream_stream is local or global default its global
+        * `receiver_queue_size`: Sets the size of the reader receive queue.
+        * `reader_name`: Sets the reader name.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        """
+        _stream = self._fabric.stream()
+        return _stream.create_asyncio_reader(
+            stream=stream,
+            start_message_id=start_message_id,
+            local=local,
+            isCollectionStream=isCollectionStream,
+            receiver_queue_size=receiver_queue_size,
+            reader_name=reader_name,
+            serializer=serializer,
+        )
+
+    # client.create_consumer_group
+
+    def create_consumer_group(
+        self,
+        stream,
+        subscription_name,
+        handler,
+        workers=4,
+        processes=False,
+        local=False,
+        isCollectionStream=False,
+        consumer_type=ConsumerTypes.SHARED.value,
+        receiver_queue_size=1000,
+        serializer=None,
+    ):
+        """Create workers consuming a stream through the same subscription.
+
+        See :func:`c8.stream_collection.StreamCollection.create_consumer_group`.
+
+        **Args**
+
+        * `stream`: The name of the stream.
+        * `subscription_name`: The name of the subscription.
+        * `handler`: Function called with each message. The message is
+                     acknowledged if it returns, and negatively acknowledged
+                     if it raises.
+
+        **Options**
+
+        * `workers`: Number of workers.
+        * `processes`: Run the workers in processes instead of threads.
+        * `local`: If the stream_stream is local or global default its global
+        * `consumer_type`: Subscription type, Shared or Failover.
+        * `receiver_queue_size`: Size of the receive queue of each worker.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        """
+        _stream = self._fabric.stream()
+        return _stream.create_consumer_group(
+            stream,
+            subscription_name,
+            handler,
+            workers=workers,
+            processes=processes,
+            local=local,
+            isCollectionStream=isCollectionStream,
+            consumer_type=consumer_type,
+            receiver_queue_size=receiver_queue_size,
+            serializer=serializer,
+        )
+
+    # client.create_stream_connection_pool
+
+    def create_stream_connection_pool(
+        self, max_idle=4, idle_timeout=300, health_check_interval=30, ping_timeout=1
+    ):
+        """Create a pool of persistent producer, consumer and reader
+        websockets, shared by threads.
+
+        See :func:`c8.stream_collection.StreamCollection.create_connection_pool`.
+
+        **Options**
+
+        * `max_idle`: Max number of idle websockets kept per stream and
+                      options.
+        * `idle_timeout`: Time in seconds after which idle websockets are
+                          closed.
+        * `health_check_interval`: Idle time in seconds after which
+                                   websockets are pinged before being reused.
+        * `ping_timeout`: Time in seconds to wait for the pong of a producer
+                          websocket.
+        """
+        _stream = self._fabric.stream()
+        return _stream.create_connection_pool(
+            max_idle=max_idle,
+            idle_timeout=idle_timeout,
+            health_check_interval=health_check_interval,
+            ping_timeout=ping_timeout,
+        )
+
     # client.unsubscribe
     def unsubscribe(self, subscription, local=False):
         """Unsubscribes the given subscription on all streams on a stream fabric
@@ -2760,18 +3500,23 @@ class C8Client(object):
 
     # client.get_value_for_key
 
-    def get_value_for_key(self, name, key):
+    def get_value_for_key(self, name, key, hedge=None):
         """Get value for a key from key-value collection.
 
         :param name: Collection name.
         :type name: str | unicode
         :param key: The key for which the value is to be fetched.
         :type key: string
+        :param hedge: If set to True, the read is sent again (to another
+            region if possible) when it is slow, see
+            :class:`c8.hedging.HedgePolicy`. False disables it. Not set means
+            the hedging policy of the client applies.
+        :type hedge: bool | None
         :returns: The value object.
         :rtype: object
         :raise c8.exceptions.GetValueError: If request fails.
         """
-        return self._fabric.key_value.get_value_for_key(name=name, key=key)
+        return self._fabric.key_value.get_value_for_key(name=name, key=key, hedge=hedge)
 
     # client.get_keys
 
@@ -3017,6 +3762,16 @@ class C8Client(object):
         """
         return self._search.list_all_views()
 
+    def has_view(self, name):
+        """Check if a view exists
+
+        :param name: The name of the view
+        :type name: str | unicode
+        :returns: True if the view exists, False otherwise
+        :rtype: bool
+        """
+        return self._search.has_view(name)
+
     def get_view_info(self, view):
         """Returns information about view
 
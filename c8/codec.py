@@ -0,0 +1,169 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+from abc import ABCMeta, abstractmethod
+
+from six import string_types
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+__all__ = [
+    "JSONCodec",
+    "StdlibJSONCodec",
+    "OrjsonCodec",
+    "UjsonCodec",
+    "default_codec",
+    "get_codec",
+]
+
+
+class JSONCodec(object):  # pragma: no cover
+    """Abstract base class for JSON codecs.
+
+    Codecs serialize request payloads straight to UTF-8 bytes and deserialize
+    response bodies from bytes, so no intermediate text is built.
+    """
+
+    __metaclass__ = ABCMeta
+
+    name = None
+
+    def __repr__(self):
+        return "<{} {}>".format(self.__class__.__name__, self.name)
+
+    @abstractmethod
+    def encode(self, obj):
+        """Serialize an object to JSON.
+
+        This method must be overridden by the user.
+
+        :param obj: Object to serialize.
+        :type obj: str | unicode | bool | int | float | list | dict | None
+        :returns: UTF-8 encoded JSON.
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode(self, data):
+        """Deserialize JSON.
+
+        This method must be overridden by the user.
+
+        :param data: UTF-8 encoded JSON, or JSON text.
+        :type data: bytes | str | unicode
+        :returns: Deserialized object.
+        :rtype: str | unicode | bool | int | float | list | dict | None
+        :raise ValueError: If the data is not valid JSON.
+        """
+        raise NotImplementedError
+
+
+class StdlibJSONCodec(JSONCodec):
+    """JSON codec based on the standard library."""
+
+    name = "json"
+
+    def encode(self, obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec based on the `orjson` package.
+
+    Objects orjson does not support (e.g. integers over 64 bits or dicts with
+    non-string keys) fall back to the standard library.
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires the orjson package")
+
+    def encode(self, obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """JSON codec based on the `ujson` package."""
+
+    name = "ujson"
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError("UjsonCodec requires the ujson package")
+
+    def encode(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data):
+        return ujson.loads(data)
+
+
+_CODECS = {
+    StdlibJSONCodec.name: StdlibJSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+
+_default_codec = None
+
+
+def default_codec():
+    """Return the fastest JSON codec available.
+
+    orjson is preferred over ujson, and the standard library is used if
+    neither is installed.
+
+    :returns: JSON codec shared by all callers.
+    :rtype: c8.codec.JSONCodec
+    """
+    global _default_codec
+    if _default_codec is None:
+        if orjson is not None:
+            _default_codec = OrjsonCodec()
+        elif ujson is not None:
+            _default_codec = UjsonCodec()
+        else:
+            _default_codec = StdlibJSONCodec()
+    return _default_codec
+
+
+def get_codec(codec=None):
+    """Return a JSON codec.
+
+    :param codec: Codec, or name of the codec ("orjson", "ujson" or "json").
+        The fastest codec available is returned if not set.
+    :type codec: c8.codec.JSONCodec | str | unicode | None
+    :returns: JSON codec.
+    :rtype: c8.codec.JSONCodec
+    :raise ValueError: If the codec name is unknown.
+    """
+    if codec is None:
+        return default_codec()
+    if isinstance(codec, string_types):
+        if codec not in _CODECS:
+            raise ValueError("unknown JSON codec: {}".format(codec))
+        return _CODECS[codec]()
+    return codec
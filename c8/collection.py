@@ -4,7 +4,7 @@ from json import dumps
 from numbers import Number
 
 from c8.api import APIWrapper
-from c8.cursor import Cursor
+from c8.bulk import BulkImporter
 from c8.exceptions import (
     CollectionImportFromFileError,
     CollectionPropertiesError,
@@ -24,17 +24,11 @@ from c8.exceptions import (
     IndexDeleteError,
     IndexListError,
 )
+from c8.export import ParallelExporter
+from c8.reader import DocumentFileReader, detect_format
 from c8.request import Request
 from c8.response import Response
-from c8.utils import (
-    csv_reader,
-    get_doc_id,
-    get_documents_from_file,
-    group_csv_key_values,
-    is_none_or_int,
-    is_none_or_str,
-    json_reader,
-)
+from c8.utils import get_doc_id, is_none_or_int, is_none_or_str
 
 __all__ = ["StandardCollection", "VertexCollection", "EdgeCollection"]
 
@@ -488,7 +482,7 @@ class Collection(APIWrapper):
         def response_handler(resp):
             if not resp.is_success:
                 raise DocumentGetError(resp, request)
-            return Cursor(self._conn, resp.body)
+            return self._cursor(resp.body, url=resp.url)
 
         return self._execute(request, response_handler)
 
@@ -554,10 +548,10 @@ class Collection(APIWrapper):
         def response_handler(resp):
             # TODO workaround for a bug in C8Db
             if self._is_transaction and limit == 0:
-                return Cursor(self._conn, [])
+                return self._cursor([])
             if not resp.is_success:
                 raise DocumentGetError(resp, request)
-            return Cursor(self._conn, resp.body)
+            return self._cursor(resp.body, url=resp.url)
 
         return self._execute(request, response_handler)
 
@@ -619,7 +613,7 @@ class Collection(APIWrapper):
         def response_handler(resp):
             if not resp.is_success:
                 raise DocumentGetError(resp, request)
-            return Cursor(self._conn, resp.body)
+            return self._cursor(resp.body, url=resp.url)
 
         return self._execute(request, response_handler)
 
@@ -675,10 +669,10 @@ class Collection(APIWrapper):
         def response_handler(resp):
             # TODO workaround for a bug in C8Db
             if self._is_transaction and limit == 0:
-                return Cursor(self._conn, [])
+                return self._cursor([])
             if not resp.is_success:
                 raise DocumentGetError(resp, request)
-            return Cursor(self._conn, resp.body)
+            return self._cursor(resp.body, url=resp.url)
 
         return self._execute(request, response_handler)
 
@@ -960,7 +954,53 @@ class StandardCollection(Collection):
     def __getitem__(self, key):
         return self.get(key)
 
-    def get(self, document, rev=None, check_rev=True):
+    def export_parallel(
+        self,
+        partitions=4,
+        batch_size=1000,
+        ordered=True,
+        max_pending_batches=2,
+        progress=None,
+    ):
+        """Export all documents in the collection over concurrent cursors.
+
+        The key space is split into **partitions** ranges of roughly equal
+        size, each read by its own streaming cursor on a worker thread.
+
+        :param partitions: Number of key ranges read concurrently.
+        :type partitions: int
+        :param batch_size: Number of documents fetched per round trip.
+        :type batch_size: int
+        :param ordered: If set to True, documents are yielded sorted by key.
+            Otherwise they are yielded as soon as any partition delivers them.
+        :type ordered: bool
+        :param max_pending_batches: Max number of fetched batches per
+            partition waiting to be consumed. Workers block once it is
+            reached.
+        :type max_pending_batches: int
+        :param progress: Callback invoked after each batch is consumed with the
+            partition index, the number of documents consumed from the
+            partition so far and whether the partition is complete.
+        :type progress: callable
+        :returns: Generator of documents.
+        :rtype: collections.abc.Iterator[dict]
+        :raise c8.exceptions.C8QLQueryExecuteError: If a query fails.
+        :raise c8.exceptions.CursorNextError: If batch retrieval fails.
+        """
+        return iter(
+            ParallelExporter(
+                self._conn,
+                self._executor,
+                self.name,
+                partitions=partitions,
+                batch_size=batch_size,
+                ordered=ordered,
+                max_pending_batches=max_pending_batches,
+                progress=progress,
+            )
+        )
+
+    def get(self, document, rev=None, check_rev=True, hedge=None):
         """Return a document.
 
         :param document: Document ID, key or body. Document body must contain
@@ -972,6 +1012,11 @@ class StandardCollection(Collection):
         :param check_rev: If set to True, revision of **document** (if given)
             is compared against the revision of target document.
         :type check_rev: bool
+        :param hedge: If set to True, the read is sent again (to another
+            region if possible) when it is slow, see
+            :class:`c8.hedging.HedgePolicy`. False disables it. Not set means
+            the hedging policy of the client applies.
+        :type hedge: bool | None
         :returns: Document, or None if not found.
         :rtype: dict | None
         :raise c8.exceptions.DocumentGetError: If retrieval fails.
@@ -991,6 +1036,7 @@ class StandardCollection(Collection):
             headers=headers,
             command=command,
             read=self.name,
+            hedge=hedge,
         )
 
         def response_handler(resp):
@@ -1004,9 +1050,25 @@ class StandardCollection(Collection):
 
         return self._execute(request, response_handler)
 
-    def insert_from_file(self, filepath, return_new=False, sync=None, silent=False):
-        """Insert a documents from csv file.
-        :param filepath: CSV or JSON file path which contains documents
+    def insert_from_file(
+        self,
+        filepath,
+        return_new=False,
+        sync=None,
+        silent=False,
+        chunk_size=1000,
+        coerce=None,
+    ):
+        """Insert documents from a CSV, JSON or JSON Lines file.
+
+        The file is read one document at a time and inserted in chunks of
+        **chunk_size** documents (see
+        :func:`c8.collection.StandardCollection.insert_many`), so the whole
+        file is never held in memory. Files ending with ".gz" are
+        decompressed on the fly.
+
+        :param filepath: CSV, JSON (array of documents) or JSON Lines file path
+            which contains documents.
         :type filepath: str
         :param return_new: Include body of the new document in the returned
             metadata. Ignored if parameter **silent** is set to True.
@@ -1016,28 +1078,103 @@ class StandardCollection(Collection):
         :param silent: If set to True, no document metadata is returned. This
             can be used to save resources.
         :type silent: bool
-        :returns: Document metadata (e.g. document key, revision) or True if
-            parameter **silent** was set to True.
-        :rtype: bool | dict
+        :param chunk_size: Number of documents inserted per request.
+        :type chunk_size: int
+        :param coerce: If set to True, CSV values that look like numbers,
+            booleans or nulls are converted. A dict maps field names to
+            callables applied to the values of the field instead.
+        :type coerce: bool | dict
+        :returns: Result of :func:`c8.collection.StandardCollection.insert_many`
+            for each chunk.
+        :rtype: [bool | list]
+        :raise c8.exceptions.CollectionImportFromFileError: If the file is
+            invalid.
         :raise c8.exceptions.DocumentInsertError: If insert fails.
         """
-        result = []
-        if filepath.endswith(".csv"):
-            data = csv_reader(filepath)
-            data_dict = group_csv_key_values(data)
-            documents, index = get_documents_from_file(data_dict, 0)
-            resp = self.insert_many(documents, return_new, sync, silent)
-            result.append(resp)
-            return result
-
-        elif filepath.endswith(".json"):
-            documents = json_reader(filepath)
-            resp = self.insert_many(documents, return_new, sync, silent)
-            result.append(resp)
-            return result
-        else:
+        if detect_format(filepath) is None:
             raise CollectionImportFromFileError("Invalid file")
 
+        result = []
+        documents = []
+        for document in DocumentFileReader(filepath, coerce=coerce):
+            documents.append(document)
+            if len(documents) >= chunk_size:
+                result.append(self.insert_many(documents, return_new, sync, silent))
+                documents = []
+        if documents or not result:
+            result.append(self.insert_many(documents, return_new, sync, silent))
+        return result
+
+    def import_from_file(
+        self,
+        filepath,
+        file_format=None,
+        coerce=None,
+        chunk_size=1000,
+        concurrency=4,
+        details=True,
+        primary_key=None,
+        replace=False,
+        progress=None,
+    ):
+        """Import documents from a CSV, JSON or JSON Lines file.
+
+        The file is streamed through
+        :func:`c8.collection.StandardCollection.bulk_import`, so files of any
+        size are imported in constant memory. Files ending with ".gz" are
+        decompressed on the fly.
+
+        :param filepath: File path.
+        :type filepath: str | unicode
+        :param file_format: "csv", "json" (array of documents) or "jsonl".
+            Detected from the file extension if not set.
+        :type file_format: str | unicode
+        :param coerce: If set to True, CSV values that look like numbers,
+            booleans or nulls are converted (empty values become None). A dict
+            maps field names to callables applied to the values of the field
+            instead, for any format.
+        :type coerce: bool | dict
+        :param chunk_size: Max number of documents per chunk.
+        :type chunk_size: int
+        :param concurrency: Max number of chunks in flight.
+        :type concurrency: int
+        :param details: If set to True, the result includes the detailed error
+            messages.
+        :type details: bool
+        :param primary_key: If not None then uses this field as the primary
+            key for the documents to be inserted.
+        :type primary_key: str | unicode
+        :param replace: Replace existing documents on unique key constraint
+            violations.
+        :type replace: bool
+        :param progress: Callback invoked each time a chunk completes with the
+            ingest statistics, extended with the bytes of the file read so far
+            ("file_bytes") and the file size ("file_size").
+        :type progress: callable
+        :returns: Result of the bulk import. Failures refer to the position of
+            the document in the file.
+        :rtype: dict
+        :raise c8.exceptions.CollectionImportFromFileError: If the file is
+            invalid.
+        """
+        reader = DocumentFileReader(filepath, file_format=file_format, coerce=coerce)
+        size = reader.size
+
+        def file_progress(stats):
+            stats["file_bytes"] = reader.position
+            stats["file_size"] = size
+            progress(stats)
+
+        return self.bulk_import(
+            reader,
+            chunk_size=chunk_size,
+            concurrency=concurrency,
+            details=details,
+            primary_key=primary_key,
+            replace=replace,
+            progress=None if progress is None else file_progress,
+        )
+
     def insert(self, document, return_new=False, sync=None, silent=False):
         """Insert a new document.
 
@@ -1087,7 +1224,9 @@ class StandardCollection(Collection):
 
         return self._execute(request, response_handler)
 
-    def insert_many(self, documents, return_new=False, sync=None, silent=False):
+    def insert_many(
+        self, documents, return_new=False, sync=None, silent=False, compress=None
+    ):
         """Insert multiple documents.
 
         If inserting a document fails, the exception object is placed in the
@@ -1105,6 +1244,10 @@ class StandardCollection(Collection):
         :param silent: If set to True, no document metadata is returned. This
             can be used to save resources.
         :type silent: bool
+        :param compress: Compression of the request payload, overriding the
+            compression policy of the client: False disables it, True, "gzip"
+            or "deflate" compresses the payload whatever its size.
+        :type compress: bool | str | unicode
         :returns: List of document metadata (e.g. document keys, revisions) and
             any exception, or True if parameter **silent** was set to True.
         :rtype: [dict | C8Error] | bool
@@ -1129,6 +1272,7 @@ class StandardCollection(Collection):
             params=params,
             command=command,
             write=self.name,
+            compress=compress,
         )
 
         def response_handler(resp):
@@ -1660,7 +1804,9 @@ class StandardCollection(Collection):
 
         return self._execute(request, response_handler)
 
-    def import_bulk(self, documents, details=True, primaryKey=None, replace=False):
+    def import_bulk(
+        self, documents, details=True, primaryKey=None, replace=False, compress=None
+    ):
         """Insert multiple documents into the collection.
 
         This is faster than :func:`c8.collection.Collection.insert_many`
@@ -1681,6 +1827,10 @@ class StandardCollection(Collection):
             the existing documents with new ones else it won't replace the documents and
             count it as "error".
         :type replace: bool
+        :param compress: Compression of the request payload, overriding the
+            compression policy of the client: False disables it, True, "gzip"
+            or "deflate" compresses the payload whatever its size.
+        :type compress: bool | str | unicode
         :returns: Result of the bulk import.
         :rtype: dict
         :raise c8.exceptions.DocumentInsertError: If import fails.
@@ -1697,7 +1847,10 @@ class StandardCollection(Collection):
             data["replace"] = replace
 
         request = Request(
-            method="post", endpoint="/import/{}".format(self.name), data=data
+            method="post",
+            endpoint="/import/{}".format(self.name),
+            data=data,
+            compress=compress,
         )
 
         def response_handler(resp):
@@ -1707,6 +1860,85 @@ class StandardCollection(Collection):
 
         return self._execute(request, response_handler)
 
+    def bulk_import(
+        self,
+        documents,
+        method="import",
+        chunk_size=1000,
+        chunk_bytes=4 * 1024 * 1024,
+        concurrency=4,
+        details=True,
+        primary_key=None,
+        replace=False,
+        sync=None,
+        progress=None,
+        compress=None,
+    ):
+        """Insert documents from any iterable in concurrent chunks.
+
+        Unlike :func:`c8.collection.StandardCollection.import_bulk`, documents
+        are consumed lazily and sent in chunks bounded by **chunk_size** and
+        **chunk_bytes**, with up to **concurrency** chunks in flight. This
+        keeps memory usage flat for generators of arbitrary length.
+
+        :param documents: New documents to insert. If they contain the "_key"
+            or "_id" fields, the values are used as the keys of the new
+            documents (auto-generated otherwise). Any "_rev" field is ignored.
+        :type documents: collections.abc.Iterable[dict]
+        :param method: API used to write the chunks, "import" (see
+            :func:`c8.collection.StandardCollection.import_bulk`) or "insert"
+            (see :func:`c8.collection.StandardCollection.insert_many`).
+        :type method: str | unicode
+        :param chunk_size: Max number of documents per chunk.
+        :type chunk_size: int
+        :param chunk_bytes: Max size of the serialized documents of a chunk in
+            bytes.
+        :type chunk_bytes: int
+        :param concurrency: Max number of chunks in flight.
+        :type concurrency: int
+        :param details: If set to True, the result includes the detailed error
+            messages. Applies only to the "import" method.
+        :type details: bool
+        :param primary_key: If not None then uses this field as the primary
+            key for the documents to be inserted. Applies only to the "import"
+            method.
+        :type primary_key: str | unicode
+        :param replace: Replace existing documents on unique key constraint
+            violations. Applies only to the "import" method.
+        :type replace: bool
+        :param sync: Block until operation is synchronized to disk. Applies
+            only to the "insert" method.
+        :type sync: bool
+        :param progress: Callback invoked with the ingest statistics each time
+            a chunk completes.
+        :type progress: callable
+        :param compress: Compression of the chunks, overriding the
+            compression policy of the client: False disables it, True, "gzip"
+            or "deflate" compresses every chunk.
+        :type compress: bool | str | unicode
+        :returns: Number of documents created, failed, empty, updated and
+            ignored, the failures with the position of each failed document
+            in the input, and the ingest statistics.
+        :rtype: dict
+        :raise c8.exceptions.DocumentParseError: If a document is not a dict.
+        """
+        importer = BulkImporter(
+            self._conn,
+            self._executor,
+            self,
+            method=method,
+            chunk_size=chunk_size,
+            chunk_bytes=chunk_bytes,
+            concurrency=concurrency,
+            details=details,
+            primary_key=primary_key,
+            replace=replace,
+            sync=sync,
+            progress=progress,
+            compress=compress,
+        )
+        return importer.run(documents)
+
 
 class VertexCollection(Collection):
     """Vertex collection API wrapper.
@@ -0,0 +1,205 @@
+from __future__ import absolute_import, unicode_literals
+
+import gzip
+import threading
+import zlib
+
+from six import string_types
+
+__all__ = ["CompressionPolicy"]
+
+ENCODINGS = ("gzip", "deflate")
+
+
+def _compress(data, encoding, level):
+    if encoding == "gzip":
+        # A fixed modification time keeps the output deterministic.
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return zlib.compress(data, level)
+
+
+def _decompress(data, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    return zlib.decompress(data)
+
+
+class CompressionPolicy(object):
+    """Compression of request bodies and responses.
+
+    Request bodies of at least **min_size** bytes are compressed with the
+    **algorithm** of the policy, if any, and sent with a Content-Encoding
+    header. Only enable it for servers accepting compressed request bodies.
+    Single requests may override the policy (see the **compress** parameter
+    of e.g. :func:`c8.collection.StandardCollection.insert_many`).
+
+    Responses are negotiated through the Accept-Encoding header, and
+    decompressed if the HTTP client left them compressed. The default HTTP
+    client decompresses them itself.
+
+    The policy counts the bytes of the request bodies before and after
+    compression, and of the response bodies on the wire (as announced by
+    their Content-Length header) and decompressed, see :func:`stats`. It is
+    thread-safe and shared by all the connections of a client.
+
+    :param algorithm: Compression of request bodies, "gzip" or "deflate".
+        None disables it.
+    :type algorithm: str | unicode | None
+    :param min_size: Request bodies smaller than this many bytes are sent
+        uncompressed.
+    :type min_size: int
+    :param level: Compression level, from 1 (fastest) to 9 (smallest).
+    :type level: int
+    :param accept_encoding: Value of the Accept-Encoding header, or None to
+        leave it to the HTTP client.
+    :type accept_encoding: str | unicode | None
+    :raise ValueError: If the algorithm is unknown.
+    """
+
+    def __init__(
+        self, algorithm=None, min_size=1024, level=6, accept_encoding="gzip, deflate"
+    ):
+        if algorithm is not None and algorithm not in ENCODINGS:
+            raise ValueError("unknown compression: {}".format(algorithm))
+        self._algorithm = algorithm
+        self._min_size = min_size
+        self._level = level
+        self._accept_encoding = accept_encoding
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._requests_compressed = 0
+        self._request_bytes = 0
+        self._request_bytes_sent = 0
+        self._responses = 0
+        self._responses_compressed = 0
+        self._response_bytes = 0
+        self._response_bytes_received = 0
+
+    def __repr__(self):
+        return "<CompressionPolicy {}>".format(self._algorithm or "uncompressed")
+
+    @property
+    def algorithm(self):
+        """Return the compression of request bodies.
+
+        :returns: "gzip", "deflate" or None.
+        :rtype: str | unicode | None
+        """
+        return self._algorithm
+
+    def encode(self, data, headers, compress=None):
+        """Compress a request body if required, and set the request headers
+        accordingly.
+
+        :param data: Request body.
+        :type data: bytes | None
+        :param headers: Request headers, updated in place.
+        :type headers: dict
+        :param compress: Compression of this request: None applies the
+            policy, False disables it, True compresses the body whatever its
+            size (with gzip if the policy has no algorithm), and "gzip" or
+            "deflate" compresses it with that algorithm whatever its size.
+        :type compress: bool | str | unicode | None
+        :returns: Request body to send.
+        :rtype: bytes | None
+        """
+        if self._accept_encoding and "Accept-Encoding" not in headers:
+            headers["Accept-Encoding"] = self._accept_encoding
+        if data is None:
+            return data
+
+        size = len(data)
+        if compress is None:
+            encoding = self._algorithm if size >= self._min_size else None
+        elif compress is True:
+            encoding = self._algorithm or "gzip"
+        elif isinstance(compress, string_types):
+            if compress not in ENCODINGS:
+                raise ValueError("unknown compression: {}".format(compress))
+            encoding = compress
+        else:
+            encoding = None
+
+        if encoding is not None:
+            data = _compress(data, encoding, self._level)
+            headers["Content-Encoding"] = encoding
+        with self._lock:
+            self._requests += 1
+            self._requests_compressed += encoding is not None
+            self._request_bytes += size
+            self._request_bytes_sent += len(data)
+        return data
+
+    def decode(self, response):
+        """Decompress a response body left compressed by the HTTP client, and
+        count its bytes.
+
+        :param response: HTTP response, updated in place.
+        :type response: c8.response.Response
+        :returns: The response.
+        :rtype: c8.response.Response
+        """
+        headers = response.headers or {}
+        encoding = (headers.get("Content-Encoding") or "").strip().lower()
+        # The raw body is read without decoding it to text, which the
+        # raw_body property would do.
+        body = response._raw_body
+        if isinstance(body, string_types):
+            body = body.encode("utf-8")
+        elif not isinstance(body, (bytes, bytearray)):
+            body = b""
+        received = len(body)
+        if encoding in ENCODINGS and body:
+            # Compressed bodies start with the gzip magic number or a zlib
+            # header, decompressed JSON bodies never do.
+            magic = b"\x1f\x8b" if encoding == "gzip" else b"\x78"
+            if body.startswith(magic):
+                try:
+                    body = _decompress(body, encoding)
+                except (OSError, zlib.error):
+                    pass
+                else:
+                    response.raw_body = body
+            length = headers.get("Content-Length")
+            if length is not None and length.isdigit():
+                received = int(length)
+        with self._lock:
+            self._responses += 1
+            self._responses_compressed += encoding in ENCODINGS
+            self._response_bytes += len(body)
+            self._response_bytes_received += received
+        return response
+
+    def stats(self):
+        """Return the compression statistics.
+
+        :returns: Number of requests sent and compressed, bytes of their
+            bodies before compression ("request_bytes") and as sent
+            ("request_bytes_sent"), number of responses received and
+            compressed, bytes of their bodies on the wire
+            ("response_bytes_received") and decompressed ("response_bytes"),
+            and the compression ratios (uncompressed / compressed size) of
+            requests and responses.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "requests_compressed": self._requests_compressed,
+                "request_bytes": self._request_bytes,
+                "request_bytes_sent": self._request_bytes_sent,
+                "request_ratio": (
+                    self._request_bytes / self._request_bytes_sent
+                    if self._request_bytes_sent
+                    else 1.0
+                ),
+                "responses": self._responses,
+                "responses_compressed": self._responses_compressed,
+                "response_bytes": self._response_bytes,
+                "response_bytes_received": self._response_bytes_received,
+                "response_ratio": (
+                    self._response_bytes / self._response_bytes_received
+                    if self._response_bytes_received
+                    else 1.0
+                ),
+            }
@@ -5,14 +5,20 @@ import json
 import requests
 
 import c8.constants as constants
+from c8.cache import MetadataCache
+from c8.codec import get_codec
+from c8.compression import CompressionPolicy
 from c8.exceptions import (
     C8AuthenticationError,
     C8TenantNotFoundError,
     C8TokenNotFoundError,
+    ServerConnectionError,
 )
-from c8.http import DefaultHTTPClient
+from c8.hedging import HedgePolicy
+from c8.http import DefaultAsyncHTTPClient, DefaultHTTPClient
+from c8.retry import RetryPolicy
 
-__all__ = ["Connection"]
+__all__ = ["Connection", "AsyncConnection"]
 
 
 class Connection(object):
@@ -31,18 +37,60 @@ class Connection(object):
     :param is_fabric: Whether this a DB or streams call.
                       Anything other than streams is a DB call.
     :type is_fabric: bool
+    :param metadata_cache: Cache of fabric resource names. A cache with the
+        default TTL is created if not set.
+    :type metadata_cache: c8.cache.MetadataCache
+    :param json_codec: JSON codec, or its name, used to serialize request
+        payloads. The fastest codec available is used if not set.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    :param retry_policy: Retry policy of the requests sent through the
+        connection. A policy with the default settings is created if not set.
+    :type retry_policy: c8.retry.RetryPolicy
+    :param compression: Compression policy of the requests and responses. A
+        policy leaving request bodies uncompressed is created if not set.
+    :type compression: c8.compression.CompressionPolicy
+    :param router: Router of the requests across the regions of the fabric.
+        Requests are sent to **url** if not set.
+    :type router: c8.routing.RegionRouter
+    :param hedge_policy: Hedging of the latency-critical reads sent through
+        the connection. A policy hedging only the reads which ask for it is
+        created if not set.
+    :type hedge_policy: c8.hedging.HedgePolicy
     """
 
-    def __init__(self, url, email, password, token, apikey, http_client, skip_tenant=False):
+    def __init__(
+        self,
+        url,
+        email,
+        password,
+        token,
+        apikey,
+        http_client,
+        skip_tenant=False,
+        metadata_cache=None,
+        json_codec=None,
+        retry_policy=None,
+        compression=None,
+        router=None,
+        hedge_policy=None,
+    ):
         self.url = url
         self._tenant_name = ""
         self._fabric_name = constants.FABRIC_DEFAULT
         self._email = email
         self._password = password
-        self._http_client = http_client or DefaultHTTPClient()
+        self._codec = get_codec(json_codec)
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._compression = compression or CompressionPolicy()
+        self._router = router
+        self._hedge_policy = hedge_policy or HedgePolicy(enabled=False)
+        self._http_client = http_client or DefaultHTTPClient(json_codec=self._codec)
         self._token = token
         self._apikey = apikey
         self._header = ""
+        if metadata_cache is None:
+            metadata_cache = MetadataCache()
+        self._metadata_cache = metadata_cache
 
         if self._token is not None:
             self._auth_token = self._token
@@ -128,6 +176,61 @@ class Connection(object):
     def headers(self):
         return self._header
 
+    @property
+    def metadata_cache(self):
+        """Return the cache of fabric resource names.
+
+        :returns: Metadata cache.
+        :rtype: c8.cache.MetadataCache
+        """
+        return self._metadata_cache
+
+    @property
+    def retry_policy(self):
+        """Return the retry policy of the requests.
+
+        :returns: Retry policy.
+        :rtype: c8.retry.RetryPolicy
+        """
+        return self._retry_policy
+
+    @property
+    def compression(self):
+        """Return the compression policy of the requests and responses.
+
+        :returns: Compression policy, with byte counters available via
+            stats().
+        :rtype: c8.compression.CompressionPolicy
+        """
+        return self._compression
+
+    @property
+    def router(self):
+        """Return the router of the requests across regions.
+
+        :returns: Region router, or None if requests are not routed.
+        :rtype: c8.routing.RegionRouter | None
+        """
+        return self._router
+
+    @property
+    def hedge_policy(self):
+        """Return the hedging policy of the latency-critical reads.
+
+        :returns: Hedging policy.
+        :rtype: c8.hedging.HedgePolicy
+        """
+        return self._hedge_policy
+
+    @property
+    def json_codec(self):
+        """Return the JSON codec used to serialize request payloads.
+
+        :returns: JSON codec.
+        :rtype: c8.codec.JSONCodec
+        """
+        return self._codec
+
     @property
     def url_prefix(self):
         """Return the C8 URL prefix (base URL + tenant name).
@@ -175,15 +278,15 @@ class Connection(object):
         self._url_prefix = new_prefix
         # return old_prefix, self._url_prefix
 
-    def send_request(self, request, custom_prefix=None):
-        """Send an HTTP request to C8 server.
+    def _build_url(self, request, custom_prefix=None):
+        """Return the full URL of the request.
 
         :param request: HTTP request.
         :type request: c8.request.Request
         :param custom_prefix: Custom url-path value
         :type custom_prefix: str
-        :return: HTTP response.
-        :rtype: c8.response.Response
+        :return: Request URL.
+        :rtype: str | unicode
         """
         # Below line is a debug to show what the full request URL is.
         # Useful in testing multitenancy API calls
@@ -191,13 +294,19 @@ class Connection(object):
         if "/_fabric" in request.endpoint:
             find_url = self._url_prefix.find("/_fabric")
             url = self._url_prefix[0:find_url]
-            final_url = url + request.endpoint
-        else:
-            if custom_prefix is not None:
-                final_url = self.url + custom_prefix + request.endpoint
-            else:
-                final_url = self._url_prefix + request.endpoint
+            return url + request.endpoint
+        if custom_prefix is not None:
+            return self.url + custom_prefix + request.endpoint
+        return self._url_prefix + request.endpoint
 
+    def _build_headers(self, request):
+        """Return the request headers with the authorization header set.
+
+        :param request: HTTP request.
+        :type request: c8.request.Request
+        :return: Request headers.
+        :rtype: dict
+        """
         headers = request.headers
 
         if self._token is not None:
@@ -210,14 +319,167 @@ class Connection(object):
             headers["Authorization"] = "bearer " + self._auth_token
 
         self._header = headers
-        return self._http_client.send_request(
-            method=request.method,
-            url=final_url,
-            params=request.params,
-            data=request.data,
-            headers=headers,
+        return headers
+
+    def _route(self, request, url, hedge=False):
+        """Return the URL of the request on the region it is routed to.
+
+        :param request: HTTP request.
+        :type request: c8.request.Request
+        :param url: Request URL on the configured endpoint.
+        :type url: str | unicode
+        :param hedge: Route a hedge of the request instead.
+        :type hedge: bool
+        :return: Request URL.
+        :rtype: str | unicode
+        """
+        if self._router is None:
+            return url
+        if request.origin is not None:
+            return self._router.route(request.method, url, origin=request.origin)
+        # Read-only queries and Redis reads are sent as POST, and hedgeable
+        # requests are reads whatever their method.
+        read = request.hedge is not False or (
+            request.read is not None and request.write is None
+        )
+        return self._router.route(request.method, url, hedge, read)
+
+    def _origin(self, url):
+        """Return the base URL of the region a request was sent to.
+
+        :param url: Request URL.
+        :type url: str | unicode
+        :return: Base URL, or None without a region router.
+        :rtype: str | unicode | None
+        """
+        if self._router is None:
+            return None
+        return self._router.origin(url)
+
+    def _record(self, url, response=None):
+        """Record the outcome of a request sent to a region."""
+        if self._router is not None:
+            self._router.record(url, response)
+
+    def send_request(self, request, custom_prefix=None):
+        """Send an HTTP request to C8 server.
+
+        :param request: HTTP request.
+        :type request: c8.request.Request
+        :param custom_prefix: Custom url-path value
+        :type custom_prefix: str
+        :return: HTTP response.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If the connection fails
+            and the request is not retried.
+        """
+        url = self._build_url(request, custom_prefix)
+        headers = self._build_headers(request)
+        data = self._compression.encode(
+            request.encode(self._codec), headers, request.compress
+        )
+
+        def send(target):
+            try:
+                resp = self._http_client.send_request(
+                    method=request.method,
+                    url=target,
+                    params=request.params,
+                    data=data,
+                    headers=headers,
+                )
+            except ServerConnectionError:
+                self._record(target)
+                raise
+            self._record(target, resp)
+            return self._compression.decode(resp)
+
+        def execute(hedge=False):
+            # Routing each attempt lets retries fail over to another region.
+            return self._retry_policy.execute(
+                request.method,
+                url,
+                send,
+                route=lambda: self._route(request, url, hedge),
+            )
+
+        if self._hedge_policy.applies(request.hedge):
+            return self._hedge_policy.execute(execute, lambda: execute(True))
+        return execute()
+
+
+class AsyncConnection(Connection):
+    """HTTP connection which sends requests without blocking the event loop.
+
+    The connection takes over the URL, fabric and credentials of an already
+    authenticated connection, so no authentication round trip is made.
+
+    :param connection: Authenticated HTTP connection.
+    :type connection: c8.connection.Connection
+    :param http_client: User-defined asyncio HTTP client.
+    :type http_client: c8.http.AsyncHTTPClient
+    """
+
+    def __init__(self, connection, http_client=None):
+        self.__dict__.update(connection.__dict__)
+        self._http_client = http_client or DefaultAsyncHTTPClient(
+            json_codec=self._codec
+        )
+
+    def __repr__(self):
+        return "<AsyncConnection {}>".format(self._fabric_name)
+
+    async def send_request(self, request, custom_prefix=None):
+        """Send an HTTP request to C8 server.
+
+        :param request: HTTP request.
+        :type request: c8.request.Request
+        :param custom_prefix: Custom url-path value
+        :type custom_prefix: str
+        :return: HTTP response.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If the connection fails
+            and the request is not retried.
+        """
+        url = self._build_url(request, custom_prefix)
+        headers = self._build_headers(request)
+        data = self._compression.encode(
+            request.encode(self._codec), headers, request.compress
         )
 
+        async def send(target):
+            try:
+                resp = await self._http_client.send_request(
+                    method=request.method,
+                    url=target,
+                    params=request.params,
+                    data=data,
+                    headers=headers,
+                )
+            except ServerConnectionError:
+                self._record(target)
+                raise
+            self._record(target, resp)
+            return self._compression.decode(resp)
+
+        async def execute(hedge=False):
+            return await self._retry_policy.execute_async(
+                request.method,
+                url,
+                send,
+                route=lambda: self._route(request, url, hedge),
+            )
+
+        if self._hedge_policy.applies(request.hedge):
+            return await self._hedge_policy.execute_async(
+                execute, lambda: execute(True)
+            )
+        return await execute()
+
+    async def close(self):
+        """Close the HTTP client and its open connections."""
+        await self._http_client.close()
+
 
 class TenantConnection(Connection):
     """Tenant Connection wrapper.
@@ -226,7 +488,22 @@ class TenantConnection(Connection):
     :type connection: c8.connection.Connection
     """
 
-    def __init__(self, url, email, password, token, apikey, http_client, skip_tenant=False):
+    def __init__(
+        self,
+        url,
+        email,
+        password,
+        token,
+        apikey,
+        http_client,
+        skip_tenant=False,
+        metadata_cache=None,
+        json_codec=None,
+        retry_policy=None,
+        compression=None,
+        router=None,
+        hedge_policy=None,
+    ):
         super(TenantConnection, self).__init__(
             url=url,
             email=email,
@@ -235,6 +512,12 @@ class TenantConnection(Connection):
             apikey=apikey,
             http_client=http_client,
             skip_tenant=skip_tenant,
+            metadata_cache=metadata_cache,
+            json_codec=json_codec,
+            retry_policy=retry_policy,
+            compression=compression,
+            router=router,
+            hedge_policy=hedge_policy,
         )
         self._fqfabric_name = self._tenant_name + "." + self._fabric_name
 
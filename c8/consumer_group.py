@@ -0,0 +1,306 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import multiprocessing
+import threading
+from urllib.parse import urlencode
+
+import websocket
+
+from c8.stream_serde import MessageCodec
+
+__all__ = ["ConsumerGroup"]
+
+
+def _message_id(raw):
+    """Return the id of a message which failed to decode, or None."""
+    try:
+        message = json.loads(raw)
+    except ValueError:
+        return None
+    return message.get("messageId") if isinstance(message, dict) else None
+
+
+def _consume(connect, url, header, handler, stop, counts, recv_timeout, serde):
+    """Consume messages until **stop** is set, acknowledging each message
+    once handled, or negatively acknowledging it if the handler fails or if
+    it fails to decode.
+
+    Runs in a worker thread or process. **counts** holds the number of
+    messages processed and failed by the worker.
+    """
+    ws = connect(url, header=header, timeout=recv_timeout)
+    try:
+        while not stop.is_set():
+            try:
+                raw = ws.recv()
+            except websocket.WebSocketTimeoutException:
+                continue
+            try:
+                message = serde.decode(raw)
+            except Exception:
+                # Corrupt messages must not stop the worker.
+                message_id = _message_id(raw)
+                if message_id is not None:
+                    counts[1] += 1
+                    nack = {"type": "negativeAcknowledge", "messageId": message_id}
+                    ws.send(json.dumps(nack))
+                continue
+            if "messageId" not in message:
+                continue
+            message_id = message["messageId"]
+            try:
+                handler(message)
+            except Exception:
+                counts[1] += 1
+                ack = {"type": "negativeAcknowledge", "messageId": message_id}
+            else:
+                counts[0] += 1
+                ack = {"messageId": message_id}
+            ws.send(json.dumps(ack))
+    finally:
+        ws.close()
+
+
+class ConsumerGroup(object):
+    """Workers consuming a stream through the same subscription.
+
+    Each worker is a thread or a process with its own websocket on the
+    subscription, named "<subscription_name>-<index>". With a Shared
+    subscription the server spreads the messages across the workers, with a
+    Failover one a single worker receives them and the others take over if
+    it fails. Workers which die (e.g. when their websocket breaks) are
+    restarted.
+
+    The handler is called with each message, whose payload is decoded by the
+    serializer. The message is acknowledged if the handler returns, and
+    negatively acknowledged so that the server redelivers it if the handler
+    raises or if the payload fails to decode. With processes, the handler must be picklable (e.g. a module
+    level function).
+
+    :param stream_collection: Stream API wrapper.
+    :type stream_collection: c8.stream_collection.StreamCollection
+    :param stream: Stream name.
+    :type stream: str | unicode
+    :param subscription_name: Subscription name.
+    :type subscription_name: str | unicode
+    :param handler: Callable called with each message.
+    :type handler: callable
+    :param workers: Number of workers.
+    :type workers: int
+    :param processes: If set to True, workers are processes. Otherwise they
+        are threads.
+    :type processes: bool
+    :param local: Operate on a local stream instead of a global one.
+    :type local: bool
+    :param isCollectionStream: The stream is the stream of a collection.
+    :type isCollectionStream: bool
+    :param consumer_type: Subscription type, Shared or Failover.
+    :type consumer_type: str | unicode
+    :param receiver_queue_size: Size of the receive queue of each worker.
+    :type receiver_queue_size: int
+    :param check_interval: Time in seconds between checks for dead workers.
+        Also bounds the time workers take to stop.
+    :type check_interval: int | float
+    :param connect: Function opening a websocket, called with its URL and
+        the keyword arguments **header** and **timeout**.
+    :type connect: callable
+    :param serializer: Payload serializer, or its name ("raw", "json" or
+        "msgpack"). Raw payloads are passed to the handler as bytes.
+    :type serializer: c8.stream_serde.Serializer | str | unicode
+    """
+
+    def __init__(
+        self,
+        stream_collection,
+        stream,
+        subscription_name,
+        handler,
+        workers=4,
+        processes=False,
+        local=False,
+        isCollectionStream=False,
+        consumer_type="Shared",
+        receiver_queue_size=1000,
+        check_interval=1,
+        connect=websocket.create_connection,
+        serializer=None,
+    ):
+        self._serde = MessageCodec(serializer)
+        self._streams = stream_collection
+        self._stream = stream
+        self._subscription = subscription_name
+        self._handler = handler
+        self._processes = processes
+        self._local = local
+        self._is_collection_stream = isCollectionStream
+        self._check_interval = check_interval
+        self._connect = connect
+        self._header = {"Authorization": stream_collection.header["Authorization"]}
+        self._names = [
+            "{}-{}".format(subscription_name, index) for index in range(workers)
+        ]
+        # The stream is looked up once, the workers only differ by name.
+        url = stream_collection._consumer_url(
+            stream,
+            isCollectionStream,
+            local,
+            subscription_name,
+            consumer_type,
+            receiver_queue_size,
+            None,
+        )
+        self._urls = [
+            url + "&" + urlencode({"consumerName": name}) for name in self._names
+        ]
+
+        if processes:
+            context = multiprocessing.get_context()
+            self._stop = context.Event()
+            self._counts = [context.Array("q", 2) for _ in self._names]
+        else:
+            self._stop = threading.Event()
+            self._counts = [[0, 0] for _ in self._names]
+        self._workers = [None] * workers
+        self._restarts = [0] * workers
+        self._errors = [None] * workers
+        self._monitor = None
+
+    def __repr__(self):
+        return "<ConsumerGroup {} {}>".format(self._stream, self._subscription)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def _spawn(self, index):
+        args = (
+            self._connect,
+            self._urls[index],
+            self._header,
+            self._handler,
+            self._stop,
+            self._counts[index],
+            self._check_interval,
+            self._serde,
+        )
+        if self._processes:
+            worker = multiprocessing.get_context().Process(
+                target=_consume, args=args, name=self._names[index]
+            )
+        else:
+            worker = threading.Thread(
+                target=self._run_thread, args=(index, args), name=self._names[index]
+            )
+        worker.daemon = True
+        worker.start()
+        self._workers[index] = worker
+
+    def _run_thread(self, index, args):
+        try:
+            _consume(*args)
+        except Exception as err:
+            self._errors[index] = err
+
+    def _supervise(self):
+        while not self._stop.wait(self._check_interval):
+            for index, worker in enumerate(self._workers):
+                if not worker.is_alive() and not self._stop.is_set():
+                    if self._processes:
+                        self._errors[index] = "exit code {}".format(worker.exitcode)
+                    self._restarts[index] += 1
+                    self._spawn(index)
+
+    def start(self):
+        """Start the workers.
+
+        :returns: The consumer group.
+        :rtype: c8.consumer_group.ConsumerGroup
+        """
+        if self._monitor is not None:
+            return self
+        self._stop.clear()
+        for index in range(len(self._workers)):
+            self._spawn(index)
+        self._monitor = threading.Thread(
+            target=self._supervise, name="c8-consumer-group"
+        )
+        self._monitor.daemon = True
+        self._monitor.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the workers.
+
+        Workers finish handling their current message before stopping.
+
+        :param timeout: Max time in seconds to wait for each worker.
+        :type timeout: int | float | None
+        """
+        if self._monitor is None:
+            return
+        self._stop.set()
+        self._monitor.join()
+        self._monitor = None
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def stats(self):
+        """Return the statistics of the workers.
+
+        :returns: Per worker name: whether it is alive, number of messages
+            processed and failed, number of restarts and the error which
+            last stopped the worker.
+        :rtype: dict
+        """
+        return {
+            name: {
+                "alive": worker is not None and worker.is_alive(),
+                "processed": counts[0],
+                "failed": counts[1],
+                "restarts": restarts,
+                "last_error": error,
+            }
+            for name, worker, counts, restarts, error in zip(
+                self._names, self._workers, self._counts, self._restarts, self._errors
+            )
+        }
+
+    def lag(self):
+        """Return the backlog of the subscription and of its workers.
+
+        :returns: Estimated backlog of the stream (as returned by
+            :func:`c8.stream_collection.StreamCollection.get_stream_backlog`),
+            number of messages not yet delivered to the subscription, and
+            per worker name, the number of messages delivered but not yet
+            acknowledged and the delivery rate.
+        :rtype: dict
+        :raise c8.exceptions.StreamPermissionError: If retrieval fails.
+        """
+        stats = self._streams.get_stream_stats(
+            self._stream,
+            isCollectionStream=self._is_collection_stream,
+            local=self._local,
+        )
+        subscription = (stats.get("subscriptions") or {}).get(self._subscription, {})
+        consumers = {
+            consumer.get("consumerName"): consumer
+            for consumer in subscription.get("consumers") or []
+        }
+        return {
+            "backlog": self._streams.get_stream_backlog(
+                self._stream,
+                local=self._local,
+                isCollectionStream=self._is_collection_stream,
+            ),
+            "subscription_backlog": subscription.get("msgBacklog"),
+            "workers": {
+                name: {
+                    "unacked": consumers.get(name, {}).get("unackedMessages"),
+                    "msg_rate_out": consumers.get(name, {}).get("msgRateOut"),
+                }
+                for name in self._names
+            },
+        }
@@ -1,5 +1,8 @@
 from __future__ import absolute_import, unicode_literals
 
+import queue
+import threading
+import weakref
 from collections import deque
 
 from c8.exceptions import (
@@ -10,7 +13,7 @@ from c8.exceptions import (
 )
 from c8.request import Request
 
-__all__ = ["Cursor"]
+__all__ = ["Cursor", "AsyncCursor"]
 
 
 class Cursor(object):
@@ -30,10 +33,18 @@ class Cursor(object):
     :type init_data: dict | list
     :param cursor_type: Cursor type ("cursor" or "export").
     :type cursor_type: str | unicode
+    :param prefetch: Number of batches to fetch ahead of the consumer on a
+        background thread. 0 (default) disables prefetching, and batches are
+        fetched only once the current batch is depleted.
+    :type prefetch: int
+    :param origin: Base URL of the region which created the cursor. Its
+        batches are fetched from there, whatever the region router selects.
+    :type origin: str | unicode | None
     """
 
     __slots__ = [
         "_conn",
+        "_origin",
         "_type",
         "_id",
         "_count",
@@ -43,10 +54,15 @@ class Cursor(object):
         "_has_more",
         "_batch",
         "_count",
+        "_prefetcher",
+        "__weakref__",
     ]
 
-    def __init__(self, connection, init_data, cursor_type="cursor"):
+    def __init__(
+        self, connection, init_data, cursor_type="cursor", prefetch=0, origin=None
+    ):
         self._conn = connection
+        self._origin = origin
         self._type = cursor_type
         self._batch = deque()
         self._id = None
@@ -54,6 +70,7 @@ class Cursor(object):
         self._cached = None
         self._profile = None
         self._warnings = None
+        self._prefetcher = None
 
         if isinstance(init_data, list):
             # In transactions, cursor initialization data is a list containing
@@ -66,6 +83,12 @@ class Cursor(object):
             # containing cursor metadata (e.g. ID, parameters).
             self._update(init_data)
 
+        if prefetch and self._has_more and self._id is not None:
+            self._prefetcher = _Prefetcher(self._conn, self._id, prefetch, origin)
+            # Stop the background thread if the cursor is garbage collected
+            # without being closed.
+            weakref.finalize(self, self._prefetcher.stop, False)
+
     def __iter__(self):
         return self
 
@@ -215,6 +238,28 @@ class Cursor(object):
 
         return self.pop()
 
+    def batches(self):
+        """Iterate over the result set one batch at a time.
+
+        Each batch is removed from the cursor before it is yielded and the
+        next batch is fetched only when the consumer asks for it, so at most
+        one batch (plus the batches prefetched, if prefetching is enabled) is
+        held in memory by the cursor.
+
+        :return: Generator of batches.
+        :rtype: collections.abc.Iterator[list]
+        :raise c8.exceptions.CursorNextError: If batch retrieval fails.
+        :raise c8.exceptions.CursorStateError: If cursor ID is not set.
+        """
+        while True:
+            if self._batch:
+                batch = list(self._batch)
+                self._batch.clear()
+                yield batch
+            if not self.has_more():
+                return
+            self.fetch()
+
     def pop(self):
         """Pop the next item from current batch.
 
@@ -240,9 +285,15 @@ class Cursor(object):
         """
         if self._id is None:
             raise CursorStateError("cursor ID not set")
-        request = Request(method="put", endpoint="/cursor/{}".format(self._id))
+        if self._prefetcher is not None:
+            return self._update(self._prefetcher.get())
+        request = Request(
+            method="put", endpoint="/cursor/{}".format(self._id), origin=self._origin
+        )
         resp = self._conn.send_request(request)
+        return self._handle_fetch(request, resp)
 
+    def _handle_fetch(self, request, resp):
         if not resp.is_success:
             raise CursorNextError(resp, request)
         return self._update(resp.body)
@@ -262,10 +313,223 @@ class Cursor(object):
         """
         if self._id is None:
             return None
-        request = Request(method="delete", endpoint="/cursor/{}".format(self._id))
+        if self._prefetcher is not None:
+            # Wait for any in-flight fetch, so that no request for the cursor
+            # is sent after it is deleted.
+            self._prefetcher.stop()
+            # The server drops the cursor on its own once the last batch has
+            # been fetched, even if it was not consumed yet.
+            ignore_missing = ignore_missing or self._prefetcher.exhausted
+        request = Request(
+            method="delete",
+            endpoint="/cursor/{}".format(self._id),
+            origin=self._origin,
+        )
         resp = self._conn.send_request(request)
+        return self._handle_close(request, resp, ignore_missing)
+
+    def _handle_close(self, request, resp, ignore_missing):
         if resp.is_success:
             return True
         if resp.status_code == 404 and ignore_missing:
             return False
         raise CursorCloseError(resp, request)
+
+
+class _Prefetcher(object):
+    """Fetch the batches of a cursor on a background thread.
+
+    :param connection: HTTP connection.
+    :type connection: c8.connection.Connection
+    :param cursor_id: Cursor ID.
+    :type cursor_id: str | unicode
+    :param depth: Max number of fetched batches waiting to be consumed.
+    :type depth: int
+    :param origin: Base URL of the region holding the cursor.
+    :type origin: str | unicode | None
+    """
+
+    def __init__(self, connection, cursor_id, depth, origin=None):
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._error = None
+        self.exhausted = False
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(connection, cursor_id, origin),
+            name="c8-cursor-prefetch-{}".format(cursor_id),
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, connection, cursor_id, origin):
+        while not self._stop.is_set():
+            request = Request(
+                method="put", endpoint="/cursor/{}".format(cursor_id), origin=origin
+            )
+            try:
+                resp = connection.send_request(request)
+                if not resp.is_success:
+                    raise CursorNextError(resp, request)
+                body = resp.body
+            except Exception as err:
+                self._put(err)
+                return
+            if not body["hasMore"]:
+                self.exhausted = True
+            if not self._put(body) or self.exhausted:
+                return
+
+    def get(self):
+        """Return the next fetched batch, waiting for it if necessary.
+
+        :return: Cursor data from C8Db server.
+        :rtype: dict
+        :raise c8.exceptions.CursorNextError: If batch retrieval fails.
+        :raise c8.exceptions.CursorStateError: If no more batches will be
+            fetched.
+        """
+        while self._error is None:
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if not self._thread.is_alive() and self._queue.empty():
+                    raise CursorStateError("no more batches to fetch")
+                continue
+            if isinstance(item, Exception):
+                self._error = item
+                break
+            return item
+        raise self._error
+
+    def stop(self, wait=True):
+        """Stop fetching batches and discard the ones not consumed yet.
+
+        :param wait: Wait for the in-flight fetch (if any) to complete.
+        :type wait: bool
+        """
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if wait and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class AsyncCursor(Cursor):
+    """Cursor API wrapper for the asyncio execution context.
+
+    Behaves like :class:`c8.cursor.Cursor`, except that the methods which talk
+    to the server (:func:`next`, :func:`fetch` and :func:`close`) are
+    coroutines. Iterate with ``async for`` and close with ``async with``.
+
+    :param connection: HTTP connection.
+    :type connection: c8.connection.AsyncConnection
+    :param init_data: Cursor initialization data.
+    :type init_data: dict | list
+    :param cursor_type: Cursor type ("cursor" or "export").
+    :type cursor_type: str | unicode
+    :param origin: Base URL of the region which created the cursor.
+    :type origin: str | unicode | None
+    """
+
+    __slots__ = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.next()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close(ignore_missing=True)
+
+    def __repr__(self):
+        return "<AsyncCursor {}>".format(self._id) if self._id else "<AsyncCursor>"
+
+    async def next(self):
+        """Pop the next item from the current batch.
+
+        If current batch is empty/depleted, an API request is automatically
+        sent to C8Db server to fetch the next batch and update the cursor.
+
+        :return: Next item in current batch.
+        :rtype: str | unicode | bool | int | list | dict
+        :raise StopAsyncIteration: If the result set is depleted.
+        :raise c8.exceptions.CursorNextError: If batch retrieval fails.
+        :raise c8.exceptions.CursorStateError: If cursor ID is not set.
+        """
+        if self.empty():
+            if not self.has_more():
+                raise StopAsyncIteration
+            await self.fetch()
+
+        return self.pop()
+
+    async def batches(self):
+        """Iterate over the result set one batch at a time.
+
+        :return: Async generator of batches.
+        :rtype: collections.abc.AsyncIterator[list]
+        :raise c8.exceptions.CursorNextError: If batch retrieval fails.
+        :raise c8.exceptions.CursorStateError: If cursor ID is not set.
+        """
+        while True:
+            if self._batch:
+                batch = list(self._batch)
+                self._batch.clear()
+                yield batch
+            if not self.has_more():
+                return
+            await self.fetch()
+
+    async def fetch(self):
+        """Fetch the next batch from server and update the cursor.
+
+        :return: New batch details.
+        :rtype: dict
+        :raise c8.exceptions.CursorNextError: If batch retrieval fails.
+        :raise c8.exceptions.CursorStateError: If cursor ID is not set.
+        """
+        if self._id is None:
+            raise CursorStateError("cursor ID not set")
+        request = Request(
+            method="put", endpoint="/cursor/{}".format(self._id), origin=self._origin
+        )
+        resp = await self._conn.send_request(request)
+        return self._handle_fetch(request, resp)
+
+    async def close(self, ignore_missing=False):
+        """Close the cursor and free any server resources tied to it.
+
+        :param ignore_missing: Do not raise exception on missing cursors.
+        :type ignore_missing: bool
+        :return: True if cursor was closed successfully, False if cursor was
+            missing on the server and **ignore_missing** was set to True, None
+            if there are no cursors to close server-side.
+        :rtype: bool | None
+        :raise c8.exceptions.CursorCloseError: If operation fails.
+        """
+        if self._id is None:
+            return None
+        request = Request(
+            method="delete",
+            endpoint="/cursor/{}".format(self._id),
+            origin=self._origin,
+        )
+        resp = await self._conn.send_request(request)
+        return self._handle_close(request, resp, ignore_missing)
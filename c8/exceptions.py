@@ -546,7 +546,18 @@ class GetIndexError(C8ServerError):
 
 
 class ServerConnectionError(C8ClientError):
-    """Failed to connect to C8Db server."""
+    """Failed to connect to C8Db server.
+
+    :param msg: Error message.
+    :type msg: str | unicode
+    :param request_sent: False if the connection failed before the request
+        was sent, so the server cannot have processed it.
+    :type request_sent: bool
+    """
+
+    def __init__(self, msg, request_sent=True):
+        super(ServerConnectionError, self).__init__(msg)
+        self.request_sent = request_sent
 
 
 class ServerVersionError(C8ServerError):
@@ -11,6 +11,7 @@ from c8.utils import suppress_warning
 
 __all__ = [
     "DefaultExecutor",
+    "AsyncioExecutor",
     "AsyncExecutor",
     "BatchExecutor",
 ]
@@ -20,7 +21,8 @@ class Executor(object):  # pragma: no cover
     """Base class for API executors.
 
     API executors dictate how API requests are executed depending on the
-    execution context (i.e. "default", "async", "batch", "transaction").
+    execution context (i.e. "default", "asyncio", "async", "batch",
+    "transaction").
 
     :param connection: HTTP connection.
     :type connection: c8.connection.Connection
@@ -31,13 +33,15 @@ class Executor(object):  # pragma: no cover
     def __init__(self, connection):
         self._conn = connection
 
-    def execute(self, request, response_handler):
+    def execute(self, request, response_handler, custom_prefix=None):
         """Execute an API request.
 
         :param request: HTTP request.
         :type request: c8.request.Request
         :param response_handler: HTTP response handler.
         :type response_handler: callable
+        :param custom_prefix: Custom url-path value
+        :type custom_prefix: str
         :return: API execution result or job.
         :rtype: str | unicode | bool | int | list | dict | c8.job.Job
         """
@@ -72,6 +76,44 @@ class DefaultExecutor(Executor):
         return response_handler(response)
 
 
+class AsyncioExecutor(Executor):
+    """Asyncio API executor.
+
+    API executions return coroutines which resolve to the same results the
+    default executor returns, so they can be awaited or gathered on an event
+    loop.
+
+    :param connection: HTTP connection.
+    :type connection: c8.connection.AsyncConnection
+    """
+
+    context = "asyncio"
+
+    def __init__(self, connection):
+        super(AsyncioExecutor, self).__init__(connection)
+
+    def execute(self, request, response_handler, custom_prefix=None):
+        """Execute an API request on the event loop.
+
+        :param request: HTTP request.
+        :type request: c8.request.Request
+        :param response_handler: HTTP response handler.
+        :type response_handler: callable
+        :param custom_prefix: Custom url-path value
+        :type custom_prefix: str
+        :return: Coroutine which resolves to the API execution result.
+        :rtype: collections.abc.Coroutine
+        """
+
+        async def run():
+            response = await self._conn.send_request(
+                request, custom_prefix=custom_prefix
+            )
+            return response_handler(response)
+
+        return run()
+
+
 class AsyncExecutor(Executor):
     """Async API Executor.
 
@@ -90,13 +132,15 @@ class AsyncExecutor(Executor):
         super(AsyncExecutor, self).__init__(connection)
         self._return_result = return_result
 
-    def execute(self, request, response_handler):
+    def execute(self, request, response_handler, custom_prefix=None):
         """Execute an API request asynchronously.
 
         :param request: HTTP request.
         :type request: c8.request.Request
         :param response_handler: HTTP response handler.
         :type response_handler: callable
+        :param custom_prefix: Custom url-path value
+        :type custom_prefix: str
         :return: Async job or None if **return_result** parameter was set to
             False during initialization.
         :rtype: c8.job.AsyncJob | None
@@ -106,7 +150,7 @@ class AsyncExecutor(Executor):
         else:
             request.headers["x-c8-async"] = "true"
 
-        resp = self._conn.send_request(request)
+        resp = self._conn.send_request(request, custom_prefix=custom_prefix)
         if not resp.is_success:
             raise AsyncExecuteError(resp, request)
         if not self._return_result:
@@ -148,21 +192,26 @@ class BatchExecutor(Executor):
             return None
         return [job for _, job in self._queue.values()]
 
-    def execute(self, request, response_handler):
+    def execute(self, request, response_handler, custom_prefix=None):
         """Place the request in the batch queue.
 
         :param request: HTTP request.
         :type request: c8.request.Request
         :param response_handler: HTTP response handler.
         :type response_handler: callable
+        :param custom_prefix: Custom url-path value. Not supported, as batch
+            parts are resolved against the fabric API URL.
+        :type custom_prefix: str
         :return: Batch job or None if **return_result** parameter was set to
             False during initialization.
         :rtype: c8.job.BatchJob | None
         :raise c8.exceptions.BatchStateError: If batch was already
-            committed.
+            committed, or a custom url-path value is given.
         """
         if self._committed:
             raise BatchStateError("batch already committed")
+        if custom_prefix is not None:
+            raise BatchStateError("custom url prefix not supported in batch")
 
         job = BatchJob(response_handler)
         self._queue[job.id] = (request, job)
@@ -0,0 +1,191 @@
+from __future__ import absolute_import, unicode_literals
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from c8.c8ql import C8QL
+
+__all__ = ["ParallelExporter"]
+
+# Marks the end of the documents of a partition in the output queues.
+_DONE = object()
+
+
+class ParallelExporter(object):
+    """Export the documents of a collection over several concurrent cursors.
+
+    The key space of the collection is split into **partitions** ranges of
+    roughly equal size, and each range is read by its own streaming cursor on
+    a worker thread. Workers hand batches over through bounded queues, so a
+    slow consumer blocks the workers instead of letting fetched batches pile
+    up in memory.
+
+    Iterating over the exporter runs the export and yields the documents. The
+    export stops, and the server cursors are closed, once the iteration is
+    exhausted or the generator is closed.
+
+    :param connection: HTTP connection.
+    :type connection: c8.connection.Connection
+    :param executor: API executor.
+    :type executor: c8.executor.Executor
+    :param name: Collection name.
+    :type name: str | unicode
+    :param partitions: Number of key ranges read concurrently.
+    :type partitions: int
+    :param batch_size: Number of documents fetched per round trip.
+    :type batch_size: int
+    :param ordered: If set to True, documents are yielded sorted by key.
+        Otherwise they are yielded in the order the batches arrive, which
+        keeps all the workers busy.
+    :type ordered: bool
+    :param max_pending_batches: Max number of fetched batches per partition
+        waiting to be consumed.
+    :type max_pending_batches: int
+    :param progress: Callback invoked after each batch is consumed with the
+        partition index, the number of documents consumed from the partition
+        so far and whether the partition is complete.
+    :type progress: callable
+    """
+
+    def __init__(
+        self,
+        connection,
+        executor,
+        name,
+        partitions=4,
+        batch_size=1000,
+        ordered=True,
+        max_pending_batches=2,
+        progress=None,
+    ):
+        if partitions < 1:
+            raise ValueError("partitions must be a positive int")
+        if max_pending_batches < 1:
+            raise ValueError("max_pending_batches must be a positive int")
+        self._c8ql = C8QL(connection, executor)
+        self._name = name
+        self._partitions = partitions
+        self._batch_size = batch_size
+        self._ordered = ordered
+        self._max_pending_batches = max_pending_batches
+        self._progress = progress
+
+    def __repr__(self):
+        return "<ParallelExporter {}>".format(self._name)
+
+    def __iter__(self):
+        return self._export()
+
+    def _first(self, query, bind_vars):
+        cursor = self._c8ql.execute(query, bind_vars=bind_vars)
+        return cursor.pop() if not cursor.empty() else None
+
+    def _ranges(self, pool):
+        """Return the key ranges of the partitions.
+
+        :returns: Lower (inclusive) and upper (exclusive) key of each range.
+            None stands for an open bound.
+        :rtype: [tuple]
+        """
+        bind_vars = {"@collection": self._name}
+        count = self._first("RETURN LENGTH(@@collection)", bind_vars) or 0
+        partitions = max(1, min(self._partitions, count))
+
+        query = "FOR doc IN @@collection SORT doc._key LIMIT @offset, 1 RETURN doc._key"
+        futures = [
+            pool.submit(
+                self._first,
+                query,
+                dict(bind_vars, offset=index * count // partitions),
+            )
+            for index in range(1, partitions)
+        ]
+        # Documents deleted meanwhile may shift or drop boundaries.
+        keys = sorted({f.result() for f in futures} - {None})
+        bounds = [None] + keys + [None]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _read(self, partition, lower, upper, output, stop):
+        filters = []
+        bind_vars = {"@collection": self._name}
+        if lower is not None:
+            filters.append("doc._key >= @lower")
+            bind_vars["lower"] = lower
+        if upper is not None:
+            filters.append("doc._key < @upper")
+            bind_vars["upper"] = upper
+        query = "FOR doc IN @@collection {}SORT doc._key RETURN doc".format(
+            "FILTER {} ".format(" && ".join(filters)) if filters else ""
+        )
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    output.put((partition, item), timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        cursor = None
+        try:
+            cursor = self._c8ql.execute(
+                query, bind_vars=bind_vars, batch_size=self._batch_size, stream=True
+            )
+            for batch in cursor.batches():
+                if not put(batch):
+                    return
+            put(_DONE)
+        except Exception as err:
+            put(err)
+        finally:
+            if cursor is not None and cursor.has_more():
+                cursor.close(ignore_missing=True)
+
+    def _export(self):
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=self._partitions)
+        outputs = []
+        try:
+            ranges = self._ranges(pool)
+            if self._ordered:
+                outputs = [queue.Queue(self._max_pending_batches) for _ in ranges]
+            else:
+                shared = queue.Queue(self._max_pending_batches * len(ranges))
+                outputs = [shared] * len(ranges)
+            for partition, (lower, upper) in enumerate(ranges):
+                pool.submit(
+                    self._read, partition, lower, upper, outputs[partition], stop
+                )
+
+            exported = [0] * len(ranges)
+            # In ordered mode partitions are drained one after another, while
+            # the others keep prefetching up to their queue size.
+            pending = list(range(len(ranges))) if self._ordered else [0]
+            remaining = len(ranges)
+            while remaining:
+                partition, item = outputs[pending[0]].get()
+                if isinstance(item, Exception):
+                    raise item
+                done = item is _DONE
+                if done:
+                    remaining -= 1
+                    if self._ordered:
+                        pending.pop(0)
+                else:
+                    exported[partition] += len(item)
+                if self._progress is not None:
+                    self._progress(partition, exported[partition], done)
+                if not done:
+                    for doc in item:
+                        yield doc
+        finally:
+            stop.set()
+            for output in set(outputs):
+                while True:
+                    try:
+                        output.get_nowait()
+                    except queue.Empty:
+                        break
+            pool.shutdown(wait=True)
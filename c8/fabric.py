@@ -10,7 +10,9 @@ from c8 import constants
 from c8.api import APIWrapper
 from c8.apikeys import APIKeys
 from c8.c8ql import C8QL
+from c8.cdc import ChangeFeed
 from c8.collection import StandardCollection
+from c8.connection import AsyncConnection
 from c8.exceptions import (
     CollectionCreateError,
     CollectionDeleteError,
@@ -53,9 +55,10 @@ from c8.exceptions import (
     StreamListError,
     StreamPermissionError,
 )
-from c8.executor import AsyncExecutor, BatchExecutor, DefaultExecutor
+from c8.executor import AsyncExecutor, AsyncioExecutor, BatchExecutor, DefaultExecutor
 from c8.graph import Graph
 from c8.keyvalue import KV
+from c8.redis.redis_commands import RedisCommands
 from c8.request import Request
 from c8.search import Search
 from c8.stream_apps import StreamApps
@@ -63,6 +66,7 @@ from c8.stream_collection import StreamCollection
 
 __all__ = [
     "StandardFabric",
+    "AsyncioFabric",
     "AsyncFabric",
     "BatchFabric",
 ]
@@ -132,15 +136,21 @@ class Fabric(APIWrapper):
         """
         return KV(self._conn, self._executor)
 
-    def on_change(self, collection, callback, timeout=60):
+    def on_change(self, collection, callback, timeout=60, subscription_name=None):
         """Execute given input function on receiving a change.
 
+        See :func:`c8.fabric.Fabric.change_feed` for a feed resuming where it
+        stopped.
+
         :param collection: Collection name(s) regex to listen for
         :type collection: str
         :param timeout: timeout value
         :type timeout: int
         :param callback: Function to execute on a change
         :type callback: function
+        :param subscription_name: Subscription name. A random one is used if
+            not set.
+        :type subscription_name: str
         """
         if not callback:
             raise ValueError("You must specify a callback function")
@@ -153,11 +163,12 @@ class Fabric(APIWrapper):
 
         namespace = constants.STREAM_LOCAL_NS_PREFIX + self.fabric_name
 
-        subscription_name = "%s-%s-subscription-%s" % (
-            self.tenant_name,
-            self.fabric_name,
-            str(random.randint(1, 1000)),
-        )
+        if not subscription_name:
+            subscription_name = "%s-%s-subscription-%s" % (
+                self.tenant_name,
+                self.fabric_name,
+                str(random.randint(1, 1000)),
+            )
 
         url = self.url.split("//")[1].split(":")[0]
 
@@ -181,6 +192,52 @@ class Fabric(APIWrapper):
         finally:
             ws.close()
 
+    def change_feed(
+        self,
+        collection,
+        subscription_name,
+        handler,
+        checkpoint_store=None,
+        checkpoint_every=1000,
+        checkpoint_interval=5,
+        on_checkpoint=None,
+    ):
+        """Return a change data capture feed of a collection, resuming where
+        it stopped.
+
+        See :class:`c8.cdc.ChangeFeed`.
+
+        :param collection: Collection name.
+        :type collection: str | unicode
+        :param subscription_name: Subscription name, shared by the runs and
+            the replicas of the feed.
+        :type subscription_name: str | unicode
+        :param handler: Function called with each change.
+        :type handler: callable
+        :param checkpoint_store: Checkpoint store, e.g.
+            :class:`c8.cdc.FileCheckpointStore` or
+            :class:`c8.cdc.KVCheckpointStore`.
+        :param checkpoint_every: Number of changes between checkpoints.
+        :type checkpoint_every: int
+        :param checkpoint_interval: Max time in seconds between checkpoints.
+        :type checkpoint_interval: int | float
+        :param on_checkpoint: Function called with each checkpoint before it
+            is saved.
+        :type on_checkpoint: callable
+        :returns: Change feed.
+        :rtype: c8.cdc.ChangeFeed
+        """
+        return ChangeFeed(
+            self.stream(),
+            collection,
+            subscription_name,
+            handler,
+            checkpoint_store=checkpoint_store,
+            checkpoint_every=checkpoint_every,
+            checkpoint_interval=checkpoint_interval,
+            on_checkpoint=on_checkpoint,
+        )
+
     def properties(self):
         """Return fabric properties.
 
@@ -583,6 +640,8 @@ class Fabric(APIWrapper):
         :returns: True if collection exists, False otherwise.
         :rtype: bool
         """
+        if self._conn.metadata_cache.contains(self.fabric_name, "collections", name):
+            return True
         return any(col["name"] == name for col in self.collections())
 
     def collections(self, collectionModel=None):
@@ -597,6 +656,11 @@ class Fabric(APIWrapper):
         def response_handler(resp):
             if not resp.is_success:
                 raise CollectionListError(resp, request)
+            self._conn.metadata_cache.update(
+                self.fabric_name,
+                "collections",
+                [col["name"] for col in resp.body["result"]],
+            )
             if collectionModel is not None:
                 docs = [
                     col
@@ -724,6 +788,9 @@ class Fabric(APIWrapper):
 
         def response_handler(resp):
             if resp.is_success:
+                self._conn.metadata_cache.add(self.fabric_name, "collections", name)
+                if stream:
+                    self._conn.metadata_cache.invalidate(self.fabric_name, "streams")
                 return self.collection(name)
             raise CollectionCreateError(resp, request)
 
@@ -785,9 +852,12 @@ class Fabric(APIWrapper):
 
         def response_handler(resp):
             if resp.error_code == 1203 and ignore_missing:
+                self._conn.metadata_cache.discard(self.fabric_name, "collections", name)
                 return False
             if not resp.is_success:
                 raise CollectionDeleteError(resp, request)
+            self._conn.metadata_cache.discard(self.fabric_name, "collections", name)
+            self._conn.metadata_cache.invalidate(self.fabric_name, "streams")
             return True
 
         return self._execute(request, response_handler)
@@ -814,6 +884,8 @@ class Fabric(APIWrapper):
         :returns: True if graph exists, False otherwise.
         :rtype: bool
         """
+        if self._conn.metadata_cache.contains(self.fabric_name, "graphs", name):
+            return True
         for graph in self.graphs():
             if graph["name"] == name:
                 return True
@@ -831,6 +903,11 @@ class Fabric(APIWrapper):
         def response_handler(resp):
             if not resp.is_success:
                 raise GraphListError(resp, request)
+            self._conn.metadata_cache.update(
+                self.fabric_name,
+                "graphs",
+                [body["_key"] for body in resp.body["graphs"]],
+            )
             return [
                 {
                     "id": body["_id"],
@@ -907,6 +984,8 @@ class Fabric(APIWrapper):
 
         def response_handler(resp):
             if resp.is_success:
+                self._conn.metadata_cache.add(self.fabric_name, "graphs", name)
+                self._conn.metadata_cache.invalidate(self.fabric_name, "collections")
                 return Graph(self._conn, self._executor, name)
             raise GraphCreateError(resp, request)
 
@@ -937,9 +1016,13 @@ class Fabric(APIWrapper):
 
         def response_handler(resp):
             if resp.error_code == 1924 and ignore_missing:
+                self._conn.metadata_cache.discard(self.fabric_name, "graphs", name)
                 return False
             if not resp.is_success:
                 raise GraphDeleteError(resp, request)
+            self._conn.metadata_cache.discard(self.fabric_name, "graphs", name)
+            if drop_collections:
+                self._conn.metadata_cache.invalidate(self.fabric_name, "collections")
             return True
 
         return self._execute(request, response_handler)
@@ -1050,6 +1133,12 @@ class Fabric(APIWrapper):
         def response_handler(resp):
             code = resp.status_code
             if resp.is_success:
+                self._conn.metadata_cache.update(
+                    self.fabric_name,
+                    "streams",
+                    [col["topic"] for col in resp.body["result"]],
+                    scope=local,
+                )
                 return [
                     {
                         "name": col["topic"],
@@ -1084,6 +1173,10 @@ class Fabric(APIWrapper):
                 stream = "c8globals." + stream
             elif local is True and "c8locals" not in stream:
                 stream = "c8locals." + stream
+        if self._conn.metadata_cache.contains(
+            self.fabric_name, "streams", stream, scope=local
+        ):
+            return True
         return any(mystream["name"] == stream for mystream in self.streams(local=local))
 
     def create_stream(self, stream, local=False):
@@ -1105,6 +1198,7 @@ class Fabric(APIWrapper):
         def response_handler(resp):
             code = resp.status_code
             if resp.is_success:
+                self._conn.metadata_cache.invalidate(self.fabric_name, "streams")
                 return resp.body["result"]
             elif code == 502:
                 raise StreamCommunicationError(resp, request)
@@ -1130,6 +1224,7 @@ class Fabric(APIWrapper):
         def response_handler(resp):
             code = resp.status_code
             if resp.is_success:
+                self._conn.metadata_cache.invalidate(self.fabric_name, "streams")
                 return True
             elif code == 403:
                 raise StreamPermissionError(resp, request)
@@ -1515,6 +1610,20 @@ class StandardFabric(Fabric):
     def __repr__(self):
         return "<StandardFabric {}>".format(self.name)
 
+    def begin_asyncio_execution(self, http_client=None):
+        """Begin asyncio execution.
+
+        API executions return coroutines, so requests can be awaited and
+        fanned out concurrently on a single event loop.
+
+        :param http_client: User-defined asyncio HTTP client. Defaults to
+            :class:`c8.http.DefaultAsyncHTTPClient`.
+        :type http_client: c8.http.AsyncHTTPClient
+        :returns: Fabric API wrapper built specifically for asyncio execution.
+        :rtype: c8.fabric.AsyncioFabric
+        """
+        return AsyncioFabric(AsyncConnection(self._conn, http_client))
+
     def begin_async_execution(self, return_result=True):
         """Begin async execution.
 
@@ -1542,6 +1651,56 @@ class StandardFabric(Fabric):
         return BatchFabric(self._conn, return_result)
 
 
+class AsyncioFabric(Fabric):
+    """Fabric API wrapper tailored specifically for asyncio execution.
+
+    See :func:`c8.fabric.StandardFabric.begin_asyncio_execution`.
+
+    :param connection: Asyncio HTTP connection.
+    :type connection: c8.connection.AsyncConnection
+    """
+
+    def __init__(self, connection):
+        super(AsyncioFabric, self).__init__(
+            connection=connection, executor=AsyncioExecutor(connection)
+        )
+
+    def __repr__(self):
+        return "<AsyncioFabric {}>".format(self.name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    @property
+    def redis(self):
+        """Return the Redis commands API wrapper.
+
+        :returns: Redis commands API wrapper.
+        :rtype: c8.redis.redis_commands.RedisCommands
+        """
+        return RedisCommands(self._conn, self._executor)
+
+    def collection(self, name):
+        """Return the standard collection API wrapper.
+
+        Unlike the other execution contexts, the existence of the collection
+        is not checked, as that would block the event loop.
+
+        :param name: Collection name.
+        :type name: str | unicode
+        :returns: Standard collection API wrapper.
+        :rtype: c8.collection.StandardCollection
+        """
+        return StandardCollection(self._conn, self._executor, name)
+
+    async def close(self):
+        """Close the asyncio HTTP client and its open connections."""
+        await self._conn.close()
+
+
 class AsyncFabric(Fabric):
     """Fabric API wrapper tailored specifically for async execution.
 
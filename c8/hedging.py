@@ -0,0 +1,309 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+__all__ = ["HedgePolicy"]
+
+
+class HedgePolicy(object):
+    """Hedging of latency-critical reads.
+
+    A hedged read which has not returned after the hedge delay is sent a
+    second time, to the next nearest region if the client has a region router
+    (see :class:`c8.routing.RegionRouter`), or over another connection to the
+    same host otherwise. The first successful response is returned and the
+    other request is cancelled; a request already running in a thread cannot
+    be interrupted, so its response is dropped when it completes.
+
+    The hedge delay is the **percentile** of the latencies of the last
+    **window** hedged reads, **initial_delay** until **min_samples** of them
+    completed, or the fixed **delay** if set. At most **budget** hedges per
+    read are sent, which caps the extra load on the servers.
+
+    Only idempotent reads are hedged: single document, key-value and Redis GET
+    reads, through their **hedge** parameter (e.g.
+    :func:`c8.collection.StandardCollection.get`). Their default, None,
+    applies **enabled**. The policy is thread-safe and shared by all the
+    connections of a client.
+
+    :param enabled: Hedge the reads not setting their **hedge** parameter.
+    :type enabled: bool
+    :param delay: Fixed hedge delay in seconds. Not set means computed from
+        the latencies.
+    :type delay: int | float | None
+    :param percentile: Percentile of the latencies used as hedge delay.
+    :type percentile: int | float
+    :param initial_delay: Hedge delay in seconds until **min_samples**
+        latencies are known.
+    :type initial_delay: int | float
+    :param min_delay: Min hedge delay in seconds.
+    :type min_delay: int | float
+    :param budget: Max number of hedges per hedgeable read, e.g. 0.05 for at
+        most 5% extra requests.
+    :type budget: float
+    :param window: Number of latencies the hedge delay is computed from.
+    :type window: int
+    :param min_samples: Number of latencies needed to compute the hedge delay.
+    :type min_samples: int
+    :param max_workers: Max number of threads sending hedged reads, which
+        should be at least twice the number of threads reading concurrently.
+        Reads are sent on the calling thread, without hedging, when no thread
+        is free. Unused by asyncio connections.
+    :type max_workers: int
+    """
+
+    def __init__(
+        self,
+        enabled=True,
+        delay=None,
+        percentile=95,
+        initial_delay=0.05,
+        min_delay=0.001,
+        budget=0.05,
+        window=1000,
+        min_samples=20,
+        max_workers=32,
+    ):
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        if budget < 0:
+            raise ValueError("budget must be positive")
+        self._enabled = enabled
+        self._delay = delay
+        self._percentile = percentile
+        self._initial_delay = initial_delay
+        self._min_delay = min_delay
+        self._budget = budget
+        self._min_samples = min_samples
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        # Hedge delay computed from the latencies, and the number of
+        # latencies observed since.
+        self._computed = None
+        self._observed = 0
+        self._pool = None
+        # Threads free to send a read, so that reads never queue in the pool.
+        self._workers = threading.Semaphore(max_workers)
+        self._requests = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._throttled = 0
+
+    def __repr__(self):
+        return "<HedgePolicy {}>".format("enabled" if self._enabled else "disabled")
+
+    @property
+    def enabled(self):
+        """Return True if reads are hedged by default.
+
+        :returns: Whether reads are hedged by default.
+        :rtype: bool
+        """
+        return self._enabled
+
+    def applies(self, hedge):
+        """Return True if a read is hedged.
+
+        :param hedge: Hedging of the read: True or False overrides the policy,
+            None applies it.
+        :type hedge: bool | None
+        :returns: Whether the read is hedged.
+        :rtype: bool
+        """
+        return self._enabled if hedge is None else bool(hedge)
+
+    def delay(self):
+        """Return the current hedge delay.
+
+        :returns: Delay in seconds.
+        :rtype: float
+        """
+        if self._delay is not None:
+            return self._delay
+        with self._lock:
+            count = len(self._latencies)
+            if count < self._min_samples:
+                return self._initial_delay
+            # Sorting the window on every read would cost more than the
+            # delay is worth being exact, so it is recomputed periodically.
+            if self._computed is None or self._observed >= max(1, count // 20):
+                latencies = sorted(self._latencies)
+                index = int(math.ceil(self._percentile / 100.0 * count)) - 1
+                self._computed = max(self._min_delay, latencies[max(0, index)])
+                self._observed = 0
+            return self._computed
+
+    def _observe(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            self._observed += 1
+
+    def _start(self):
+        with self._lock:
+            self._requests += 1
+
+    def _allow_hedge(self):
+        with self._lock:
+            if self._hedged + 1 > self._budget * self._requests:
+                self._throttled += 1
+                return False
+            self._hedged += 1
+            return True
+
+    def _won(self):
+        with self._lock:
+            self._hedge_wins += 1
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self._max_workers, "c8-hedge")
+            return self._pool
+
+    def execute(self, send, send_hedge):
+        """Send a read, and hedge it if it is slower than the hedge delay.
+
+        :param send: Callable sending the read and returning the response.
+        :type send: callable
+        :param send_hedge: Callable sending the hedge and returning the
+            response.
+        :type send_hedge: callable
+        :returns: First successful response.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If both requests fail
+            (the error of the first one is raised).
+        """
+        delay = self.delay()
+        self._start()
+
+        def timed(send):
+            # The latency is measured from when the read is sent, so that it
+            # never includes the time spent waiting for a thread.
+            started = time.monotonic()
+            try:
+                return send()
+            finally:
+                self._observe(time.monotonic() - started)
+
+        if not self._workers.acquire(False):
+            # No thread is free to send the read while waiting for it: it is
+            # sent on the calling thread, and not hedged.
+            return timed(send)
+
+        pool = self._executor()
+        running = threading.Event()
+
+        def run(send, observe):
+            running.set()
+            try:
+                return timed(send) if observe else send()
+            finally:
+                self._workers.release()
+
+        primary = pool.submit(run, send, True)
+        running.wait()
+        wait([primary], timeout=delay)
+        if primary.done():
+            return primary.result()
+        if not self._workers.acquire(False):
+            return primary.result()
+        if not self._allow_hedge():
+            self._workers.release()
+            return primary.result()
+
+        hedge = pool.submit(run, send_hedge, False)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # The primary request wins ties.
+            for future in sorted(done, key=lambda f: f is not primary):
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if future is hedge:
+                        self._won()
+                    return future.result()
+        return primary.result()
+
+    async def execute_async(self, send, send_hedge):
+        """Send a read without blocking the event loop, and hedge it if it is
+        slower than the hedge delay.
+
+        :param send: Coroutine function sending the read and returning the
+            response.
+        :type send: callable
+        :param send_hedge: Coroutine function sending the hedge and returning
+            the response.
+        :type send_hedge: callable
+        :returns: First successful response.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If both requests fail
+            (the error of the first one is raised).
+        """
+        delay = self.delay()
+        self._start()
+
+        async def timed():
+            started = time.monotonic()
+            try:
+                return await send()
+            except asyncio.CancelledError:
+                started = None
+                raise
+            finally:
+                if started is not None:
+                    self._observe(time.monotonic() - started)
+
+        primary = asyncio.ensure_future(timed())
+        pending = {primary}
+        try:
+            await asyncio.wait(pending, timeout=delay)
+            if primary.done() or not self._allow_hedge():
+                return await primary
+
+            hedge = asyncio.ensure_future(send_hedge())
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._won()
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        """Return the hedging statistics.
+
+        :returns: Number of hedged reads, hedges sent, hedges which returned
+            first, hedges not sent for lack of budget, and the current hedge
+            delay in seconds.
+        :rtype: dict
+        """
+        delay = self.delay()
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "hedged": self._hedged,
+                "hedge_wins": self._hedge_wins,
+                "throttled": self._throttled,
+                "delay": delay,
+            }
+
+    def close(self):
+        """Stop the threads sending hedged reads."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -1,15 +1,40 @@
 from __future__ import absolute_import, unicode_literals
 
+import asyncio
 import socket
+import threading
 import time
 from abc import ABCMeta, abstractmethod
+from functools import partial
+from urllib.parse import urlsplit
 
 import requests
 from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
 
+from c8.codec import get_codec
+from c8.exceptions import ServerConnectionError
 from c8.response import Response
 
-__all__ = ["HTTPClient", "DefaultHTTPClient"]
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+__all__ = [
+    "HTTPClient",
+    "DefaultHTTPClient",
+    "HTTP2Client",
+    "AsyncHTTPClient",
+    "DefaultAsyncHTTPClient",
+    "AsyncHTTP2Client",
+]
 
 
 class HTTPClient(object):  # pragma: no cover
@@ -34,7 +59,7 @@ class HTTPClient(object):  # pragma: no cover
         :param params: URL (query) parameters.
         :type params: dict
         :param data: Request payload.
-        :type data: str | unicode | bool | int | list | dict
+        :type data: bytes | str | unicode | bool | int | list | dict
         :param auth: Username and password.
         :type auth: tuple
         :returns: HTTP response.
@@ -48,24 +73,241 @@ class HTTPClient(object):  # pragma: no cover
 # Also see: https://github.com/requests/requests/issues/3808
 
 
+def socket_options(tcp_nodelay=True, keepalive_idle=None, keepalive_interval=None):
+    """Return the options of the sockets opened by the default HTTP client.
+
+    TCP keepalive is always enabled. The keepalive timings are only set on
+    the platforms supporting them.
+
+    :param tcp_nodelay: Disable Nagle's algorithm.
+    :type tcp_nodelay: bool
+    :param keepalive_idle: Idle time in seconds before keepalive probes are
+        sent. The system default is used if not set.
+    :type keepalive_idle: int
+    :param keepalive_interval: Time in seconds between keepalive probes. The
+        system default is used if not set.
+    :type keepalive_interval: int
+    :returns: Socket options, as (level, option, value) tuples.
+    :rtype: list
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if tcp_nodelay:
+        options.insert(0, (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+    # macOS names TCP_KEEPIDLE TCP_KEEPALIVE.
+    keepidle = getattr(socket, "TCP_KEEPIDLE", getattr(socket, "TCP_KEEPALIVE", None))
+    if keepalive_idle is not None and keepidle is not None:
+        options.append((socket.IPPROTO_TCP, keepidle, keepalive_idle))
+    keepintvl = getattr(socket, "TCP_KEEPINTVL", None)
+    if keepalive_interval is not None and keepintvl is not None:
+        options.append((socket.IPPROTO_TCP, keepintvl, keepalive_interval))
+    return options
+
+
+class _PoolStatsMixin(object):
+    """Connection pool counting the connections it opens and reuses, and
+    closing the connections idle for longer than **idle_timeout**."""
+
+    def __init__(self, *args, **kwargs):
+        self.idle_timeout = kwargs.pop("idle_timeout", None)
+        self.created = 0
+        self.reused = 0
+        self.expired = 0
+        self._stats_lock = threading.Lock()
+        super(_PoolStatsMixin, self).__init__(*args, **kwargs)
+
+    def _get_conn(self, timeout=None):
+        conn = super(_PoolStatsMixin, self)._get_conn(timeout)
+        released = getattr(conn, "_c8_released", None)
+        expired = (
+            conn.sock is not None
+            and self.idle_timeout is not None
+            and released is not None
+            and time.monotonic() - released > self.idle_timeout
+        )
+        if expired:
+            conn.close()
+        with self._stats_lock:
+            self.expired += expired
+            # Connections without a socket connect when they are used.
+            if conn.sock is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._c8_released = time.monotonic()
+        super(_PoolStatsMixin, self)._put_conn(conn)
+
+    def idle(self):
+        """Return the number of open connections waiting in the pool."""
+        queue = self.pool.queue if self.pool is not None else ()
+        return sum(1 for conn in list(queue) if conn and conn.sock is not None)
+
+
+class _HTTPConnectionPool(_PoolStatsMixin, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSConnectionPool(_PoolStatsMixin, HTTPSConnectionPool):
+    pass
+
+
 class KeepaliveAdapter(requests.adapters.HTTPAdapter):
+    """Transport adapter enabling TCP keepalive, and keeping statistics of
+    its connection pools.
+
+    :param socket_options: Options of the sockets. Those returned by
+        :func:`c8.http.socket_options` are used if not set.
+    :type socket_options: list
+    :param idle_timeout: Time in seconds after which idle connections are
+        closed instead of being reused. Not set means never.
+    :type idle_timeout: int | float
+    """
+
+    def __init__(self, socket_options=None, idle_timeout=None, **kwargs):
+        self._socket_options = socket_options
+        self._idle_timeout = idle_timeout
+        super(KeepaliveAdapter, self).__init__(**kwargs)
+
     def init_poolmanager(self, *args, **kwargs):
-        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
-            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
-        ]
+        options = getattr(self, "_socket_options", None)
+        if options is None:
+            options = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+            ]
+        kwargs["socket_options"] = options
         super(KeepaliveAdapter, self).init_poolmanager(*args, **kwargs)
+        idle_timeout = getattr(self, "_idle_timeout", None)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": partial(_HTTPConnectionPool, idle_timeout=idle_timeout),
+            "https": partial(_HTTPSConnectionPool, idle_timeout=idle_timeout),
+        }
+
+    def pool_stats(self):
+        """Return the statistics of the connection pools, by host.
+
+        :returns: Number of idle connections, and of connections opened
+            ("created"), reused and closed for being idle ("expired").
+        :rtype: dict
+        """
+        pools = self.poolmanager.pools
+        stats = {}
+        for key in pools.keys():
+            pool = pools.get(key)
+            if not isinstance(pool, _PoolStatsMixin):
+                continue
+            host = "{}://{}:{}".format(pool.scheme, pool.host, pool.port)
+            stats[host] = {
+                "idle": pool.idle(),
+                "created": pool.created,
+                "reused": pool.reused,
+                "expired": pool.expired,
+            }
+        return stats
+
+
+def _connect_failed(err):
+    """Return True if a requests error was raised before the request was sent,
+    i.e. the connection timed out, was refused or its host did not resolve.
+
+    :param err: Connection error.
+    :type err: requests.ConnectionError
+    :rtype: bool
+    """
+    if isinstance(err, requests.ConnectTimeout):
+        return True
+    reason = err.args[0] if err.args else None
+    # urllib3 errors usually come wrapped in a MaxRetryError.
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, (ConnectTimeoutError, NewConnectionError))
 
 
 class DefaultHTTPClient(HTTPClient):
-    """Default HTTP client implementation."""
+    """Default HTTP client implementation.
+
+    Connections are kept alive and pooled per host. Size the pools after the
+    number of threads sending requests concurrently: when more requests are
+    in flight to a host than **pool_maxsize**, the extra connections are
+    closed after use (or requests wait for a connection if **pool_block** is
+    set), and :func:`pool_stats` shows many more connections created than
+    reused.
 
-    def __init__(self):
+    :param json_codec: JSON codec, or its name, used to deserialize response
+        bodies. The fastest codec available is used if not set.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    :param pool_connections: Number of hosts whose connection pools are
+        kept.
+    :type pool_connections: int
+    :param pool_maxsize: Max number of connections kept per host.
+    :type pool_maxsize: int
+    :param pool_block: Make requests wait for a free connection when
+        **pool_maxsize** connections to the host are in use, instead of
+        opening a connection which is closed after use.
+    :type pool_block: bool
+    :param idle_timeout: Time in seconds after which idle connections are
+        closed instead of being reused, e.g. to stay below the idle timeout
+        of a load balancer. Not set means never.
+    :type idle_timeout: int | float
+    :param tcp_nodelay: Disable Nagle's algorithm.
+    :type tcp_nodelay: bool
+    :param keepalive_idle: Idle time in seconds before TCP keepalive probes
+        are sent. The system default is used if not set.
+    :type keepalive_idle: int
+    :param keepalive_interval: Time in seconds between TCP keepalive probes.
+        The system default is used if not set.
+    :type keepalive_interval: int
+    """
+
+    def __init__(
+        self,
+        json_codec=None,
+        pool_connections=10,
+        pool_maxsize=10,
+        pool_block=False,
+        idle_timeout=None,
+        tcp_nodelay=True,
+        keepalive_idle=None,
+        keepalive_interval=None,
+    ):
+        self._codec = get_codec(json_codec)
         self._session = requests.Session()
+        self._active = 0
+        self._active_lock = threading.Lock()
         # KARTIK : 20181211 : C8Platform#166 : Implement keepalive adapter
-        adapter = KeepaliveAdapter()
-        adapter.max_retries = 5
-        self._session.mount("https://", adapter)
-        self._session.mount("http://", adapter)
+        # Failed requests are retried by the retry policy of the connection.
+        self._adapter = KeepaliveAdapter(
+            socket_options=socket_options(
+                tcp_nodelay, keepalive_idle, keepalive_interval
+            ),
+            idle_timeout=idle_timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+
+    def pool_stats(self):
+        """Return the connection pool statistics.
+
+        :returns: Number of requests in flight ("active"), of idle
+            connections, and of connections opened ("created"), reused and
+            closed for being idle ("expired"), in total and by host
+            ("hosts").
+        :rtype: dict
+        """
+        hosts = self._adapter.pool_stats()
+        stats = {"active": self._active}
+        for name in ("idle", "created", "reused", "expired"):
+            stats[name] = sum(host[name] for host in hosts.values())
+        stats["hosts"] = hosts
+        return stats
+
+    def close(self):
+        """Close the open connections."""
+        self._session.close()
 
     def send_request(
         self, method, url, params=None, data=None, headers=None, auth=None
@@ -81,11 +323,12 @@ class DefaultHTTPClient(HTTPClient):
         :param params: URL (query) parameters.
         :type params: dict
         :param data: Request payload.
-        :type data: str | unicode | bool | int | list | dict
+        :type data: bytes | str | unicode | bool | int | list | dict
         :param auth: Username and password.
         :type auth: tuple
         :returns: HTTP response.
         :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If the connection fails.
         """
         # KARTIK : C8Platform#166 : explicitly set a keep-alive header
         if not headers:
@@ -95,37 +338,414 @@ class DefaultHTTPClient(HTTPClient):
                 del headers["Connection"]
             headers["Connection"] = "keep-alive"
 
-        retry = 5
-        time_sleep = 5
-        while True:
+        with self._active_lock:
+            self._active += 1
+        try:
+            raw_resp = self._session.request(
+                method=method,
+                url=url,
+                params=params,
+                data=data,
+                headers=headers,
+                auth=auth,
+                verify=False,
+                timeout=260,
+            )
+        except requests.ConnectionError as err:
+            raise ServerConnectionError(
+                "requests.ConnectionError: Not able to connect to url: %s. "
+                "Please make sure the federation is up and running." % url,
+                request_sent=not _connect_failed(err),
+            )
+        finally:
+            with self._active_lock:
+                self._active -= 1
+
+        return Response(
+            method=raw_resp.request.method,
+            url=raw_resp.url,
+            headers=raw_resp.headers,
+            status_code=raw_resp.status_code,
+            status_text=raw_resp.reason,
+            raw_body=raw_resp.content,
+            codec=self._codec,
+        )
+
+
+def _http2_arguments(params, headers):
+    """Adapt the arguments of send_request to httpx.
+
+    :returns: Query parameters without None values, and headers without the
+        connection-specific ones, which HTTP/2 forbids.
+    :rtype: (dict | None, dict | None)
+    """
+    if params:
+        params = {k: v for k, v in params.items() if v is not None}
+    if headers:
+        headers = {
+            k: v
+            for k, v in headers.items()
+            if k.lower() not in ("connection", "keep-alive")
+        }
+    return params, headers
+
+
+def _http2_connection_error(err, url):
+    """Return the connection error raised for a failed httpx request.
+
+    :param err: httpx transport error.
+    :type err: httpx.TransportError
+    :param url: Request URL.
+    :type url: str | unicode
+    :rtype: c8.exceptions.ServerConnectionError
+    """
+    return ServerConnectionError(
+        "httpx.{}: Not able to connect to url: {}. Please make sure the "
+        "federation is up and running.".format(type(err).__name__, url),
+        request_sent=not isinstance(err, (httpx.ConnectError, httpx.ConnectTimeout)),
+    )
+
+
+def _http2_response(raw_resp, codec):
+    return Response(
+        method=raw_resp.request.method,
+        url=str(raw_resp.url),
+        headers=raw_resp.headers,
+        status_code=raw_resp.status_code,
+        status_text=raw_resp.reason_phrase,
+        raw_body=raw_resp.content,
+        codec=codec,
+    )
+
+
+class HTTP2Client(HTTPClient):
+    """HTTP client multiplexing requests over HTTP/2.
+
+    Requires the `httpx` package with its `http2` extra. Concurrent requests
+    to a host, e.g. from many threads, share a single connection instead of
+    opening one connection each: every request is an HTTP/2 stream of the
+    connection, with its own flow control window. At most
+    **max_concurrent_streams** requests per host are in flight at a time,
+    the others wait for one to complete; the server may set a lower limit,
+    in which case extra connections are opened. Servers which do not
+    support HTTP/2 are spoken to over HTTP/1.1.
+
+    :param max_concurrent_streams: Max number of requests in flight per
+        host.
+    :type max_concurrent_streams: int
+    :param max_connections: Max number of connections, to all hosts.
+    :type max_connections: int
+    :param timeout: Timeout of a request in seconds.
+    :type timeout: int | float
+    :param json_codec: JSON codec, or its name, used to deserialize response
+        bodies. The fastest codec available is used if not set.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    :param transport: httpx transport. The default one is used if not set.
+    :type transport: httpx.BaseTransport
+    """
+
+    def __init__(
+        self,
+        max_concurrent_streams=100,
+        max_connections=100,
+        timeout=260,
+        json_codec=None,
+        transport=None,
+    ):
+        if httpx is None:
+            raise ImportError("HTTP2Client requires the httpx package")
+        self._codec = get_codec(json_codec)
+        self._max_concurrent_streams = max_concurrent_streams
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._client = httpx.Client(
+            http2=True,
+            verify=False,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections),
+            transport=transport,
+        )
+
+    def _semaphore(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._streams.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self._max_concurrent_streams)
+                self._streams[host] = semaphore
+        return semaphore
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        """Send an HTTP request.
+
+        :param method: HTTP method in lowercase (e.g. "post").
+        :type method: str | unicode
+        :param url: Request URL.
+        :type url: str | unicode
+        :param headers: Request headers.
+        :type headers: dict
+        :param params: URL (query) parameters.
+        :type params: dict
+        :param data: Request payload.
+        :type data: bytes | str | unicode
+        :param auth: Username and password.
+        :type auth: tuple
+        :returns: HTTP response.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If the connection fails.
+        """
+        params, headers = _http2_arguments(params, headers)
+        with self._semaphore(url):
             try:
-                raw_resp = self._session.request(
-                    method=method,
-                    url=url,
+                raw_resp = self._client.request(
+                    method,
+                    url,
                     params=params,
-                    data=data,
+                    content=data,
                     headers=headers,
                     auth=auth,
-                    verify=False,
-                    timeout=260,
                 )
-                break
-            except requests.ConnectionError:
-                if retry == 0:
-                    raise Exception(
-                        "requests.ConnectionError: Not able to connect to "
-                        "url: %s. Please make sure the federation is up and "
-                        "running." % url
-                    )
-                #  "Error in connecting the url. Retring..."
-                retry -= 1
-                time.sleep(time_sleep)
+            except httpx.TransportError as err:
+                raise _http2_connection_error(err, url)
+        return _http2_response(raw_resp, self._codec)
+
+    def close(self):
+        """Close the open connections."""
+        self._client.close()
+
+
+class AsyncHTTPClient(object):  # pragma: no cover
+    """Abstract base class for asyncio HTTP clients."""
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    async def send_request(
+        self, method, url, headers=None, params=None, data=None, auth=None
+    ):
+        """Send an HTTP request without blocking the event loop.
+
+        This method must be overridden by the user.
+
+        :param method: HTTP method in lowercase (e.g. "post").
+        :type method: str | unicode
+        :param url: Request URL.
+        :type url: str | unicode
+        :param headers: Request headers.
+        :type headers: dict
+        :param params: URL (query) parameters.
+        :type params: dict
+        :param data: Request payload.
+        :type data: bytes | str | unicode | bool | int | list | dict
+        :param auth: Username and password.
+        :type auth: tuple
+        :returns: HTTP response.
+        :rtype: c8.response.Response
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """Release the resources (e.g. open connections) held by the client."""
+
+
+class DefaultAsyncHTTPClient(AsyncHTTPClient):
+    """Default asyncio HTTP client implementation.
+
+    Requires the `aiohttp` package. A single session, and therefore a single
+    connection pool, is shared by all requests sent through the client. The
+    session is created lazily so that it binds to the running event loop.
+
+    :param limit: Maximum number of simultaneous connections.
+    :type limit: int
+    :param limit_per_host: Maximum number of simultaneous connections to the
+        same host. 0 means no limit.
+    :type limit_per_host: int
+    :param timeout: Total timeout of a request in seconds.
+    :type timeout: int | float
+    :param json_codec: JSON codec, or its name, used to deserialize response
+        bodies. The fastest codec available is used if not set.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    """
+
+    def __init__(self, limit=1000, limit_per_host=0, timeout=260, json_codec=None):
+        if aiohttp is None:
+            raise ImportError("DefaultAsyncHTTPClient requires the aiohttp package")
+        self._codec = get_codec(json_codec)
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._timeout = timeout
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit, limit_per_host=self._limit_per_host, ssl=False
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self._timeout),
+            )
+        return self._session
+
+    async def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        """Send an HTTP request without blocking the event loop.
+
+        :param method: HTTP method in lowercase (e.g. "post").
+        :type method: str | unicode
+        :param url: Request URL.
+        :type url: str | unicode
+        :param headers: Request headers.
+        :type headers: dict
+        :param params: URL (query) parameters.
+        :type params: dict
+        :param data: Request payload.
+        :type data: bytes | str | unicode | bool | int | list | dict
+        :param auth: Username and password.
+        :type auth: tuple
+        :returns: HTTP response.
+        :rtype: c8.response.Response
+        """
+        if params:
+            # Unlike requests, aiohttp rejects None values in query parameters.
+            params = {k: v for k, v in params.items() if v is not None}
+        if auth is not None:
+            auth = aiohttp.BasicAuth(*auth)
+
+        session = self._get_session()
+        try:
+            async with session.request(
+                method=method,
+                url=url,
+                params=params,
+                data=data,
+                headers=headers,
+                auth=auth,
+            ) as raw_resp:
+                raw_body = await raw_resp.read()
+        except aiohttp.ClientConnectionError as err:
+            raise ServerConnectionError(
+                "aiohttp.ClientConnectionError: Not able to connect to "
+                "url: %s. Please make sure the federation is up and "
+                "running." % url,
+                request_sent=not isinstance(err, aiohttp.ClientConnectorError),
+            )
 
         return Response(
-            method=raw_resp.request.method,
-            url=raw_resp.url,
+            method=raw_resp.method,
+            url=str(raw_resp.url),
             headers=raw_resp.headers,
-            status_code=raw_resp.status_code,
+            status_code=raw_resp.status,
             status_text=raw_resp.reason,
-            raw_body=raw_resp.text,
+            raw_body=raw_body,
+            codec=self._codec,
         )
+
+    async def close(self):
+        """Close the underlying session and its open connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class AsyncHTTP2Client(AsyncHTTPClient):
+    """Asyncio HTTP client multiplexing requests over HTTP/2.
+
+    Requires the `httpx` package with its `http2` extra. See
+    :class:`c8.http.HTTP2Client`. The client is created lazily so that it
+    binds to the running event loop.
+
+    :param max_concurrent_streams: Max number of requests in flight per
+        host.
+    :type max_concurrent_streams: int
+    :param max_connections: Max number of connections, to all hosts.
+    :type max_connections: int
+    :param timeout: Timeout of a request in seconds.
+    :type timeout: int | float
+    :param json_codec: JSON codec, or its name, used to deserialize response
+        bodies. The fastest codec available is used if not set.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    :param transport: httpx transport. The default one is used if not set.
+    :type transport: httpx.AsyncBaseTransport
+    """
+
+    def __init__(
+        self,
+        max_concurrent_streams=100,
+        max_connections=100,
+        timeout=260,
+        json_codec=None,
+        transport=None,
+    ):
+        if httpx is None:
+            raise ImportError("AsyncHTTP2Client requires the httpx package")
+        self._codec = get_codec(json_codec)
+        self._max_concurrent_streams = max_concurrent_streams
+        self._max_connections = max_connections
+        self._timeout = timeout
+        self._transport = transport
+        self._streams = {}
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                verify=False,
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=self._max_connections),
+                transport=self._transport,
+            )
+            self._streams = {}
+        return self._client
+
+    async def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        """Send an HTTP request without blocking the event loop.
+
+        :param method: HTTP method in lowercase (e.g. "post").
+        :type method: str | unicode
+        :param url: Request URL.
+        :type url: str | unicode
+        :param headers: Request headers.
+        :type headers: dict
+        :param params: URL (query) parameters.
+        :type params: dict
+        :param data: Request payload.
+        :type data: bytes | str | unicode
+        :param auth: Username and password.
+        :type auth: tuple
+        :returns: HTTP response.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If the connection fails.
+        """
+        params, headers = _http2_arguments(params, headers)
+        client = self._get_client()
+        host = urlsplit(url).netloc
+        semaphore = self._streams.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_concurrent_streams)
+            self._streams[host] = semaphore
+        async with semaphore:
+            try:
+                raw_resp = await client.request(
+                    method,
+                    url,
+                    params=params,
+                    content=data,
+                    headers=headers,
+                    auth=auth,
+                )
+            except httpx.TransportError as err:
+                raise _http2_connection_error(err, url)
+        return _http2_response(raw_resp, self._codec)
+
+    async def close(self):
+        """Close the underlying client and its open connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
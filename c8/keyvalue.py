@@ -1,7 +1,5 @@
 from __future__ import absolute_import, unicode_literals
 
-from json import dumps
-
 from c8.api import APIWrapper
 from c8.exceptions import (
     CreateCollectionError,
@@ -45,6 +43,11 @@ class KV(APIWrapper):
             if not resp.is_success:
                 raise ListCollections(resp, request)
             else:
+                self._conn.metadata_cache.update(
+                    self.fabric_name,
+                    "kv",
+                    [collection["name"] for collection in resp.body["result"]],
+                )
                 return resp.body["result"]
 
         return self._execute(request, response_handler)
@@ -69,6 +72,7 @@ class KV(APIWrapper):
                 raise CreateCollectionError(resp, request)
             else:
                 if resp.body["error"] is False and resp.body["name"] == name:
+                    self._conn.metadata_cache.add(self.fabric_name, "kv", name)
                     return True
                 else:
                     return False
@@ -83,6 +87,8 @@ class KV(APIWrapper):
         :return: True if the collection exists.
         :rtype: boolean
         """
+        if self._conn.metadata_cache.contains(self.fabric_name, "kv", name):
+            return True
         exists = False
         collections = self.get_collections()
         for collection in collections:
@@ -108,6 +114,7 @@ class KV(APIWrapper):
                 raise DeleteCollectionError(resp, request)
             else:
                 if resp.body["error"] is False and resp.body["name"] == name:
+                    self._conn.metadata_cache.discard(self.fabric_name, "kv", name)
                     return True
                 else:
                     return False
@@ -125,9 +132,7 @@ class KV(APIWrapper):
         :rtype: list
         :raise c8.exceptions.InsertKVError: If insertion fails.
         """
-        request = Request(
-            method="put", endpoint="/kv/{}/value".format(name), data=dumps(data)
-        )
+        request = Request(method="put", endpoint="/kv/{}/value".format(name), data=data)
 
         def response_handler(resp):
             if not resp.is_success:
@@ -173,7 +178,7 @@ class KV(APIWrapper):
         :raise c8.exceptions.DeleteEntryForKey: If deletion fails.
         """
         request = Request(
-            method="delete", endpoint="/kv/{}/values".format(name), data=dumps(keys)
+            method="delete", endpoint="/kv/{}/values".format(name), data=keys
         )
 
         def response_handler(resp):
@@ -184,18 +189,25 @@ class KV(APIWrapper):
 
         return self._execute(request, response_handler)
 
-    def get_value_for_key(self, name, key):
+    def get_value_for_key(self, name, key, hedge=None):
         """Get value for a key from key-value collection.
 
         :param name: Collection name.
         :type name: str | unicode
         :param key: The key for which the value is to be fetched.
         :type key: string
+        :param hedge: If set to True, the read is sent again (to another
+            region if possible) when it is slow, see
+            :class:`c8.hedging.HedgePolicy`. False disables it. Not set means
+            the hedging policy of the client applies.
+        :type hedge: bool | None
         :return: The value object.
         :rtype: object
         :raise c8.exceptions.GetValueError: If request fails.
         """
-        request = Request(method="get", endpoint="/kv/{}/value/{}".format(name, key))
+        request = Request(
+            method="get", endpoint="/kv/{}/value/{}".format(name, key), hedge=hedge
+        )
 
         def response_handler(resp):
             if not resp.is_success:
@@ -0,0 +1,240 @@
+from __future__ import absolute_import, unicode_literals
+
+import csv
+import gzip
+import io
+import json
+import os
+import re
+
+from c8.exceptions import CollectionImportFromFileError
+
+__all__ = ["DocumentFileReader", "detect_format", "infer_type"]
+
+FORMATS = {
+    ".csv": "csv",
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+_WHITESPACE = re.compile(r"\s*")
+_INTEGER = re.compile(r"-?(0|[1-9][0-9]*)$")
+
+
+def detect_format(filepath):
+    """Return the document format of a file from its extension.
+
+    A trailing ".gz" extension (gzip-compressed input) is ignored.
+
+    :param filepath: File path.
+    :type filepath: str | unicode
+    :returns: "csv", "json" or "jsonl", or None if the format is unknown.
+    :rtype: str | unicode | None
+    """
+    if filepath.endswith(".gz"):
+        filepath = filepath[:-3]
+    return FORMATS.get(os.path.splitext(filepath)[1].lower())
+
+
+def infer_type(value):
+    """Convert a CSV value to a bool, None, int or float if it looks like one.
+
+    :param value: CSV value.
+    :type value: str | unicode
+    :returns: Converted value, or the value itself.
+    :rtype: str | unicode | bool | int | float | None
+    """
+    if value == "" or value == "null":
+        return None
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    if _INTEGER.match(value):
+        return int(value)
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+class DocumentFileReader(object):
+    """Read documents from a CSV, JSON or JSON Lines file one at a time.
+
+    JSON files must hold an array of documents, which is decoded
+    incrementally. Files ending with ".gz" are decompressed on the fly, and a
+    leading UTF-8 byte order mark is skipped. Only a small read buffer is
+    kept in memory, regardless of the file size.
+
+    :param filepath: File path.
+    :type filepath: str | unicode
+    :param file_format: "csv", "json" or "jsonl". Detected from the file
+        extension if not set.
+    :type file_format: str | unicode
+    :param coerce: If set to True, CSV values that look like numbers, booleans
+        or nulls are converted (empty values become None). A dict maps field
+        names to callables applied to the values of the field instead, for
+        any format.
+    :type coerce: bool | dict
+    :param buffer_size: Number of characters read from the file at a time.
+    :type buffer_size: int
+    :param max_document_size: Max number of characters of a JSON document.
+        A document which does not decode within this many characters is
+        invalid, so that a malformed file is not read into memory.
+    :type max_document_size: int
+    :raise c8.exceptions.CollectionImportFromFileError: If the format is
+        unknown.
+    """
+
+    def __init__(
+        self,
+        filepath,
+        file_format=None,
+        coerce=None,
+        buffer_size=65536,
+        max_document_size=64 * 1024 * 1024,
+    ):
+        self._path = os.path.expanduser(filepath)
+        self._format = file_format or detect_format(filepath)
+        if self._format not in ("csv", "json", "jsonl"):
+            raise CollectionImportFromFileError("Invalid file")
+        self._coerce = coerce
+        self._buffer_size = buffer_size
+        self._max_document_size = max_document_size
+        self._raw = None
+        self._position = 0
+
+    def __repr__(self):
+        return "<DocumentFileReader {}>".format(self._path)
+
+    def __iter__(self):
+        return self._read()
+
+    @property
+    def format(self):
+        """Return the document format.
+
+        :returns: "csv", "json" or "jsonl".
+        :rtype: str | unicode
+        """
+        return self._format
+
+    @property
+    def size(self):
+        """Return the size of the file on disk.
+
+        :returns: File size in bytes.
+        :rtype: int
+        """
+        return os.path.getsize(self._path)
+
+    @property
+    def position(self):
+        """Return the number of bytes of the file on disk read so far.
+
+        :returns: Bytes read. Ahead of the documents yielded by up to the read
+            buffer size.
+        :rtype: int
+        """
+        if self._raw is not None and not self._raw.closed:
+            return self._raw.tell()
+        return self._position
+
+    def _read(self):
+        self._position = 0
+        self._raw = open(self._path, "rb")
+        try:
+            stream = self._raw
+            if self._path.endswith(".gz"):
+                stream = gzip.GzipFile(fileobj=self._raw, mode="rb")
+            text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+            if self._format == "csv":
+                documents = self._read_csv(text)
+            elif self._format == "jsonl":
+                documents = self._read_jsonl(text)
+            else:
+                documents = self._read_json(text)
+            for document in documents:
+                yield self._convert(document)
+        finally:
+            self._position = self._raw.tell()
+            self._raw.close()
+
+    def _convert(self, document):
+        if isinstance(self._coerce, dict):
+            for field, convert in self._coerce.items():
+                if field in document:
+                    document[field] = convert(document[field])
+        return document
+
+    def _read_csv(self, text):
+        infer = self._coerce is True
+        try:
+            for row in csv.DictReader(text):
+                if infer:
+                    row = {field: infer_type(value) for field, value in row.items()}
+                yield row
+        except csv.Error as err:
+            raise CollectionImportFromFileError("Invalid CSV file: {}".format(err))
+
+    def _read_jsonl(self, text):
+        for number, line in enumerate(text, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise CollectionImportFromFileError(
+                    "Invalid JSON on line {}".format(number)
+                )
+
+    def _read_json(self, text):
+        decoder = json.JSONDecoder()
+        buf, pos, eof = "", 0, False
+        # Expected next token: the opening bracket, the first value (or the
+        # closing bracket), a separator (or the closing bracket), or a value.
+        state = "start"
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos == len(buf):
+                if eof:
+                    raise CollectionImportFromFileError("Invalid JSON file")
+                chunk = text.read(self._buffer_size)
+                buf, pos, eof = chunk, 0, not chunk
+                continue
+
+            char = buf[pos]
+            if state == "start":
+                if char != "[":
+                    raise CollectionImportFromFileError("Invalid JSON file")
+                pos += 1
+                state = "first"
+                continue
+            if char == "]" and state in ("first", "separator"):
+                return
+            if state == "separator":
+                if char != ",":
+                    raise CollectionImportFromFileError("Invalid JSON file")
+                pos += 1
+                state = "value"
+                continue
+
+            while True:
+                try:
+                    document, end = decoder.raw_decode(buf, pos)
+                    # A number at the end of the buffer may be truncated.
+                    if end < len(buf) or eof:
+                        pos = end
+                        break
+                    raise ValueError
+                except ValueError:
+                    if eof or len(buf) - pos > self._max_document_size:
+                        raise CollectionImportFromFileError("Invalid JSON file")
+                    # Grow the reads with the buffer so that large documents
+                    # are decoded in a linear number of attempts.
+                    chunk = text.read(max(self._buffer_size, len(buf) - pos))
+                    buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+            yield document
+            state = "separator"
@@ -1,11 +1,15 @@
-from json import dumps
-
 from c8.exceptions import C8ServerError
 from c8.request import Request
 
 
-def build_request(collection, data):
-    request = Request(method="post", endpoint="/redis/" + collection, data=dumps(data))
+def build_request(collection, data, hedge=False, read=False):
+    request = Request(
+        method="post",
+        endpoint="/redis/" + collection,
+        data=data,
+        read=collection if read else None,
+        hedge=hedge,
+    )
     return request
 
 
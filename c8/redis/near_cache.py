@@ -0,0 +1,451 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+__all__ = ["NearCache"]
+
+# Commands which never modify the keys they are given.
+READ_COMMANDS = frozenset(
+    [
+        "BITCOUNT",
+        "BITPOS",
+        "DBSIZE",
+        "ECHO",
+        "EXISTS",
+        "GET",
+        "GETBIT",
+        "GETRANGE",
+        "HEXISTS",
+        "HGET",
+        "HGETALL",
+        "HKEYS",
+        "HLEN",
+        "HMGET",
+        "HRANDFIELD",
+        "HSCAN",
+        "HSTRLEN",
+        "HVALS",
+        "LINDEX",
+        "LLEN",
+        "LPOS",
+        "LRANGE",
+        "MGET",
+        "PING",
+        "PTTL",
+        "RANDOMKEY",
+        "SCAN",
+        "SCARD",
+        "SDIFF",
+        "SINTER",
+        "SISMEMBER",
+        "SMEMBERS",
+        "SMISMEMBER",
+        "SRANDMEMBER",
+        "SSCAN",
+        "STRLEN",
+        "SUNION",
+        "TIME",
+        "TTL",
+        "TYPE",
+        "ZCARD",
+        "ZCOUNT",
+        "ZDIFF",
+        "ZINTER",
+        "ZLEXCOUNT",
+        "ZMSCORE",
+        "ZRANDMEMBER",
+        "ZRANGE",
+        "ZRANGEBYLEX",
+        "ZRANGEBYSCORE",
+        "ZRANK",
+        "ZREVRANGE",
+        "ZREVRANGEBYLEX",
+        "ZREVRANGEBYSCORE",
+        "ZREVRANK",
+        "ZSCAN",
+        "ZSCORE",
+        "ZUNION",
+    ]
+)
+
+# Read commands answered from the cache. The view of a key cached for a
+# command is the command name followed by the arguments after the key, and
+# MGET is answered from the GET views of its keys.
+CACHED_COMMANDS = frozenset(["GET", "HGET", "HGETALL", "MGET"])
+
+# Expiry options of SET and GETEX, and the conversion of their value.
+_EXPIRY_OPTIONS = {
+    "EX": (1, False),
+    "PX": (1000, False),
+    "EXAT": (1, True),
+    "PXAT": (1000, True),
+}
+
+# Expiry commands and the expiry option they are equivalent to.
+_EXPIRE_COMMANDS = {
+    "EXPIRE": "EX",
+    "PEXPIRE": "PX",
+    "EXPIREAT": "EXAT",
+    "PEXPIREAT": "PXAT",
+}
+
+# Commands removing the time to live of the keys they are given.
+_PERSIST_COMMANDS = frozenset(["DEL", "GETDEL", "GETSET", "PERSIST", "UNLINK"])
+
+
+def _sizeof(value):
+    """Return the approximate memory footprint of a decoded response body."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += _sizeof(key) + _sizeof(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += _sizeof(item)
+    return size
+
+
+def _key(arg):
+    """Return a key argument as the string the cache stores it under."""
+    return arg if isinstance(arg, str) else str(arg)
+
+
+def _deadline(option, value, now):
+    """Return the monotonic time at which a key expires, or None if unknown."""
+    scale, absolute = _EXPIRY_OPTIONS[option]
+    try:
+        seconds = float(value) / scale
+    except (TypeError, ValueError):
+        return None
+    if absolute:
+        seconds -= time.time()
+    return now + seconds
+
+
+class NearCache(object):
+    """In-process LRU cache of Redis reads.
+
+    When passed to :class:`c8.redis.redis_commands.RedisCommands`, the results
+    of GET, HGET and HGETALL (and the keys of MGET) are served from memory
+    after the first read. Writes made through the same client invalidate the
+    keys they touch, and the time to live set through the client (EXPIRE,
+    PEXPIRE, EXPIREAT, PEXPIREAT, SETEX, PSETEX and the expiry options of SET
+    and GETEX) caps how long the values of a key are cached.
+
+    Writes made by other clients are not seen: **ttl** bounds how stale a
+    cached value can get. Cached results are shared by all readers and must
+    not be modified.
+
+    The cache is thread-safe.
+
+    :param max_entries: Max number of cached results.
+    :type max_entries: int
+    :param max_bytes: Max approximate memory used by the cached results in
+        bytes.
+    :type max_bytes: int
+    :param ttl: Max time a result is cached in seconds. None means results
+        are cached until they are invalidated, evicted or their key expires.
+    :type ttl: int | float | None
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=60):
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive int")
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # (collection, key, view) -> [expiry time, result, size]
+        self._entries = OrderedDict()
+        # (collection, key) -> cached views of the key
+        self._views = {}
+        # (collection, key) -> monotonic time at which the key expires
+        self._deadlines = OrderedDict()
+        # (collection, key) -> generation of its last invalidation. Results
+        # read before an invalidation of their key must not be cached.
+        self._invalidated = OrderedDict()
+        self._generation = 0
+        self._floor = 0
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def __repr__(self):
+        return "<NearCache {}>".format(len(self._entries))
+
+    @property
+    def max_entries(self):
+        """Return the max number of cached results.
+
+        :returns: Max number of cached results.
+        :rtype: int
+        """
+        return self._max_entries
+
+    @property
+    def max_bytes(self):
+        """Return the max approximate memory used by the cached results.
+
+        :returns: Max memory in bytes.
+        :rtype: int
+        """
+        return self._max_bytes
+
+    @property
+    def ttl(self):
+        """Return the max time a result is cached.
+
+        :returns: Time to live in seconds.
+        :rtype: int | float | None
+        """
+        return self._ttl
+
+    def lookup(self, collection, key, view):
+        """Return the cached result of a read.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param key: Key read.
+        :type key: str
+        :param view: Read command followed by its arguments after the key
+            (e.g. ("HGET", "field")).
+        :type view: tuple
+        :returns: True and the result if cached, False and None otherwise.
+        :rtype: (bool, dict | None)
+        """
+        entry_key = (collection, key, view)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(entry_key)
+                    self._hits += 1
+                    return True, entry[1]
+                self._remove(entry_key)
+            self._misses += 1
+            return False, None
+
+    def token(self):
+        """Return the token to pass to :func:`store` for a read about to be
+        sent.
+
+        :returns: Invalidation generation.
+        :rtype: int
+        """
+        return self._generation
+
+    def store(self, collection, key, view, result, token):
+        """Cache the result of a read.
+
+        The result is dropped if the key was invalidated since **token** was
+        taken, as the read may have raced with a write.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param key: Key read.
+        :type key: str
+        :param view: Read command followed by its arguments after the key.
+        :type view: tuple
+        :param result: Result of the read.
+        :type result: dict
+        :param token: Token returned by :func:`token` before the read was sent.
+        :type token: int
+        :returns: True if the result was cached.
+        :rtype: bool
+        """
+        size = _sizeof(result)
+        if size > self._max_bytes:
+            return False
+        with self._lock:
+            name = (collection, key)
+            if self._invalidated.get(name, self._floor) > token:
+                return False
+            now = time.monotonic()
+            expires = float("inf") if self._ttl is None else now + self._ttl
+            deadline = self._deadlines.get(name)
+            if deadline is not None:
+                if deadline <= now:
+                    del self._deadlines[name]
+                    return False
+                expires = min(expires, deadline)
+
+            entry_key = (collection, key, view)
+            if entry_key in self._entries:
+                self._remove(entry_key)
+            self._entries[entry_key] = [expires, result, size]
+            self._views.setdefault(name, set()).add(view)
+            self._bytes += size
+            while (
+                len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+            return True
+
+    def _remove(self, entry_key):
+        expires, result, size = self._entries.pop(entry_key)
+        self._bytes -= size
+        name = entry_key[:2]
+        views = self._views[name]
+        views.discard(entry_key[2])
+        if not views:
+            del self._views[name]
+
+    def _invalidate(self, name):
+        self._generation += 1
+        self._invalidated[name] = self._generation
+        self._invalidated.move_to_end(name)
+        if len(self._invalidated) > self._max_entries:
+            _, self._floor = self._invalidated.popitem(last=False)
+        for view in list(self._views.get(name, ())):
+            self._remove(name + (view,))
+            self._invalidations += 1
+
+    def invalidate(self, collection=None, keys=None):
+        """Drop cached results.
+
+        :param collection: Collection name. If not set, the results of all
+            collections are dropped.
+        :type collection: str
+        :param keys: Keys whose results are dropped. If not set, the results
+            of all keys of the collection are dropped.
+        :type keys: list
+        """
+        with self._lock:
+            if keys is not None:
+                for key in keys:
+                    self._invalidate((collection, key))
+                return
+            # Results read before now must not be cached, whatever their key.
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+            for name in list(self._views):
+                if collection is None or name[0] == collection:
+                    for view in list(self._views[name]):
+                        self._remove(name + (view,))
+                        self._invalidations += 1
+            for name in list(self._deadlines):
+                if collection is None or name[0] == collection:
+                    del self._deadlines[name]
+
+    def clear(self):
+        """Drop all cached results and tracked expiry times."""
+        self.invalidate()
+
+    def observe(self, command, collection, args):
+        """Record a write command sent through the client.
+
+        The keys the command may modify are invalidated, and the expiry time
+        of the keys whose time to live it sets is tracked.
+
+        :param command: Redis command (e.g. "SET").
+        :type command: str
+        :param collection: Collection name.
+        :type collection: str
+        :param args: Command arguments.
+        :type args: tuple
+        :returns: Invalidated keys, or None if the whole collection was.
+        :rtype: list | None
+        """
+        if command == "FLUSHDB":
+            self.invalidate(collection)
+            return None
+        # Values are invalidated along with keys, as the arguments of most
+        # commands are not told apart. Extra invalidations are harmless.
+        keys = [
+            arg if isinstance(arg, str) else str(arg)
+            for arg in args
+            if isinstance(arg, (str, int, float)) and not isinstance(arg, bool)
+        ]
+        with self._lock:
+            # The expiry options are found by position, so the arguments
+            # are parsed as given, values which are not strings included.
+            if keys:
+                self._track_expiry(command, collection, args)
+            for key in keys:
+                self._invalidate((collection, key))
+        return keys
+
+    def _set_deadline(self, name, deadline):
+        if deadline is None:
+            self._deadlines.pop(name, None)
+            return
+        self._deadlines[name] = deadline
+        self._deadlines.move_to_end(name)
+        if len(self._deadlines) > self._max_entries:
+            self._deadlines.popitem(last=False)
+
+    def _track_expiry(self, command, collection, args):
+        now = time.monotonic()
+        name = (collection, _key(args[0]))
+        options = [arg.upper() if isinstance(arg, str) else None for arg in args]
+
+        if command in ("SETEX", "PSETEX") and len(args) > 1:
+            option = "EX" if command == "SETEX" else "PX"
+            self._set_deadline(name, _deadline(option, args[1], now))
+        elif command in ("SET", "GETEX"):
+            first = 2 if command == "SET" else 1
+            for index in range(first, len(args)):
+                option = options[index]
+                if option in _EXPIRY_OPTIONS and index + 1 < len(args):
+                    deadline = _deadline(option, args[index + 1], now)
+                    self._set_deadline(name, deadline)
+                    return
+                if option == "KEEPTTL":
+                    return
+                if option == "PERSIST":
+                    self._set_deadline(name, None)
+                    return
+            if command == "SET":
+                self._set_deadline(name, None)
+        elif command in _EXPIRE_COMMANDS and len(args) > 1:
+            deadline = _deadline(_EXPIRE_COMMANDS[command], args[1], now)
+            current = self._deadlines.get(name)
+            # Conditional expiries (NX, XX, GT, LT) may not apply: keep the
+            # earliest of the possible expiry times.
+            if len(args) > 2 and current is not None and deadline is not None:
+                deadline = min(current, deadline)
+            self._set_deadline(name, deadline)
+        elif command in _PERSIST_COMMANDS:
+            targets = args if command in ("DEL", "UNLINK") else args[:1]
+            for key in targets:
+                self._set_deadline((collection, _key(key)), None)
+        elif command in ("RENAME", "RENAMENX", "COPY") and len(args) > 1:
+            # The destination takes the time to live of the source.
+            target = (collection, _key(args[1]))
+            deadline = self._deadlines.get(name)
+            if command == "RENAME":
+                self._deadlines.pop(name, None)
+                self._set_deadline(target, deadline)
+            elif deadline is not None:
+                current = self._deadlines.get(target)
+                if current is not None:
+                    deadline = min(current, deadline)
+                self._set_deadline(target, deadline)
+
+    def stats(self):
+        """Return the cache statistics.
+
+        :returns: Number of hits and misses, hit rate, number of cached
+            results and their approximate size in bytes, number of results
+            evicted to honor the limits and invalidated by writes.
+        :rtype: dict
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+                "ttl": self._ttl,
+            }
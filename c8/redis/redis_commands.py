@@ -1,11 +1,60 @@
-from c8.executor import DefaultExecutor
+from c8.exceptions import C8Error
+from c8.executor import BatchExecutor, DefaultExecutor, Executor
 from c8.redis.redis_interface import RedisInterface
+from c8.redis.scan import concurrent_pages, key_pages, scan_pages
+
+__all__ = ["RedisCommands", "RedisPipeline"]
 
 
 class RedisCommands(object):
-    def __init__(self, connection):
+    """Redis commands API wrapper.
+
+    :param connection: HTTP connection.
+    :type connection: c8.connection.Connection
+    :param executor: API executor. Defaults to
+        :class:`c8.executor.DefaultExecutor`.
+    :type executor: c8.executor.Executor
+    :param near_cache: Near cache serving GET, HGET, HGETALL and MGET from
+        memory. Writes made through the wrapper invalidate it.
+    :type near_cache: c8.redis.near_cache.NearCache
+    :raise ValueError: If a near cache is set in async or asyncio execution.
+    """
+
+    def __init__(self, connection, executor=None, near_cache=None):
         self._conn = connection
-        self._executor = DefaultExecutor(connection)
+        self._executor = executor or DefaultExecutor(connection)
+        if near_cache is not None and self._executor.context not in (
+            "default",
+            "batch",
+        ):
+            raise ValueError(
+                "near cache is not supported in {} execution".format(
+                    self._executor.context
+                )
+            )
+        self._interface = RedisInterface(self._conn, self._executor, near_cache)
+
+    @property
+    def near_cache(self):
+        """Return the near cache of reads.
+
+        :returns: Near cache, or None if not enabled.
+        :rtype: c8.redis.near_cache.NearCache | None
+        """
+        return self._interface.near_cache
+
+    def pipeline(self, max_batch_size=1000):
+        """Return a pipeline which queues commands and sends them in batches.
+
+        :param max_batch_size: Max number of commands sent per request.
+        :type max_batch_size: int
+        :returns: Redis pipeline.
+        :rtype: c8.redis.redis_commands.RedisPipeline
+        :raise ValueError: If called in asyncio execution.
+        """
+        if self._executor.context == "asyncio":
+            raise ValueError("pipelines are not supported in asyncio execution")
+        return RedisPipeline(self._conn, max_batch_size, self.near_cache)
 
     def set(self, key, value, collection, options=[]):
         """
@@ -26,9 +75,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SET"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, value, *options
-        )
+        return self._interface.command_parser(command, collection, key, value, *options)
 
     def append(self, key, value, collection):
         """
@@ -47,9 +94,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "APPEND"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, value
-        )
+        return self._interface.command_parser(command, collection, key, value)
 
     def decr(self, key, collection):
         """
@@ -67,9 +112,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "DECR"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key
-        )
+        return self._interface.command_parser(command, collection, key)
 
     def decrby(self, key, decrement, collection):
         """
@@ -89,11 +132,9 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "DECRBY"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, decrement
-        )
+        return self._interface.command_parser(command, collection, key, decrement)
 
-    def get(self, key, collection):
+    def get(self, key, collection, hedge=None):
         """
         Get the value of key. If the key does not exist the special value nil is
         returned. An error is returned if the value stored at key is not a string,
@@ -104,13 +145,16 @@ class RedisCommands(object):
         :type key: str
         :param collection: Name of the collection that we set values to
         :type collection: str
+        :param hedge: If set to True, the read is sent again (to another region
+            if possible) when it is slow, see :class:`c8.hedging.HedgePolicy`.
+            False disables it. Not set means the hedging policy of the client
+            applies.
+        :type hedge: bool | None
         :returns: Returns response from server in format {"code": xx, "result": xx}
         :rtype: dict
         """
         command = "GET"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key
-        )
+        return self._interface.command_parser(command, collection, key, hedge=hedge)
 
     def getdel(self, key, collection):
         """
@@ -127,9 +171,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "GETDEL"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key
-        )
+        return self._interface.command_parser(command, collection, key)
 
     def getex(self, key, collection, expiry_command=None, time=None):
         """
@@ -149,7 +191,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "GETEX"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, expiry_command, time
         )
 
@@ -175,9 +217,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "GETRANGE"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, start, end
-        )
+        return self._interface.command_parser(command, collection, key, start, end)
 
     def getset(self, key, value, collection):
         """
@@ -196,9 +236,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "GETSET"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, value
-        )
+        return self._interface.command_parser(command, collection, key, value)
 
     def incr(self, key, collection):
         """
@@ -216,9 +254,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "INCR"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key
-        )
+        return self._interface.command_parser(command, collection, key)
 
     def incrby(self, key, increment, collection):
         """
@@ -238,9 +274,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "INCRBY"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, increment
-        )
+        return self._interface.command_parser(command, collection, key, increment)
 
     def incrbyfloat(self, key, increment, collection):
         """
@@ -264,9 +298,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "INCRBYFLOAT"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, increment
-        )
+        return self._interface.command_parser(command, collection, key, increment)
 
     def mget(self, keys, collection):
         """
@@ -283,9 +315,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "MGET"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, *keys
-        )
+        return self._interface.command_parser(command, collection, *keys)
 
     def mset(self, data, collection):
         """
@@ -307,9 +337,7 @@ class RedisCommands(object):
             data_list.append(key)
             data_list.append(value)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, *data_list
-        )
+        return self._interface.command_parser(command, collection, *data_list)
 
     def psetex(self, key, milliseconds, value, collection):
         """
@@ -329,7 +357,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "PSETEX"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, milliseconds, value
         )
 
@@ -351,9 +379,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SETBIT"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, offset, value
-        )
+        return self._interface.command_parser(command, collection, key, offset, value)
 
     def msetnx(self, data, collection):
         """
@@ -374,9 +400,7 @@ class RedisCommands(object):
             data_list.append(key)
             data_list.append(value)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, *data_list
-        )
+        return self._interface.command_parser(command, collection, *data_list)
 
     def setex(self, key, seconds, value, collection):
         """
@@ -396,9 +420,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SETEX"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, seconds, value
-        )
+        return self._interface.command_parser(command, collection, key, seconds, value)
 
     def setnx(self, key, value, collection):
         """
@@ -417,9 +439,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SETNX"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, value
-        )
+        return self._interface.command_parser(command, collection, key, value)
 
     def setrange(self, key, offset, value, collection):
         """
@@ -443,9 +463,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SETRANGE"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, offset, value
-        )
+        return self._interface.command_parser(command, collection, key, offset, value)
 
     def strlen(self, key, collection):
         """
@@ -461,7 +479,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "STRLEN"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -488,7 +506,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "BITCOUNT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, start, end, data_format
         )
 
@@ -510,7 +528,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "BITOP"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, operation, deskey, *keys
         )
 
@@ -538,7 +556,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "BITPOS"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, bit, start, end, data_format
         )
 
@@ -557,7 +575,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "GETBIT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -583,9 +601,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LPUSH"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *elements
-        )
+        return self._interface.command_parser(command, collection, key, *elements)
 
     def lindex(self, key, index, collection):
         """
@@ -606,9 +622,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LINDEX"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, index
-        )
+        return self._interface.command_parser(command, collection, key, index)
 
     def linsert(self, key, modifier, pivot, element, collection):
         """
@@ -630,7 +644,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LINSERT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, modifier, pivot, element
         )
 
@@ -649,7 +663,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LLEN"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -677,9 +691,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LRANGE"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, start, stop
-        )
+        return self._interface.command_parser(command, collection, key, start, stop)
 
     def lmove(self, source, destination, where_from, where_to, collection):
         """
@@ -703,7 +715,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LMOVE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, source, destination, where_from, where_to
         )
 
@@ -753,7 +765,7 @@ class RedisCommands(object):
             max_len_list.append("MAXLEN")
             max_len_list.append(max_len)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, element, *rank_list, *count_list, *max_len_list
         )
 
@@ -776,9 +788,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "RPUSH"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *elements
-        )
+        return self._interface.command_parser(command, collection, key, *elements)
 
     def lpop(
         self,
@@ -803,7 +813,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LPOP"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -827,9 +837,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LPUSHX"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *elements
-        )
+        return self._interface.command_parser(command, collection, key, *elements)
 
     def rpushx(self, key, elements, collection):
         """
@@ -848,9 +856,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "RPUSHX"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *elements
-        )
+        return self._interface.command_parser(command, collection, key, *elements)
 
     def lrem(self, key, count, element, collection):
         """
@@ -874,9 +880,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LREM"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, count, element
-        )
+        return self._interface.command_parser(command, collection, key, count, element)
 
     def lset(self, key, index, element, collection):
         """
@@ -896,9 +900,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LSET"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, index, element
-        )
+        return self._interface.command_parser(command, collection, key, index, element)
 
     def ltrim(self, key, start, stop, collection):
         """
@@ -919,9 +921,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "LTRIM"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, start, stop
-        )
+        return self._interface.command_parser(command, collection, key, start, stop)
 
     def rpop(
         self,
@@ -946,7 +946,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "RPOP"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -970,7 +970,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "RPOPLPUSH"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             source,
@@ -999,9 +999,7 @@ class RedisCommands(object):
             data_list.append(dict_key)
             data_list.append(dict_value)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *data_list
-        )
+        return self._interface.command_parser(command, collection, key, *data_list)
 
     def hget(self, key, field, collection):
         """
@@ -1018,9 +1016,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HGET"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, field
-        )
+        return self._interface.command_parser(command, collection, key, field)
 
     def hdel(self, key, fields, collection):
         """
@@ -1039,9 +1035,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HDEL"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *fields
-        )
+        return self._interface.command_parser(command, collection, key, *fields)
 
     def hexists(self, key, field, collection):
         """
@@ -1058,9 +1052,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HEXISTS"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, field
-        )
+        return self._interface.command_parser(command, collection, key, field)
 
     def hgetall(self, key, collection):
         """
@@ -1077,9 +1069,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HGETALL"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key
-        )
+        return self._interface.command_parser(command, collection, key)
 
     def hincrby(self, key, field, increment, collection):
         """
@@ -1100,7 +1090,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HINCRBY"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, field, increment
         )
 
@@ -1128,7 +1118,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HINCRBYFLOAT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, field, increment
         )
 
@@ -1145,7 +1135,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HKEYS"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1164,7 +1154,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HLEN"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1188,9 +1178,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HMGET"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *fields
-        )
+        return self._interface.command_parser(command, collection, key, *fields)
 
     def hmset(self, key, data, collection):
         """
@@ -1214,9 +1202,7 @@ class RedisCommands(object):
             data_list.append(dict_key)
             data_list.append(dict_value)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *data_list
-        )
+        return self._interface.command_parser(command, collection, key, *data_list)
 
     def hscan(self, key, cursor, collection, pattern=None, count=None):
         """
@@ -1248,7 +1234,7 @@ class RedisCommands(object):
             count_list.append("COUNT")
             count_list.append(count)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, cursor, *pattern_list, *count_list
         )
 
@@ -1268,7 +1254,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HSTRLEN"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1297,7 +1283,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HRANDFIELD"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1318,7 +1304,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "HVALS"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1341,9 +1327,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SADD"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *members
-        )
+        return self._interface.command_parser(command, collection, key, *members)
 
     def scard(self, key, collection):
         """
@@ -1358,7 +1342,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SCARD"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1378,7 +1362,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SDIFF"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             *keys,
@@ -1400,7 +1384,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SDIFFSTORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             destination,
@@ -1421,7 +1405,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SINTER"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             *keys,
@@ -1443,7 +1427,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SINTERSTORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             destination,
@@ -1465,9 +1449,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SISMEMBER"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, member
-        )
+        return self._interface.command_parser(command, collection, key, member)
 
     def smembers(self, key, collection):
         """
@@ -1482,7 +1464,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SMEMBERS"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1505,9 +1487,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SMISMEMBER"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *members
-        )
+        return self._interface.command_parser(command, collection, key, *members)
 
     def smove(self, source, destination, member, collection):
         """
@@ -1528,7 +1508,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SMOVE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, source, destination, member
         )
 
@@ -1549,9 +1529,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SPOP"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, count
-        )
+        return self._interface.command_parser(command, collection, key, count)
 
     def srandmember(self, key, collection, count=None):
         """
@@ -1571,9 +1549,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SRANDMEMBER"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, count
-        )
+        return self._interface.command_parser(command, collection, key, count)
 
     def srem(self, key, members, collection):
         """
@@ -1592,9 +1568,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SREM"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *members
-        )
+        return self._interface.command_parser(command, collection, key, *members)
 
     def sscan(self, key, cursor, collection, pattern=None, count=None):
         """
@@ -1626,7 +1600,7 @@ class RedisCommands(object):
             count_list.append("COUNT")
             count_list.append(count)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, cursor, *pattern_list, *count_list
         )
 
@@ -1643,7 +1617,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SUNION"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             *keys,
@@ -1665,7 +1639,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "SUNIONSTORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             destination,
@@ -1694,9 +1668,7 @@ class RedisCommands(object):
         """
         command = "ZADD"
 
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *options, *data
-        )
+        return self._interface.command_parser(command, collection, key, *options, *data)
 
     def zcard(self, key, collection):
         """
@@ -1712,7 +1684,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZCARD"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -1737,7 +1709,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZCOUNT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum
         )
 
@@ -1764,7 +1736,7 @@ class RedisCommands(object):
         else:
             with_scores_command = None
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, num_keys, *keys, with_scores_command
         )
 
@@ -1787,7 +1759,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZDIFFSTORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             destination,
@@ -1815,7 +1787,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZINCRBY"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, increment, member
         )
 
@@ -1848,7 +1820,7 @@ class RedisCommands(object):
         if with_scores is True:
             options_command.append("WITHSCORES")
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             num_keys,
@@ -1880,7 +1852,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZINTERSTORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             destination,
@@ -1909,7 +1881,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZLEXCOUNT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum
         )
 
@@ -1929,9 +1901,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZMSCORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *members
-        )
+        return self._interface.command_parser(command, collection, key, *members)
 
     def zpopmax(self, key, collection, count=None):
         """
@@ -1949,9 +1919,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZPOPMAX"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, count
-        )
+        return self._interface.command_parser(command, collection, key, count)
 
     def zpopmin(self, key, collection, count=None):
         """
@@ -1970,9 +1938,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZPOPMIN"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, count
-        )
+        return self._interface.command_parser(command, collection, key, count)
 
     def zrandmember(self, key, collection, count=None, with_scores=False):
         """
@@ -1999,7 +1965,7 @@ class RedisCommands(object):
         else:
             with_scores_command = None
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, count, with_scores_command
         )
 
@@ -2024,7 +1990,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZRANGE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, start, stop, *options
         )
 
@@ -2060,7 +2026,7 @@ class RedisCommands(object):
             limit_list.append(count)
 
         command = "ZRANGEBYLEX"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum, *limit_list
         )
 
@@ -2112,7 +2078,7 @@ class RedisCommands(object):
             limit_list.append(offset)
             limit_list.append(count)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum, with_scores_command, *limit_list
         )
 
@@ -2137,7 +2103,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZRANGESTORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, dst, key, minimum, maximum, *options
         )
 
@@ -2158,9 +2124,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZRANK"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, member
-        )
+        return self._interface.command_parser(command, collection, key, member)
 
     def zrem(self, key, members, collection):
         """
@@ -2179,9 +2143,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZREM"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, *members
-        )
+        return self._interface.command_parser(command, collection, key, *members)
 
     def zremrangebylex(
         self,
@@ -2210,7 +2172,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZREMRANGEBYLEX"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum
         )
 
@@ -2242,9 +2204,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZREMRANGEBYRANK"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, start, stop
-        )
+        return self._interface.command_parser(command, collection, key, start, stop)
 
     def zremrangebyscore(
         self,
@@ -2270,7 +2230,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZREMRANGEBYSCORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum
         )
 
@@ -2302,7 +2262,7 @@ class RedisCommands(object):
         else:
             with_scores_command = None
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, start, stop, with_scores_command
         )
 
@@ -2339,7 +2299,7 @@ class RedisCommands(object):
             limit_list.append(offset)
             limit_list.append(count)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum, *limit_list
         )
 
@@ -2391,7 +2351,7 @@ class RedisCommands(object):
             limit_list.append(offset)
             limit_list.append(count)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, minimum, maximum, with_scores_command, *limit_list
         )
 
@@ -2412,9 +2372,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZREVRANK"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, member
-        )
+        return self._interface.command_parser(command, collection, key, member)
 
     def zscan(self, key, cursor, collection, pattern=None, count=None):
         """
@@ -2446,7 +2404,7 @@ class RedisCommands(object):
             count_list.append("COUNT")
             count_list.append(count)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, cursor, *pattern_list, *count_list
         )
 
@@ -2466,9 +2424,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ZSCORE"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, member
-        )
+        return self._interface.command_parser(command, collection, key, member)
 
     def zunion(self, num_keys, keys, collection, options=None, with_scores=False):
         """
@@ -2498,7 +2454,7 @@ class RedisCommands(object):
         if with_scores is True:
             options_command.append("WITHSCORES")
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             num_keys,
@@ -2541,7 +2497,7 @@ class RedisCommands(object):
         if with_scores is True:
             options_command.append("WITHSCORES")
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             destination,
@@ -2582,7 +2538,7 @@ class RedisCommands(object):
         if replace is True:
             options_command.append("WITHSCORES")
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, source, destination, *options_command
         )
 
@@ -2603,9 +2559,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "DEL"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, *keys
-        )
+        return self._interface.command_parser(command, collection, *keys)
 
     def exists(
         self,
@@ -2624,9 +2578,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "EXISTS"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, *keys
-        )
+        return self._interface.command_parser(command, collection, *keys)
 
     def expire(
         self,
@@ -2653,7 +2605,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "EXPIRE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, seconds, options
         )
 
@@ -2683,7 +2635,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "EXPIREAT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, unix_time_seconds, options
         )
 
@@ -2702,7 +2654,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "PERSIST"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -2734,7 +2686,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "PEXPIRE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, milliseconds, options
         )
 
@@ -2762,7 +2714,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "PEXPIREAT"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, key, unix_time_milliseconds, options
         )
 
@@ -2785,7 +2737,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "PTTL"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -2805,7 +2757,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "RANDOMKEY"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
         )
@@ -2829,9 +2781,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "RENAME"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, new_key
-        )
+        return self._interface.command_parser(command, collection, key, new_key)
 
     def renamenx(self, key, new_key, collection):
         """
@@ -2851,9 +2801,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "RENAMENX"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, key, new_key
-        )
+        return self._interface.command_parser(command, collection, key, new_key)
 
     def scan(self, cursor, collection, pattern=None, count=None, data_type=None):
         """
@@ -2890,7 +2838,7 @@ class RedisCommands(object):
             type_list.append("TYPE")
             type_list.append(data_type)
 
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command, collection, cursor, *pattern_list, *count_list, *type_list
         )
 
@@ -2913,7 +2861,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "TTL"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -2938,7 +2886,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "TYPE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             key,
@@ -2966,9 +2914,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "UNLINK"
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, *keys
-        )
+        return self._interface.command_parser(command, collection, *keys)
 
     def echo(
         self,
@@ -2987,7 +2933,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "ECHO"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             message,
@@ -3010,7 +2956,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "PING"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
             message,
@@ -3030,7 +2976,7 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "DBSIZE"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
         )
@@ -3060,9 +3006,7 @@ class RedisCommands(object):
         else:
             async_flush_command = None
 
-        return RedisInterface(self._conn, self._executor).command_parser(
-            command, collection, async_flush_command
-        )
+        return self._interface.command_parser(command, collection, async_flush_command)
 
     def time(
         self,
@@ -3081,7 +3025,280 @@ class RedisCommands(object):
         :rtype: dict
         """
         command = "TIME"
-        return RedisInterface(self._conn, self._executor).command_parser(
+        return self._interface.command_parser(
             command,
             collection,
         )
+
+    def _scan_fetcher(self, name):
+        if self._executor.context != "default":
+            raise ValueError(
+                "scan iterators are not supported in {} execution".format(
+                    self._executor.context
+                )
+            )
+        return getattr(self, name)
+
+    def scan_iter(
+        self, collection, pattern=None, count=None, data_type=None, prefetch=True
+    ):
+        """Iterate over the keys of a collection, following the SCAN cursor.
+
+        As with SCAN, a key may be returned more than once.
+
+        :param collection: Name of the collection
+        :type collection: str
+        :param pattern: Only return the keys matching the pattern
+        :type pattern: str
+        :param count: Number of keys scanned per request
+        :type count: int
+        :param data_type: Only return the keys of the type (ex. "hash")
+        :type data_type: str
+        :param prefetch: Fetch the next page while the current one is consumed
+        :type prefetch: bool
+        :returns: Generator of keys
+        :rtype: collections.abc.Iterator[str]
+        :raise ValueError: If not in the default execution context.
+        """
+        self._scan_fetcher("scan")
+        for page in key_pages(self, collection, pattern, count, data_type, prefetch):
+            yield from page
+
+    def hscan_iter(self, key, collection, pattern=None, count=None, prefetch=True):
+        """Iterate over the fields of a hash, following the HSCAN cursor.
+
+        :param key: Key of the hash
+        :type key: str
+        :param collection: Name of the collection
+        :type collection: str
+        :param pattern: Only return the fields matching the pattern
+        :type pattern: str
+        :param count: Number of fields scanned per request
+        :type count: int
+        :param prefetch: Fetch the next page while the current one is consumed
+        :type prefetch: bool
+        :returns: Generator of (field, value) tuples
+        :rtype: collections.abc.Iterator[tuple]
+        :raise ValueError: If not in the default execution context.
+        """
+        hscan = self._scan_fetcher("hscan")
+
+        def fetch(cursor):
+            return hscan(key, cursor, collection, pattern, count)
+
+        for page in scan_pages(fetch, prefetch):
+            yield from zip(page[::2], page[1::2])
+
+    def sscan_iter(self, key, collection, pattern=None, count=None, prefetch=True):
+        """Iterate over the members of a set, following the SSCAN cursor.
+
+        :param key: Key of the set
+        :type key: str
+        :param collection: Name of the collection
+        :type collection: str
+        :param pattern: Only return the members matching the pattern
+        :type pattern: str
+        :param count: Number of members scanned per request
+        :type count: int
+        :param prefetch: Fetch the next page while the current one is consumed
+        :type prefetch: bool
+        :returns: Generator of members
+        :rtype: collections.abc.Iterator[str]
+        :raise ValueError: If not in the default execution context.
+        """
+        sscan = self._scan_fetcher("sscan")
+
+        def fetch(cursor):
+            return sscan(key, cursor, collection, pattern, count)
+
+        for page in scan_pages(fetch, prefetch):
+            yield from page
+
+    def zscan_iter(self, key, collection, pattern=None, count=None, prefetch=True):
+        """Iterate over the members of a sorted set, following the ZSCAN
+        cursor.
+
+        :param key: Key of the sorted set
+        :type key: str
+        :param collection: Name of the collection
+        :type collection: str
+        :param pattern: Only return the members matching the pattern
+        :type pattern: str
+        :param count: Number of members scanned per request
+        :type count: int
+        :param prefetch: Fetch the next page while the current one is consumed
+        :type prefetch: bool
+        :returns: Generator of (member, score) tuples
+        :rtype: collections.abc.Iterator[tuple]
+        :raise ValueError: If not in the default execution context.
+        """
+        zscan = self._scan_fetcher("zscan")
+
+        def fetch(cursor):
+            return zscan(key, cursor, collection, pattern, count)
+
+        for page in scan_pages(fetch, prefetch):
+            # The server returns the score of each member before the member.
+            yield from zip(page[1::2], page[::2])
+
+    def scan_collections(
+        self,
+        collections,
+        pattern=None,
+        count=None,
+        data_type=None,
+        prefetch=True,
+        max_workers=8,
+    ):
+        """Iterate over the keys of several collections, scanned concurrently.
+
+        Keys are returned as their pages arrive, so the keys of different
+        collections are interleaved.
+
+        :param collections: Names of the collections
+        :type collections: [str]
+        :param pattern: Only return the keys matching the pattern
+        :type pattern: str
+        :param count: Number of keys scanned per request
+        :type count: int
+        :param data_type: Only return the keys of the type (ex. "hash")
+        :type data_type: str
+        :param prefetch: Fetch the next page of each collection while the
+            current one is consumed
+        :type prefetch: bool
+        :param max_workers: Max number of collections scanned at the same time
+        :type max_workers: int
+        :returns: Generator of (collection, key) tuples
+        :rtype: collections.abc.Iterator[tuple]
+        :raise ValueError: If not in the default execution context.
+        """
+        self._scan_fetcher("scan")
+
+        def source(collection):
+            return collection, lambda: key_pages(
+                self, collection, pattern, count, data_type, prefetch
+            )
+
+        sources = [source(collection) for collection in collections]
+        for collection, page in concurrent_pages(sources, max_workers):
+            for key in page:
+                yield collection, key
+
+
+class _PipelineExecutor(Executor):
+    """Executor queuing requests into batches of bounded size."""
+
+    context = "batch"
+
+    def __init__(self, connection, max_batch_size):
+        super(_PipelineExecutor, self).__init__(connection)
+        self._max_batch_size = max_batch_size
+        self.reset()
+
+    @property
+    def size(self):
+        return self._size
+
+    def reset(self):
+        self._batches = []
+        self._size = 0
+
+    def execute(self, request, response_handler, custom_prefix=None):
+        if self._size % self._max_batch_size == 0:
+            self._batches.append(BatchExecutor(self._conn, return_result=True))
+        self._size += 1
+        return self._batches[-1].execute(request, response_handler, custom_prefix)
+
+    def commit(self):
+        batches = self._batches
+        self.reset()
+        jobs = []
+        for batch in batches:
+            jobs.extend(batch.commit())
+        return jobs
+
+
+class RedisPipeline(RedisCommands):
+    """Redis commands queued client-side and sent in batches.
+
+    Commands return :class:`c8.job.BatchJob` instances instead of results.
+    Queued commands are sent with :func:`execute` over the batch API, in as
+    few requests as **max_batch_size** allows, and run in the order they were
+    queued. Exiting the pipeline as a context manager executes it unless an
+    exception was raised.
+
+    The commands are not run atomically: commands of other clients may run in
+    between, and a failed command does not stop the commands after it.
+
+    :param connection: HTTP connection.
+    :type connection: c8.connection.Connection
+    :param max_batch_size: Max number of commands sent per request.
+    :type max_batch_size: int
+    :param near_cache: Near cache invalidated by the queued writes. Reads are
+        not served from it.
+    :type near_cache: c8.redis.near_cache.NearCache
+    """
+
+    def __init__(self, connection, max_batch_size=1000, near_cache=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive int")
+        super(RedisPipeline, self).__init__(
+            connection, _PipelineExecutor(connection, max_batch_size), near_cache
+        )
+
+    def __repr__(self):
+        return "<RedisPipeline {}>".format(self._executor.size)
+
+    def __len__(self):
+        return self._executor.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception, *_):
+        if exception is None:
+            self.execute()
+        else:
+            self.reset()
+
+    def pipeline(self, max_batch_size=1000):
+        raise ValueError("pipelines cannot be nested")
+
+    def reset(self):
+        """Discard the queued commands."""
+        self._executor.reset()
+        if self.near_cache is not None:
+            self._interface.flush_pending()
+
+    def execute(self, raise_on_error=True):
+        """Send the queued commands and return their results in order.
+
+        The pipeline is emptied and can be reused afterwards.
+
+        :param raise_on_error: If set to True, the error of the first failed
+            command is raised once all commands ran. Otherwise, errors are
+            placed in the result list instead of the command results.
+        :type raise_on_error: bool
+        :returns: Results of the commands, in the format
+            {"code": xx, "result": xx}.
+        :rtype: [dict | c8.redis.core.RedisServerError]
+        :raise c8.redis.core.RedisServerError: If a command fails and
+            **raise_on_error** is set to True.
+        :raise c8.exceptions.BatchExecuteError: If a batch request fails.
+        """
+        try:
+            jobs = self._executor.commit()
+        finally:
+            if self.near_cache is not None:
+                self._interface.flush_pending()
+        results = []
+        for job in jobs:
+            try:
+                results.append(job.result())
+            except C8Error as err:
+                results.append(err)
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, C8Error):
+                    raise result
+        return results
@@ -1,5 +1,6 @@
 from c8.api import APIWrapper
 from c8.redis.core import RedisServerError, build_request
+from c8.redis.near_cache import CACHED_COMMANDS, READ_COMMANDS
 
 
 class RedisInterface(APIWrapper):
@@ -10,19 +11,106 @@ class RedisInterface(APIWrapper):
     :type connection: c8.connection.Connection
     :param executor: API executor.
     :type executor: c8.executor.Executor
+    :param near_cache: Near cache of reads. Reads are served from it in the
+        default execution context only.
+    :type near_cache: c8.redis.near_cache.NearCache
     """
 
-    def __init__(self, connection, executor):
+    def __init__(self, connection, executor, near_cache=None):
         super(RedisInterface, self).__init__(connection, executor)
+        self._near_cache = near_cache
+        # Writes queued in a batch, invalidated again once it is committed.
+        self._pending = []
 
     def __repr__(self):
         return "<RedisInterface in {}>".format(self._conn.fabric_name)
 
-    def command_parser(self, command, collection, *args):
+    @property
+    def near_cache(self):
+        """Return the near cache of reads.
+
+        :returns: Near cache, or None if not enabled.
+        :rtype: c8.redis.near_cache.NearCache | None
+        """
+        return self._near_cache
+
+    def command_parser(self, command, collection, *args, hedge=False):
+        cache = self._near_cache
+        if cache is None:
+            return self._send(command, collection, args, hedge)
+
+        if command in CACHED_COMMANDS:
+            if not args or self._executor.context != "default":
+                return self._send(command, collection, args, hedge)
+            if command == "MGET":
+                return self._cached_mget(collection, args)
+            key = args[0] if isinstance(args[0], str) else str(args[0])
+            view = (command,) + args[1:]
+            hit, result = cache.lookup(collection, key, view)
+            if hit:
+                return result
+            token = cache.token()
+            result = self._send(command, collection, args, hedge)
+            cache.store(collection, key, view, result, token)
+            return result
+        if command in READ_COMMANDS:
+            return self._send(command, collection, args, hedge)
+
+        # Reads racing with the write may fetch the previous value after the
+        # first invalidation, so the keys are invalidated again once it ran.
+        keys = cache.observe(command, collection, args)
+        if self.context != "default":
+            self._pending.append((collection, keys))
+            return self._send(command, collection, args)
+        try:
+            return self._send(command, collection, args)
+        finally:
+            cache.invalidate(collection, keys)
+
+    def flush_pending(self):
+        """Invalidate the keys written by the committed batch commands."""
+        pending, self._pending = self._pending, []
+        for collection, keys in pending:
+            self._near_cache.invalidate(collection, keys)
+
+    def _cached_mget(self, collection, keys):
+        cache = self._near_cache
+        keys = [key if isinstance(key, str) else str(key) for key in keys]
+        values = {}
+        missing = {}
+        code = 200
+        for key in keys:
+            hit, result = cache.lookup(collection, key, ("GET",))
+            if hit:
+                values[key] = result.get("result")
+                code = result.get("code", code)
+            else:
+                missing[key] = None
+        if not missing:
+            return {"code": code, "result": [values[key] for key in keys]}
+
+        missing = list(missing)
+        token = cache.token()
+        body = self._send("MGET", collection, missing)
+        results = body.get("result") if isinstance(body, dict) else None
+        if not isinstance(results, list) or len(results) != len(missing):
+            # Unknown reply format, fetch all keys without caching.
+            return self._send("MGET", collection, keys)
+        code = body.get("code", code)
+        for key, value in zip(missing, results):
+            values[key] = value
+            cache.store(
+                collection, key, ("GET",), {"code": code, "result": value}, token
+            )
+        return {"code": code, "result": [values[key] for key in keys]}
+
+    def _send(self, command, collection, args, hedge=False):
         data = [command, *args]
         filtered_data = [i for i in data if i is not None]
 
-        request = build_request(collection, filtered_data)
+        request = build_request(
+            collection, filtered_data, hedge, read=command in READ_COMMANDS
+        )
 
         def response_handler(response):
             if not response.is_success and request is not None:
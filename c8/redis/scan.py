@@ -0,0 +1,136 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ["scan_pages", "key_pages", "concurrent_pages"]
+
+# Cursors the server returns once an iteration is complete.
+_DONE_CURSORS = (0, "0", None)
+
+
+def scan_pages(fetch, prefetch=True):
+    """Yield the pages of a SCAN family command, following its cursor.
+
+    The iteration ends when the server returns cursor 0 or the cursor it was
+    given. Pages may be empty (e.g. when no key of the page matches the
+    pattern) and are skipped.
+
+    :param fetch: Callable taking a cursor and returning the response of the
+        command, in format {"code": xx, "result": [cursor, elements]}.
+    :type fetch: callable
+    :param prefetch: If set to True, the next page is fetched on a background
+        thread while the caller processes the current one.
+    :type prefetch: bool
+    :returns: Generator of pages (lists of raw elements).
+    :rtype: collections.abc.Iterator[list]
+    """
+    pool = ThreadPoolExecutor(1, "c8-redis-scan") if prefetch else None
+    try:
+        cursor = 0
+        reply = fetch(cursor)
+        while True:
+            next_cursor, page = reply["result"]
+            done = next_cursor in _DONE_CURSORS or next_cursor == cursor
+            pending = None
+            if pool is not None and not done:
+                pending = pool.submit(fetch, next_cursor)
+            if page:
+                yield page
+            if done:
+                return
+            reply = fetch(next_cursor) if pending is None else pending.result()
+            cursor = next_cursor
+    finally:
+        if pool is not None:
+            # A page still being prefetched is discarded.
+            pool.shutdown(wait=False)
+
+
+def key_pages(
+    redis, collection, pattern=None, count=None, data_type=None, prefetch=True
+):
+    """Yield the pages of keys of a collection, following the SCAN cursor.
+
+    :param redis: Redis commands in the default execution context.
+    :type redis: c8.redis.redis_commands.RedisCommands
+    :param collection: Collection name.
+    :type collection: str
+    :param pattern: Only return the keys matching the pattern.
+    :type pattern: str
+    :param count: Number of keys scanned per request.
+    :type count: int
+    :param data_type: Only return the keys of the type (e.g. "hash").
+    :type data_type: str
+    :param prefetch: Fetch the next page while the current one is consumed.
+    :type prefetch: bool
+    :returns: Generator of pages of keys.
+    :rtype: collections.abc.Iterator[list]
+    """
+
+    def fetch(cursor):
+        return redis.scan(cursor, collection, pattern, count, data_type)
+
+    return scan_pages(fetch, prefetch)
+
+
+def concurrent_pages(sources, max_workers=8, buffer_size=16):
+    """Iterate over several page iterators concurrently.
+
+    Each source is drained on a worker thread, and its pages are yielded as
+    they arrive, interleaved with the pages of the other sources.
+
+    :param sources: Labels and callables returning the page iterator of the
+        label (e.g. a collection name and its scan).
+    :type sources: [(object, callable)]
+    :param max_workers: Max number of sources drained at the same time.
+    :type max_workers: int
+    :param buffer_size: Max number of pages waiting to be consumed.
+    :type buffer_size: int
+    :returns: Generator of (label, page) tuples.
+    :rtype: collections.abc.Iterator[(object, list)]
+    """
+    sources = list(sources)
+    pages = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(label, iterate):
+        try:
+            for page in iterate():
+                if not put((label, page)):
+                    return
+        except Exception as err:
+            put(err)
+        finally:
+            put(done)
+
+    pool = ThreadPoolExecutor(max(1, min(max_workers, len(sources))))
+    try:
+        for label, iterate in sources:
+            pool.submit(drain, label, iterate)
+        remaining = len(sources)
+        while remaining:
+            item = pages.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        while True:
+            try:
+                pages.get_nowait()
+            except queue.Empty:
+                break
+        pool.shutdown(wait=False)
@@ -0,0 +1,497 @@
+import bisect
+import hashlib
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from c8.redis.redis_commands import RedisCommands
+from c8.redis.scan import concurrent_pages, key_pages
+
+__all__ = ["HashRing", "ShardedRedis", "hash_tag"]
+
+# Names of the RedisCommands parameters holding keys.
+KEY_PARAMS = ("key", "keys", "source", "destination", "deskey", "dst", "new_key")
+
+# RedisCommands methods which are not routed to a shard.
+_UNROUTED = frozenset(["pipeline"])
+
+
+def hash_tag(key):
+    """Return the part of a key which is hashed to pick its shard.
+
+    As in Redis Cluster, if the key contains a non-empty substring between
+    the first "{" and the next "}", only that substring is hashed, so that
+    keys such as "{user:1}:name" and "{user:1}:email" share a shard.
+
+    :param key: Key.
+    :type key: str
+    :returns: Hashed part of the key.
+    :rtype: str
+    """
+    start = key.find("{") + 1
+    if start:
+        end = key.find("}", start)
+        if end > start:
+            return key[start:end]
+    return key
+
+
+def _hash(value):
+    digest = hashlib.md5(value.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class HashRing(object):
+    """Consistent hash ring.
+
+    Each node is placed at **replicas** points of the ring, and a key belongs
+    to the node of the first point following its hash. Adding or removing a
+    node only moves the keys of the ring segments it gains or loses, about
+    1/N of the keys for N nodes.
+
+    :param nodes: Initial nodes.
+    :type nodes: collections.abc.Iterable[str]
+    :param replicas: Number of points per node.
+    :type replicas: int
+    """
+
+    def __init__(self, nodes=(), replicas=160):
+        if replicas < 1:
+            raise ValueError("replicas must be a positive int")
+        self._replicas = replicas
+        self._points = []
+        self._owners = []
+        self._nodes = []
+        for node in nodes:
+            self.add(node)
+
+    def __repr__(self):
+        return "<HashRing {}>".format(self._nodes)
+
+    @property
+    def nodes(self):
+        """Return the nodes of the ring.
+
+        :returns: Nodes, in the order they were added.
+        :rtype: [str]
+        """
+        return list(self._nodes)
+
+    def add(self, node):
+        """Add a node to the ring.
+
+        :param node: Node name.
+        :type node: str
+        :raise ValueError: If the node is already in the ring.
+        """
+        if node in self._nodes:
+            raise ValueError("node {} already in the ring".format(node))
+        self._nodes.append(node)
+        for replica in range(self._replicas):
+            point = _hash("{}#{}".format(node, replica))
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node):
+        """Remove a node from the ring.
+
+        :param node: Node name.
+        :type node: str
+        :raise ValueError: If the node is not in the ring.
+        """
+        if node not in self._nodes:
+            raise ValueError("node {} not in the ring".format(node))
+        self._nodes.remove(node)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def get(self, key):
+        """Return the node owning a key.
+
+        :param key: Key.
+        :type key: str
+        :returns: Node name.
+        :rtype: str
+        :raise ValueError: If the ring is empty.
+        """
+        if not self._points:
+            raise ValueError("hash ring is empty")
+        index = bisect.bisect(self._points, _hash(hash_tag(key)))
+        return self._owners[index % len(self._points)]
+
+
+class ShardedRedis(object):
+    """Redis commands spread across several collections.
+
+    Keys are mapped to collections with a consistent hash ring, honoring hash
+    tags (see :func:`hash_tag`). Each collection may be served by its own
+    :class:`c8.redis.redis_commands.RedisCommands`, e.g. one connected to the
+    region closest to the data.
+
+    Every :class:`c8.redis.redis_commands.RedisCommands` method taking a
+    collection is available without the collection argument and is sent to
+    the collection owning its keys. Commands on keys of different
+    collections are rejected, except MGET, MSET, DEL, EXISTS and UNLINK,
+    which are split by collection, sent in parallel and merged.
+
+    :param redis: Redis commands of the collections not given their own.
+    :type redis: c8.redis.redis_commands.RedisCommands
+    :param collections: Collection names, or a mapping of collection names to
+        the Redis commands serving them (None for **redis**).
+    :type collections: [str] | dict
+    :param replicas: Number of points of each collection on the hash ring.
+    :type replicas: int
+    :param max_workers: Max number of parallel requests of a fan-out.
+    :type max_workers: int
+    """
+
+    _signatures = {}
+
+    def __init__(self, redis, collections, replicas=160, max_workers=8):
+        self._redis = redis
+        self._ring = HashRing(replicas=replicas)
+        self._shards = {}
+        self._max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+        if not isinstance(collections, dict):
+            collections = dict.fromkeys(collections)
+        for collection, shard in collections.items():
+            self._ring.add(collection)
+            self._shards[collection] = shard or redis
+
+    def __repr__(self):
+        return "<ShardedRedis {}>".format(self._ring.nodes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in _UNROUTED:
+            raise AttributeError(name)
+        signature = self._signature(name)
+        if signature is None:
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            keys = []
+            for param in KEY_PARAMS:
+                value = arguments.get(param)
+                if isinstance(value, (list, tuple)):
+                    keys.extend(value)
+                elif value is not None:
+                    keys.append(value)
+            collection = self._route(name, keys)
+            method = getattr(self._shards[collection], name)
+            return method(collection=collection, **arguments)
+
+        command.__name__ = name
+        command.__doc__ = getattr(RedisCommands, name).__doc__
+        return command
+
+    @classmethod
+    def _signature(cls, name):
+        """Return the signature of a routable command, without the self and
+        collection parameters."""
+        if name not in cls._signatures:
+            method = getattr(RedisCommands, name, None)
+            signature = None
+            if callable(method):
+                params = inspect.signature(method).parameters
+                if "collection" in params and any(p in params for p in KEY_PARAMS):
+                    signature = inspect.Signature(
+                        [
+                            param
+                            for param in list(params.values())[1:]
+                            if param.name != "collection"
+                        ]
+                    )
+            cls._signatures[name] = signature
+        return cls._signatures[name]
+
+    @property
+    def collections(self):
+        """Return the names of the collections.
+
+        :returns: Collection names.
+        :rtype: [str]
+        """
+        return self._ring.nodes
+
+    def shard(self, key):
+        """Return the collection owning a key.
+
+        :param key: Key.
+        :type key: str
+        :returns: Collection name.
+        :rtype: str
+        """
+        return self._ring.get(key)
+
+    def _route(self, command, keys):
+        if not keys:
+            raise ValueError("{} has no key to route".format(command))
+        collection = self._ring.get(keys[0])
+        for key in keys[1:]:
+            if self._ring.get(key) != collection:
+                raise ValueError(
+                    "keys of {} map to different collections, use a hash "
+                    "tag to keep them together".format(command)
+                )
+        return collection
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self._max_workers)
+            return self._pool
+
+    def close(self):
+        """Shut down the worker threads of the fan-outs."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _fan_out(self, name, keys, build):
+        """Send a command to each collection owning some of the keys.
+
+        :returns: (collection, key positions, response) tuples.
+        """
+        groups = {}
+        for index, key in enumerate(keys):
+            groups.setdefault(self._ring.get(key), []).append(index)
+
+        def call(collection, indexes):
+            method = getattr(self._shards[collection], name)
+            return method(build([keys[i] for i in indexes]), collection)
+
+        if len(groups) == 1:
+            ((collection, indexes),) = groups.items()
+            return [(collection, indexes, call(collection, indexes))]
+        pool = self._executor()
+        futures = [
+            (collection, indexes, pool.submit(call, collection, indexes))
+            for collection, indexes in groups.items()
+        ]
+        return [(c, indexes, future.result()) for c, indexes, future in futures]
+
+    @staticmethod
+    def _merge(replies, result):
+        code = replies[0][2].get("code") if replies else 200
+        return {"code": code, "result": result}
+
+    def _count(self, name, keys):
+        replies = self._fan_out(name, list(keys), list)
+        return self._merge(replies, sum(reply["result"] for _, _, reply in replies))
+
+    def mget(self, keys):
+        """Return the values of the keys, fetched from their collections in
+        parallel.
+
+        :param keys: Keys.
+        :type keys: list
+        :returns: Response in format {"code": xx, "result": [values]}, with
+            the values in the order of the keys.
+        :rtype: dict
+        """
+        keys = list(keys)
+        values = [None] * len(keys)
+        replies = self._fan_out("mget", keys, list)
+        for _, indexes, reply in replies:
+            for index, value in zip(indexes, reply["result"]):
+                values[index] = value
+        return self._merge(replies, values)
+
+    def mset(self, data):
+        """Set the keys to their values, in their collections in parallel.
+
+        The keys of each collection are set atomically, but not across
+        collections.
+
+        :param data: Dictionary of the data.
+        :type data: dict
+        :returns: Response in format {"code": xx, "result": xx}.
+        :rtype: dict
+        """
+        keys = list(data)
+        replies = self._fan_out("mset", keys, lambda ks: {k: data[k] for k in ks})
+        return self._merge(replies, "OK")
+
+    def delete(self, keys):
+        """Remove the keys from their collections in parallel.
+
+        :param keys: Keys.
+        :type keys: list
+        :returns: Response in format {"code": xx, "result": xx}, with the
+            number of keys removed.
+        :rtype: dict
+        """
+        return self._count("delete", keys)
+
+    def exists(self, keys):
+        """Count the existing keys, checked in their collections in parallel.
+
+        :param keys: Keys.
+        :type keys: list
+        :returns: Response in format {"code": xx, "result": xx}, with the
+            number of existing keys.
+        :rtype: dict
+        """
+        return self._count("exists", keys)
+
+    def unlink(self, keys):
+        """Remove the keys from their collections in parallel, reclaiming
+        memory asynchronously.
+
+        :param keys: Keys.
+        :type keys: list
+        :returns: Response in format {"code": xx, "result": xx}, with the
+            number of keys removed.
+        :rtype: dict
+        """
+        return self._count("unlink", keys)
+
+    def scan_iter(
+        self, pattern=None, count=None, data_type=None, prefetch=True, max_workers=8
+    ):
+        """Iterate over the keys of all collections, scanned concurrently.
+
+        :param pattern: Only return the keys matching the pattern.
+        :type pattern: str
+        :param count: Number of keys scanned per request.
+        :type count: int
+        :param data_type: Only return the keys of the type (e.g. "hash").
+        :type data_type: str
+        :param prefetch: Fetch the next page of each collection while the
+            current one is consumed.
+        :type prefetch: bool
+        :param max_workers: Max number of collections scanned at the same time.
+        :type max_workers: int
+        :returns: Generator of keys.
+        :rtype: collections.abc.Iterator[str]
+        """
+
+        def source(collection):
+            redis = self._shards[collection]
+            return collection, lambda: key_pages(
+                redis, collection, pattern, count, data_type, prefetch
+            )
+
+        sources = [source(collection) for collection in self._ring.nodes]
+        for _, page in concurrent_pages(sources, max_workers):
+            yield from page
+
+    def add_collection(self, collection, redis=None, rebalance=True):
+        """Add a collection to the ring.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param redis: Redis commands serving the collection. Defaults to the
+            Redis commands of the sharded client.
+        :type redis: c8.redis.redis_commands.RedisCommands
+        :param rebalance: If set to True, the keys now owned by the new
+            collection are moved to it.
+        :type rebalance: bool
+        :returns: Rebalancing statistics (see :func:`rebalance`).
+        :rtype: dict
+        :raise ValueError: If the collection is already in the ring.
+        """
+        self._ring.add(collection)
+        self._shards[collection] = redis or self._redis
+        sources = [c for c in self._ring.nodes if c != collection]
+        if not rebalance:
+            return {"scanned": 0, "moved": 0}
+        return self.rebalance(sources)
+
+    def remove_collection(self, collection, rebalance=True):
+        """Remove a collection from the ring.
+
+        :param collection: Collection name.
+        :type collection: str
+        :param rebalance: If set to True, the keys of the collection are moved
+            to their new collections.
+        :type rebalance: bool
+        :returns: Rebalancing statistics (see :func:`rebalance`).
+        :rtype: dict
+        :raise ValueError: If the collection is not in the ring.
+        """
+        self._ring.remove(collection)
+        try:
+            if not rebalance:
+                return {"scanned": 0, "moved": 0}
+            return self.rebalance([collection])
+        finally:
+            del self._shards[collection]
+
+    def rebalance(self, collections=None, count=1000):
+        """Move the keys stored outside of the collection owning them.
+
+        Keys are scanned, then strings, hashes, lists, sets and sorted sets
+        are copied with their time to live and deleted from their previous
+        collection. Moves are not atomic: keys written while they are moved
+        may lose the write, so rebalance while writes are paused.
+
+        :param collections: Collections to scan. Defaults to all.
+        :type collections: [str]
+        :param count: Number of keys scanned per request.
+        :type count: int
+        :returns: Number of keys scanned and moved.
+        :rtype: dict
+        """
+        scanned = moved = 0
+        for source in collections or self._ring.nodes:
+            redis = self._shards[source]
+            # Keys are collected first, so that they are moved after the scan.
+            keys = dict.fromkeys(redis.scan_iter(source, count=count))
+            for key in keys:
+                scanned += 1
+                target = self._ring.get(key)
+                if target != source:
+                    moved += _move(key, redis, source, self._shards[target], target)
+        return {"scanned": scanned, "moved": moved}
+
+
+def _move(key, redis, source, target_redis, target):
+    """Copy a key to its new collection and delete it from the old one.
+
+    :returns: 1 if the key was moved, 0 if it no longer exists or has an
+        unsupported type.
+    :rtype: int
+    """
+    kind = redis.type(key, source)["result"]
+    if kind == "string":
+        value = redis.get(key, source)["result"]
+        if value is None:
+            return 0
+        write = [("set", (key, value))]
+    elif kind == "hash":
+        pairs = redis.hgetall(key, source)["result"]
+        write = [("hset", (key, dict(zip(pairs[::2], pairs[1::2]))))]
+    elif kind == "list":
+        write = [("rpush", (key, redis.lrange(key, 0, -1, source)["result"]))]
+    elif kind == "set":
+        write = [("sadd", (key, redis.smembers(key, source)["result"]))]
+    elif kind == "zset":
+        pairs = redis.zrange(key, 0, -1, source, ["WITHSCORES"])["result"]
+        data = []
+        for member, score in zip(pairs[::2], pairs[1::2]):
+            data.extend([score, member])
+        write = [("zadd", (key, data))]
+    else:
+        return 0
+
+    ttl = redis.pttl(key, source)["result"]
+    target_redis.delete([key], target)
+    for name, args in write:
+        getattr(target_redis, name)(*args, target)
+    if ttl is not None and ttl > 0:
+        target_redis.pexpire(key, ttl, target)
+    redis.delete([key], source)
+    return 1
@@ -21,14 +21,27 @@ class Request(object):
     :type headers: dict
     :param params: URL parameters.
     :type params: dict
-    :param data: Request payload.
-    :type data: str | unicode | bool | int | list | dict
+    :param data: Request payload. Strings and bytes are sent as is, anything
+        else is serialized to JSON when the request is sent.
+    :type data: str | unicode | bytes | bool | int | list | dict
     :param command: C8Sh command.
     :type command: str | unicode
-    :param read: Names of collections read during transaction.
-    :type read: str | unicode | [str | unicode]
+    :param read: Names of collections read during transaction, or True for
+        a read whose collections are unknown (e.g. a read-only query).
+    :type read: str | unicode | [str | unicode] | bool
     :param write: Names of collections written to during transaction.
     :type write: str | unicode | [str | unicode]
+    :param compress: Compression of the payload, overriding the compression
+        policy of the connection: False disables it, True or "gzip" or
+        "deflate" compresses the payload whatever its size.
+    :type compress: bool | str | unicode | None
+    :param hedge: Hedging of the request, for idempotent reads only: None
+        applies the hedging policy of the connection, True hedges the request
+        and False (default) never does.
+    :type hedge: bool | None
+    :param origin: Base URL of the region the request must be sent to,
+        bypassing the region router (e.g. the region holding a cursor).
+    :type origin: str | unicode | None
 
     :ivar method: HTTP method in lowercase (e.g. "post").
     :vartype method: str | unicode
@@ -38,14 +51,21 @@ class Request(object):
     :vartype headers: dict
     :ivar params: URL (query) parameters.
     :vartype params: dict
-    :ivar data: Request payload.
-    :vartype data: str | unicode | bool | int | list | dict
+    :ivar data: Request payload as JSON text.
+    :vartype data: str | unicode | None
     :ivar command: C8Sh command.
     :vartype command: str | unicode | None
-    :ivar read: Names of collections read during transaction.
-    :vartype read: str | unicode | [str | unicode] | None
+    :ivar read: Names of collections read during transaction, or True for a
+        read whose collections are unknown.
+    :vartype read: str | unicode | [str | unicode] | bool | None
     :ivar write: Names of collections written to during transaction.
     :vartype write: str | unicode | [str | unicode] | None
+    :ivar compress: Compression of the payload.
+    :vartype compress: bool | str | unicode | None
+    :ivar hedge: Hedging of the request.
+    :vartype hedge: bool | None
+    :ivar origin: Base URL of the region the request is pinned to.
+    :vartype origin: str | unicode | None
     """
 
     __slots__ = (
@@ -53,10 +73,14 @@ class Request(object):
         "endpoint",
         "headers",
         "params",
-        "data",
+        "_payload",
+        "_data",
         "command",
         "read",
         "write",
+        "compress",
+        "hedge",
+        "origin",
     )
 
     def __init__(
@@ -70,6 +94,9 @@ class Request(object):
         command=None,
         read=None,
         write=None,
+        compress=None,
+        hedge=False,
+        origin=None,
     ):
         self.method = method
         self.endpoint = endpoint
@@ -90,18 +117,55 @@ class Request(object):
                     params[key] = int(val)
         self.params = params
 
-        # Normalize the payload.
-        if data is None:
-            self.data = None
-        elif isinstance(data, string_types):
-            self.data = data
-        else:
-            self.data = json.dumps(data)
+        # The payload is serialized when the request is sent, by the codec of
+        # the connection (see the encode method).
+        self._payload = data
+        self._data = None
 
         # Set the transaction metadata.
         self.command = command
         self.read = read
         self.write = write
+        self.compress = compress
+        self.hedge = hedge
+        self.origin = origin
+
+    @property
+    def data(self):
+        """Return the request payload as JSON text.
+
+        :returns: Request payload.
+        :rtype: str | unicode | None
+        """
+        if self._data is None and self._payload is not None:
+            if isinstance(self._payload, string_types):
+                self._data = self._payload
+            elif isinstance(self._payload, bytes):
+                self._data = self._payload.decode("utf-8")
+            else:
+                self._data = json.dumps(self._payload)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._payload = data
+        self._data = None
+
+    def encode(self, codec):
+        """Return the request payload serialized to bytes.
+
+        :param codec: JSON codec used to serialize the payload unless it is
+            already a string or bytes.
+        :type codec: c8.codec.JSONCodec
+        :returns: Request payload.
+        :rtype: bytes | None
+        """
+        payload = self._payload
+        if payload is None or isinstance(payload, bytes):
+            return payload
+        if isinstance(payload, string_types):
+            return payload.encode("utf-8")
+        return codec.encode(payload)
 
     def set_auth_token_in_header(self, auth_tok):
         """Set the Authorization header with the specified JWT auth token.
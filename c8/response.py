@@ -1,9 +1,14 @@
 from __future__ import absolute_import, unicode_literals
 
-import json
+from six import string_types
+
+from c8.codec import default_codec
 
 __all__ = ["Response"]
 
+# Marks a body which has not been deserialized yet.
+_PENDING = object()
+
 
 class Response(object):
     """HTTP response.
@@ -19,7 +24,10 @@ class Response(object):
     :param status_text: Response status text.
     :type status_text: str | unicode
     :param raw_body: Raw response body.
-    :type raw_body: str | unicode
+    :type raw_body: bytes | str | unicode
+    :param codec: JSON codec used to deserialize the body. Defaults to
+        :func:`c8.codec.default_codec`.
+    :type codec: c8.codec.JSONCodec
 
     :ivar method: HTTP method in lowercase (e.g. "post").
     :vartype method: str | unicode
@@ -31,15 +39,18 @@ class Response(object):
     :vartype status_code: int
     :ivar status_text: Response status text.
     :vartype status_text: str | unicode
-    :ivar body: JSON-deserialized response body.
+    :ivar body: JSON-deserialized response body. Deserialized on first
+        access.
     :vartype body: str | unicode | bool | int | list | dict
-    :ivar raw_body: Raw response body.
+    :ivar raw_body: Raw response body as text.
     :vartype raw_body: str | unicode
     :ivar error_code: Error code from C8Db server.
     :vartype error_code: int
     :ivar error_message: Error message from C8Db server.
     :vartype error_message: str | unicode
-    :ivar is_success: True if response status code was 2XX.
+    :ivar is_success: True if response status code was 2XX and the body
+        holds no error code. Checking it does not deserialize bodies without
+        an "errorNum" field.
     :vartype is_success: bool
     """
 
@@ -49,34 +60,96 @@ class Response(object):
         "headers",
         "status_code",
         "status_text",
-        "body",
-        "raw_body",
-        "error_code",
-        "error_message",
-        "is_success",
+        "_raw_body",
+        "_codec",
+        "_body",
+        "_is_success",
     )
 
-    def __init__(self, method, url, headers, status_code, status_text, raw_body):
+    def __init__(
+        self, method, url, headers, status_code, status_text, raw_body, codec=None
+    ):
         self.method = method.lower()
         self.url = url
         self.headers = headers
         self.status_code = status_code
         self.status_text = status_text
+        self._codec = codec
         self.raw_body = raw_body
 
-        # De-serialize the response body.
-        try:
-            self.body = json.loads(raw_body)
-        except (ValueError, TypeError):
-            self.body = raw_body
+    @property
+    def raw_body(self):
+        """Return the raw response body as text.
+
+        :returns: Raw response body.
+        :rtype: str | unicode
+        """
+        if isinstance(self._raw_body, (bytes, bytearray)):
+            self._raw_body = self._raw_body.decode("utf-8", "replace")
+        return self._raw_body
 
-        # Extract error code and message.
-        if isinstance(self.body, dict):
-            self.error_code = self.body.get("errorNum")
-            self.error_message = self.body.get("errorMessage")
+    @raw_body.setter
+    def raw_body(self, raw_body):
+        self._raw_body = raw_body
+        self._is_success = None
+        if isinstance(raw_body, (bytes, bytearray) + string_types):
+            self._body = _PENDING
         else:
-            self.error_code = None
-            self.error_message = None
+            self._body = raw_body
+
+    @property
+    def body(self):
+        """Return the JSON-deserialized response body.
+
+        :returns: Response body, or the raw body if it is not valid JSON.
+        :rtype: str | unicode | bool | int | list | dict
+        """
+        if self._body is _PENDING:
+            try:
+                self._body = (self._codec or default_codec()).decode(self._raw_body)
+            except (ValueError, TypeError):
+                self._body = self.raw_body
+        return self._body
+
+    @property
+    def error_code(self):
+        """Return the error code from C8Db server.
+
+        :returns: Error code, or None if the body holds no error.
+        :rtype: int | None
+        """
+        body = self.body
+        return body.get("errorNum") if isinstance(body, dict) else None
+
+    @property
+    def error_message(self):
+        """Return the error message from C8Db server.
+
+        :returns: Error message, or None if the body holds no error.
+        :rtype: str | unicode | None
+        """
+        body = self.body
+        return body.get("errorMessage") if isinstance(body, dict) else None
+
+    @property
+    def is_success(self):
+        """Return True if the request succeeded.
+
+        :returns: True if status code was 2XX and the body holds no error code.
+        :rtype: bool
+        """
+        if self._is_success is None:
+            if not 200 <= self.status_code < 300:
+                self._is_success = False
+            elif self._body is _PENDING and not self._may_hold_error():
+                self._is_success = True
+            else:
+                self._is_success = self.error_code is None
+        return self._is_success
 
-        http_ok = 200 <= status_code < 300
-        self.is_success = http_ok and self.error_code is None
+    def _may_hold_error(self):
+        # Cheap scan which rules out most bodies without deserializing them.
+        raw_body = self._raw_body
+        if isinstance(raw_body, string_types):
+            return '"errorNum"' in raw_body
+        return b'"errorNum"' in raw_body
@@ -0,0 +1,374 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from six.moves.urllib.parse import urlsplit
+
+from c8.exceptions import ServerConnectionError
+
+__all__ = ["RetryPolicy", "CircuitBreaker", "NoRetryPolicy"]
+
+
+class CircuitBreaker(object):
+    """Per-host circuit breaker.
+
+    After **failure_threshold** consecutive failures (connection errors or
+    responses with a status code in **failure_statuses**) of a host, its
+    circuit opens and requests to it fail fast for **reset_timeout** seconds.
+    A single trial request is then let through: the circuit closes if it
+    succeeds and opens again otherwise. Other responses, including
+    application errors such as 500, show that the host is up and close the
+    circuit.
+
+    :param failure_threshold: Number of consecutive failures opening the
+        circuit.
+    :type failure_threshold: int
+    :param reset_timeout: Seconds the circuit stays open.
+    :type reset_timeout: int | float
+    :param failure_statuses: Status codes of a host failing to serve
+        requests.
+    :type failure_statuses: collections.abc.Iterable[int]
+    """
+
+    def __init__(
+        self, failure_threshold=5, reset_timeout=30, failure_statuses=(502, 503, 504)
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failure_statuses = frozenset(failure_statuses)
+        self._lock = threading.Lock()
+        # Host -> [consecutive failures, time the circuit opened or None]
+        self._hosts = {}
+
+    def __repr__(self):
+        return "<CircuitBreaker>"
+
+    def allow(self, host):
+        """Return True if a request to the host may be sent.
+
+        :param host: Host (and port) of the request URL.
+        :type host: str | unicode
+        :returns: False if the circuit of the host is open.
+        :rtype: bool
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state[1] is None:
+                return True
+            now = time.monotonic()
+            if now - state[1] < self._reset_timeout:
+                return False
+            # Let a single trial request through, and keep the others out
+            # until it completes (or for another timeout if it never does).
+            state[1] = now
+            return True
+
+    def failed(self, status):
+        """Return True if a response status code is a failure of the host.
+
+        :param status: HTTP status code.
+        :type status: int
+        :returns: True if the status code is in the failure statuses.
+        :rtype: bool
+        """
+        return status in self._failure_statuses
+
+    def record_success(self, host):
+        """Record a successful request to the host, closing its circuit.
+
+        :param host: Host (and port) of the request URL.
+        :type host: str | unicode
+        """
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host):
+        """Record a failed request to the host.
+
+        :param host: Host (and port) of the request URL.
+        :type host: str | unicode
+        """
+        with self._lock:
+            state = self._hosts.setdefault(host, [0, None])
+            state[0] += 1
+            if state[0] >= self._failure_threshold:
+                state[1] = time.monotonic()
+
+    def state(self, host):
+        """Return the state of the circuit of a host.
+
+        :param host: Host (and port) of the request URL.
+        :type host: str | unicode
+        :returns: "closed", "open" or "half-open" (a trial request may be
+            sent).
+        :rtype: str | unicode
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state[1] is None:
+                return "closed"
+            if time.monotonic() - state[1] < self._reset_timeout:
+                return "open"
+            return "half-open"
+
+
+class RetryPolicy(object):
+    """Retry policy of HTTP requests.
+
+    Failed attempts are retried with exponential backoff and full jitter
+    until **max_attempts** is reached or the next attempt would start after
+    the **deadline**. Only requests which are safe to repeat are retried:
+
+    * Connection errors, if the method is in **retry_methods** or the
+      connection failed before the request was sent.
+    * Responses with a status code in **retry_statuses**, if the method is in
+      **retry_methods**. 429 and 503 responses are retried for any method, as
+      the server did not process the request. The Retry-After header of the
+      response, if any, takes precedence over the backoff delay. Without a
+      **deadline**, it is capped to **backoff_max**.
+
+    :param max_attempts: Max number of attempts per request, including the
+        first one.
+    :type max_attempts: int
+    :param backoff_base: Backoff delay before the first retry in seconds. It
+        doubles with each retry.
+    :type backoff_base: int | float
+    :param backoff_max: Max backoff delay in seconds.
+    :type backoff_max: int | float
+    :param jitter: If set to True, each delay is drawn uniformly between 0 and
+        the backoff delay, so that clients failing together do not retry
+        together.
+    :type jitter: bool
+    :param deadline: Max seconds spent on a request, including retries. None
+        means no deadline.
+    :type deadline: int | float | None
+    :param retry_methods: HTTP methods (in lowercase) which are safe to
+        repeat. Cursor fetches (PUT) and writes are excluded by default.
+    :type retry_methods: collections.abc.Iterable[str | unicode]
+    :param retry_statuses: Status codes which are retried.
+    :type retry_statuses: collections.abc.Iterable[int]
+    :param breaker: Circuit breaker shared by the requests using the policy.
+        A breaker with the default settings is created if not set. False
+        disables it.
+    :type breaker: c8.retry.CircuitBreaker | bool
+    """
+
+    # Status codes the server returns before processing the request.
+    UNPROCESSED_STATUSES = frozenset([429, 503])
+
+    def __init__(
+        self,
+        max_attempts=5,
+        backoff_base=0.1,
+        backoff_max=10,
+        jitter=True,
+        deadline=60,
+        retry_methods=("get", "head", "options"),
+        retry_statuses=(429, 502, 503, 504),
+        breaker=None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be a positive int")
+        self._max_attempts = max_attempts
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._jitter = jitter
+        self._deadline = deadline
+        self._retry_methods = frozenset(m.lower() for m in retry_methods)
+        self._retry_statuses = frozenset(retry_statuses)
+        if breaker is None:
+            breaker = CircuitBreaker()
+        self._breaker = breaker or None
+
+    def __repr__(self):
+        return "<RetryPolicy {}>".format(self._max_attempts)
+
+    @property
+    def breaker(self):
+        """Return the circuit breaker.
+
+        :returns: Circuit breaker, or None if disabled.
+        :rtype: c8.retry.CircuitBreaker | None
+        """
+        return self._breaker
+
+    def backoff(self, attempt):
+        """Return the delay before a retry.
+
+        :param attempt: Number of attempts made so far.
+        :type attempt: int
+        :returns: Delay in seconds.
+        :rtype: float
+        """
+        delay = min(self._backoff_max, self._backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self._jitter else delay
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After") if response.headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _plan(self, method):
+        return _Attempts(self, method.lower())
+
+    def execute(self, method, url, send, route=None):
+        """Send a request, retrying it according to the policy.
+
+        :param method: HTTP method in lowercase (e.g. "post").
+        :type method: str | unicode
+        :param url: Request URL.
+        :type url: str | unicode
+        :param send: Callable sending the request and returning the response.
+        :type send: callable
+        :param route: Callable returning the URL of each attempt (e.g. on the
+            region it is routed to), which **send** is then called with. The
+            circuit breaker is checked and updated for the host of each
+            attempt.
+        :type route: callable
+        :returns: HTTP response of the last attempt.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If the circuit of the host
+            is open, or the last attempt failed to connect.
+        """
+        attempts = self._plan(method)
+        while True:
+            target = url if route is None else route()
+            attempts.start(urlsplit(target).netloc)
+            try:
+                response = send() if route is None else send(target)
+            except ServerConnectionError as err:
+                delay = attempts.failed(err)
+            else:
+                delay = attempts.completed(response)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+
+    async def execute_async(self, method, url, send, route=None):
+        """Send a request without blocking the event loop, retrying it
+        according to the policy.
+
+        :param method: HTTP method in lowercase (e.g. "post").
+        :type method: str | unicode
+        :param url: Request URL.
+        :type url: str | unicode
+        :param send: Coroutine function sending the request and returning the
+            response.
+        :type send: callable
+        :param route: Callable returning the URL of each attempt, which
+            **send** is then called with.
+        :type route: callable
+        :returns: HTTP response of the last attempt.
+        :rtype: c8.response.Response
+        :raise c8.exceptions.ServerConnectionError: If the circuit of the host
+            is open, or the last attempt failed to connect.
+        """
+        attempts = self._plan(method)
+        while True:
+            target = url if route is None else route()
+            attempts.start(urlsplit(target).netloc)
+            try:
+                response = await (send() if route is None else send(target))
+            except ServerConnectionError as err:
+                delay = attempts.failed(err)
+            else:
+                delay = attempts.completed(response)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+
+
+class NoRetryPolicy(RetryPolicy):
+    """Retry policy which sends each request exactly once."""
+
+    def __init__(self):
+        super(NoRetryPolicy, self).__init__(max_attempts=1, breaker=False)
+
+
+class _Attempts(object):
+    """Attempts of a single request under a retry policy."""
+
+    def __init__(self, policy, method):
+        self._policy = policy
+        self._method = method
+        self._host = None
+        self._count = 0
+        self._started = time.monotonic()
+
+    def start(self, host):
+        self._host = host
+        breaker = self._policy._breaker
+        if breaker is not None and not breaker.allow(self._host):
+            raise ServerConnectionError(
+                "circuit breaker open for host {}".format(self._host),
+                request_sent=False,
+            )
+        self._count += 1
+
+    def _delay(self, delay):
+        """Return the delay before the next attempt, or None to give up."""
+        policy = self._policy
+        if self._count >= policy._max_attempts:
+            return None
+        if delay is None:
+            delay = policy.backoff(self._count)
+        if policy._deadline is not None:
+            if time.monotonic() - self._started + delay > policy._deadline:
+                return None
+        return delay
+
+    def failed(self, error):
+        """Return the delay before retrying a connection error.
+
+        :raise c8.exceptions.ServerConnectionError: If the request is not
+            retried.
+        """
+        breaker = self._policy._breaker
+        if breaker is not None:
+            breaker.record_failure(self._host)
+        delay = None
+        if self._method in self._policy._retry_methods or not error.request_sent:
+            delay = self._delay(None)
+        if delay is None:
+            if self._count > 1:
+                error.message = "{} (after {} attempts)".format(
+                    error.message, self._count
+                )
+                error.args = (error.message,)
+            raise error
+        return delay
+
+    def completed(self, response):
+        """Return the delay before retrying a response, or None to return it."""
+        policy = self._policy
+        status = response.status_code
+        breaker = policy._breaker
+        if breaker is not None:
+            if breaker.failed(status):
+                breaker.record_failure(self._host)
+            else:
+                breaker.record_success(self._host)
+
+        if status not in policy._retry_statuses:
+            return None
+        if (
+            self._method not in policy._retry_methods
+            and status not in policy.UNPROCESSED_STATUSES
+        ):
+            return None
+        delay = policy._retry_after(response)
+        if delay is not None and policy._deadline is None:
+            delay = min(delay, policy._backoff_max)
+        return self._delay(delay)
@@ -0,0 +1,427 @@
+from __future__ import absolute_import, unicode_literals
+
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from six.moves.urllib.parse import urlsplit
+
+from c8.exceptions import C8Error
+from c8.fabric import StandardFabric
+from c8.retry import NoRetryPolicy
+
+__all__ = ["RegionRouter"]
+
+
+class _Region(object):
+    """Regional endpoint and its health."""
+
+    def __init__(self, name, url, info):
+        self.name = name
+        self.url = url
+        self.info = info
+        self.connection = None
+        self.latency = None
+        self.probe_ok = True
+        self.failures = 0
+        self.failed_at = None
+        self.requests = 0
+        self.errors = 0
+
+
+def _region_url(base_url, info):
+    """Return the base URL of a region, with the scheme and port of the
+    configured endpoint."""
+    tags = info.get("tags") or {}
+    host = tags.get("api")
+    if not host:
+        host = tags.get("url") or (info.get("locationInfo") or {}).get("url")
+        if not host:
+            return None
+        host = "api-" + host
+    base = urlsplit(base_url)
+    if base.port is not None:
+        host = "{}:{}".format(host, base.port)
+    return "{}://{}".format(base.scheme, host)
+
+
+class RegionRouter(object):
+    """Routing of requests across the regions of a geo-fabric.
+
+    The regions of the fabric are discovered from its datacenter list, and
+    their latency is measured by pinging them. Reads (requests whose method is
+    in **read_methods**, or marked as reads by the connection, e.g. read-only
+    queries and Redis reads sent as POST) go to the healthy region with the
+    lowest latency. The fetches of a cursor go to the region which created
+    it, whatever its health, since the cursor only exists there.
+    Writes go to the **write_region**, or to the configured endpoint if not
+    set, and fail over to the nearest healthy region when it is unhealthy.
+
+    A region becomes unhealthy when its last probe failed, when its probe
+    latency exceeds **max_latency**, or after **failure_threshold**
+    consecutive requests to it failed to connect or got a 502, 503 or 504
+    response. In the first two cases, it becomes healthy again at its next
+    successful probe. In the last one, a successful probe is not enough (the
+    region may answer pings while failing requests): requests are sent to it
+    again **recovery_timeout** seconds after its last failure, and it becomes
+    healthy again once one of them succeeds. Requests are sent to the
+    configured endpoint until the regions are discovered, and when no region
+    is healthy.
+
+    Probes refresh every **probe_interval** seconds in a background thread,
+    started by :func:`start`. The router is thread-safe and shared by all the
+    connections of a client.
+
+    :param write_region: Name of the region writes go to, e.g. "gdn-us-west".
+        Not set means the configured endpoint.
+    :type write_region: str | unicode | None
+    :param probe_interval: Seconds between two probes of the regions. 0 or
+        None disables background probing, see :func:`refresh`.
+    :type probe_interval: int | float | None
+    :param failure_threshold: Number of consecutive failed requests making a
+        region unhealthy.
+    :type failure_threshold: int
+    :param recovery_timeout: Seconds after which requests are sent again to
+        a region made unhealthy by failed requests.
+    :type recovery_timeout: int | float
+    :param max_latency: Probe latency in seconds above which a region is
+        degraded and unhealthy. Not set means no limit.
+    :type max_latency: int | float | None
+    :param smoothing: Weight of the last probe in the latency of a region,
+        between 0 (exclusive) and 1 (only the last probe counts).
+    :type smoothing: float
+    :param read_methods: HTTP methods (in lowercase) routed as reads.
+    :type read_methods: collections.abc.Iterable[str | unicode]
+    """
+
+    # Statuses of a region failing to serve requests.
+    FAILURE_STATUSES = frozenset([502, 503, 504])
+
+    def __init__(
+        self,
+        write_region=None,
+        probe_interval=30,
+        failure_threshold=3,
+        recovery_timeout=30,
+        max_latency=None,
+        smoothing=0.3,
+        read_methods=("get", "head"),
+    ):
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        self._write_region = write_region
+        self._probe_interval = probe_interval
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._max_latency = max_latency
+        self._smoothing = smoothing
+        self._read_methods = frozenset(m.lower() for m in read_methods)
+        self._lock = threading.Lock()
+        self._fabric = None
+        self._home = None
+        # Region name -> region, in discovery order.
+        self._regions = {}
+        self._failovers = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __repr__(self):
+        return "<RegionRouter {}>".format(",".join(self._regions) or "undiscovered")
+
+    @property
+    def write_region(self):
+        """Return the name of the region writes go to.
+
+        :returns: Region name, or None for the configured endpoint.
+        :rtype: str | unicode | None
+        """
+        return self._write_region
+
+    def discover(self, fabric):
+        """Discover the regions of a fabric.
+
+        Known regions keep their latency and health.
+
+        :param fabric: Fabric whose regions requests are routed to.
+        :type fabric: c8.fabric.StandardFabric
+        :returns: Names of the regions.
+        :rtype: [str | unicode]
+        :raise c8.exceptions.GetDcListError: If retrieval fails.
+        :raise c8.exceptions.GetDcDetailError: If retrieval fails.
+        """
+        home = fabric._conn.url
+        names = [name.strip() for name in fabric.dclist() if name.strip()]
+        details = {info.get("name"): info for info in fabric.dclist_all()}
+
+        regions = {}
+        for name in names:
+            info = details.get(name)
+            if info is None:
+                info = fabric.get_dc_detail(name)
+            url = _region_url(home, info)
+            if url is None:
+                continue
+            region = self._regions.get(name)
+            if region is None or region.url != url:
+                region = _Region(name, url, info)
+                region.connection = self._region_connection(fabric._conn, url)
+            region.info = info
+            regions[name] = region
+
+        with self._lock:
+            self._fabric = fabric
+            self._home = home
+            self._regions = regions
+        return list(regions)
+
+    def _region_connection(self, connection, url):
+        """Return a copy of a connection sending requests to a region.
+
+        Probes are not routed nor retried.
+        """
+        conn = copy.copy(connection)
+        path = connection._url_prefix.replace(connection.url, "", 1)
+        conn._url_prefix = url + path
+        conn.url = url
+        conn._router = None
+        conn._retry_policy = NoRetryPolicy()
+        return conn
+
+    def _probe(self, region):
+        started = time.monotonic()
+        try:
+            StandardFabric(region.connection).ping()
+        except C8Error:
+            return None
+        return time.monotonic() - started
+
+    def refresh(self):
+        """Probe the latency of the regions.
+
+        :returns: Latency in seconds of each region, None for the regions
+            which failed to respond.
+        :rtype: dict
+        """
+        regions = list(self._regions.values())
+        if not regions:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+            latencies = list(pool.map(self._probe, regions))
+
+        with self._lock:
+            for region, latency in zip(regions, latencies):
+                region.probe_ok = latency is not None
+                if latency is None:
+                    continue
+                if region.latency is None:
+                    region.latency = latency
+                else:
+                    region.latency += self._smoothing * (latency - region.latency)
+        return {region.name: latency for region, latency in zip(regions, latencies)}
+
+    def _run(self):
+        while not self._stop.wait(self._probe_interval):
+            try:
+                self.refresh()
+            except Exception:  # pragma: no cover
+                # Probing must never stop; failures show as unhealthy regions.
+                pass
+
+    def start(self, fabric=None):
+        """Discover and probe the regions, and start probing them in the
+        background.
+
+        :param fabric: Fabric whose regions requests are routed to. Not set
+            means the fabric of the last discovery.
+        :type fabric: c8.fabric.StandardFabric
+        :returns: The router.
+        :rtype: c8.routing.RegionRouter
+        """
+        fabric = fabric or self._fabric
+        if fabric is not None:
+            self.discover(fabric)
+        self.refresh()
+        if self._probe_interval and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="c8-region-probe")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop probing the regions in the background."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _healthy(self, region):
+        if not region.probe_ok:
+            return False
+        if region.failures >= self._failure_threshold:
+            if time.monotonic() - region.failed_at < self._recovery_timeout:
+                return False
+        if self._max_latency is not None and region.latency is not None:
+            return region.latency <= self._max_latency
+        return True
+
+    def _home_region(self):
+        return next((r for r in self._regions.values() if r.url == self._home), None)
+
+    def _nearest(self, exclude=None):
+        best = None
+        for region in self._regions.values():
+            if region is exclude or region.latency is None:
+                continue
+            if not self._healthy(region):
+                continue
+            if best is None or region.latency < best.latency:
+                best = region
+        return best
+
+    def select(self, method, read=False):
+        """Return the region a request goes to.
+
+        :param method: HTTP method in lowercase (e.g. "get").
+        :type method: str | unicode
+        :param read: Route the request as a read whatever its method.
+        :type read: bool
+        :returns: Region name, or None for the configured endpoint.
+        :rtype: str | unicode | None
+        """
+        region = self._select(method, read=read)
+        return region.name if region is not None else None
+
+    def _select(self, method, hedge=False, read=False):
+        with self._lock:
+            if read or method.lower() in self._read_methods:
+                region = self._nearest()
+            else:
+                if self._write_region is not None:
+                    region = self._regions.get(self._write_region)
+                else:
+                    region = self._home_region()
+                if region is not None and not self._healthy(region):
+                    if not hedge:
+                        self._failovers += 1
+                    region = self._nearest()
+            if not hedge:
+                return region
+            # Hedges go to the nearest region the request did not go to.
+            return self._nearest(exclude=region or self._home_region())
+
+    def route(self, method, url, hedge=False, read=False, origin=None):
+        """Return the URL a request is sent to.
+
+        :param method: HTTP method in lowercase (e.g. "get").
+        :type method: str | unicode
+        :param url: Request URL on the configured endpoint.
+        :type url: str | unicode
+        :param hedge: If set to True, return the URL of a hedge of the
+            request, on the nearest other healthy region.
+        :type hedge: bool
+        :param read: Route the request as a read whatever its method.
+        :type read: bool
+        :param origin: Base URL the request is pinned to (see
+            :func:`origin`), whatever the health of its region.
+        :type origin: str | unicode | None
+        :returns: Request URL, unchanged if it goes to the configured
+            endpoint.
+        :rtype: str | unicode
+        """
+        home = self._home
+        if home is None or not url.startswith(home):
+            return url
+        if origin is not None:
+            return origin + url.replace(home, "", 1)
+        region = self._select(method, hedge, read)
+        if region is None:
+            return url
+        return region.url + url.replace(home, "", 1)
+
+    def origin(self, url):
+        """Return the base URL of the region a request was sent to, so that
+        the requests depending on it (e.g. the fetches of a cursor) are
+        pinned to the same region.
+
+        :param url: Request URL.
+        :type url: str | unicode
+        :returns: Base URL of the region or of the configured endpoint, or
+            None if the URL is on neither.
+        :rtype: str | unicode | None
+        """
+        with self._lock:
+            region = self._region_of(url)
+        if region is not None:
+            return region.url
+        home = self._home
+        if home is not None and (url == home or url.startswith(home + "/")):
+            return home
+        return None
+
+    def _region_of(self, url):
+        for region in self._regions.values():
+            if url == region.url or url.startswith(region.url + "/"):
+                return region
+        return None
+
+    def record(self, url, response=None):
+        """Record the outcome of a request sent to a region.
+
+        :param url: Request URL.
+        :type url: str | unicode
+        :param response: HTTP response, or None if the connection failed.
+        :type response: c8.response.Response | None
+        """
+        with self._lock:
+            region = self._region_of(url)
+            if region is None:
+                return
+            region.requests += 1
+            if response is None or response.status_code in self.FAILURE_STATUSES:
+                region.errors += 1
+                region.failures += 1
+                region.failed_at = time.monotonic()
+            else:
+                region.failures = 0
+
+    def regions(self):
+        """Return the regions and their health.
+
+        :returns: Regions sorted by latency (unprobed regions last), each
+            with its name, base URL, latency in seconds, health, number of
+            requests routed to it and number of failed ones.
+        :rtype: [dict]
+        """
+        with self._lock:
+            regions = [
+                {
+                    "name": region.name,
+                    "url": region.url,
+                    "latency": region.latency,
+                    "healthy": self._healthy(region),
+                    "requests": region.requests,
+                    "errors": region.errors,
+                }
+                for region in self._regions.values()
+            ]
+        return sorted(regions, key=lambda r: (r["latency"] is None, r["latency"] or 0))
+
+    def stats(self):
+        """Return the routing statistics.
+
+        :returns: Number of regions, healthy regions, requests routed to a
+            region, and writes failed over from an unhealthy write region.
+        :rtype: dict
+        """
+        regions = self.regions()
+        with self._lock:
+            failovers = self._failovers
+        return {
+            "regions": len(regions),
+            "healthy": sum(region["healthy"] for region in regions),
+            "requests": sum(region["requests"] for region in regions),
+            "failovers": failovers,
+        }
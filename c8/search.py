@@ -132,11 +132,28 @@ class Search(APIWrapper):
         def response_handler(resp):
             if not resp.is_success:
                 raise ViewGetError(resp, request)
+            self._conn.metadata_cache.update(
+                self.fabric_name,
+                "views",
+                [view["name"] for view in resp.body["result"]],
+            )
             return resp.body["result"]
 
         # execute request
         return self._execute(request, response_handler)
 
+    def has_view(self, name):
+        """Check if a view exists
+
+        :param name: The name of the view
+        :type name: str | unicode
+        :return: True if the view exists, False otherwise
+        :rtype: bool
+        """
+        if self._conn.metadata_cache.contains(self.fabric_name, "views", name):
+            return True
+        return any(view["name"] == name for view in self.list_all_views())
+
     def create_view(self, name, links={}, primary_sort=[]):
         """Creates a new view with a given name and properties if it does not
         already exist.
@@ -171,6 +188,7 @@ class Search(APIWrapper):
                 raise ViewCreateViewNameMissingError(resp, request)
             if resp.status_code == 404:
                 raise ViewCreateViewNameUnknownError(resp, request)
+            self._conn.metadata_cache.add(self.fabric_name, "views", name)
             return resp.body
 
         # execute request
@@ -223,6 +241,8 @@ class Search(APIWrapper):
                 raise ViewCreateViewNameMissingError(resp, request)
             if resp.status_code == 400:
                 raise ViewCreateViewNameUnknownError(resp, request)
+            self._conn.metadata_cache.discard(self.fabric_name, "views", old_name)
+            self._conn.metadata_cache.add(self.fabric_name, "views", new_name)
             return True
 
         # execute request
@@ -249,6 +269,7 @@ class Search(APIWrapper):
                 raise ViewCreateViewNameMissingError(resp, request)
             if resp.status_code == 400:
                 raise ViewCreateViewNameUnknownError(resp, request)
+            self._conn.metadata_cache.discard(self.fabric_name, "views", view)
             return True
 
         # execute request
@@ -11,14 +11,22 @@ import websocket
 from c8 import constants
 from c8 import exceptions as ex
 from c8.api import APIWrapper
+from c8.consumer_group import ConsumerGroup
 from c8.request import Request
+from c8.stream_consumer import AsyncConsumer
+from c8.stream_pool import StreamConnectionPool
+from c8.stream_producer import BatchProducer
 
 __all__ = ["StreamCollection"]
 
 
 class Base64Socket(websocket.WebSocket):
     def send(self, payload, **kwargs):
-        b64payload = {"payload": base64.b64encode(six.b(payload)).decode("utf-8")}
+        # Bytes-like payloads (bytes, bytearray, memoryview) are encoded as
+        # is, text is encoded to UTF-8 first.
+        if isinstance(payload, six.string_types):
+            payload = payload.encode("utf-8")
+        b64payload = {"payload": base64.b64encode(payload).decode("ascii")}
         return super().send(json.dumps(b64payload), **kwargs)
 
 
@@ -61,7 +69,13 @@ class StreamCollection(APIWrapper):
         url = urlparse(url)
         self.header = connection.headers
         self.fabric = fabric
-        dcl_local = self.fabric.localdc(detail=True)
+        # The local data center rarely changes, so it is looked up once per
+        # connection rather than each time a stream wrapper is created.
+        cache = connection.metadata_cache
+        dcl_local = cache.get_value(None, "localdc")
+        if dcl_local is None:
+            dcl_local = self.fabric.localdc(detail=True)
+            cache.set_value(None, "localdc", dcl_local)
         ws_url = "wss://api-%s/_ws/ws/v2/"
         self._ws_url = ws_url % (dcl_local["tags"]["url"])
 
@@ -123,6 +137,41 @@ class StreamCollection(APIWrapper):
                                   other option is
                                   `PartitionsRoutingMode.UseSinglePartition`
         """
+        url = self._producer_url(
+            stream,
+            isCollectionStream,
+            local,
+            producer_name,
+            initial_sequence_id,
+            send_timeout_millis,
+            compression_type,
+            max_pending_messages,
+            batching_enabled,
+            batching_max_messages,
+            batching_max_publish_delay_ms,
+            message_routing_mode,
+        )
+        return websocket.create_connection(
+            url,
+            header={"Authorization": self.header["Authorization"]},
+            class_=Base64Socket,
+        )
+
+    def _producer_url(
+        self,
+        stream,
+        isCollectionStream=False,
+        local=False,
+        producer_name=None,
+        initial_sequence_id=None,
+        send_timeout_millis=30000,
+        compression_type=COMPRESSION_TYPES.NONE,
+        max_pending_messages=1000,
+        batching_enabled=False,
+        batching_max_messages=1000,
+        batching_max_publish_delay_ms=10,
+        message_routing_mode=ROUTING_MODE.ROUND_ROBIN_PARTITION,
+    ):
         if isCollectionStream is False:
             if local is True:
                 type_constant = constants.STREAM_LOCAL_NS_PREFIX
@@ -156,12 +205,7 @@ class StreamCollection(APIWrapper):
             }
 
             params = {k: v for k, v in params.items() if v is not None}
-            url = self._ws_url + topic + "?" + urlencode(params)
-            return websocket.create_connection(
-                url,
-                header={"Authorization": self.header["Authorization"]},
-                class_=Base64Socket,
-            )
+            return self._ws_url + topic + "?" + urlencode(params)
 
         raise ex.StreamProducerError(
             "No stream present with name:"
@@ -169,6 +213,74 @@ class StreamCollection(APIWrapper):
             + ". Please create a stream and then stream producer"
         )
 
+    def create_batch_producer(
+        self,
+        stream,
+        isCollectionStream=False,
+        local=False,
+        producer_name=None,
+        send_timeout_millis=30000,
+        compression_type=COMPRESSION_TYPES.NONE,
+        max_pending_messages=1000,
+        message_routing_mode=ROUTING_MODE.ROUND_ROBIN_PARTITION,
+        batch_max_messages=1000,
+        batch_max_bytes=1024 * 1024,
+        linger_ms=5,
+        block_if_queue_full=True,
+        serializer=None,
+        compression=None,
+    ):
+        """Create a producer buffering messages client side.
+
+        Messages are written to the websocket in batches and acknowledged
+        through futures, see :class:`c8.stream_producer.BatchProducer`.
+
+        **Args**
+
+        * `stream`: The stream name
+
+        **Options**
+
+        * `local`: If the stream_stream is local or global default its global
+        * `producer_name`: Specify a name for the producer.
+        * `send_timeout_millis`: Time after which a message which is not
+                                 acknowledged fails.
+        * `compression_type`: Set the compression type for the producer.
+        * `max_pending_messages`: Max number of messages buffered or awaiting
+                                  their acknowledgment.
+        * `message_routing_mode`: Set the message routing mode for the
+                                  partitioned producer.
+        * `batch_max_messages`: Max number of messages per write.
+        * `batch_max_bytes`: Max number of encoded bytes per write.
+        * `linger_ms`: Max time in milliseconds a message is buffered.
+        * `block_if_queue_full`: Set whether `send` should block when the max
+                                 number of pending messages is reached.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        * `compression`: Payload compression, "zlib" or "lz4".
+        """
+        socket = self.create_producer(
+            stream,
+            isCollectionStream=isCollectionStream,
+            local=local,
+            producer_name=producer_name,
+            send_timeout_millis=send_timeout_millis,
+            compression_type=compression_type,
+            max_pending_messages=max_pending_messages,
+            message_routing_mode=message_routing_mode,
+        )
+        return BatchProducer(
+            socket,
+            batch_max_messages=batch_max_messages,
+            batch_max_bytes=batch_max_bytes,
+            linger_ms=linger_ms,
+            max_pending_messages=max_pending_messages,
+            block_if_queue_full=block_if_queue_full,
+            serializer=serializer,
+            compression=compression,
+            send_timeout_ms=send_timeout_millis,
+        )
+
     def create_reader(
         self,
         stream,
@@ -197,6 +309,27 @@ class StreamCollection(APIWrapper):
             higher memory utilization.
         * `reader_name`: Sets the reader name.
         """
+        url = self._reader_url(
+            stream,
+            start_message_id,
+            local,
+            isCollectionStream,
+            receiver_queue_size,
+            reader_name,
+        )
+        return websocket.create_connection(
+            url, header={"Authorization": self.header["Authorization"]}
+        )
+
+    def _reader_url(
+        self,
+        stream,
+        start_message_id="latest",
+        local=False,
+        isCollectionStream=False,
+        receiver_queue_size=1000,
+        reader_name=None,
+    ):
         if isCollectionStream is False:
             if local is True:
                 type_constant = constants.STREAM_LOCAL_NS_PREFIX
@@ -219,11 +352,7 @@ class StreamCollection(APIWrapper):
             }
 
             params = {k: v for k, v in params.items() if v is not None}
-            url = self._ws_url + topic + "?" + urlencode(params)
-
-            return websocket.create_connection(
-                url, header={"Authorization": self.header["Authorization"]}
-            )
+            return self._ws_url + topic + "?" + urlencode(params)
 
         raise ex.StreamSubscriberError(
             "No stream present with name:"
@@ -289,6 +418,29 @@ class StreamCollection(APIWrapper):
             Sets the time duration for which the broker-side consumer stats
             will be cached in the client.
         """
+        url = self._consumer_url(
+            stream,
+            isCollectionStream,
+            local,
+            subscription_name,
+            consumer_type,
+            receiver_queue_size,
+            consumer_name,
+        )
+        return websocket.create_connection(
+            url, header={"Authorization": self.header["Authorization"]}
+        )
+
+    def _consumer_url(
+        self,
+        stream,
+        isCollectionStream=False,
+        local=False,
+        subscription_name=None,
+        consumer_type=CONSUMER_TYPES.EXCLUSIVE,
+        receiver_queue_size=1000,
+        consumer_name=None,
+    ):
         if local is True:
             type_constant = constants.STREAM_LOCAL_NS_PREFIX
         elif local is False:
@@ -327,10 +479,7 @@ class StreamCollection(APIWrapper):
             }
 
             params = {k: v for k, v in params.items() if v is not None}
-            url = self._ws_url + topic + "?" + urlencode(params)
-            return websocket.create_connection(
-                url, header={"Authorization": self.header["Authorization"]}
-            )
+            return self._ws_url + topic + "?" + urlencode(params)
 
         raise ex.StreamSubscriberError(
             "No stream present with name:"
@@ -338,6 +487,184 @@ class StreamCollection(APIWrapper):
             + ". Please create a stream and then stream subscriber."
         )
 
+    def asyncio_subscribe(
+        self,
+        stream,
+        isCollectionStream=False,
+        local=False,
+        subscription_name=None,
+        consumer_type=CONSUMER_TYPES.EXCLUSIVE,
+        receiver_queue_size=1000,
+        consumer_name=None,
+        ack_batch_size=100,
+        ack_interval_ms=50,
+        serializer=None,
+    ):
+        """Subscribe to the given topic and subscription combination, for use
+        with asyncio.
+
+        The websocket is opened by the returned consumer when it is first
+        used, see :class:`c8.stream_consumer.AsyncConsumer`. Requires the
+        `aiohttp` package.
+
+        **Args**
+
+        * `stream`: The name of the stream.
+
+        **Options**
+
+        * `local`: If the stream_stream is local or global default its global
+        * `subscription_name`: The name of the subscription.
+        * `consumer_type`: Select the subscription type to be used when
+                           subscribing to the topic.
+        * `receiver_queue_size`: Sets the size of the consumer receive queue.
+        * `consumer_name`: Sets the consumer name.
+        * `ack_batch_size`: Number of queued acknowledgements triggering a
+                            write.
+        * `ack_interval_ms`: Max time in milliseconds an acknowledgement is
+                             queued.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        """
+        url = self._consumer_url(
+            stream,
+            isCollectionStream,
+            local,
+            subscription_name,
+            consumer_type,
+            receiver_queue_size,
+            consumer_name,
+        )
+        return AsyncConsumer(
+            url,
+            headers={"Authorization": self.header["Authorization"]},
+            ack_batch_size=ack_batch_size,
+            ack_interval_ms=ack_interval_ms,
+            serializer=serializer,
+        )
+
+    def create_asyncio_reader(
+        self,
+        stream,
+        start_message_id="latest",
+        local=False,
+        isCollectionStream=False,
+        receiver_queue_size=1000,
+        reader_name=None,
+        serializer=None,
+    ):
+        """Create a reader on a particular topic, for use with asyncio.
+
+        Messages are acknowledged as they are received. Requires the
+        `aiohttp` package.
+
+        **Args**
+
+        * `stream`: The name of the stream.
+
+        **Options**
+        * `start_message_id`: The initial reader positioning is done by
+                              specifying a message id.(latest or earliest)
+        * `local`: If the stream_stream is local or global default its global
+        * `receiver_queue_size`: Sets the size of the reader receive queue.
+        * `reader_name`: Sets the reader name.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        """
+        url = self._reader_url(
+            stream,
+            start_message_id,
+            local,
+            isCollectionStream,
+            receiver_queue_size,
+            reader_name,
+        )
+        return AsyncConsumer(
+            url,
+            headers={"Authorization": self.header["Authorization"]},
+            auto_ack=True,
+            serializer=serializer,
+        )
+
+    def create_consumer_group(
+        self,
+        stream,
+        subscription_name,
+        handler,
+        workers=4,
+        processes=False,
+        local=False,
+        isCollectionStream=False,
+        consumer_type=CONSUMER_TYPES.SHARED,
+        receiver_queue_size=1000,
+        serializer=None,
+    ):
+        """Create workers consuming a stream through the same subscription.
+
+        The workers are started by
+        :func:`c8.consumer_group.ConsumerGroup.start`, see
+        :class:`c8.consumer_group.ConsumerGroup`.
+
+        **Args**
+
+        * `stream`: The name of the stream.
+        * `subscription_name`: The name of the subscription.
+        * `handler`: Function called with each message. The message is
+                     acknowledged if it returns, and negatively acknowledged
+                     if it raises.
+
+        **Options**
+
+        * `workers`: Number of workers.
+        * `processes`: Run the workers in processes instead of threads.
+        * `local`: If the stream_stream is local or global default its global
+        * `consumer_type`: Subscription type, Shared or Failover.
+        * `receiver_queue_size`: Size of the receive queue of each worker.
+        * `serializer`: Payload serializer, "raw" (default), "json" or
+                        "msgpack".
+        """
+        return ConsumerGroup(
+            self,
+            stream,
+            subscription_name,
+            handler,
+            workers=workers,
+            processes=processes,
+            local=local,
+            isCollectionStream=isCollectionStream,
+            consumer_type=consumer_type,
+            receiver_queue_size=receiver_queue_size,
+            serializer=serializer,
+        )
+
+    def create_connection_pool(
+        self, max_idle=4, idle_timeout=300, health_check_interval=30, ping_timeout=1
+    ):
+        """Create a pool of persistent producer, consumer and reader
+        websockets, shared by threads.
+
+        See :class:`c8.stream_pool.StreamConnectionPool`.
+
+        **Options**
+
+        * `max_idle`: Max number of idle websockets kept per stream and
+                      options.
+        * `idle_timeout`: Time in seconds after which idle websockets are
+                          closed.
+        * `health_check_interval`: Idle time in seconds after which
+                                   websockets are pinged before being reused.
+        * `ping_timeout`: Time in seconds to wait for the pong of a producer
+                          websocket.
+        """
+        return StreamConnectionPool(
+            self,
+            max_idle=max_idle,
+            idle_timeout=idle_timeout,
+            health_check_interval=health_check_interval,
+            ping_timeout=ping_timeout,
+            producer_class=Base64Socket,
+        )
+
     def unsubscribe(self, subscription, local=False):
         """Unsubscribes the given subscription on all streams on a stream fabric
         :param subscription
@@ -0,0 +1,367 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import collections
+import json
+
+from c8.exceptions import StreamConnectionError
+from c8.stream_serde import MessageCodec
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+__all__ = ["AsyncConsumer", "connect_websocket", "merge_consumers"]
+
+
+class _AiohttpSocket(object):
+    """Websocket opened with aiohttp, closing its session along with it."""
+
+    def __init__(self, session, ws):
+        self._session = session
+        self._ws = ws
+
+    async def recv(self):
+        message = await self._ws.receive()
+        if message.type == aiohttp.WSMsgType.TEXT:
+            return message.data
+        if message.type == aiohttp.WSMsgType.BINARY:
+            return message.data.decode("utf-8")
+        # The socket is closing, closed or failed.
+        return None
+
+    async def send(self, data):
+        await self._ws.send_str(data)
+
+    async def close(self):
+        try:
+            await self._ws.close()
+        finally:
+            await self._session.close()
+
+
+async def connect_websocket(url, headers=None):
+    """Open a websocket without blocking the event loop.
+
+    Requires the `aiohttp` package.
+
+    :param url: Websocket URL.
+    :type url: str | unicode
+    :param headers: Request headers.
+    :type headers: dict
+    :returns: Socket with coroutines **recv** (returning None once the socket
+        is closed), **send** and **close**.
+    :raise c8.exceptions.StreamConnectionError: If the connection fails.
+    """
+    if aiohttp is None:
+        raise ImportError("asyncio stream consumers require the aiohttp package")
+    session = aiohttp.ClientSession()
+    try:
+        ws = await session.ws_connect(url, headers=headers)
+    except aiohttp.ClientError as err:
+        await session.close()
+        raise StreamConnectionError(
+            "Not able to open websocket {}: {}".format(url, err)
+        )
+    return _AiohttpSocket(session, ws)
+
+
+class AsyncConsumer(object):
+    """Asyncio stream consumer or reader.
+
+    The consumer is an async iterator of messages. Each message is the dict
+    sent by the server (with keys "messageId", "payload", "properties",
+    "publishTime" etc.), with its payload decoded by the serializer.
+
+    Acknowledgements are queued by :func:`ack` and :func:`nack` and written
+    by a background task once **ack_batch_size** of them are queued, or
+    **ack_interval_ms** after the first one, so that consuming never waits on
+    an acknowledgement write.
+
+    :param url: Consumer or reader websocket URL.
+    :type url: str | unicode
+    :param headers: Websocket request headers.
+    :type headers: dict
+    :param auto_ack: If set to True, messages are acknowledged as soon as
+        they are received. Readers need it to keep receiving messages.
+    :type auto_ack: bool
+    :param ack_batch_size: Number of queued acknowledgements triggering a
+        write.
+    :type ack_batch_size: int
+    :param ack_interval_ms: Max time in milliseconds an acknowledgement is
+        queued.
+    :type ack_interval_ms: int | float
+    :param connect: Coroutine function opening the websocket, called with the
+        URL and the headers. Defaults to :func:`connect_websocket`.
+    :type connect: callable
+    :param serializer: Payload serializer, or its name ("raw", "json" or
+        "msgpack"). Raw payloads are returned as bytes.
+    :type serializer: c8.stream_serde.Serializer | str | unicode
+    """
+
+    def __init__(
+        self,
+        url,
+        headers=None,
+        auto_ack=False,
+        ack_batch_size=100,
+        ack_interval_ms=50,
+        connect=None,
+        serializer=None,
+    ):
+        self._url = url
+        self._serde = MessageCodec(serializer)
+        self._headers = headers
+        self._auto_ack = auto_ack
+        self._ack_batch_size = ack_batch_size
+        self._ack_interval = ack_interval_ms / 1000.0
+        self._connect = connect or connect_websocket
+        self._socket = None
+        self._acks = []
+        self._ack_ready = None
+        self._ack_full = None
+        self._ack_task = None
+        self._closing = False
+
+        self._received = 0
+        self._acked = 0
+        self._nacked = 0
+        self._ack_writes = 0
+
+    def __repr__(self):
+        return "<AsyncConsumer {}>".format(self._url.split("?", 1)[0])
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.receive()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def open(self):
+        """Open the websocket, if not opened yet.
+
+        :returns: The consumer.
+        :rtype: c8.stream_consumer.AsyncConsumer
+        """
+        if self._socket is None:
+            self._socket = await self._connect(self._url, self._headers)
+            self._closing = False
+            self._ack_ready = asyncio.Event()
+            self._ack_full = asyncio.Event()
+            self._ack_task = asyncio.ensure_future(self._ack_loop())
+        return self
+
+    async def receive(self):
+        """Return the next message.
+
+        :returns: Message, or None if the websocket is closed.
+        :rtype: dict | None
+        """
+        await self.open()
+        while True:
+            raw = await self._socket.recv()
+            if raw is None:
+                return None
+            message = self._serde.decode(raw)
+            if "messageId" in message:
+                break
+        self._received += 1
+        if self._auto_ack:
+            self.ack(message)
+        return message
+
+    def ack(self, message):
+        """Queue the acknowledgement of a message.
+
+        :param message: Message or message ID.
+        :type message: dict | str | unicode
+        """
+        self._acked += 1
+        self._queue_ack({"messageId": _message_id(message)})
+
+    def nack(self, message):
+        """Queue the negative acknowledgement of a message, so that the
+        server redelivers it.
+
+        :param message: Message or message ID.
+        :type message: dict | str | unicode
+        """
+        self._nacked += 1
+        self._queue_ack(
+            {"type": "negativeAcknowledge", "messageId": _message_id(message)}
+        )
+
+    def _queue_ack(self, ack):
+        self._acks.append(json.dumps(ack))
+        if self._ack_ready is not None:
+            self._ack_ready.set()
+            if len(self._acks) >= self._ack_batch_size:
+                self._ack_full.set()
+
+    async def _ack_loop(self):
+        while True:
+            await self._ack_ready.wait()
+            if not self._closing:
+                try:
+                    await asyncio.wait_for(self._ack_full.wait(), self._ack_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._ack_ready.clear()
+            self._ack_full.clear()
+            await self.flush_acks()
+            if self._closing:
+                return
+
+    async def flush_acks(self):
+        """Write the queued acknowledgements."""
+        acks, self._acks = self._acks, []
+        if acks:
+            self._ack_writes += 1
+        for ack in acks:
+            await self._socket.send(ack)
+
+    async def process(self, handler, concurrency=16, on_error=None):
+        """Process messages concurrently until the websocket is closed.
+
+        Up to **concurrency** messages are handled at the same time. Messages
+        are acknowledged in the order they were received, once they and all
+        the messages received before them are processed. Messages whose
+        handler fails are negatively acknowledged so that the server
+        redelivers them.
+
+        :param handler: Coroutine function called with each message.
+        :type handler: callable
+        :param concurrency: Max number of messages processed at the same time.
+        :type concurrency: int
+        :param on_error: Callable called with the message and the exception
+            when the handler fails.
+        :type on_error: callable
+        :returns: Number of messages processed.
+        :rtype: int
+        """
+        slots = asyncio.Semaphore(concurrency)
+        # Entries [message, succeeded], in order of reception.
+        window = collections.deque()
+        tasks = set()
+        count = 0
+
+        def complete():
+            while window and window[0][1] is not None:
+                message, succeeded = window.popleft()
+                if self._auto_ack:
+                    continue
+                if succeeded:
+                    self.ack(message)
+                else:
+                    self.nack(message)
+
+        async def run(entry):
+            try:
+                await handler(entry[0])
+                entry[1] = True
+            except Exception as err:
+                entry[1] = False
+                if on_error is not None:
+                    on_error(entry[0], err)
+            finally:
+                slots.release()
+                complete()
+
+        try:
+            async for message in self:
+                await slots.acquire()
+                entry = [message, None]
+                window.append(entry)
+                task = asyncio.ensure_future(run(entry))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                count += 1
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        return count
+
+    async def close(self):
+        """Write the queued acknowledgements and close the websocket."""
+        if self._socket is None:
+            return
+        self._closing = True
+        self._ack_ready.set()
+        try:
+            await self._ack_task
+        finally:
+            socket, self._socket = self._socket, None
+            await socket.close()
+
+    def stats(self):
+        """Return the consumer statistics.
+
+        :returns: Number of messages received, acknowledged and negatively
+            acknowledged, number of acknowledgement batches written and
+            number of acknowledgements queued.
+        :rtype: dict
+        """
+        return {
+            "received": self._received,
+            "acked": self._acked,
+            "nacked": self._nacked,
+            "ack_writes": self._ack_writes,
+            "queued_acks": len(self._acks),
+        }
+
+
+def _message_id(message):
+    if isinstance(message, dict):
+        return message["messageId"]
+    return message
+
+
+async def merge_consumers(consumers, buffer_size=1000):
+    """Follow several consumers at once.
+
+    :param consumers: Consumers to follow.
+    :type consumers: [c8.stream_consumer.AsyncConsumer]
+    :param buffer_size: Max number of messages waiting to be consumed.
+    :type buffer_size: int
+    :returns: Async generator of (consumer, message) tuples, ending once all
+        the websockets are closed.
+    :rtype: collections.abc.AsyncIterator
+    """
+    consumers = list(consumers)
+    messages = asyncio.Queue(buffer_size)
+    done = object()
+
+    async def pump(consumer):
+        try:
+            async for message in consumer:
+                await messages.put((consumer, message))
+        except Exception as err:
+            await messages.put(err)
+            return
+        await messages.put(done)
+
+    tasks = [asyncio.ensure_future(pump(consumer)) for consumer in consumers]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await messages.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
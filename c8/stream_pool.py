@@ -0,0 +1,384 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import websocket
+
+from c8.exceptions import StreamProducerError
+
+__all__ = ["StreamConnectionPool"]
+
+# Errors meaning a websocket is broken and must not be reused.
+CONNECTION_ERRORS = (websocket.WebSocketException, OSError)
+
+
+class StreamConnectionPool(object):
+    """Pool of persistent stream websockets, shared by threads.
+
+    Opening a producer, consumer or reader websocket takes a stream lookup
+    and a TLS handshake. The pool keeps websockets open once they are
+    released, keyed by role (producer, consumer or reader), stream and
+    options, and hands them out again to the next caller asking for the same
+    key. The websocket URL of each key is also computed once, so reusing a
+    websocket costs no HTTP request.
+
+    A websocket is leased by a single thread at a time. Websockets idle for
+    longer than **health_check_interval** are pinged before being reused,
+    and replaced if the ping fails. Producer websockets are also replaced if
+    the pong does not arrive within **ping_timeout**. Consumer and reader
+    websockets are not waited on, as the frames read while waiting could be
+    messages: a socket which is half-open still passes their check, and
+    fails on first use instead. Websockets idle for longer than
+    **idle_timeout** are closed, and at most **max_idle** idle websockets are
+    kept per key.
+
+    Consumer and reader websockets keep their subscription while they are
+    idle, so the server keeps delivering up to a receive queue of messages
+    to them: only pool them when they are leased most of the time.
+
+    :param stream_collection: Stream API wrapper.
+    :type stream_collection: c8.stream_collection.StreamCollection
+    :param max_idle: Max number of idle websockets kept per key.
+    :type max_idle: int
+    :param idle_timeout: Time in seconds after which idle websockets are
+        closed.
+    :type idle_timeout: int | float
+    :param health_check_interval: Idle time in seconds after which
+        websockets are pinged before being reused.
+    :type health_check_interval: int | float
+    :param ping_timeout: Time in seconds to wait for the pong of a producer
+        websocket.
+    :type ping_timeout: int | float
+    :param producer_class: Websocket class of producers.
+    :type producer_class: type
+    :param connect: Function opening a websocket, called with its URL and
+        the keyword arguments **header** and **class_**.
+    :type connect: callable
+    """
+
+    def __init__(
+        self,
+        stream_collection,
+        max_idle=4,
+        idle_timeout=300,
+        health_check_interval=30,
+        ping_timeout=1,
+        producer_class=websocket.WebSocket,
+        connect=websocket.create_connection,
+    ):
+        self._streams = stream_collection
+        self._max_idle = max_idle
+        self._idle_timeout = idle_timeout
+        self._health_check_interval = health_check_interval
+        self._ping_timeout = ping_timeout
+        self._classes = {
+            "producer": producer_class,
+            "consumer": websocket.WebSocket,
+            "reader": websocket.WebSocket,
+        }
+        self._urls = {
+            "producer": stream_collection._producer_url,
+            "consumer": stream_collection._consumer_url,
+            "reader": stream_collection._reader_url,
+        }
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # URL of each key.
+        self._key_urls = {}
+        # Idle websockets of each key, with the time they were released.
+        self._idle = {}
+        # Key of each leased websocket, by websocket ID.
+        self._leased = {}
+        self._created = 0
+        self._reused = 0
+        self._reconnects = 0
+        self._evicted = 0
+        self._unhealthy = 0
+
+    def __repr__(self):
+        return "<StreamConnectionPool {}>".format(self._streams.fabric_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _url(self, key, role, stream, options):
+        with self._lock:
+            url = self._key_urls.get(key)
+        if url is None:
+            url = self._urls[role](stream, **options)
+            with self._lock:
+                self._key_urls[key] = url
+        return url
+
+    def _healthy(self, ws, role):
+        if not getattr(ws, "connected", True):
+            return False
+        try:
+            ws.ping()
+            if role == "producer":
+                return self._pong(ws)
+        except CONNECTION_ERRORS:
+            return False
+        return True
+
+    def _pong(self, ws):
+        """Return True if the pong of a websocket arrives in time.
+
+        Frames read before the pong are acknowledgements of messages sent by
+        a previous lease, which nobody waits for anymore.
+        """
+        timeout = ws.gettimeout()
+        deadline = time.monotonic() + self._ping_timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                ws.settimeout(remaining)
+                opcode, _ = ws.recv_data_frame(control_frame=True)
+                if opcode == websocket.ABNF.OPCODE_PONG:
+                    return True
+                if opcode == websocket.ABNF.OPCODE_CLOSE:
+                    return False
+        finally:
+            ws.settimeout(timeout)
+
+    def _close_all(self, sockets):
+        for ws in sockets:
+            try:
+                ws.close()
+            except CONNECTION_ERRORS:
+                pass
+
+    def _expired(self, now):
+        # Must be called with the lock held.
+        expired, deadline = [], now - self._idle_timeout
+        for key in list(self._idle):
+            entries = self._idle[key]
+            kept = [entry for entry in entries if entry[1] > deadline]
+            expired.extend(ws for ws, released in entries if released <= deadline)
+            if kept:
+                self._idle[key] = kept
+            else:
+                del self._idle[key]
+        self._evicted += len(expired)
+        return expired
+
+    def acquire(self, role, stream, **options):
+        """Lease a websocket, opening one if none is idle.
+
+        The websocket must be given back with :func:`release`.
+
+        :param role: "producer", "consumer" or "reader".
+        :type role: str | unicode
+        :param stream: The name of the stream.
+        :type stream: str | unicode
+        :param options: Options of
+            :func:`c8.stream_collection.StreamCollection.create_producer`,
+            :func:`c8.stream_collection.StreamCollection.subscribe` (those
+            setting up the subscription) or
+            :func:`c8.stream_collection.StreamCollection.create_reader`.
+        :returns: Websocket.
+        :rtype: websocket.WebSocket
+        :raise c8.exceptions.StreamProducerError: If the pool is closed or
+            the stream does not exist.
+        :raise c8.exceptions.StreamSubscriberError: If the stream does not
+            exist.
+        """
+        if role not in self._urls:
+            raise ValueError("unknown role: {}".format(role))
+        key = (role, stream, tuple(sorted(options.items())))
+        url = self._url(key, role, stream, options)
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                if self._closed:
+                    raise StreamProducerError("connection pool is closed")
+                expired = self._expired(now)
+                entries = self._idle.get(key)
+                ws, released = entries.pop() if entries else (None, None)
+            self._close_all(expired)
+            if ws is None:
+                break
+            if now - released < self._health_check_interval or self._healthy(ws, role):
+                with self._lock:
+                    self._leased[id(ws)] = key
+                    self._reused += 1
+                return ws
+            with self._lock:
+                self._unhealthy += 1
+            self._close_all([ws])
+
+        header = {"Authorization": self._streams.header["Authorization"]}
+        ws = self._connect(url, header=header, class_=self._classes[role])
+        with self._lock:
+            self._leased[id(ws)] = key
+            self._created += 1
+        return ws
+
+    def release(self, ws, discard=False):
+        """Give back a leased websocket.
+
+        :param ws: Websocket returned by :func:`acquire`.
+        :type ws: websocket.WebSocket
+        :param discard: Close the websocket instead of keeping it, e.g.
+            because it failed.
+        :type discard: bool
+        """
+        now = time.monotonic()
+        with self._lock:
+            key = self._leased.pop(id(ws), None)
+            close = self._expired(now)
+            if key is None or discard or self._closed:
+                close.append(ws)
+            elif len(self._idle.get(key, ())) >= self._max_idle:
+                close.append(ws)
+                self._evicted += 1
+            else:
+                self._idle.setdefault(key, []).append((ws, now))
+        self._close_all(close)
+
+    @contextmanager
+    def connection(self, role, stream, **options):
+        """Lease a websocket for the duration of a with statement.
+
+        The websocket is given back when the with statement ends, or closed
+        if a websocket or socket error is raised.
+
+        :param role: "producer", "consumer" or "reader".
+        :type role: str | unicode
+        :param stream: The name of the stream.
+        :type stream: str | unicode
+        :param options: Options of the websocket, see :func:`acquire`.
+        :returns: Websocket.
+        :rtype: websocket.WebSocket
+        """
+        ws = self.acquire(role, stream, **options)
+        try:
+            yield ws
+        except CONNECTION_ERRORS:
+            self.release(ws, discard=True)
+            raise
+        except BaseException:
+            self.release(ws)
+            raise
+        self.release(ws)
+
+    def producer(self, stream, **options):
+        """Lease a producer websocket, see :func:`connection`.
+
+        :param stream: The name of the stream.
+        :type stream: str | unicode
+        :param options: Options of
+            :func:`c8.stream_collection.StreamCollection.create_producer`.
+        """
+        return self.connection("producer", stream, **options)
+
+    def consumer(self, stream, **options):
+        """Lease a consumer websocket, see :func:`connection`.
+
+        :param stream: The name of the stream.
+        :type stream: str | unicode
+        :param options: Options of
+            :func:`c8.stream_collection.StreamCollection.subscribe`.
+        """
+        return self.connection("consumer", stream, **options)
+
+    def reader(self, stream, **options):
+        """Lease a reader websocket, see :func:`connection`.
+
+        :param stream: The name of the stream.
+        :type stream: str | unicode
+        :param options: Options of
+            :func:`c8.stream_collection.StreamCollection.create_reader`.
+        """
+        return self.connection("reader", stream, **options)
+
+    def send(self, stream, payload, retries=1, **options):
+        """Publish a message through a pooled producer websocket, and wait for
+        its acknowledgement.
+
+        If the websocket turns out to be broken, the message is sent again
+        through a new one, up to **retries** times. A message whose
+        acknowledgement was lost may thus be published twice.
+
+        :param stream: The name of the stream.
+        :type stream: str | unicode
+        :param payload: Message payload.
+        :type payload: str | unicode | bytes
+        :param retries: Max number of reconnections.
+        :type retries: int
+        :param options: Options of
+            :func:`c8.stream_collection.StreamCollection.create_producer`.
+        :returns: Message ID.
+        :rtype: str | unicode
+        :raise c8.exceptions.StreamProducerError: If the server rejects the
+            message.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.producer(stream, **options) as ws:
+                    ws.send(payload)
+                    reply = json.loads(ws.recv())
+                break
+            except CONNECTION_ERRORS:
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self._reconnects += 1
+        if reply.get("result") != "ok":
+            error = reply.get("errorMsg") or reply.get("result") or "send failed"
+            raise StreamProducerError(error)
+        return reply.get("messageId")
+
+    def evict_idle(self):
+        """Close the websockets idle for longer than the idle timeout.
+
+        Idle websockets are also evicted whenever websockets are leased or
+        released.
+
+        :returns: Number of websockets closed.
+        :rtype: int
+        """
+        with self._lock:
+            expired = self._expired(time.monotonic())
+        self._close_all(expired)
+        return len(expired)
+
+    def close(self):
+        """Close the idle websockets, and the leased ones once released."""
+        with self._lock:
+            self._closed = True
+            idle = [ws for entries in self._idle.values() for ws, _ in entries]
+            self._idle = {}
+        self._close_all(idle)
+
+    def stats(self):
+        """Return the pool statistics.
+
+        :returns: Number of websockets opened ("created"), leased again
+            ("reused"), reopened by :func:`send` ("reconnects"), closed for
+            being idle ("evicted") and replaced after a failed health check
+            ("unhealthy"), and number of websockets currently idle and leased.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "created": self._created,
+                "reused": self._reused,
+                "reconnects": self._reconnects,
+                "evicted": self._evicted,
+                "unhealthy": self._unhealthy,
+                "idle": sum(len(entries) for entries in self._idle.values()),
+                "leased": len(self._leased),
+            }
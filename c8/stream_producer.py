@@ -0,0 +1,390 @@
+from __future__ import absolute_import, unicode_literals
+
+import itertools
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+from c8.exceptions import StreamProducerError
+from c8.stream_serde import MessageCodec
+
+__all__ = ["BatchProducer"]
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+# Max time in seconds to wait for the server to close the socket.
+_CLOSE_TIMEOUT = 3
+
+
+def encode_frame(text):
+    """Return a masked websocket text frame.
+
+    The payload is masked with integer arithmetic, which is orders of
+    magnitude faster than the byte by byte masking of websocket-client when
+    numpy is not installed.
+
+    :param text: Frame payload.
+    :type text: str | unicode
+    :returns: Encoded frame.
+    :rtype: bytes
+    """
+    data = text.encode("utf-8")
+    length = len(data)
+    if length < 126:
+        header = struct.pack("!BB", 0x81, 0x80 | length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x81, 0x80 | 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x81, 0x80 | 127, length)
+    mask = os.urandom(4)
+    key = int.from_bytes((mask * (length // 4 + 1))[:length], "little")
+    masked = (int.from_bytes(data, "little") ^ key).to_bytes(length, "little")
+    return header + mask + masked
+
+
+class BatchProducer(object):
+    """Stream producer buffering messages client side.
+
+    Messages passed to :func:`send` are encoded right away and buffered. The
+    buffer is written to the websocket in a single write once it holds
+    **batch_max_messages** messages or **batch_max_bytes** bytes, or
+    **linger_ms** milliseconds after its first message was buffered,
+    whichever comes first. Each message is still a frame of its own, so
+    consumers are not affected.
+
+    Each message gets a future resolved with its message ID when the server
+    acknowledges it, or failed with :class:`c8.exceptions.StreamProducerError`
+    if the server rejects it, the socket fails or no acknowledgement arrives
+    within **send_timeout_ms**. At most **max_pending_messages** messages may
+    be buffered or awaiting their acknowledgement at the same time.
+
+    :param socket: Producer websocket, as returned by
+        :func:`c8.stream_collection.StreamCollection.create_producer`. The
+        producer takes ownership of it.
+    :type socket: websocket.WebSocket
+    :param batch_max_messages: Max number of messages per write.
+    :type batch_max_messages: int
+    :param batch_max_bytes: Max number of encoded bytes per write.
+    :type batch_max_bytes: int
+    :param linger_ms: Max time in milliseconds a message is buffered.
+    :type linger_ms: int | float
+    :param max_pending_messages: Max number of messages buffered or awaiting
+        their acknowledgement.
+    :type max_pending_messages: int
+    :param block_if_queue_full: If set to True, :func:`send` blocks while the
+        max number of pending messages is reached. Otherwise it raises
+        :class:`c8.exceptions.StreamProducerError`.
+    :type block_if_queue_full: bool
+    :param send_timeout_ms: Time in milliseconds after which a message which
+        is not acknowledged fails. 0 or None disables the timeout.
+    :type send_timeout_ms: int | float | None
+    :param serializer: Payload serializer, or its name ("raw", "json" or
+        "msgpack"). Raw payloads are sent as is.
+    :type serializer: c8.stream_serde.Serializer | str | unicode
+    :param compression: Payload compression ("zlib" or "lz4"), or None.
+    :type compression: str | unicode | None
+    """
+
+    def __init__(
+        self,
+        socket,
+        batch_max_messages=1000,
+        batch_max_bytes=1024 * 1024,
+        linger_ms=5,
+        max_pending_messages=1000,
+        block_if_queue_full=True,
+        send_timeout_ms=30000,
+        serializer=None,
+        compression=None,
+    ):
+        self._socket = socket
+        self._serde = MessageCodec(serializer, compression)
+        self._batch_max_messages = batch_max_messages
+        self._batch_max_bytes = batch_max_bytes
+        self._linger = linger_ms / 1000.0
+        self._block = block_if_queue_full
+        self._send_timeout = (send_timeout_ms or 0) / 1000.0
+        self._max_pending = max_pending_messages
+        self._contexts = itertools.count(1)
+
+        self._lock = threading.Condition()
+        self._write_lock = threading.Lock()
+        # Encoded frames waiting to be written, and their total size.
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffer_deadline = None
+        # Context -> (future, time the message was buffered)
+        self._pending = {}
+        self._closed = False
+        self._error = None
+
+        self._messages = 0
+        self._bytes = 0
+        self._batches = 0
+        self._acked = 0
+        self._failed = 0
+
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="c8-producer-flush"
+        )
+        self._flusher.daemon = True
+        self._flusher.start()
+        self._receiver = threading.Thread(
+            target=self._receive_loop, name="c8-producer-receive"
+        )
+        self._receiver.daemon = True
+        self._receiver.start()
+
+    def __repr__(self):
+        return "<BatchProducer {}>".format(len(self._pending))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def send(self, payload, properties=None, key=None, callback=None):
+        """Buffer a message.
+
+        :param payload: Message payload, serialized by the serializer of the
+            producer. Raw payloads may be text or any bytes-like object.
+        :type payload: str | unicode | bytes | bytearray | memoryview
+        :param properties: Message properties.
+        :type properties: dict
+        :param key: Message key, used for routing and compaction.
+        :type key: str | unicode
+        :param callback: Callable called with the future of the message once
+            it is acknowledged or failed.
+        :type callback: callable
+        :returns: Future resolved with the message ID.
+        :rtype: concurrent.futures.Future
+        :raise c8.exceptions.StreamProducerError: If the producer is closed or
+            failed, or the max number of pending messages is reached and
+            **block_if_queue_full** is False.
+        """
+        payload, extra = self._serde.encode_payload(payload)
+        if extra:
+            properties = dict(properties or {}, **extra)
+        context = str(next(self._contexts))
+        # The message is formatted by hand, only the optional fields go
+        # through the JSON encoder.
+        fields = ['{"payload":"', payload, '"']
+        if properties:
+            fields.extend((',"properties":', _encode(properties)))
+        if key is not None:
+            fields.extend((',"key":', _encode(key)))
+        fields.extend((',"context":"', context, '"}'))
+        frame = encode_frame("".join(fields))
+
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+
+        with self._lock:
+            while True:
+                if self._closed or self._error is not None:
+                    raise StreamProducerError(self._error or "producer is closed")
+                if len(self._pending) < self._max_pending:
+                    break
+                if not self._block:
+                    raise StreamProducerError("producer queue is full")
+                self._lock.wait()
+            now = time.monotonic()
+            self._pending[context] = (future, now)
+            self._buffer.append(frame)
+            self._buffer_bytes += len(frame)
+            if len(self._buffer) == 1:
+                self._buffer_deadline = now + self._linger
+                self._lock.notify_all()
+            full = (
+                len(self._buffer) >= self._batch_max_messages
+                or self._buffer_bytes >= self._batch_max_bytes
+            )
+        if full:
+            self._flush_buffer()
+        return future
+
+    def _take_buffer(self):
+        frames = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffer_deadline = None
+        return frames
+
+    def _flush_buffer(self):
+        # Buffers are taken and written under the write lock, so that they
+        # reach the socket in the order they were filled.
+        with self._write_lock:
+            with self._lock:
+                frames = self._take_buffer()
+            self._write(frames)
+
+    def _write(self, frames):
+        if not frames:
+            return
+        data = b"".join(frames)
+        try:
+            # The frames are already encoded, so they are written to the
+            # underlying socket, under the lock of the websocket writers.
+            with self._socket.lock:
+                self._socket.sock.sendall(data)
+        except Exception as err:
+            self._fail("producer socket failed: {}".format(err))
+            return
+        with self._lock:
+            self._messages += len(frames)
+            self._bytes += sum(len(frame) for frame in frames)
+            self._batches += 1
+
+    def _resolve(self, context, message_id=None, error=None):
+        with self._lock:
+            entry = self._pending.pop(context, None)
+            if entry is None:
+                return
+            if error is None:
+                self._acked += 1
+            else:
+                self._failed += 1
+            self._lock.notify_all()
+        if error is None:
+            entry[0].set_result(message_id)
+        else:
+            entry[0].set_exception(StreamProducerError(error))
+
+    def _fail(self, error):
+        """Fail all pending messages and stop accepting new ones."""
+        with self._lock:
+            if self._error is None:
+                self._error = error
+            self._take_buffer()
+            contexts = list(self._pending)
+        for context in contexts:
+            self._resolve(context, error=error)
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                if self._closed and not self._buffer:
+                    return
+                now = time.monotonic()
+                timeout = 1.0
+                if self._buffer_deadline is not None:
+                    timeout = self._buffer_deadline - now
+                if self._send_timeout and self._pending:
+                    sent_at = next(iter(self._pending.values()))[1]
+                    timeout = min(timeout, sent_at + self._send_timeout - now)
+                if timeout > 0:
+                    self._lock.wait(timeout)
+                    continue
+                flush = (
+                    self._buffer_deadline is not None and self._buffer_deadline <= now
+                )
+                expired = []
+                if self._send_timeout:
+                    for context, (_, sent_at) in self._pending.items():
+                        if sent_at + self._send_timeout > now:
+                            break
+                        expired.append(context)
+            if flush:
+                self._flush_buffer()
+            for context in expired:
+                self._resolve(context, error="send timed out")
+
+    def _receive_loop(self):
+        while True:
+            try:
+                reply = self._socket.recv()
+            except Exception as err:
+                with self._lock:
+                    closed = self._closed
+                if not closed:
+                    self._fail("producer socket failed: {}".format(err))
+                return
+            if not reply:
+                # Control frames, e.g. the close frame of the server.
+                continue
+            try:
+                reply = json.loads(reply)
+                context = reply.get("context")
+            except (ValueError, AttributeError):
+                continue
+            if reply.get("result") == "ok":
+                self._resolve(context, reply.get("messageId"))
+            else:
+                error = reply.get("errorMsg") or reply.get("result") or "send failed"
+                self._resolve(context, error=error)
+
+    def flush(self, timeout=None):
+        """Write the buffered messages and wait for the acknowledgement of all
+        pending messages.
+
+        :param timeout: Max time to wait in seconds. None waits until all
+            messages are acknowledged or failed.
+        :type timeout: int | float | None
+        :returns: True if no message is pending anymore.
+        :rtype: bool
+        """
+        self._flush_buffer()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+            return True
+
+    def close(self, timeout=None):
+        """Flush the pending messages and close the socket.
+
+        Messages still pending after **timeout** fail.
+
+        :param timeout: Max time to wait for the pending messages in seconds.
+        :type timeout: int | float | None
+        """
+        self.flush(timeout)
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+        self._fail("producer is closed")
+        self._flusher.join()
+
+        # The receiver stops once the server answered the close frame and
+        # closed the connection, or once the socket is shut down.
+        try:
+            self._socket.send_close()
+        except Exception:
+            pass
+        self._receiver.join(_CLOSE_TIMEOUT)
+        sock = self._socket.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._socket.shutdown()
+        self._receiver.join()
+
+    def stats(self):
+        """Return the producer statistics.
+
+        :returns: Number of messages and bytes written, number of writes,
+            number of messages acknowledged, failed and pending.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "messages": self._messages,
+                "bytes": self._bytes,
+                "batches": self._batches,
+                "acked": self._acked,
+                "failed": self._failed,
+                "pending": len(self._pending),
+            }
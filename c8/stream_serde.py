@@ -0,0 +1,299 @@
+from __future__ import absolute_import, unicode_literals
+
+import base64
+import binascii
+import zlib
+from abc import ABCMeta, abstractmethod
+
+from six import string_types
+
+from c8.codec import get_codec
+from c8.exceptions import StreamEventError
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover
+    lz4_frame = None
+
+__all__ = [
+    "Serializer",
+    "RawSerializer",
+    "JSONSerializer",
+    "MsgpackSerializer",
+    "get_serializer",
+    "MessageCodec",
+]
+
+# Message property recording how the payload is compressed, so that
+# consumers decompress it without being configured for it.
+COMPRESSION_PROPERTY = "c8-compression"
+
+
+class Serializer(object):  # pragma: no cover
+    """Abstract base class for stream payload serializers."""
+
+    __metaclass__ = ABCMeta
+
+    name = None
+
+    def __repr__(self):
+        return "<{} {}>".format(self.__class__.__name__, self.name)
+
+    @abstractmethod
+    def dumps(self, value):
+        """Serialize a value into a message payload.
+
+        This method must be overridden by the user.
+
+        :param value: Value to serialize.
+        :returns: Payload.
+        :rtype: bytes | bytearray | memoryview
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, payload):
+        """Deserialize a message payload.
+
+        This method must be overridden by the user.
+
+        :param payload: Payload.
+        :type payload: bytes
+        :returns: Deserialized value.
+        """
+        raise NotImplementedError
+
+
+class RawSerializer(Serializer):
+    """Serializer sending bytes-like payloads as is.
+
+    Text is encoded to UTF-8, and payloads are received as bytes.
+    """
+
+    name = "raw"
+
+    def dumps(self, value):
+        if isinstance(value, string_types):
+            return value.encode("utf-8")
+        return value
+
+    def loads(self, payload):
+        return payload
+
+
+class JSONSerializer(Serializer):
+    """Serializer encoding payloads to JSON.
+
+    :param json_codec: JSON codec, or its name. The fastest codec available
+        is used if not set.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    """
+
+    name = "json"
+
+    def __init__(self, json_codec=None):
+        self._codec = get_codec(json_codec)
+
+    def dumps(self, value):
+        return self._codec.encode(value)
+
+    def loads(self, payload):
+        return self._codec.decode(payload)
+
+
+class MsgpackSerializer(Serializer):
+    """Serializer encoding payloads to MessagePack.
+
+    Requires the `msgpack` package.
+    """
+
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("MsgpackSerializer requires the msgpack package")
+
+    def dumps(self, value):
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, payload):
+        return msgpack.unpackb(payload, raw=False)
+
+
+_SERIALIZERS = {
+    RawSerializer.name: RawSerializer,
+    JSONSerializer.name: JSONSerializer,
+    MsgpackSerializer.name: MsgpackSerializer,
+}
+
+
+def get_serializer(serializer=None):
+    """Return a stream payload serializer.
+
+    :param serializer: Serializer, or name of the serializer ("raw", "json"
+        or "msgpack"). The raw serializer is returned if not set.
+    :type serializer: c8.stream_serde.Serializer | str | unicode | None
+    :returns: Serializer.
+    :rtype: c8.stream_serde.Serializer
+    :raise ValueError: If the serializer name is unknown.
+    """
+    if serializer is None:
+        serializer = RawSerializer.name
+    if isinstance(serializer, string_types):
+        if serializer not in _SERIALIZERS:
+            raise ValueError("unknown serializer: {}".format(serializer))
+        return _SERIALIZERS[serializer]()
+    return serializer
+
+
+def _compress(data, compression, level):
+    if compression == "zlib":
+        return zlib.compress(data, level)
+    if lz4_frame is None:
+        raise ImportError("lz4 compression requires the lz4 package")
+    return lz4_frame.compress(data, compression_level=max(level, 0))
+
+
+def _decompress(data, compression):
+    if compression == "zlib":
+        return zlib.decompress(data)
+    if compression == "lz4":
+        if lz4_frame is None:
+            raise ImportError("lz4 compression requires the lz4 package")
+        return lz4_frame.decompress(data)
+    raise StreamEventError("unknown payload compression: {}".format(compression))
+
+
+class MessageCodec(object):
+    """Encoder and decoder of stream messages.
+
+    Stream websockets carry messages as JSON envelopes with base64 encoded
+    payloads. The codec turns values into envelopes and back in as few
+    copies as the format allows: payloads are serialized straight to bytes,
+    base64 encoded once, and the envelope of received messages is parsed
+    with the fastest JSON codec available before the payload is decoded
+    once.
+
+    :param serializer: Payload serializer, or its name ("raw", "json" or
+        "msgpack").
+    :type serializer: c8.stream_serde.Serializer | str | unicode
+    :param compression: Payload compression ("zlib" or "lz4"), or None.
+    :type compression: str | unicode | None
+    :param compression_level: Compression level.
+    :type compression_level: int
+    :param min_compress_bytes: Payloads smaller than this are not
+        compressed.
+    :type min_compress_bytes: int
+    :param json_codec: JSON codec, or its name, used for the envelopes.
+    :type json_codec: c8.codec.JSONCodec | str | unicode
+    :raise ValueError: If the serializer or compression is unknown.
+    """
+
+    def __init__(
+        self,
+        serializer=None,
+        compression=None,
+        compression_level=-1,
+        min_compress_bytes=256,
+        json_codec=None,
+    ):
+        if compression not in (None, "zlib", "lz4"):
+            raise ValueError("unknown compression: {}".format(compression))
+        if compression == "lz4" and lz4_frame is None:
+            raise ImportError("lz4 compression requires the lz4 package")
+        self._serializer = get_serializer(serializer)
+        self._compression = compression
+        self._level = compression_level
+        self._min_compress_bytes = min_compress_bytes
+        self._codec = get_codec(json_codec)
+
+    def __repr__(self):
+        return "<MessageCodec {} {}>".format(
+            self._serializer.name, self._compression or "uncompressed"
+        )
+
+    @property
+    def serializer(self):
+        """Return the payload serializer.
+
+        :returns: Serializer.
+        :rtype: c8.stream_serde.Serializer
+        """
+        return self._serializer
+
+    def encode_payload(self, value):
+        """Serialize, compress and base64 encode a value.
+
+        :param value: Value to encode.
+        :returns: Base64 encoded payload, and the properties to add to the
+            message (None if there is none).
+        :rtype: (str | unicode, dict | None)
+        """
+        payload = self._serializer.dumps(value)
+        properties = None
+        if self._compression and len(payload) >= self._min_compress_bytes:
+            payload = _compress(payload, self._compression, self._level)
+            properties = {COMPRESSION_PROPERTY: self._compression}
+        return base64.b64encode(payload).decode("ascii"), properties
+
+    def decode_payload(self, payload, properties=None):
+        """Base64 decode, decompress and deserialize a payload.
+
+        :param payload: Base64 encoded payload.
+        :type payload: str | unicode | bytes
+        :param properties: Message properties.
+        :type properties: dict
+        :returns: Decoded value.
+        :raise c8.exceptions.StreamEventError: If the payload is corrupted.
+        """
+        try:
+            data = binascii.a2b_base64(payload or b"")
+            compression = properties and properties.get(COMPRESSION_PROPERTY)
+            if compression:
+                data = _decompress(data, compression)
+        except (binascii.Error, zlib.error) as err:
+            raise StreamEventError("corrupted message payload: {}".format(err))
+        return self._serializer.loads(data)
+
+    def encode(self, value, properties=None, key=None):
+        """Return the envelope of a message, as sent to producer websockets.
+
+        :param value: Message value.
+        :param properties: Message properties.
+        :type properties: dict
+        :param key: Message key.
+        :type key: str | unicode
+        :returns: JSON envelope.
+        :rtype: str | unicode
+        """
+        payload, extra = self.encode_payload(value)
+        message = {"payload": payload}
+        if extra:
+            properties = dict(properties or {}, **extra)
+        if properties:
+            message["properties"] = properties
+        if key is not None:
+            message["key"] = key
+        return self._codec.encode(message).decode("utf-8")
+
+    def decode(self, raw):
+        """Decode a message received from a consumer or reader websocket.
+
+        :param raw: JSON envelope.
+        :type raw: str | unicode | bytes
+        :returns: Message, with its payload decoded. Frames which are not
+            messages are returned as is.
+        :rtype: dict
+        :raise c8.exceptions.StreamEventError: If the payload is corrupted.
+        """
+        message = self._codec.decode(raw)
+        if "messageId" in message:
+            message["payload"] = self.decode_payload(
+                message.get("payload"), message.get("properties")
+            )
+        return message
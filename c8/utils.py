@@ -1,8 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 
-import csv
-import json
 import logging
+import warnings
 from collections import deque
 from contextlib import contextmanager
 
@@ -10,6 +9,7 @@ from six import string_types
 
 from c8.cursor import Cursor
 from c8.exceptions import DocumentParseError
+from c8.reader import DocumentFileReader
 
 
 @contextmanager
@@ -79,45 +79,82 @@ def is_none_or_str(obj):
     return obj is None or isinstance(obj, string_types)
 
 
+def _deprecated(name):
+    warnings.warn(
+        "{} is deprecated, use c8.reader.DocumentFileReader instead".format(name),
+        DeprecationWarning,
+        stacklevel=3,
+    )
+
+
 def json_reader(filepath):
-    try:
-        file = open(filepath)
-        return json.load(file)
-    except json.JSONDecodeError:
-        raise Exception("Invalid JSON file")
+    """Return the documents of a JSON file.
+
+    .. deprecated:: Use :class:`c8.reader.DocumentFileReader` instead.
+
+    :param filepath: JSON file path.
+    :type filepath: str | unicode
+    :return: Documents.
+    :rtype: list
+    :raise c8.exceptions.CollectionImportFromFileError: If the file is not
+        valid JSON.
+    """
+    _deprecated("json_reader")
+    return list(DocumentFileReader(filepath, file_format="json"))
 
 
 def csv_reader(filepath):
-    try:
-        loaded = csv.DictReader(open(filepath, newline=""))
-        return loaded
-    except csv.Error:
-        raise csv.Error
+    """Return an iterator over the rows of a CSV file.
+
+    .. deprecated:: Use :class:`c8.reader.DocumentFileReader` instead.
+
+    :param filepath: CSV file path.
+    :type filepath: str | unicode
+    :return: Rows as dicts.
+    :rtype: collections.abc.Iterator[dict]
+    """
+    _deprecated("csv_reader")
+    return iter(DocumentFileReader(filepath, file_format="csv"))
 
 
 def group_csv_key_values(data):
+    """Return the values of CSV rows grouped by column.
+
+    .. deprecated:: Use :class:`c8.reader.DocumentFileReader` instead.
+
+    :param data: Rows as dicts.
+    :type data: collections.abc.Iterable[dict]
+    :return: Column -> row index -> value.
+    :rtype: dict
+    """
+    _deprecated("group_csv_key_values")
     data_dict = {}
-    index = 0
-    for row in data:
+    for index, row in enumerate(data):
         for column, value in row.items():
-            data_dict.setdefault(column, {index: value})
-            temp_dict = data_dict.get(column)
-            temp_dict.update({index: value})
-        index += 1
+            data_dict.setdefault(column, {})[index] = value
     return data_dict
 
 
 def get_documents_from_file(data, index):
+    """Return the documents of CSV values grouped by column.
+
+    .. deprecated:: Use :class:`c8.reader.DocumentFileReader` instead.
+
+    :param data: Values grouped by column, as returned by
+        :func:`group_csv_key_values`.
+    :type data: dict
+    :param index: Index of the first row.
+    :type index: int
+    :return: Documents, and the index following the last row.
+    :rtype: (list, int)
+    """
+    _deprecated("get_documents_from_file")
     documents = []
-    for key in data.keys():
-        first_key = key
-        break
-    for counter in range(len(data[first_key])):
-        document = {}
-        for key in data.keys():
-            document[key] = data[key][index]
+    if not data:
+        return documents, index
+    for _ in range(len(next(iter(data.values())))):
+        documents.append({key: data[key][index] for key in data})
         index += 1
-        documents.append(document)
     return documents, index
 
 
@@ -138,3 +175,18 @@ def clean_doc(obj):
             for field, value in obj.items()
             if field in {"_key", "_from", "_to"} or not field.startswith("_")
         }
+
+
+def iter_clean_docs(docs):
+    """Yield the documents with all extra system keys stripped.
+
+    Unlike :func:`clean_doc`, documents are cleaned lazily one at a time, so
+    no intermediate list is built.
+
+    :param docs: Documents.
+    :type docs: iterable
+    :return: Generator of documents with the system keys stripped.
+    :rtype: collections.abc.Iterator[dict]
+    """
+    for doc in docs:
+        yield clean_doc(doc)
@@ -16,6 +16,12 @@ setup(
     include_package_data=True,
     install_requires=["requests==2.25.1", "six", "websocket-client==0.57.0"],
     tests_require=["pytest", "mock", "flake8"],
+    extras_require={
+        "asyncio": ["aiohttp"],
+        "http2": ["httpx[http2]"],
+        "lz4": ["lz4"],
+        "msgpack": ["msgpack"],
+    },
     classifiers=[
         "Intended Audience :: Developers",
         "Intended Audience :: End Users/Desktop",
@@ -1,12 +1,18 @@
 from __future__ import absolute_import, unicode_literals
 
+import asyncio
+import json
 from collections import deque
 from uuid import uuid4
 
 import pytest
 
+from c8.cache import MetadataCache
+from c8.connection import Connection
 from c8.cursor import Cursor
 from c8.exceptions import AsyncExecuteError, BatchExecuteError
+from c8.http import AsyncHTTPClient, HTTPClient
+from c8.response import Response
 
 
 def generate_fabric_name():
@@ -181,3 +187,75 @@ def assert_raises(exception):
             BatchExecuteError,
         )
     )
+
+
+def build_response(method, url, reply):
+    """Build a response from a canned reply.
+
+    :param reply: Response body, or a (status code, body) tuple.
+    :type reply: dict | list | tuple
+    :return: HTTP response.
+    :rtype: c8.response.Response
+    """
+    status_code, body = reply if isinstance(reply, tuple) else (200, reply)
+    return Response(
+        method=method,
+        url=url,
+        headers={},
+        status_code=status_code,
+        status_text="OK" if status_code < 400 else "ERROR",
+        raw_body=json.dumps(body),
+    )
+
+
+class StubHTTPClient(HTTPClient):
+    """HTTP client which replies with canned responses in order."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        self.requests.append((method, url))
+        return build_response(method, url, self.replies.pop(0))
+
+
+class StubAsyncHTTPClient(AsyncHTTPClient):
+    """Asyncio HTTP client which replies with canned responses in order."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.closed = False
+
+    async def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        self.requests.append((method, url))
+        await asyncio.sleep(0)
+        return build_response(method, url, self.replies.pop(0))
+
+    async def close(self):
+        self.closed = True
+
+
+def build_stub_connection(replies, metadata_cache_ttl=60):
+    """Return a connection which talks to a stub HTTP client.
+
+    :param replies: Canned replies of the stub HTTP client.
+    :type replies: list
+    :return: Connection.
+    :rtype: c8.connection.Connection
+    """
+    return Connection(
+        url="https://test.macrometa.io",
+        email="",
+        password="",
+        token=None,
+        apikey="key",
+        http_client=StubHTTPClient(replies),
+        skip_tenant=True,
+        metadata_cache=MetadataCache(metadata_cache_ttl),
+    )
@@ -0,0 +1,54 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+
+import pytest
+
+from c8.connection import AsyncConnection
+from c8.cursor import AsyncCursor
+from c8.fabric import AsyncioFabric
+from tests.helpers import StubAsyncHTTPClient, build_stub_connection
+
+
+def build_fabric(replies):
+    http_client = StubAsyncHTTPClient(replies)
+    conn = AsyncConnection(build_stub_connection([]), http_client)
+    return AsyncioFabric(conn), http_client
+
+
+@pytest.mark.vcr
+def test_asyncio_fabric_fan_out():
+    fabric, http_client = build_fabric([{"result": [{"name": "col"}]}] * 3)
+    assert fabric.context == "asyncio"
+    assert fabric.key_value.context == "asyncio"
+
+    async def run():
+        async with fabric:
+            return await asyncio.gather(
+                *[fabric.key_value.get_collections() for _ in range(3)]
+            )
+
+    assert asyncio.run(run()) == [[{"name": "col"}]] * 3
+    assert http_client.closed is True
+    assert (
+        http_client.requests
+        == [("get", "https://test.macrometa.io/_fabric/_system/_api/kv")] * 3
+    )
+
+
+@pytest.mark.vcr
+def test_asyncio_cursor():
+    fabric, http_client = build_fabric(
+        [
+            {"id": "1", "result": [1, 2], "hasMore": True},
+            {"id": "1", "result": [3], "hasMore": False},
+        ]
+    )
+
+    async def run():
+        cursor = await fabric.c8ql.execute("FOR i IN 1..3 RETURN i", batch_size=2)
+        assert isinstance(cursor, AsyncCursor)
+        return [item async for item in cursor]
+
+    assert asyncio.run(run()) == [1, 2, 3]
+    assert http_client.requests[-1][0] == "put"
@@ -0,0 +1,177 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import threading
+
+import pytest
+
+from c8.codec import StdlibJSONCodec
+from c8.collection import StandardCollection
+from c8.exceptions import DocumentParseError
+from c8.executor import DefaultExecutor
+from c8.http import HTTPClient
+from tests.helpers import assert_raises, build_response, build_stub_connection
+
+
+class IngestServer(HTTPClient):
+    """HTTP client emulating the import and document APIs.
+
+    Documents with a "bad" field are rejected, and chunks holding a document
+    with a "reject" field fail as a whole.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            body = json.loads(data)
+            docs = body["data"] if "/import/" in url else body
+            with self.lock:
+                self.chunks.append((url, body, params))
+            if any("reject" in doc for doc in docs):
+                return build_response(
+                    method,
+                    url,
+                    (400, {"error": True, "errorNum": 600, "errorMessage": "bad"}),
+                )
+            if "/import/" in url:
+                bad = [i for i, doc in enumerate(docs) if "bad" in doc]
+                return build_response(
+                    method,
+                    url,
+                    {
+                        "created": len(docs) - len(bad),
+                        "errors": len(bad),
+                        "empty": 0,
+                        "updated": 0,
+                        "ignored": 0,
+                        "details": [
+                            "at position {}: invalid document".format(i) for i in bad
+                        ],
+                    },
+                )
+            return build_response(
+                method,
+                url,
+                (
+                    202,
+                    [
+                        {"error": True, "errorNum": 1210, "errorMessage": "conflict"}
+                        if "bad" in doc
+                        else {"_id": "col/{}".format(i), "_key": str(i)}
+                        for i, doc in enumerate(docs)
+                    ],
+                ),
+            )
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def build_collection(server):
+    conn = build_stub_connection([])
+    conn._http_client = server
+    return StandardCollection(conn, DefaultExecutor(conn), "col")
+
+
+@pytest.mark.vcr
+def test_bulk_import_chunks():
+    server = IngestServer()
+    progress = []
+    docs = ({"_id": "col/{}".format(i)} if i == 3 else {"v": i} for i in range(25))
+    result = build_collection(server).bulk_import(
+        docs, chunk_size=10, concurrency=2, primary_key="v", progress=progress.append
+    )
+    assert result["created"] == 25
+    assert result["errors"] == 0
+    assert result["details"] == []
+    assert result["stats"]["documents"] == 25
+    assert result["stats"]["chunks"] == 3
+    assert server.max_active <= 2
+    assert [p["documents"] for p in progress][-1] == 25
+
+    sizes = sorted(len(body["data"]) for _, body, _ in server.chunks)
+    assert sizes == [5, 10, 10]
+    for _, body, _ in server.chunks:
+        assert body["details"] is True
+        assert body["primaryKey"] == "v"
+    first = [body for _, body, _ in server.chunks if body["data"][0].get("v") == 0]
+    assert first[0]["data"][3] == {"_id": "col/3", "_key": "3"}
+
+
+@pytest.mark.vcr
+def test_bulk_import_chunk_bytes():
+    server = IngestServer()
+    docs = [{"v": "x" * 100} for _ in range(10)]
+    result = build_collection(server).bulk_import(docs, chunk_bytes=250)
+    assert result["created"] == 10
+    assert [len(body["data"]) for _, body, _ in server.chunks] == [2] * 5
+
+
+class UnicodeJSONCodec(StdlibJSONCodec):
+    """JSON codec keeping non-ASCII characters."""
+
+    def encode(self, obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.mark.vcr
+def test_bulk_import_json_codec():
+    server = IngestServer()
+    collection = build_collection(server)
+    collection._conn._codec = UnicodeJSONCodec()
+    docs = [{"v": "\u00e9" * 50} for _ in range(10)]
+    # Chunks are serialized by the codec of the connection, and their size is
+    # counted in bytes.
+    result = collection.bulk_import(docs, chunk_bytes=250)
+    assert result["created"] == 10
+    assert result["stats"]["bytes"] == 10 * (len('{"v": ""}') + 100 + 1)
+    assert [len(body["data"]) for _, body, _ in server.chunks] == [2] * 5
+    assert server.chunks[0][1]["data"][0] == docs[0]
+
+
+@pytest.mark.vcr
+def test_bulk_import_errors():
+    server = IngestServer()
+    docs = [{"v": i} for i in range(20)]
+    docs[4]["bad"] = True
+    docs[13]["bad"] = True
+    docs[17]["reject"] = True
+    result = build_collection(server).bulk_import(docs, chunk_size=5, concurrency=3)
+    assert result["created"] == 13
+    assert result["errors"] == 7
+    assert [d["index"] for d in result["details"]] == [4, 13, 15, 16, 17, 18, 19]
+    assert result["details"][0]["message"] == "at position 4: invalid document"
+    assert result["details"][2]["message"] == "[HTTP 400][ERR 600] bad"
+
+    with assert_raises(DocumentParseError):
+        build_collection(IngestServer()).bulk_import([{"v": 1}, "invalid"])
+
+
+@pytest.mark.vcr
+def test_bulk_import_insert_method():
+    server = IngestServer()
+    docs = [{"v": i} for i in range(7)]
+    docs[5]["bad"] = True
+    result = build_collection(server).bulk_import(
+        iter(docs), method="insert", chunk_size=3, sync=True
+    )
+    assert result["created"] == 6
+    assert result["errors"] == 1
+    assert result["details"] == [{"index": 5, "message": "conflict"}]
+    for url, body, params in server.chunks:
+        assert url.endswith("/_api/document/col")
+        assert params["waitForSync"] == 1
+        assert isinstance(body, list)
+
+    with assert_raises(ValueError):
+        build_collection(server).bulk_import(docs, method="replace")
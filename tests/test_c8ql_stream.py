@@ -0,0 +1,79 @@
+from __future__ import absolute_import, unicode_literals
+
+import pytest
+
+from c8.exceptions import C8QLGetAllBatchesError
+from c8.fabric import StandardFabric
+from tests.helpers import assert_raises, build_stub_connection
+
+
+def build_c8ql(replies):
+    conn = build_stub_connection(replies)
+    return StandardFabric(conn).c8ql, conn._http_client
+
+
+def cursor_reply(docs, has_more):
+    return {"id": "1", "result": docs, "hasMore": has_more}
+
+
+@pytest.mark.vcr
+def test_stream_batches():
+    c8ql, http_client = build_c8ql(
+        [
+            cursor_reply([{"_key": "1", "_rev": "a", "v": 1}], True),
+            cursor_reply([{"_key": "2", "_rev": "b", "v": 2}], False),
+        ]
+    )
+    batches = c8ql.stream_batches("FOR d IN col RETURN d", batch_size=1)
+    # The query runs when the first batch is requested.
+    assert http_client.requests == []
+    assert next(batches) == [{"_key": "1", "v": 1}]
+    # The next batch is only fetched when the consumer asks for it.
+    assert len(http_client.requests) == 1
+    assert list(batches) == [[{"_key": "2", "v": 2}]]
+    assert [method for method, _ in http_client.requests] == ["post", "put"]
+
+
+@pytest.mark.vcr
+def test_stream_documents_closes_cursor():
+    c8ql, http_client = build_c8ql(
+        [
+            cursor_reply([{"_key": "1", "_id": "col/1"}, {"_key": "2"}], True),
+            {"error": False},
+        ]
+    )
+    docs = c8ql.stream_documents("FOR d IN col RETURN d", batch_size=2)
+    assert next(docs) == {"_key": "1"}
+    docs.close()
+    assert http_client.requests[-1] == (
+        "delete",
+        "https://test.macrometa.io/_fabric/_system/_api/cursor/1",
+    )
+
+
+@pytest.mark.vcr
+def test_stream_documents_never_iterated():
+    c8ql, http_client = build_c8ql([])
+    docs = c8ql.stream_documents("FOR d IN col RETURN d")
+    docs.close()
+    del docs
+    assert http_client.requests == []
+
+
+@pytest.mark.vcr
+def test_stream_documents_read_only():
+    c8ql, http_client = build_c8ql([])
+    with assert_raises(C8QLGetAllBatchesError):
+        c8ql.stream_documents("FOR d IN col REMOVE d IN col")
+    assert http_client.requests == []
+
+
+@pytest.mark.vcr
+def test_get_all_batches():
+    c8ql, _ = build_c8ql(
+        [cursor_reply([{"_key": "1"}], True), cursor_reply([{"_key": "2"}], False)]
+    )
+    assert c8ql.get_all_batches("FOR d IN col RETURN d") == [
+        {"_key": "1"},
+        {"_key": "2"},
+    ]
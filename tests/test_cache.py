@@ -0,0 +1,106 @@
+from __future__ import absolute_import, unicode_literals
+
+import pytest
+
+from c8.cache import MetadataCache
+from c8.client import C8Client
+from c8.fabric import StandardFabric
+from tests.helpers import StubHTTPClient, build_stub_connection
+
+
+def collection_info(name):
+    return {
+        "id": "1",
+        "name": name,
+        "isSystem": False,
+        "isSpot": False,
+        "type": 2,
+        "status": 3,
+        "collectionModel": "DOCUMENT",
+    }
+
+
+def build_fabric(replies, ttl=60):
+    conn = build_stub_connection(replies, metadata_cache_ttl=ttl)
+    return StandardFabric(conn), conn._http_client
+
+
+@pytest.mark.vcr
+def test_metadata_cache_lookup():
+    cache = MetadataCache(ttl=60)
+    assert cache.contains("_system", "collections", "foo") is False
+
+    cache.update("_system", "collections", ["foo"])
+    assert cache.contains("_system", "collections", "foo") is True
+    assert cache.contains("other", "collections", "foo") is False
+
+    cache.add("_system", "collections", "bar")
+    cache.discard("_system", "collections", "foo")
+    assert cache.contains("_system", "collections", "bar") is True
+    assert cache.contains("_system", "collections", "foo") is False
+
+    cache.update("_system", "streams", ["s"], scope=True)
+    cache.invalidate("_system", "streams")
+    assert cache.contains("_system", "streams", "s", scope=True) is False
+    assert cache.stats() == {"hits": 2, "misses": 4, "entries": 1, "ttl": 60}
+
+
+@pytest.mark.vcr
+def test_metadata_cache_expiry_and_disabled():
+    cache = MetadataCache(ttl=-1)
+    cache.update("_system", "graphs", ["g"])
+    assert cache.contains("_system", "graphs", "g") is False
+    assert cache.stats()["entries"] == 0
+
+    cache = MetadataCache(ttl=0)
+    assert cache.enabled is False
+    cache.update("_system", "graphs", ["g"])
+    assert cache.contains("_system", "graphs", "g") is False
+
+
+@pytest.mark.vcr
+def test_fabric_collection_uses_cache():
+    fabric, http_client = build_fabric(
+        [{"result": [collection_info("foo")]}, {"result": [collection_info("foo")]}]
+    )
+    for _ in range(3):
+        assert fabric.collection("foo").name == "foo"
+    assert len(http_client.requests) == 1
+
+    # Unknown names always trigger a fresh listing.
+    assert fabric.has_collection("bar") is False
+    assert len(http_client.requests) == 2
+    assert fabric._conn.metadata_cache.stats()["hits"] == 2
+
+
+@pytest.mark.vcr
+def test_fabric_collection_without_cache():
+    fabric, http_client = build_fabric(
+        [{"result": [collection_info("foo")]}, {"result": [collection_info("foo")]}],
+        ttl=None,
+    )
+    fabric.collection("foo")
+    fabric.collection("foo")
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.vcr
+def test_tenants_do_not_share_cache():
+    http_client = StubHTTPClient(
+        [{"result": [collection_info("foo")]}, {"result": [collection_info("bar")]}]
+    )
+    client = C8Client(
+        host="test.macrometa.io",
+        port=443,
+        apikey="key",
+        skip_tenant=True,
+        http_client=http_client,
+    )
+    # Both tenants have a _system fabric, with different collections.
+    first = client.tenant(apikey="key1", skip_tenant=True).useFabric("_system")
+    second = client.tenant(apikey="key2", skip_tenant=True).useFabric("_system")
+    assert first.has_collection("foo") is True
+    assert second.has_collection("foo") is False
+    assert len(http_client.requests) == 2
+    assert first._conn.metadata_cache is not second._conn.metadata_cache
+    assert client.metadata_cache is client._fabric._conn.metadata_cache
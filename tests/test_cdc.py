@@ -0,0 +1,160 @@
+from __future__ import absolute_import, unicode_literals
+
+import base64
+import json
+
+import pytest
+import websocket
+
+from c8.cdc import ChangeFeed, FileCheckpointStore, KVCheckpointStore
+from c8.exceptions import GetValueError
+from c8.fabric import StandardFabric
+from tests.helpers import assert_raises, build_stub_connection
+
+
+class Streams(object):
+    """Stream API wrapper emulating a collection stream."""
+
+    header = {"Authorization": "bearer x"}
+
+    def __init__(self):
+        self.urls = []
+
+    def _consumer_url(self, stream, isCollectionStream, local, subscription, *args):
+        self.urls.append((stream, isCollectionStream, local, subscription, args[0]))
+        return "wss://test/consumer/{}/{}".format(stream, subscription)
+
+    def get_stream_stats(self, stream, isCollectionStream=False, local=False):
+        return {"subscriptions": {"feed": {"msgBacklog": 12}}}
+
+
+class ChangeSocket(object):
+    """Websocket delivering changes, then timing out."""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.acks = []
+        self.closed = False
+
+    def recv(self):
+        if not self.changes:
+            raise websocket.WebSocketTimeoutException("timed out")
+        return self.changes.pop(0)
+
+    def send(self, data):
+        self.acks.append(json.loads(data)["messageId"])
+
+    def close(self):
+        self.closed = True
+
+
+def build_change(index):
+    payload = json.dumps({"_key": str(index), "value": index}).encode()
+    return json.dumps(
+        {
+            "messageId": "id-{}".format(index),
+            "payload": base64.b64encode(payload).decode(),
+        }
+    )
+
+
+def build_feed(socket, handler, **kwargs):
+    def connect(url, header=None, timeout=None):
+        assert header == {"Authorization": "bearer x"}
+        return socket
+
+    streams = Streams()
+    feed = ChangeFeed(streams, "orders", "feed", handler, connect=connect, **kwargs)
+    return feed, streams
+
+
+@pytest.mark.vcr
+def test_change_feed_checkpoints(tmp_path):
+    store = FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+    changes = []
+    socket = ChangeSocket([build_change(i) for i in range(10)])
+    feed, streams = build_feed(
+        socket, changes.append, checkpoint_store=store, checkpoint_every=4
+    )
+    assert feed.run(max_changes=10) == 10
+    assert streams.urls == [("orders", True, True, "feed", "Failover")]
+    assert [change["payload"]["value"] for change in changes] == list(range(10))
+    # Changes are acknowledged once checkpointed.
+    assert socket.acks == ["id-{}".format(i) for i in range(10)]
+    assert socket.closed is True
+    checkpoint = store.load("feed")
+    assert checkpoint["message_id"] == "id-9"
+    assert checkpoint["message_ids"] == ["id-8", "id-9"]
+    assert checkpoint["processed"] == 10
+    assert feed.checkpoint == checkpoint
+    stats = feed.stats()
+    assert stats["processed"] == 10
+    assert stats["checkpoints"] == 3
+    assert stats["uncommitted"] == 0
+    assert feed.backlog() == 12
+
+    # Changes checkpointed but not acknowledged before a restart are
+    # skipped when they are redelivered.
+    changes = []
+    socket = ChangeSocket([build_change(i) for i in range(8, 12)])
+    feed, _ = build_feed(socket, changes.append, checkpoint_store=store)
+    assert feed.run(idle_timeout=0) == 2
+    assert [change["messageId"] for change in changes] == ["id-10", "id-11"]
+    assert socket.acks == ["id-8", "id-9", "id-10", "id-11"]
+    assert feed.stats()["skipped"] == 2
+    assert store.load("feed")["processed"] == 12
+
+
+@pytest.mark.vcr
+def test_change_feed_hooks():
+    socket = ChangeSocket([build_change(i) for i in range(3)])
+    feed, _ = build_feed(socket, lambda change: None)
+    # Without a checkpoint store, changes are acknowledged right away.
+    assert feed.run(idle_timeout=0) == 3
+    assert socket.acks == ["id-0", "id-1", "id-2"]
+    assert feed.checkpoint is None
+
+    class Store(object):
+        saved = []
+
+        def load(self, subscription):
+            return None
+
+        def save(self, subscription, checkpoint):
+            self.saved.append(checkpoint)
+
+    def fail(checkpoint):
+        raise ValueError(checkpoint)
+
+    socket = ChangeSocket([build_change(i) for i in range(3)])
+    feed, _ = build_feed(
+        socket, lambda change: None, checkpoint_store=Store(), on_checkpoint=fail
+    )
+    with assert_raises(ValueError):
+        feed.run(idle_timeout=0)
+    # Nothing is saved nor acknowledged if the hook fails.
+    assert Store.saved == []
+    assert socket.acks == []
+    assert socket.closed is True
+
+
+@pytest.mark.vcr
+def test_kv_checkpoint_store():
+    conn = build_stub_connection(
+        [
+            (404, {"error": True, "errorMessage": "not found", "code": 404}),
+            [{"_key": "feed"}],
+            {"_key": "feed", "value": json.dumps({"message_id": "id-1"})},
+            (500, {"error": True, "errorMessage": "failed", "code": 500}),
+        ]
+    )
+    store = KVCheckpointStore(StandardFabric(conn).key_value, "checkpoints")
+    assert store.load("feed") is None
+    store.save("feed", {"message_id": "id-1"})
+    assert store.load("feed") == {"message_id": "id-1"}
+    with assert_raises(GetValueError):
+        store.load("feed")
+    assert conn._http_client.requests[1] == (
+        "put",
+        "https://test.macrometa.io/_fabric/_system/_api/kv/checkpoints/value",
+    )
@@ -0,0 +1,118 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+
+import pytest
+
+from c8.codec import (
+    OrjsonCodec,
+    StdlibJSONCodec,
+    UjsonCodec,
+    default_codec,
+    get_codec,
+    orjson,
+    ujson,
+)
+from c8.request import Request
+from c8.response import Response
+from tests.helpers import assert_raises, build_stub_connection
+
+DOCUMENT = {"_key": "k", "name": "Zoë", "tags": ["a", 1, 2.5, True, None]}
+
+
+def available_codecs():
+    codecs = [StdlibJSONCodec()]
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    if ujson is not None:
+        codecs.append(UjsonCodec())
+    return codecs
+
+
+@pytest.mark.vcr
+def test_codec_round_trip():
+    for codec in available_codecs():
+        encoded = codec.encode(DOCUMENT)
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded.decode("utf-8")) == DOCUMENT
+        assert codec.decode(encoded) == DOCUMENT
+        assert codec.decode(encoded.decode("utf-8")) == DOCUMENT
+        with assert_raises(ValueError):
+            codec.decode(b"invalid")
+
+
+@pytest.mark.vcr
+def test_get_codec():
+    assert get_codec() is default_codec()
+    assert isinstance(get_codec("json"), StdlibJSONCodec)
+    codec = StdlibJSONCodec()
+    assert get_codec(codec) is codec
+    with assert_raises(ValueError):
+        get_codec("yaml")
+    if orjson is not None:
+        assert isinstance(default_codec(), OrjsonCodec)
+
+
+@pytest.mark.vcr
+@pytest.mark.skipif(orjson is None, reason="requires orjson")
+def test_orjson_codec_fallback():
+    codec = OrjsonCodec()
+    big = {"n": 2**70}
+    assert codec.decode(codec.encode(big)) == big
+    assert codec.encode({1: "a"}) == b'{"1":"a"}'
+
+
+@pytest.mark.vcr
+def test_request_encode():
+    codec = StdlibJSONCodec()
+    request = Request(method="post", endpoint="/_api/test", data=DOCUMENT)
+    assert request.encode(codec) == codec.encode(DOCUMENT)
+    assert json.loads(request.data) == DOCUMENT
+
+    request = Request(method="post", endpoint="/_api/test", data="[1]")
+    assert request.encode(codec) == b"[1]"
+    assert Request(method="get", endpoint="/_api/test").encode(codec) is None
+
+    request.data = {"a": 1}
+    assert request.data == '{"a": 1}'
+
+
+@pytest.mark.vcr
+def test_response_bytes():
+    for codec in available_codecs():
+        resp = Response(
+            method="get",
+            url="test_url",
+            headers={},
+            status_code=404,
+            status_text="Not Found",
+            raw_body='{"errorNum": 1203, "errorMessage": "é"}'.encode("utf-8"),
+            codec=codec,
+        )
+        assert resp.body == {"errorNum": 1203, "errorMessage": "é"}
+        assert resp.error_code == 1203
+        assert resp.raw_body == '{"errorNum": 1203, "errorMessage": "é"}'
+        assert resp.is_success is False
+
+    resp = Response("get", "test_url", {}, 200, "OK", b"<html>")
+    assert resp.body == resp.raw_body == "<html>"
+    resp = Response("get", "test_url", {}, 200, "OK", {"error": True})
+    assert resp.body == resp.raw_body == {"error": True}
+
+
+@pytest.mark.vcr
+def test_connection_sends_encoded_payload():
+    conn = build_stub_connection([{"result": True}])
+    conn._codec = StdlibJSONCodec()
+    sent = []
+    send_request = conn._http_client.send_request
+
+    def record(method, url, params=None, data=None, headers=None, auth=None):
+        sent.append(data)
+        return send_request(method, url, params, data, headers, auth)
+
+    conn._http_client.send_request = record
+    request = Request(method="post", endpoint="/test", data={"a": [1, 2]})
+    assert conn.send_request(request).body == {"result": True}
+    assert sent == [b'{"a":[1,2]}']
+    assert conn.json_codec is conn._codec
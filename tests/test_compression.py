@@ -0,0 +1,150 @@
+from __future__ import absolute_import, unicode_literals
+
+import gzip
+import json
+import zlib
+
+import pytest
+
+from c8.collection import StandardCollection
+from c8.compression import CompressionPolicy
+from c8.connection import Connection
+from c8.executor import DefaultExecutor
+from c8.http import HTTPClient
+from c8.request import Request
+from c8.response import Response
+from tests.helpers import assert_raises
+
+DOCUMENTS = [{"_key": str(i), "name": "student", "grade": i % 5} for i in range(200)]
+
+
+class RecordingHTTPClient(HTTPClient):
+    """HTTP client recording the payloads and headers it sends, and replying
+    with gzip compressed bodies it does not decompress."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        self.sent.append((data, dict(headers)))
+        body = gzip.compress(json.dumps([{"_id": "students/1"}]).encode())
+        return Response(
+            method=method,
+            url=url,
+            headers={"Content-Encoding": "gzip", "Content-Length": str(len(body))},
+            status_code=201,
+            status_text="Created",
+            raw_body=body,
+        )
+
+
+def build_connection(compression):
+    return Connection(
+        url="https://test.macrometa.io",
+        email="",
+        password="",
+        token=None,
+        apikey="key",
+        http_client=RecordingHTTPClient(),
+        skip_tenant=True,
+        compression=compression,
+    )
+
+
+@pytest.mark.vcr
+def test_compression_policy_encode():
+    policy = CompressionPolicy("gzip", min_size=100)
+    headers = {}
+    assert policy.encode(b"[1]", headers) == b"[1]"
+    assert headers == {"Accept-Encoding": "gzip, deflate"}
+
+    payload = json.dumps(DOCUMENTS).encode()
+    headers = {}
+    data = policy.encode(payload, headers)
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(data) == payload
+
+    # Single requests override the policy.
+    headers = {}
+    assert policy.encode(payload, headers, compress=False) == payload
+    assert "Content-Encoding" not in headers
+    assert zlib.decompress(policy.encode(b"[1]", {}, compress="deflate")) == b"[1]"
+    assert gzip.decompress(policy.encode(b"[1]", {}, compress=True)) == b"[1]"
+    with assert_raises(ValueError):
+        policy.encode(payload, {}, compress="br")
+    with assert_raises(ValueError):
+        CompressionPolicy("br")
+
+    stats = policy.stats()
+    assert stats["requests"] == 5
+    assert stats["requests_compressed"] == 3
+    assert stats["request_bytes"] == 2 * len(payload) + 9
+    assert stats["request_ratio"] > 1
+
+    # No compression, and no Accept-Encoding header.
+    policy = CompressionPolicy(accept_encoding=None)
+    headers = {}
+    assert policy.encode(payload, headers) == payload
+    assert headers == {}
+    assert policy.stats()["request_ratio"] == 1.0
+
+
+@pytest.mark.vcr
+def test_compression_policy_decode():
+    policy = CompressionPolicy()
+    body = json.dumps(DOCUMENTS).encode()
+    compressed = gzip.compress(body)
+    headers = {"Content-Encoding": "gzip", "Content-Length": str(len(compressed))}
+
+    # Bodies left compressed by the HTTP client are decompressed...
+    resp = Response("get", "url", headers, 200, "OK", compressed)
+    assert policy.decode(resp).body == DOCUMENTS
+    # ... and bodies it decompressed are left alone.
+    resp = Response("get", "url", headers, 200, "OK", body)
+    assert policy.decode(resp).body == DOCUMENTS
+    resp = Response("get", "url", {"Content-Encoding": "deflate"}, 200, "OK", b"")
+    policy.decode(resp)
+    resp = Response("get", "url", {}, 200, "OK", "[1]")
+    assert policy.decode(resp).body == [1]
+
+    stats = policy.stats()
+    assert stats["responses"] == 4
+    assert stats["responses_compressed"] == 3
+    assert stats["response_bytes"] == 2 * len(body) + 3
+    assert stats["response_bytes_received"] == 2 * len(compressed) + 3
+    assert stats["response_ratio"] > 1
+
+
+@pytest.mark.vcr
+def test_connection_compression():
+    policy = CompressionPolicy("gzip", min_size=1024)
+    conn = build_connection(policy)
+    assert conn.compression is policy
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+
+    assert students.insert_many(DOCUMENTS) == [{"_id": "students/1"}]
+    data, headers = conn._http_client.sent[-1]
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Accept-Encoding"] == "gzip, deflate"
+    assert json.loads(gzip.decompress(data)) == DOCUMENTS
+
+    students.insert_many(DOCUMENTS[:2], compress="deflate")
+    data, headers = conn._http_client.sent[-1]
+    assert headers["Content-Encoding"] == "deflate"
+    assert json.loads(zlib.decompress(data)) == DOCUMENTS[:2]
+
+    conn.send_request(Request("post", "/document/students", data=DOCUMENTS))
+    conn.send_request(
+        Request("post", "/document/students", data=DOCUMENTS, compress=False)
+    )
+    data, headers = conn._http_client.sent[-1]
+    assert "Content-Encoding" not in headers
+    assert json.loads(data) == DOCUMENTS
+
+    stats = policy.stats()
+    assert stats["requests"] == 4
+    assert stats["requests_compressed"] == 3
+    assert stats["responses"] == 4
+    assert stats["responses_compressed"] == 4
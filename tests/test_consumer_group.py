@@ -0,0 +1,183 @@
+from __future__ import absolute_import, unicode_literals
+
+import base64
+import json
+import queue
+import threading
+import time
+
+import pytest
+import websocket
+
+from c8.consumer_group import ConsumerGroup
+
+
+class Streams(object):
+    """Stream API wrapper emulating a stream and its statistics."""
+
+    header = {"Authorization": "bearer x"}
+
+    def __init__(self):
+        self.lookups = 0
+
+    def _consumer_url(self, stream, *args):
+        self.lookups += 1
+        return "wss://test/consumer/{}?subscriptionType={}".format(stream, args[3])
+
+    def get_stream_stats(self, stream, isCollectionStream=False, local=False):
+        consumers = [{"consumerName": "sub-0", "unackedMessages": 3, "msgRateOut": 1}]
+        return {"subscriptions": {"sub": {"msgBacklog": 7, "consumers": consumers}}}
+
+    def get_stream_backlog(self, stream, local=False, isCollectionStream=False):
+        return {"messageBacklog": 7}
+
+
+class ConsumerSocket(object):
+    """Websocket delivering the messages of a shared queue."""
+
+    def __init__(self, messages, acks, timeout, fail_after=None):
+        self.messages = messages
+        self.acks = acks
+        self.timeout = timeout
+        self.fail_after = fail_after
+
+    def recv(self):
+        if self.fail_after is not None:
+            if self.fail_after == 0:
+                raise websocket.WebSocketConnectionClosedException("closed")
+            self.fail_after -= 1
+        try:
+            return self.messages.get(timeout=self.timeout)
+        except queue.Empty:
+            raise websocket.WebSocketTimeoutException("timed out")
+
+    def send(self, data):
+        self.acks.put(json.loads(data))
+
+    def close(self):
+        pass
+
+
+def build_message(index):
+    payload = base64.b64encode(str(index).encode()).decode()
+    return json.dumps({"messageId": "id-{}".format(index), "payload": payload})
+
+
+def fail_on_three(message):
+    if message["payload"] == b"3":
+        raise ValueError(message)
+
+
+class ReplayingSocket(object):
+    """Websocket delivering 5 messages, then timing out."""
+
+    def __init__(self, url, header=None, timeout=None):
+        self.messages = [build_message(index) for index in range(5)]
+        self.timeout = timeout
+
+    def recv(self):
+        if not self.messages:
+            time.sleep(self.timeout)
+            raise websocket.WebSocketTimeoutException("timed out")
+        return self.messages.pop(0)
+
+    def send(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.vcr
+def test_consumer_group_threads():
+    messages, acks = queue.Queue(), queue.Queue()
+    urls = []
+    lock = threading.Lock()
+
+    def connect(url, header=None, timeout=None):
+        assert header == {"Authorization": "bearer x"}
+        with lock:
+            urls.append(url)
+            # The first connection breaks after a message.
+            fail_after = 1 if len(urls) == 1 else None
+        return ConsumerSocket(messages, acks, timeout, fail_after)
+
+    streams = Streams()
+    group = ConsumerGroup(
+        streams,
+        "stream",
+        "sub",
+        fail_on_three,
+        workers=3,
+        check_interval=0.05,
+        connect=connect,
+    )
+    assert streams.lookups == 1
+    with group:
+        for index in range(20):
+            messages.put(build_message(index))
+        # Corrupt messages are negatively acknowledged, or skipped if their id
+        # cannot be read, without stopping the worker.
+        messages.put(json.dumps({"messageId": "id-corrupt", "payload": "a"}))
+        messages.put("{")
+        received = [acks.get(timeout=5) for _ in range(21)]
+        deadline = time.monotonic() + 5
+        while sum(s["restarts"] for s in group.stats().values()) == 0:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    assert sorted(ack["messageId"] for ack in received) == sorted(
+        ["id-{}".format(index) for index in range(20)] + ["id-corrupt"]
+    )
+    assert sorted(ack["messageId"] for ack in received if "type" in ack) == [
+        "id-3",
+        "id-corrupt",
+    ]
+    assert sorted(set(urls)) == [
+        "wss://test/consumer/stream?subscriptionType=Shared&consumerName=sub-{}".format(
+            index
+        )
+        for index in range(3)
+    ]
+    stats = group.stats()
+    assert sum(s["processed"] for s in stats.values()) == 19
+    assert sum(s["failed"] for s in stats.values()) == 2
+    assert sum(s["restarts"] for s in stats.values()) == 1
+    errors = [s["last_error"] for s in stats.values() if s["last_error"]]
+    assert [type(error) for error in errors] == [
+        websocket.WebSocketConnectionClosedException
+    ]
+    assert not any(s["alive"] for s in stats.values())
+
+    assert group.lag() == {
+        "backlog": {"messageBacklog": 7},
+        "subscription_backlog": 7,
+        "workers": {
+            "sub-0": {"unacked": 3, "msg_rate_out": 1},
+            "sub-1": {"unacked": None, "msg_rate_out": None},
+            "sub-2": {"unacked": None, "msg_rate_out": None},
+        },
+    }
+
+
+@pytest.mark.vcr
+def test_consumer_group_processes():
+    group = ConsumerGroup(
+        Streams(),
+        "stream",
+        "sub",
+        fail_on_three,
+        workers=2,
+        processes=True,
+        check_interval=0.05,
+        connect=ReplayingSocket,
+    )
+    group.start()
+    deadline = time.monotonic() + 10
+    while sum(s["processed"] for s in group.stats().values()) < 8:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    group.stop(5)
+    stats = group.stats()
+    assert [s["processed"] for s in stats.values()] == [4, 4]
+    assert [s["failed"] for s in stats.values()] == [1, 1]
@@ -0,0 +1,89 @@
+from __future__ import absolute_import, unicode_literals
+
+import threading
+
+import pytest
+
+from c8.cursor import Cursor
+from c8.exceptions import CursorNextError
+from tests.helpers import StubHTTPClient, assert_raises, build_stub_connection
+
+
+def cursor_reply(docs, has_more):
+    return {"id": "1", "result": docs, "hasMore": has_more}
+
+
+class BlockingHTTPClient(StubHTTPClient):
+    """Stub HTTP client which holds fetch requests until released."""
+
+    def __init__(self, replies):
+        super(BlockingHTTPClient, self).__init__(replies)
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        if method == "put":
+            self.fetching.set()
+            self.release.wait(5)
+        return super(BlockingHTTPClient, self).send_request(
+            method, url, params, data, headers, auth
+        )
+
+
+@pytest.mark.vcr
+def test_cursor_prefetch():
+    conn = build_stub_connection(
+        [
+            cursor_reply([2, 3], True),
+            cursor_reply([4, 5], True),
+            cursor_reply([6], False),
+        ]
+    )
+    cursor = Cursor(conn, cursor_reply([0, 1], True), prefetch=2)
+    assert list(cursor) == [0, 1, 2, 3, 4, 5, 6]
+    assert cursor.has_more() is False
+    assert [method for method, _ in conn._http_client.requests] == ["put"] * 3
+
+
+@pytest.mark.vcr
+def test_cursor_prefetch_error():
+    conn = build_stub_connection([(404, {"error": True, "errorNum": 1600})])
+    cursor = Cursor(conn, cursor_reply([0], True), prefetch=1)
+    assert cursor.next() == 0
+    with assert_raises(CursorNextError):
+        cursor.next()
+    with assert_raises(CursorNextError):
+        cursor.fetch()
+
+
+@pytest.mark.vcr
+def test_cursor_prefetch_close_in_flight():
+    http_client = BlockingHTTPClient([cursor_reply([1], True), {"error": False}])
+    conn = build_stub_connection([])
+    conn._http_client = http_client
+    cursor = Cursor(conn, cursor_reply([0], True), prefetch=1)
+    assert http_client.fetching.wait(5)
+
+    closer = threading.Thread(target=cursor.close)
+    closer.start()
+    closer.join(0.2)
+    # Close waits for the in-flight fetch before deleting the cursor.
+    assert closer.is_alive()
+    http_client.release.set()
+    closer.join(5)
+    assert not closer.is_alive()
+    assert [method for method, _ in http_client.requests] == ["put", "delete"]
+
+
+@pytest.mark.vcr
+def test_cursor_prefetch_close_exhausted():
+    conn = build_stub_connection(
+        [cursor_reply([1], False), (404, {"error": True, "errorNum": 1600})]
+    )
+    cursor = Cursor(conn, cursor_reply([0], True), prefetch=1)
+    assert cursor.next() == 0
+    cursor._prefetcher._thread.join(5)
+    # The server dropped the cursor after its last batch was prefetched.
+    assert cursor.close() is False
@@ -0,0 +1,119 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import threading
+
+import pytest
+
+from c8.collection import StandardCollection
+from c8.exceptions import C8QLQueryExecuteError
+from c8.executor import DefaultExecutor
+from c8.http import HTTPClient
+from tests.helpers import assert_raises, build_response, build_stub_connection
+
+
+class CursorServer(HTTPClient):
+    """HTTP client emulating the cursor API over an in-memory collection."""
+
+    def __init__(self, keys, fail_on=None):
+        self.keys = sorted(keys)
+        self.fail_on = fail_on
+        self.cursors = {}
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def _page(self, cursor_id):
+        docs, batch_size = self.cursors[cursor_id]
+        batch, rest = docs[:batch_size], docs[batch_size:]
+        self.cursors[cursor_id] = (rest, batch_size)
+        return {"id": cursor_id, "result": batch, "hasMore": bool(rest)}
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        with self.lock:
+            if method == "put":
+                return build_response(method, url, self._page(url.split("/")[-1]))
+            if method == "delete":
+                return build_response(method, url, {"error": False})
+
+            body = json.loads(data)
+            query, bind_vars = body["query"], body.get("bindVars", {})
+            self.queries.append(query)
+            if query.startswith("RETURN LENGTH"):
+                return build_response(
+                    method, url, {"result": [len(self.keys)], "hasMore": False}
+                )
+            if "LIMIT @offset, 1" in query:
+                key = self.keys[bind_vars["offset"]]
+                return build_response(method, url, {"result": [key], "hasMore": False})
+
+            lower = bind_vars.get("lower")
+            if self.fail_on is not None and lower == self.fail_on:
+                return build_response(
+                    method, url, (400, {"error": True, "errorNum": 1501})
+                )
+            docs = [
+                {"_key": key}
+                for key in self.keys
+                if (lower is None or key >= lower)
+                and ("upper" not in bind_vars or key < bind_vars["upper"])
+            ]
+            cursor_id = str(len(self.cursors) + 1)
+            self.cursors[cursor_id] = (docs, body["batchSize"])
+            return build_response(method, url, self._page(cursor_id))
+
+
+def build_collection(server):
+    conn = build_stub_connection([])
+    conn._http_client = server
+    return StandardCollection(conn, DefaultExecutor(conn), "col")
+
+
+KEYS = ["{:03d}".format(i) for i in range(50)]
+
+
+@pytest.mark.vcr
+def test_export_parallel_ordered():
+    server = CursorServer(KEYS)
+    progress = []
+    docs = build_collection(server).export_parallel(
+        partitions=4,
+        batch_size=3,
+        progress=lambda *args: progress.append(args),
+    )
+    assert [doc["_key"] for doc in docs] == KEYS
+    assert sum(1 for q in server.queries if "LIMIT @offset, 1" in q) == 3
+    assert sorted(p for p, _, done in progress if done) == [0, 1, 2, 3]
+    assert sum(count for _, count, done in progress if done) == len(KEYS)
+
+
+@pytest.mark.vcr
+def test_export_parallel_unordered():
+    server = CursorServer(KEYS)
+    docs = build_collection(server).export_parallel(
+        partitions=3, batch_size=4, ordered=False, max_pending_batches=1
+    )
+    assert sorted(doc["_key"] for doc in docs) == KEYS
+
+
+@pytest.mark.vcr
+def test_export_parallel_small_and_empty():
+    server = CursorServer(["a", "b"])
+    docs = build_collection(server).export_parallel(partitions=8)
+    assert [doc["_key"] for doc in docs] == ["a", "b"]
+
+    server = CursorServer([])
+    assert list(build_collection(server).export_parallel()) == []
+
+
+@pytest.mark.vcr
+def test_export_parallel_error_and_close():
+    server = CursorServer(KEYS, fail_on="025")
+    with assert_raises(C8QLQueryExecuteError):
+        list(build_collection(server).export_parallel(partitions=2))
+
+    server = CursorServer(KEYS)
+    docs = build_collection(server).export_parallel(partitions=2, batch_size=2)
+    assert next(docs)["_key"] == "000"
+    docs.close()
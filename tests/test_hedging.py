@@ -0,0 +1,192 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from c8.collection import StandardCollection
+from c8.connection import AsyncConnection, Connection
+from c8.exceptions import ServerConnectionError
+from c8.executor import DefaultExecutor
+from c8.hedging import HedgePolicy
+from c8.http import AsyncHTTPClient, HTTPClient
+from c8.keyvalue import KV
+from c8.redis.redis_commands import RedisCommands
+from c8.request import Request
+from c8.retry import NoRetryPolicy
+from tests.helpers import assert_raises, build_response
+
+
+class SlowHTTPClient(HTTPClient):
+    """HTTP client whose first reply is slow, or fails if **fail** is set."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.requests = []
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        with self.lock:
+            index = len(self.requests)
+            self.requests.append((method, url))
+            self.threads.append(threading.current_thread())
+        if index == 0:
+            time.sleep(0.3)
+        if self.fail:
+            raise ServerConnectionError("attempt {}".format(index), request_sent=False)
+        return build_response(method, url, {"attempt": index})
+
+
+class SlowAsyncHTTPClient(AsyncHTTPClient):
+    """Asyncio HTTP client whose first reply is slow."""
+
+    def __init__(self):
+        self.requests = []
+        self.cancelled = []
+
+    async def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        index = len(self.requests)
+        self.requests.append((method, url))
+        try:
+            await asyncio.sleep(0.3 if index == 0 else 0)
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        return build_response(method, url, {"attempt": index})
+
+    async def close(self):
+        pass
+
+
+def build_connection(hedge_policy, fail=False):
+    return Connection(
+        url="https://test.macrometa.io",
+        email="",
+        password="",
+        token=None,
+        apikey="key",
+        http_client=SlowHTTPClient(fail),
+        skip_tenant=True,
+        retry_policy=NoRetryPolicy(),
+        hedge_policy=hedge_policy,
+    )
+
+
+@pytest.mark.vcr
+def test_hedge_policy_delay():
+    policy = HedgePolicy(initial_delay=0.5, percentile=90, min_samples=10)
+    assert policy.delay() == 0.5
+    for latency in range(1, 101):
+        policy._observe(latency / 1000.0)
+    assert policy.delay() == 0.09
+    assert HedgePolicy(delay=0.2).delay() == 0.2
+    assert HedgePolicy(min_delay=0.5, min_samples=1).delay() == 0.05
+
+    assert policy.applies(None) is True
+    assert policy.applies(False) is False
+    assert HedgePolicy(enabled=False).applies(None) is False
+    assert HedgePolicy(enabled=False).applies(True) is True
+    with assert_raises(ValueError):
+        HedgePolicy(percentile=0)
+    with assert_raises(ValueError):
+        HedgePolicy(budget=-1)
+
+
+@pytest.mark.vcr
+def test_hedged_reads():
+    policy = HedgePolicy(enabled=False, delay=0.02, budget=1)
+    conn = build_connection(policy)
+    assert conn.hedge_policy is policy
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+
+    # Slow reads are hedged, and the first response wins.
+    assert students.get("1", hedge=True) == {"attempt": 1}
+    assert len(conn._http_client.requests) == 2
+    stats = policy.stats()
+    assert stats["requests"] == 1
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+    # Reads are not hedged unless asked to or enabled by the policy.
+    conn = build_connection(policy)
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+    assert students.get("1") == {"attempt": 0}
+    assert len(conn._http_client.requests) == 1
+
+    policy = HedgePolicy(delay=0.02, budget=1)
+    conn = build_connection(policy)
+    assert KV(conn, DefaultExecutor(conn)).get_value_for_key("kv", "1") == {
+        "attempt": 1
+    }
+    conn = build_connection(policy)
+    assert RedisCommands(conn).get("1", "cache") == {"attempt": 1}
+    conn = build_connection(policy)
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+    assert students.get("1", hedge=False) == {"attempt": 0}
+    # Writes are never hedged.
+    conn = build_connection(policy)
+    RedisCommands(conn).set("1", "a", "cache")
+    assert len(conn._http_client.requests) == 1
+
+    # The budget caps the number of hedges.
+    policy = HedgePolicy(delay=0.02, budget=0.5)
+    conn = build_connection(policy)
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+    assert students.get("1") == {"attempt": 0}
+    assert policy.stats()["throttled"] == 1
+    assert students.get("2") == {"attempt": 1}
+    assert policy.stats()["hedged"] == 0
+
+    # The error of the read is raised when both requests fail.
+    conn = build_connection(HedgePolicy(delay=0.02, budget=1), fail=True)
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+    with assert_raises(ServerConnectionError) as err:
+        students.get("1")
+    assert "attempt 0" in str(err.value)
+    policy.close()
+
+
+@pytest.mark.vcr
+def test_hedged_reads_without_free_thread():
+    policy = HedgePolicy(delay=0.02, budget=1, max_workers=2)
+    conn = build_connection(policy)
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+
+    # The latency is measured from when the read is sent.
+    assert students.get("1") == {"attempt": 1}
+    time.sleep(0.4)
+    assert 0.3 <= policy._latencies[0] < 0.4
+
+    # Reads are sent on the calling thread, and not hedged, when no thread is
+    # free.
+    conn = build_connection(policy)
+    students = StandardCollection(conn, DefaultExecutor(conn), "students")
+    for _ in range(2):
+        policy._workers.acquire()
+    assert students.get("1") == {"attempt": 0}
+    assert conn._http_client.threads == [threading.current_thread()]
+    assert policy.stats()["hedged"] == 1
+    for _ in range(2):
+        policy._workers.release()
+    policy.close()
+
+
+@pytest.mark.vcr
+def test_hedged_reads_asyncio():
+    policy = HedgePolicy(delay=0.02, budget=1)
+    http_client = SlowAsyncHTTPClient()
+    conn = AsyncConnection(build_connection(policy), http_client)
+    request = Request(method="get", endpoint="/document/students/1", hedge=True)
+
+    resp = asyncio.run(conn.send_request(request))
+    assert resp.body == {"attempt": 1}
+    # The slow request is cancelled.
+    assert http_client.cancelled == [0]
+    assert policy.stats()["hedge_wins"] == 1
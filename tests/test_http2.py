@@ -0,0 +1,122 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from c8.exceptions import ServerConnectionError
+from c8.http import AsyncHTTP2Client, HTTP2Client, httpx
+from tests.helpers import assert_raises
+
+URL = "https://test.macrometa.io/_fabric/_system/_api/document/students"
+
+
+def handler(request):
+    if request.url.host == "down.macrometa.io":
+        raise httpx.ConnectError("refused", request=request)
+    body = {
+        "method": request.method,
+        "params": dict(request.url.params),
+        "headers": {k: v for k, v in request.headers.items() if k != "content-length"},
+        "data": request.content.decode(),
+    }
+    return httpx.Response(200, json=body)
+
+
+@pytest.mark.vcr
+@pytest.mark.skipif(httpx is not None, reason="requires httpx to be missing")
+def test_http2_client_requires_httpx():
+    with assert_raises(ImportError):
+        HTTP2Client()
+    with assert_raises(ImportError):
+        AsyncHTTP2Client()
+
+
+@pytest.mark.vcr
+@pytest.mark.skipif(httpx is None, reason="requires httpx")
+def test_http2_client():
+    http_client = HTTP2Client(
+        max_concurrent_streams=2, transport=httpx.MockTransport(handler)
+    )
+    resp = http_client.send_request(
+        "post",
+        URL,
+        params={"returnNew": 1, "silent": None},
+        data=b'{"_key": "1"}',
+        headers={"Connection": "keep-alive", "x-test": "1"},
+    )
+    assert resp.status_code == 200
+    assert resp.body["method"] == "POST"
+    assert resp.body["params"] == {"returnNew": "1"}
+    assert resp.body["data"] == '{"_key": "1"}'
+    # Connection-specific headers are forbidden in HTTP/2.
+    assert "connection" not in resp.body["headers"]
+    assert resp.body["headers"]["x-test"] == "1"
+
+    with assert_raises(ServerConnectionError) as err:
+        http_client.send_request("get", "https://down.macrometa.io/_api/version")
+    assert err.value.request_sent is False
+    http_client.close()
+
+
+class ConcurrencyHandler(object):
+    """Transport handler recording the peak number of requests in flight."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self, request):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.02)
+            return httpx.Response(200, json={})
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.mark.vcr
+@pytest.mark.skipif(httpx is None, reason="requires httpx")
+def test_http2_client_max_concurrent_streams():
+    handler = ConcurrencyHandler()
+    http_client = HTTP2Client(
+        max_concurrent_streams=2, transport=httpx.MockTransport(handler)
+    )
+    results = []
+
+    def send():
+        results.append(http_client.send_request("get", URL).status_code)
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [200] * 8
+    assert handler.peak <= 2
+    http_client.close()
+
+
+@pytest.mark.vcr
+@pytest.mark.skipif(httpx is None, reason="requires httpx")
+def test_async_http2_client():
+    async def main():
+        http_client = AsyncHTTP2Client(transport=httpx.MockTransport(handler))
+        responses = await asyncio.gather(
+            *[
+                http_client.send_request("put", URL, data=json.dumps({"i": i}))
+                for i in range(10)
+            ]
+        )
+        await http_client.close()
+        return responses
+
+    responses = asyncio.run(main())
+    assert [json.loads(resp.body["data"])["i"] for resp in responses] == list(range(10))
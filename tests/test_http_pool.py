@@ -0,0 +1,97 @@
+from __future__ import absolute_import, unicode_literals
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from c8.http import DefaultHTTPClient, socket_options
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"result": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/_api/version".format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.vcr
+def test_http_pool_stats(url):
+    http_client = DefaultHTTPClient(pool_maxsize=2)
+    for _ in range(3):
+        assert http_client.send_request("get", url).body == {"result": True}
+    stats = http_client.pool_stats()
+    assert stats["active"] == 0
+    assert stats["idle"] == 1
+    assert stats["created"] == 1
+    assert stats["reused"] == 2
+    assert stats["expired"] == 0
+    host = url.rsplit("/", 2)[0]
+    assert stats["hosts"] == {
+        host: {"idle": 1, "created": 1, "reused": 2, "expired": 0}
+    }
+
+    # Connections idle for longer than the idle timeout are not reused.
+    http_client = DefaultHTTPClient(idle_timeout=0)
+    for _ in range(3):
+        http_client.send_request("get", url)
+    stats = http_client.pool_stats()
+    assert stats["created"] == 3
+    assert stats["reused"] == 0
+    assert stats["expired"] == 2
+    http_client.close()
+    assert http_client.pool_stats()["idle"] == 0
+
+
+@pytest.mark.vcr
+def test_http_pool_concurrency(url):
+    http_client = DefaultHTTPClient(pool_maxsize=4, pool_block=True)
+    barrier = threading.Barrier(8)
+
+    def send():
+        barrier.wait()
+        for _ in range(10):
+            http_client.send_request("get", url)
+
+    threads = [threading.Thread(target=send) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = http_client.pool_stats()
+    # Blocking pools never open more than pool_maxsize connections.
+    assert stats["created"] <= 4
+    assert stats["created"] + stats["reused"] == 80
+    assert stats["active"] == 0
+
+
+@pytest.mark.vcr
+def test_socket_options():
+    nodelay = (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    keepalive = (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    assert socket_options() == [nodelay, keepalive]
+    assert socket_options(tcp_nodelay=False) == [keepalive]
+    options = socket_options(keepalive_idle=30, keepalive_interval=10)
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        assert (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30) in options
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        assert (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10) in options
@@ -0,0 +1,171 @@
+from __future__ import absolute_import, unicode_literals
+
+import gzip
+import json
+import os
+
+import pytest
+
+from c8.collection import StandardCollection
+from c8.exceptions import CollectionImportFromFileError
+from c8.executor import DefaultExecutor
+from c8.reader import DocumentFileReader, detect_format, infer_type
+from c8.utils import (
+    csv_reader,
+    get_documents_from_file,
+    group_csv_key_values,
+    json_reader,
+)
+from tests.helpers import StubHTTPClient, assert_raises, build_stub_connection
+
+FILES = os.path.join(os.path.dirname(__file__), "files")
+
+
+def write_file(tmpdir, name, content):
+    path = str(tmpdir.join(name))
+    opener = gzip.open if name.endswith(".gz") else open
+    with opener(path, "wt") as f:
+        f.write(content)
+    return path
+
+
+@pytest.mark.vcr
+def test_detect_format_and_infer_type():
+    assert detect_format("a.csv") == "csv"
+    assert detect_format("a.JSON") == "json"
+    assert detect_format("a.jsonl.gz") == "jsonl"
+    assert detect_format("a.ndjson") == "jsonl"
+    assert detect_format("a.txt") is None
+
+    assert infer_type("") is None
+    assert infer_type("true") is True
+    assert infer_type("false") is False
+    assert infer_type("-12") == -12
+    assert infer_type("0.5") == 0.5
+    assert infer_type("1.5e3") == 1500.0
+    assert infer_type("Stark") == "Stark"
+
+
+@pytest.mark.vcr
+def test_reader_json_matches_json_load():
+    path = os.path.join(FILES, "data.json")
+    with open(path) as f:
+        expected = json.load(f)
+    reader = DocumentFileReader(path, buffer_size=7)
+    assert list(reader) == expected
+    assert reader.position == reader.size
+
+
+@pytest.mark.vcr
+def test_reader_json_edge_cases(tmpdir):
+    big = {"v": "x" * 1000, "n": [1, 2, 3]}
+    path = write_file(tmpdir, "docs.json.gz", json.dumps([big, {"a": 1}, 12345]))
+    assert list(DocumentFileReader(path, buffer_size=16)) == [big, {"a": 1}, 12345]
+
+    path = write_file(tmpdir, "empty.json", " [ ] ")
+    assert list(DocumentFileReader(path)) == []
+
+    for content in ("", "{}", "[{}", "[{} {}]", "[{},]"):
+        path = write_file(tmpdir, "bad.json", content)
+        with assert_raises(CollectionImportFromFileError):
+            list(DocumentFileReader(path, buffer_size=2))
+
+    # Malformed documents are not read until the end of the file.
+    path = write_file(tmpdir, "bad.json", '[{"a": }' + " " * 100000 + "]")
+    reader = DocumentFileReader(path, buffer_size=16, max_document_size=100)
+    with assert_raises(CollectionImportFromFileError):
+        list(reader)
+    assert reader.position < 50000
+
+    # Byte order marks are skipped.
+    path = str(tmpdir.join("bom.json"))
+    with open(path, "w", encoding="utf-8-sig") as f:
+        f.write('[{"a": 1}]')
+    assert list(DocumentFileReader(path)) == [{"a": 1}]
+
+
+@pytest.mark.vcr
+def test_reader_csv_and_jsonl(tmpdir):
+    path = os.path.join(FILES, "data.csv")
+    docs = list(DocumentFileReader(path))
+    assert docs[1]["name"] == "Jaime"
+    assert docs[1]["age"] == "36"
+
+    docs = list(DocumentFileReader(path, coerce=True))
+    assert docs[0]["alive"] is False
+    assert docs[0]["age"] is None
+    assert docs[1]["age"] == 36
+
+    docs = list(DocumentFileReader(path, coerce={"age": len}))
+    assert docs[1]["age"] == 2
+
+    path = write_file(tmpdir, "docs.log", '{"a": 1}\n\n{"a": 2}\n')
+    assert list(DocumentFileReader(path, file_format="jsonl")) == [
+        {"a": 1},
+        {"a": 2},
+    ]
+    path = write_file(tmpdir, "bad.jsonl", '{"a": 1}\n{"a": \n')
+    with assert_raises(CollectionImportFromFileError) as err:
+        list(DocumentFileReader(path))
+    assert "line 2" in err.value.message
+
+    with assert_raises(CollectionImportFromFileError):
+        DocumentFileReader(os.path.join(FILES, "data"))
+
+    path = str(tmpdir.join("bom.csv"))
+    with open(path, "w", encoding="utf-8-sig") as f:
+        f.write("name,age\nJaime,36\n")
+    assert list(DocumentFileReader(path)) == [{"name": "Jaime", "age": "36"}]
+
+
+@pytest.mark.vcr
+def test_deprecated_file_helpers():
+    with pytest.warns(DeprecationWarning):
+        assert json_reader(os.path.join(FILES, "data.json")) == list(
+            DocumentFileReader(os.path.join(FILES, "data.json"))
+        )
+    with pytest.warns(DeprecationWarning):
+        rows = list(csv_reader(os.path.join(FILES, "data.csv")))
+    assert rows == list(DocumentFileReader(os.path.join(FILES, "data.csv")))
+
+    with pytest.warns(DeprecationWarning):
+        data = group_csv_key_values([{"a": "1", "b": "2"}, {"a": "3", "b": "4"}])
+    assert data == {"a": {0: "1", 1: "3"}, "b": {0: "2", 1: "4"}}
+    with pytest.warns(DeprecationWarning):
+        assert get_documents_from_file(data, 0) == (
+            [{"a": "1", "b": "2"}, {"a": "3", "b": "4"}],
+            2,
+        )
+
+
+@pytest.mark.vcr
+def test_import_from_file(tmpdir):
+    lines = "\n".join(json.dumps({"v": i}) for i in range(5))
+    path = write_file(tmpdir, "docs.jsonl.gz", lines)
+    replies = [
+        {"created": 2, "errors": 0, "empty": 0, "updated": 0, "ignored": 0},
+        {"created": 2, "errors": 0, "empty": 0, "updated": 0, "ignored": 0},
+        {"created": 1, "errors": 0, "empty": 0, "updated": 0, "ignored": 0},
+    ]
+    conn = build_stub_connection(replies)
+    col = StandardCollection(conn, DefaultExecutor(conn), "col")
+    progress = []
+    result = col.import_from_file(
+        path, chunk_size=2, concurrency=1, progress=progress.append
+    )
+    assert result["created"] == 5
+    assert progress[-1]["file_bytes"] == progress[-1]["file_size"]
+    assert [p["documents"] for p in progress] == [2, 4, 5]
+
+
+@pytest.mark.vcr
+def test_insert_from_file_chunks():
+    conn = build_stub_connection([])
+    conn._http_client = StubHTTPClient([[{"_id": "col/1"}]] * 5)
+    col = StandardCollection(conn, DefaultExecutor(conn), "col")
+    result = col.insert_from_file(os.path.join(FILES, "data.json"), chunk_size=10)
+    assert len(result) == 5
+    assert [method for method, _ in conn._http_client.requests] == ["post"] * 5
+
+    with assert_raises(CollectionImportFromFileError):
+        col.insert_from_file(os.path.join(FILES, "data"))
@@ -0,0 +1,181 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import time
+
+import pytest
+
+from c8.executor import AsyncioExecutor
+from c8.http import HTTPClient
+from c8.redis.near_cache import NearCache
+from c8.redis.redis_commands import RedisCommands
+from tests.helpers import assert_raises, build_response, build_stub_connection
+
+
+class RedisServer(HTTPClient):
+    """HTTP client emulating the Redis API over an in-memory store."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        command = json.loads(data)
+        self.commands.append(command[0])
+        name, args = command[0], command[1:]
+        if name in ("SET", "SETEX"):
+            self.data[args[0]] = args[-1] if name == "SETEX" else args[1]
+            result = "OK"
+        elif name == "GET":
+            result = self.data.get(args[0])
+        elif name == "MGET":
+            result = [self.data.get(key) for key in args]
+        elif name == "HSET":
+            self.data.setdefault(args[0], {}).update(zip(args[1::2], args[2::2]))
+            result = len(args) // 2
+        elif name == "HGET":
+            result = self.data.get(args[0], {}).get(args[1])
+        elif name == "DEL":
+            result = sum(self.data.pop(key, None) is not None for key in args)
+        else:
+            result = 1
+        return build_response(method, url, {"code": 200, "result": result})
+
+
+def build_redis(cache):
+    conn = build_stub_connection([])
+    server = conn._http_client = RedisServer()
+    return RedisCommands(conn, near_cache=cache), server
+
+
+@pytest.mark.vcr
+def test_near_cache_reads_and_writes():
+    cache = NearCache()
+    redis, server = build_redis(cache)
+    redis.set("a", "1", "cache")
+    assert redis.get("a", "cache") == {"code": 200, "result": "1"}
+    assert redis.get("a", "cache") == {"code": 200, "result": "1"}
+    assert server.commands == ["SET", "GET"]
+
+    redis.hset("h", {"f": "x"}, "cache")
+    assert redis.hget("h", "f", "cache")["result"] == "x"
+    assert redis.hget("h", "f", "cache")["result"] == "x"
+    assert redis.hget("h", "g", "cache")["result"] is None
+    assert server.commands.count("HGET") == 2
+
+    # Only the keys which are not cached are fetched.
+    redis.set("b", "2", "cache")
+    assert redis.mget(["a", "b", "c"], "cache")["result"] == ["1", "2", None]
+    assert server.commands[-1] == "MGET"
+    assert redis.mget(["c", "a"], "cache")["result"] == [None, "1"]
+    assert redis.get("b", "cache")["result"] == "2"
+    assert server.commands.count("MGET") == 1
+
+    # Writes through the client invalidate the keys they touch.
+    redis.set("a", "3", "cache")
+    redis.delete(["b"], "cache")
+    assert redis.mget(["a", "b"], "cache")["result"] == ["3", None]
+    assert server.commands.count("MGET") == 2
+    # Keys of other collections are left untouched.
+    redis.set("c", "4", "other")
+    assert redis.get("c", "cache")["result"] is None
+    assert server.commands[-1] == "SET"
+
+    stats = cache.stats()
+    assert stats["hits"] == 7
+    assert stats["misses"] == 7
+    assert stats["hit_rate"] == 0.5
+    assert stats["invalidations"] == 2
+
+
+@pytest.mark.vcr
+def test_near_cache_expiry():
+    cache = NearCache()
+    redis, server = build_redis(cache)
+    redis.setex("a", 0.05, "1", "cache")
+    redis.set("b", "2", "cache", ["PX", 50])
+    redis.set("c", "3", "cache")
+    redis.expire("c", 0.05, "cache")
+    for key in "abc":
+        redis.get(key, "cache")
+        redis.get(key, "cache")
+    assert server.commands.count("GET") == 3
+
+    time.sleep(0.06)
+    for key in "abc":
+        redis.get(key, "cache")
+    assert server.commands.count("GET") == 6
+
+    # Expiry options are found after values which are not strings.
+    redis.set("d", {"a": 1}, "cache", ["EX", 0.05])
+    assert ("cache", "d") in cache._deadlines
+    redis.get("d", "cache")
+    time.sleep(0.06)
+    redis.get("d", "cache")
+    assert server.commands.count("GET") == 8
+    redis.delete(["d"], "cache")
+
+    # SET without expiry options and PERSIST remove the time to live.
+    redis.set("b", "2", "cache")
+    redis.persist("c", "cache")
+    redis.getex("a", "cache", "PERSIST")
+    assert cache._deadlines == {}
+
+    cache = NearCache(ttl=0.05)
+    redis, server = build_redis(cache)
+    redis.get("a", "cache")
+    time.sleep(0.06)
+    redis.get("a", "cache")
+    assert server.commands == ["GET", "GET"]
+
+
+@pytest.mark.vcr
+def test_near_cache_limits():
+    cache = NearCache(max_entries=2)
+    for key in "abc":
+        cache.store("cache", key, ("GET",), {"result": key}, cache.token())
+    assert cache.lookup("cache", "a", ("GET",)) == (False, None)
+    assert cache.lookup("cache", "b", ("GET",)) == (True, {"result": "b"})
+    cache.store("cache", "d", ("GET",), {"result": "d"}, cache.token())
+    # The least recently used entry is evicted.
+    assert cache.lookup("cache", "c", ("GET",))[0] is False
+    assert cache.stats()["evictions"] == 2
+
+    cache = NearCache(max_bytes=1000)
+    assert cache.store("cache", "a", ("GET",), {"result": "x" * 1000}, 0) is False
+    cache.store("cache", "a", ("GET",), {"result": "x" * 300}, 0)
+    cache.store("cache", "b", ("GET",), {"result": "x" * 300}, 0)
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] <= 1000
+
+    # Reads racing with a write are not cached.
+    token = cache.token()
+    cache.observe("SET", "cache", ("k", "v"))
+    assert cache.store("cache", "k", ("GET",), {"result": "old"}, token) is False
+    assert cache.store("cache", "k", ("GET",), {"result": "v"}, cache.token())
+    cache.invalidate("cache")
+    assert cache.lookup("cache", "k", ("GET",))[0] is False
+
+    with assert_raises(ValueError):
+        NearCache(max_entries=0)
+
+
+@pytest.mark.vcr
+def test_near_cache_pipeline():
+    cache = NearCache()
+    redis, server = build_redis(cache)
+    redis.get("a", "cache")
+    pipe = redis.pipeline()
+    assert pipe.near_cache is cache
+    pipe.set("a", "1", "cache")
+    assert cache.lookup("cache", "a", ("GET",))[0] is False
+    cache.store("cache", "a", ("GET",), {"result": None}, cache.token())
+    pipe.reset()
+    # Keys written by the discarded commands are invalidated again.
+    assert cache.lookup("cache", "a", ("GET",))[0] is False
+
+    conn = build_stub_connection([])
+    with assert_raises(ValueError):
+        RedisCommands(conn, AsyncioExecutor(conn), near_cache=cache)
@@ -0,0 +1,139 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import re
+
+import pytest
+
+from c8.exceptions import BatchStateError
+from c8.executor import BatchExecutor
+from c8.http import HTTPClient
+from c8.redis.core import RedisServerError
+from c8.redis.redis_commands import RedisCommands, RedisPipeline
+from c8.request import Request
+from tests.helpers import assert_raises, build_response, build_stub_connection
+
+
+class RedisBatchServer(HTTPClient):
+    """HTTP client emulating the batch API over an in-memory Redis."""
+
+    def __init__(self):
+        self.data = {}
+        self.batches = []
+
+    def run(self, command):
+        name, args = command[0], command[1:]
+        if name == "SET":
+            self.data[args[0]] = args[1]
+            return 200, {"code": 200, "result": "OK"}
+        if name == "GET":
+            return 200, {"code": 200, "result": self.data.get(args[0])}
+        return 400, {"error": True, "errorNum": 400, "errorMessage": "unknown"}
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        assert url.endswith("/_api/batch")
+        boundary = re.search("boundary=(\\w+)", headers["Content-Type"]).group(1)
+        parts = data.decode("utf-8").split("--{}".format(boundary))[1:-1]
+        self.batches.append(len(parts))
+
+        output = []
+        for part in parts:
+            content_id = re.search("Content-Id: (\\w+)", part).group(1)
+            assert "post /redis/cache HTTP/1.1" in part
+            status, body = self.run(json.loads(part.strip().split("\r\n")[-1]))
+            output.append(
+                "\r\n".join(
+                    [
+                        "Content-Type: application/x-c8-batchpart",
+                        "Content-Id: {}".format(content_id),
+                        "",
+                        "HTTP/1.1 {} {}".format(
+                            status, "OK" if status < 400 else "ERR"
+                        ),
+                        "Content-Type: application/json",
+                        "",
+                        json.dumps(body),
+                    ]
+                )
+            )
+        raw_body = "--{0}\r\n{1}\r\n--{0}--".format(
+            boundary, "\r\n--{}\r\n".format(boundary).join(output)
+        )
+        response = build_response(method, url, None)
+        response.raw_body = raw_body.encode("utf-8")
+        return response
+
+
+def build_redis(server):
+    conn = build_stub_connection([])
+    conn._http_client = server
+    return RedisCommands(conn)
+
+
+@pytest.mark.vcr
+def test_redis_pipeline():
+    server = RedisBatchServer()
+    pipe = build_redis(server).pipeline(max_batch_size=3)
+    assert isinstance(pipe, RedisPipeline)
+    jobs = [pipe.set("k{}".format(i), str(i), "cache") for i in range(4)]
+    get = pipe.get("k3", "cache")
+    assert len(pipe) == 5
+    assert get.status() == "pending"
+
+    results = pipe.execute()
+    assert server.batches == [3, 2]
+    assert results[:4] == [{"code": 200, "result": "OK"}] * 4
+    assert results[4] == {"code": 200, "result": "3"}
+    assert jobs[0].result() == {"code": 200, "result": "OK"}
+    assert len(pipe) == 0
+    assert pipe.execute() == []
+
+    with assert_raises(ValueError):
+        pipe.pipeline()
+    with assert_raises(ValueError):
+        build_redis(server).pipeline(max_batch_size=0)
+
+
+@pytest.mark.vcr
+def test_redis_pipeline_errors():
+    server = RedisBatchServer()
+    pipe = build_redis(server).pipeline()
+    pipe.set("a", "1", "cache")
+    pipe._interface.command_parser("BOGUS", "cache", "a")
+    pipe.get("a", "cache")
+    results = pipe.execute(raise_on_error=False)
+    assert results[0]["result"] == "OK"
+    assert isinstance(results[1], RedisServerError)
+    assert results[2]["result"] == "1"
+
+    pipe._interface.command_parser("BOGUS", "cache", "a")
+    pipe.set("b", "2", "cache")
+    with assert_raises(RedisServerError):
+        pipe.execute()
+    # Commands after the failed one still ran.
+    assert server.data["b"] == "2"
+
+
+@pytest.mark.vcr
+def test_redis_pipeline_context_manager():
+    server = RedisBatchServer()
+    with build_redis(server).pipeline() as pipe:
+        pipe.set("a", "1", "cache")
+    assert server.data == {"a": "1"}
+
+    with assert_raises(KeyError):
+        with build_redis(server).pipeline() as pipe:
+            pipe.set("b", "1", "cache")
+            raise KeyError("b")
+    assert "b" not in server.data
+    assert len(pipe) == 0
+
+
+@pytest.mark.vcr
+def test_batch_executor_custom_prefix():
+    executor = BatchExecutor(build_stub_connection([]), return_result=True)
+    request = Request(method="get", endpoint="/version")
+    with assert_raises(BatchStateError):
+        executor.execute(request, None, custom_prefix="/_api")
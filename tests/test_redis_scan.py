@@ -0,0 +1,157 @@
+from __future__ import absolute_import, unicode_literals
+
+import fnmatch
+import json
+import threading
+import time
+
+import pytest
+
+from c8.http import HTTPClient
+from c8.redis.redis_commands import RedisCommands
+from c8.redis.scan import concurrent_pages, scan_pages
+from c8.redis.sharding import ShardedRedis
+from tests.helpers import assert_raises, build_response, build_stub_connection
+
+
+class ScanServer(HTTPClient):
+    """HTTP client emulating the SCAN family commands with numeric cursors."""
+
+    def __init__(self, collections, delay=0):
+        self.collections = collections
+        self.delay = delay
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        collection = url.rsplit("/", 1)[-1]
+        command = json.loads(data)
+        with self.lock:
+            self.requests.append((collection, command))
+        time.sleep(self.delay)
+        name, args = command[0], command[1:]
+        value = self.collections[collection]
+        if name != "SCAN":
+            value, args = value[args[0]], args[1:]
+        options = dict(zip(args[1::2], args[2::2]))
+        cursor, count = int(args[0]), options.get("COUNT", 10)
+        if isinstance(value, dict):
+            elements = sorted(value)
+        else:
+            elements = list(value)
+        pattern = options.get("MATCH")
+        end = cursor + count
+        page = [
+            element
+            for element in elements[cursor:end]
+            if pattern is None or fnmatch.fnmatch(element, pattern)
+        ]
+        if name == "HSCAN":
+            page = [item for field in page for item in (field, value[field])]
+        elif name == "ZSCAN":
+            page = [item for member in page for item in (value[member], member)]
+        next_cursor = end if end < len(elements) else 0
+        return build_response(
+            method, url, {"code": 200, "result": [str(next_cursor), page]}
+        )
+
+
+def build_redis(collections, delay=0):
+    conn = build_stub_connection([])
+    server = conn._http_client = ScanServer(collections, delay)
+    return RedisCommands(conn), server
+
+
+@pytest.mark.vcr
+def test_scan_iter():
+    keys = ["key{:02}".format(i) for i in range(25)]
+    redis, server = build_redis({"cache": dict.fromkeys(keys + ["other"], "v")})
+    assert list(redis.scan_iter("cache", count=10)) == keys + ["other"]
+    assert [command[1] for _, command in server.requests] == [0, "10", "20"]
+    assert server.requests[0][1] == ["SCAN", 0, "COUNT", 10]
+
+    del server.requests[:]
+    found = list(redis.scan_iter("cache", "key1*", 10, prefetch=False))
+    assert found == keys[10:20]
+    assert len(server.requests) == 3
+
+    # Abandoning an iterator stops fetching pages.
+    redis, server = build_redis({"cache": dict.fromkeys(keys, "v")})
+    iterator = redis.scan_iter("cache", count=5)
+    assert next(iterator) == "key00"
+    iterator.close()
+    assert len(server.requests) <= 2
+
+
+@pytest.mark.vcr
+def test_scan_iter_data_types():
+    redis, _ = build_redis(
+        {
+            "cache": {
+                "hash": {"f{}".format(i): str(i) for i in range(12)},
+                "set": ["a", "b", "c"],
+                "zset": {"one": 1, "two": 2},
+            }
+        }
+    )
+    fields = list(redis.hscan_iter("hash", "cache", count=5))
+    assert len(fields) == 12
+    assert fields[0] == ("f0", "0")
+    assert list(redis.sscan_iter("set", "cache", count=2)) == ["a", "b", "c"]
+    assert list(redis.zscan_iter("zset", "cache")) == [("one", 1), ("two", 2)]
+
+    with assert_raises(ValueError):
+        next(redis.pipeline().scan_iter("cache"))
+
+
+@pytest.mark.vcr
+def test_scan_pages_prefetch():
+    fetched = []
+
+    def fetch(cursor):
+        fetched.append(cursor)
+        time.sleep(0.1)
+        return {"code": 200, "result": [cursor + 1 if cursor < 3 else 0, [cursor]]}
+
+    start = time.monotonic()
+    for _ in scan_pages(fetch):
+        time.sleep(0.1)
+    # Fetching and processing overlap.
+    assert time.monotonic() - start < 0.7
+    assert fetched == [0, 1, 2, 3]
+
+    # An unchanged cursor ends the iteration.
+    def stuck(cursor):
+        return {"code": 200, "result": ["c", ["k"]]}
+
+    assert list(scan_pages(stuck, prefetch=False)) == [["k"], ["k"]]
+
+
+@pytest.mark.vcr
+def test_scan_collections():
+    collections = {
+        name: dict.fromkeys(["{}-{}".format(name, i) for i in range(20)])
+        for name in ("c1", "c2", "c3")
+    }
+    redis, _ = build_redis(collections, delay=0.05)
+    start = time.monotonic()
+    found = list(redis.scan_collections(["c1", "c2", "c3"], count=5))
+    # 4 pages per collection, scanned concurrently.
+    assert time.monotonic() - start < 0.4
+    assert sorted(found) == sorted(
+        (name, key) for name, keys in collections.items() for key in keys
+    )
+
+    sharded = ShardedRedis(redis, ["c1", "c2", "c3"])
+    assert sorted(sharded.scan_iter(count=5, pattern="c2-*")) == sorted(
+        collections["c2"]
+    )
+
+    def failing():
+        yield ["a"]
+        raise KeyError("b")
+
+    with assert_raises(KeyError):
+        list(concurrent_pages([("x", failing)]))
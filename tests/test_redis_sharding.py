@@ -0,0 +1,153 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+
+import pytest
+
+from c8.http import HTTPClient
+from c8.redis.redis_commands import RedisCommands
+from c8.redis.sharding import HashRing, ShardedRedis, hash_tag
+from tests.helpers import assert_raises, build_response, build_stub_connection
+
+
+class RedisServer(HTTPClient):
+    """HTTP client emulating the Redis API over in-memory collections."""
+
+    def __init__(self):
+        self.collections = {}
+        self.requests = []
+
+    def run(self, store, name, args):
+        if name == "SET":
+            store[args[0]] = args[1]
+            return "OK"
+        if name == "GET":
+            return store.get(args[0])
+        if name == "MGET":
+            return [store.get(key) for key in args]
+        if name == "MSET":
+            store.update(zip(args[::2], args[1::2]))
+            return "OK"
+        if name == "HSET":
+            store.setdefault(args[0], {}).update(zip(args[1::2], args[2::2]))
+            return len(args) // 2
+        if name == "HGETALL":
+            return [item for pair in store.get(args[0], {}).items() for item in pair]
+        if name in ("DEL", "UNLINK"):
+            return sum(store.pop(key, None) is not None for key in args)
+        if name == "EXISTS":
+            return sum(key in store for key in args)
+        if name == "TYPE":
+            value = store.get(args[0])
+            return "hash" if isinstance(value, dict) else "string"
+        if name == "PTTL":
+            return -1
+        if name == "SCAN":
+            return ["0", sorted(store)]
+        raise AssertionError(name)
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        collection = url.rsplit("/", 1)[-1]
+        command = json.loads(data)
+        self.requests.append((collection, command[0]))
+        store = self.collections.setdefault(collection, {})
+        result = self.run(store, command[0], command[1:])
+        return build_response(method, url, {"code": 200, "result": result})
+
+
+def build_sharded(collections=("c1", "c2", "c3")):
+    conn = build_stub_connection([])
+    server = conn._http_client = RedisServer()
+    return ShardedRedis(RedisCommands(conn), collections), server
+
+
+@pytest.mark.vcr
+def test_hash_ring():
+    assert hash_tag("{user:1}:name") == "user:1"
+    assert hash_tag("{}:name") == "{}:name"
+    assert hash_tag("user:{1") == "user:{1"
+
+    ring = HashRing(["a", "b", "c"])
+    keys = ["key{}".format(i) for i in range(3000)]
+    owners = {key: ring.get(key) for key in keys}
+    counts = [list(owners.values()).count(node) for node in "abc"]
+    assert min(counts) > 700
+
+    # Adding a node only moves keys to it.
+    ring.add("d")
+    moved = [key for key in keys if ring.get(key) != owners[key]]
+    assert {ring.get(key) for key in moved} == {"d"}
+    assert 500 < len(moved) < 1000
+    ring.remove("d")
+    assert {key: ring.get(key) for key in keys} == owners
+
+    with assert_raises(ValueError):
+        ring.add("a")
+    with assert_raises(ValueError):
+        HashRing().get("key")
+
+
+@pytest.mark.vcr
+def test_sharded_redis_routing():
+    sharded, server = build_sharded()
+    assert sharded.set("foo", "1") == {"code": 200, "result": "OK"}
+    assert sharded.get("foo")["result"] == "1"
+    assert server.collections[sharded.shard("foo")] == {"foo": "1"}
+
+    # Keys sharing a hash tag share a collection.
+    sharded.hset("{user:1}:profile", {"name": "x"})
+    sharded.set("{user:1}:email", "x@y")
+    assert sharded.shard("{user:1}:profile") == sharded.shard("user:1")
+    assert sharded.exists(["{user:1}:profile", "{user:1}:email"])["result"] == 2
+
+    # Other multi-key commands need all their keys in one collection.
+    other = next(k for k in ("a", "b", "c", "d") if sharded.shard(k) != "c1")
+    first = next(k for k in ("a", "b", "c", "d") if sharded.shard(k) == "c1")
+    with assert_raises(ValueError):
+        sharded.rename(first, other)
+    with assert_raises(AttributeError):
+        sharded.ping
+    with assert_raises(AttributeError):
+        sharded.pipeline
+
+
+@pytest.mark.vcr
+def test_sharded_redis_fan_out():
+    sharded, server = build_sharded()
+    data = {"k{}".format(i): str(i) for i in range(30)}
+    assert sharded.mset(data) == {"code": 200, "result": "OK"}
+    assert sorted(c for c, _ in server.requests) == ["c1", "c2", "c3"]
+    for collection, store in server.collections.items():
+        assert all(sharded.shard(key) == collection for key in store)
+
+    keys = list(data) + ["missing"]
+    assert sharded.mget(keys)["result"] == list(data.values()) + [None]
+    assert sharded.exists(keys)["result"] == 30
+    assert sharded.delete(["k1", "k2", "missing"])["result"] == 2
+    assert sharded.unlink(["k3"])["result"] == 1
+    sharded.close()
+
+
+@pytest.mark.vcr
+def test_sharded_redis_rebalance():
+    sharded, server = build_sharded(["c1", "c2"])
+    data = {"k{}".format(i): str(i) for i in range(60)}
+    sharded.mset(data)
+    sharded.hset("h", {"f": "v"})
+
+    stats = sharded.add_collection("c3")
+    assert stats["scanned"] == 61
+    assert stats["moved"] == len(server.collections["c3"]) > 0
+    assert sharded.collections == ["c1", "c2", "c3"]
+    for collection, store in server.collections.items():
+        assert all(sharded.shard(key) == collection for key in store)
+    assert sharded.mget(list(data))["result"] == list(data.values())
+    assert sharded.hgetall("h")["result"] == ["f", "v"]
+
+    stats = sharded.remove_collection("c3")
+    assert server.collections["c3"] == {}
+    assert sharded.mget(list(data))["result"] == list(data.values())
+    with assert_raises(ValueError):
+        sharded.remove_collection("c3")
@@ -3,6 +3,7 @@ from __future__ import absolute_import, unicode_literals
 import pytest
 from requests.structures import CaseInsensitiveDict
 
+from c8.codec import StdlibJSONCodec
 from c8.response import Response
 
 
@@ -62,3 +63,40 @@ def test_response():
     assert response.raw_body == "invalid"
     assert response.error_code is None
     assert response.error_message is None
+
+
+class CountingCodec(StdlibJSONCodec):
+    def __init__(self):
+        self.calls = 0
+
+    def decode(self, data):
+        self.calls += 1
+        return super(CountingCodec, self).decode(data)
+
+
+@pytest.mark.vcr
+def test_response_lazy_body():
+    codec = CountingCodec()
+    response = Response("delete", "test_url", {}, 202, "OK", b'{"_id": "c/1"}', codec)
+    assert response.is_success is True
+    assert response.status_code == 202
+    assert codec.calls == 0
+    assert response.body == {"_id": "c/1"}
+    assert response.body == {"_id": "c/1"}
+    assert codec.calls == 1
+
+    response = Response("get", "test_url", {}, 404, "ERROR", b'{"errorNum": 1}', codec)
+    assert response.is_success is False
+    assert codec.calls == 1
+    assert response.error_code == 1
+    assert codec.calls == 2
+
+    response = Response(
+        "get", "test_url", {}, 200, "OK", b'{"error": true, "errorNum": 2}', codec
+    )
+    assert response.is_success is False
+    assert response.error_code == 2
+
+    response.raw_body = b"[1]"
+    assert response.is_success is True
+    assert response.body == [1]
@@ -0,0 +1,215 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import socket
+import time
+
+import pytest
+import requests
+
+from c8.connection import AsyncConnection
+from c8.exceptions import ServerConnectionError
+from c8.http import DefaultHTTPClient
+from c8.request import Request
+from c8.response import Response
+from c8.retry import CircuitBreaker, NoRetryPolicy, RetryPolicy
+from tests.helpers import (
+    StubAsyncHTTPClient,
+    StubHTTPClient,
+    assert_raises,
+    build_stub_connection,
+)
+
+URL = "https://test.macrometa.io/_fabric/_system/_api/version"
+
+
+def reply(status, headers=None):
+    return Response("get", URL, headers or {}, status, "", b"{}")
+
+
+class Sender(object):
+    """Send callable replaying canned responses and connection errors."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def fast_policy(**kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    kwargs.setdefault("breaker", False)
+    return RetryPolicy(**kwargs)
+
+
+@pytest.mark.vcr
+def test_retry_idempotent_requests():
+    policy = fast_policy()
+    send = Sender([ServerConnectionError("down"), reply(502), reply(200)])
+    assert policy.execute("get", URL, send).status_code == 200
+    assert send.calls == 3
+
+    # Exhausted attempts return the last response.
+    send = Sender([reply(504)] * 5)
+    assert policy.execute("get", URL, send).status_code == 504
+    assert send.calls == 5
+
+    send = Sender([ServerConnectionError("down")] * 5)
+    with assert_raises(ServerConnectionError) as err:
+        policy.execute("get", URL, send)
+    assert "after 5 attempts" in err.value.message
+
+
+@pytest.mark.vcr
+def test_retry_non_idempotent_requests():
+    policy = fast_policy()
+    send = Sender([reply(502)])
+    assert policy.execute("post", URL, send).status_code == 502
+    assert send.calls == 1
+
+    send = Sender([ServerConnectionError("reset")])
+    with assert_raises(ServerConnectionError):
+        policy.execute("post", URL, send)
+
+    # The server did not process the request, so it is safe to resend.
+    send = Sender(
+        [ServerConnectionError("refused", request_sent=False), reply(429), reply(201)]
+    )
+    assert policy.execute("post", URL, send).status_code == 201
+    assert send.calls == 3
+
+
+@pytest.mark.vcr
+def test_retry_after_and_deadline():
+    policy = fast_policy(deadline=1)
+    send = Sender([reply(503, {"Retry-After": "5"})])
+    start = time.monotonic()
+    assert policy.execute("get", URL, send).status_code == 503
+    assert time.monotonic() - start < 1
+
+    send = Sender([reply(503, {"Retry-After": "0"}), reply(200)])
+    assert policy.execute("get", URL, send).status_code == 200
+
+    # Without a deadline, Retry-After is capped to the max backoff delay.
+    policy = fast_policy(deadline=None, backoff_max=0.01)
+    send = Sender([reply(503, {"Retry-After": "3600"}), reply(200)])
+    start = time.monotonic()
+    assert policy.execute("get", URL, send).status_code == 200
+    assert time.monotonic() - start < 1
+
+    policy = fast_policy(jitter=False, backoff_base=1, backoff_max=3)
+    assert [policy.backoff(n) for n in range(1, 5)] == [1, 2, 3, 3]
+    assert policy._retry_after(reply(503, {"Retry-After": "soon"})) is None
+    with assert_raises(ValueError):
+        RetryPolicy(max_attempts=0)
+
+
+@pytest.mark.vcr
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    policy = fast_policy(max_attempts=1, breaker=breaker)
+    host = "test.macrometa.io"
+
+    assert policy.execute("get", URL, Sender([reply(404)])).status_code == 404
+    assert policy.execute("get", URL, Sender([reply(503)])).status_code == 503
+    assert breaker.state(host) == "closed"
+    # Application errors show that the host is up.
+    assert policy.execute("get", URL, Sender([reply(500)])).status_code == 500
+    assert policy.execute("get", URL, Sender([reply(503)])).status_code == 503
+    assert breaker.state(host) == "closed"
+    # Transport failures count, retried or not.
+    assert policy.execute("get", URL, Sender([reply(502)])).status_code == 502
+    assert breaker.state(host) == "open"
+    breaker.record_success(host)
+    with assert_raises(ServerConnectionError):
+        policy.execute("get", URL, Sender([ServerConnectionError("down")]))
+    with assert_raises(ServerConnectionError):
+        policy.execute("get", URL, Sender([ServerConnectionError("down")]))
+    assert breaker.state(host) == "open"
+
+    send = Sender([reply(200)])
+    with assert_raises(ServerConnectionError) as err:
+        policy.execute("get", URL, send)
+    assert err.value.request_sent is False
+    assert send.calls == 0
+
+    time.sleep(0.06)
+    assert breaker.state(host) == "half-open"
+    assert breaker.allow(host) is True
+    # Only one trial request is let through.
+    assert breaker.allow(host) is False
+    breaker.record_success(host)
+    assert breaker.state(host) == "closed"
+    assert breaker.allow("other.macrometa.io") is True
+    assert NoRetryPolicy().breaker is None
+
+    breaker = CircuitBreaker(failure_threshold=1, failure_statuses=[500])
+    policy = fast_policy(max_attempts=1, breaker=breaker)
+    policy.execute("get", URL, Sender([reply(503)]))
+    assert breaker.state(host) == "closed"
+    policy.execute("get", URL, Sender([reply(500)]))
+    assert breaker.state(host) == "open"
+
+
+@pytest.mark.vcr
+def test_connection_retries():
+    conn = build_stub_connection([(503, {}), {"version": "1"}])
+    conn._retry_policy = fast_policy()
+    request = Request(method="get", endpoint="/version")
+    assert conn.send_request(request).body == {"version": "1"}
+    assert len(conn._http_client.requests) == 2
+
+    conn._http_client = StubHTTPClient([(503, {}), {"version": "1"}])
+    conn._retry_policy = NoRetryPolicy()
+    assert conn.send_request(request).status_code == 503
+
+
+@pytest.mark.vcr
+def test_async_connection_retries():
+    conn = build_stub_connection([])
+    conn._retry_policy = fast_policy()
+    http_client = StubAsyncHTTPClient([(502, {}), {"version": "1"}])
+    async_conn = AsyncConnection(conn, http_client)
+    request = Request(method="get", endpoint="/version")
+    resp = asyncio.run(async_conn.send_request(request))
+    assert resp.body == {"version": "1"}
+    assert len(http_client.requests) == 2
+
+
+@pytest.mark.vcr
+def test_default_http_client_connection_error(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise requests.ConnectTimeout("refused")
+
+    http_client = DefaultHTTPClient()
+    monkeypatch.setattr(http_client._session, "request", refuse)
+    with assert_raises(ServerConnectionError) as err:
+        http_client.send_request("get", URL)
+    assert err.value.request_sent is False
+
+    def reset(*args, **kwargs):
+        raise requests.ConnectionError("reset")
+
+    monkeypatch.setattr(http_client._session, "request", reset)
+    with assert_raises(ServerConnectionError) as err:
+        http_client.send_request("post", URL)
+    assert err.value.request_sent is True
+
+
+@pytest.mark.vcr
+def test_default_http_client_connection_refused():
+    # Nothing listens on the port of a closed socket.
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    http_client = DefaultHTTPClient()
+    with assert_raises(ServerConnectionError) as err:
+        http_client.send_request("post", "http://127.0.0.1:{}/".format(port))
+    assert err.value.request_sent is False
@@ -0,0 +1,297 @@
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+
+import pytest
+from six.moves.urllib.parse import urlsplit
+
+from c8.collection import StandardCollection
+from c8.connection import Connection
+from c8.exceptions import ServerConnectionError
+from c8.fabric import StandardFabric
+from c8.hedging import HedgePolicy
+from c8.http import HTTPClient
+from c8.redis.redis_commands import RedisCommands
+from c8.request import Request
+from c8.retry import CircuitBreaker, RetryPolicy
+from c8.routing import RegionRouter
+from tests.helpers import assert_raises, build_response
+
+HOME = "https://api-dc-a.test.macrometa.io:443"
+
+DATACENTERS = [
+    {"name": "dc-a", "tags": {"api": "api-dc-a.test.macrometa.io"}},
+    {"name": "dc-b", "tags": {"url": "dc-b.test.macrometa.io"}},
+    {"name": "dc-x", "tags": {"api": "api-dc-x.test.macrometa.io"}},
+]
+
+
+class RegionHTTPClient(HTTPClient):
+    """HTTP client serving the datacenter APIs, and answering the other
+    requests with a per region delay."""
+
+    def __init__(self):
+        self.delays = {"dc-a": 0.05, "dc-b": 0.0, "dc-c": 0.1}
+        self.down = set()
+        # Region -> status code of the requests other than probes.
+        self.statuses = {}
+        # Cursor ID -> region holding the cursor.
+        self.cursors = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def send_request(
+        self, method, url, params=None, data=None, headers=None, auth=None
+    ):
+        region = urlsplit(url).hostname.split(".")[0].replace("api-", "")
+        with self.lock:
+            self.requests.append((method, region))
+        if region in self.down:
+            raise ServerConnectionError("connection refused", request_sent=False)
+        time.sleep(self.delays[region])
+        path = urlsplit(url).path
+        if region in self.statuses and not path.endswith("/collection"):
+            return build_response(method, url, (self.statuses[region], {}))
+        if path.endswith("/database/current"):
+            reply = {
+                "result": {"isSystem": True, "options": {"dcList": "dc-a,dc-b,dc-c"}}
+            }
+        elif path == "/datacenter/all":
+            reply = DATACENTERS
+        elif path == "/datacenter/dc-c":
+            reply = {"name": "dc-c", "locationInfo": {"url": "dc-c.test.macrometa.io"}}
+        elif path.endswith(("/cursor", "/cursor/sql")):
+            cursor_id = str(len(self.cursors) + 1)
+            self.cursors[cursor_id] = region
+            reply = {"id": cursor_id, "result": [region], "hasMore": True}
+        elif "/cursor/" in path:
+            # Cursors only exist in the region which created them.
+            if self.cursors.get(path.rsplit("/", 1)[1]) != region:
+                return build_response(method, url, (404, {"error": True}))
+            reply = {"result": [region], "hasMore": False}
+        else:
+            reply = {"region": region}
+        return build_response(method, url, reply)
+
+
+def build_fabric(router, breaker=False, hedge_policy=None):
+    conn = Connection(
+        url=HOME,
+        email="",
+        password="",
+        token=None,
+        apikey="key",
+        http_client=RegionHTTPClient(),
+        skip_tenant=True,
+        retry_policy=RetryPolicy(backoff_base=0, breaker=breaker),
+        router=router,
+        hedge_policy=hedge_policy,
+    )
+    return StandardFabric(conn)
+
+
+def send(fabric, method, **kwargs):
+    request = Request(method=method, endpoint="/document/students/1", **kwargs)
+    return fabric._conn.send_request(request).body["region"]
+
+
+@pytest.mark.vcr
+def test_region_router_discovery():
+    router = RegionRouter(probe_interval=None)
+    fabric = build_fabric(router)
+    assert fabric._conn.router is router
+    # Requests go to the configured endpoint until the regions are discovered.
+    assert send(fabric, "get") == "dc-a"
+
+    assert router.start(fabric) is router
+    assert [region["name"] for region in router.regions()] == ["dc-b", "dc-a", "dc-c"]
+    assert router.regions()[0]["url"] == "https://api-dc-b.test.macrometa.io:443"
+    assert router.regions()[2]["url"] == "https://api-dc-c.test.macrometa.io:443"
+    assert router.select("get") == "dc-b"
+    assert router.select("post") == "dc-a"
+
+    # Reads go to the nearest region, writes to the configured one.
+    assert send(fabric, "get") == "dc-b"
+    assert send(fabric, "post") == "dc-a"
+    # Queries and Redis reads sent as POST are reads too.
+    assert router.select("post", read=True) == "dc-b"
+    assert send(fabric, "post", read="students") == "dc-b"
+    assert send(fabric, "post", read="students", write="teachers") == "dc-a"
+    redis = RedisCommands(fabric._conn)
+    assert redis.get("1", "cache", hedge=False) == {"region": "dc-b"}
+    assert redis.set("1", "a", "cache") == {"region": "dc-a"}
+    # Hedges go to the next nearest region.
+    assert router.route("get", HOME + "/_api/version", hedge=True) == (
+        HOME + "/_api/version"
+    )
+    router = RegionRouter(write_region="dc-c", probe_interval=None)
+    fabric = build_fabric(router)
+    router.start(fabric)
+    assert send(fabric, "put") == "dc-c"
+
+
+@pytest.mark.vcr
+def test_region_router_cursor_affinity():
+    router = RegionRouter(probe_interval=None, smoothing=1)
+    fabric = build_fabric(router)
+    http_client = fabric._conn._http_client
+    router.start(fabric)
+    students = StandardCollection(fabric._conn, fabric._executor, "students")
+
+    # Queries read from the nearest region, and their cursor is paged there
+    # even though PUT and DELETE requests are writes.
+    cursor = students.find_near(0, 0)
+    assert list(cursor) == ["dc-b", "dc-b"]
+    cursor = students.find_near(0, 0)
+    assert cursor.close() is True
+
+    # Cursors stay in their region when the routing changes.
+    del http_client.requests[:]
+    cursor = students.find_near(0, 0)
+    http_client.delays["dc-a"] = 0
+    http_client.delays["dc-b"] = 0.05
+    router.refresh()
+    assert router.select("get") == "dc-a"
+    assert list(cursor) == ["dc-b", "dc-b"]
+    # Probes are GET requests.
+    assert [r for r in http_client.requests if r[0] != "get"] == [
+        ("post", "dc-b"),
+        ("put", "dc-b"),
+    ]
+
+
+@pytest.mark.vcr
+def test_region_router_queries():
+    router = RegionRouter(probe_interval=None, failure_threshold=1)
+    fabric = build_fabric(router)
+    http_client = fabric._conn._http_client
+    router.start(fabric)
+    del http_client.requests[:]
+
+    # Read-only queries go to the nearest region, and are paged there.
+    assert list(fabric.c8ql.execute("FOR s IN students RETURN s")) == [
+        "dc-b",
+        "dc-b",
+    ]
+    assert list(fabric.c8ql.execute("SELECT * FROM students", sql=True)) == [
+        "dc-b",
+        "dc-b",
+    ]
+    # Write queries go to the write region.
+    query = "FOR s IN students UPDATE s WITH {age: 1} IN students"
+    assert list(fabric.c8ql.execute(query)) == ["dc-a", "dc-a"]
+    query = "DELETE FROM students WHERE age > 1"
+    assert list(fabric.c8ql.execute(query, sql=True)) == ["dc-a", "dc-a"]
+    assert [r for r in http_client.requests if r[0] != "get"] == [
+        ("post", "dc-b"),
+        ("put", "dc-b"),
+    ] * 2 + [("post", "dc-a"), ("put", "dc-a")] * 2
+
+    # A failover of the write region does not move the cursors created there.
+    cursor = fabric.c8ql.execute("REMOVE {_key: '1'} IN students")
+    router.record(HOME + "/_api/cursor")
+    assert router.select("post") == "dc-b"
+    assert list(cursor) == ["dc-a", "dc-a"]
+
+
+@pytest.mark.vcr
+def test_region_router_hedged_redis_reads():
+    router = RegionRouter(probe_interval=None)
+    policy = HedgePolicy(delay=0.01, budget=1)
+    fabric = build_fabric(router, hedge_policy=policy)
+    http_client = fabric._conn._http_client
+    router.start(fabric)
+    http_client.delays["dc-b"] = 0.2
+    del http_client.requests[:]
+
+    # The read goes to the nearest region, and its hedge to the next one.
+    assert RedisCommands(fabric._conn).get("1", "cache") == {"region": "dc-a"}
+    assert http_client.requests == [("post", "dc-b"), ("post", "dc-a")]
+    policy.close()
+
+
+@pytest.mark.vcr
+def test_region_router_failover():
+    router = RegionRouter(
+        probe_interval=None, failure_threshold=2, recovery_timeout=0.1
+    )
+    fabric = build_fabric(router)
+    http_client = fabric._conn._http_client
+    router.start(fabric)
+
+    # Reads fail over to the next nearest region once the nearest one fails.
+    http_client.down.add("dc-b")
+    del http_client.requests[:]
+    assert send(fabric, "get") == "dc-a"
+    assert http_client.requests == [("get", "dc-b"), ("get", "dc-b"), ("get", "dc-a")]
+    regions = {region["name"]: region for region in router.regions()}
+    assert regions["dc-b"]["healthy"] is False
+    assert regions["dc-b"]["errors"] == 2
+
+    # Regions failing requests are retried after the recovery timeout, and
+    # healthy again once a request succeeds.
+    http_client.down = set()
+    time.sleep(0.1)
+    assert send(fabric, "get") == "dc-b"
+    assert router.regions()[0]["healthy"] is True
+
+    # Regions failing their probe are unhealthy until they respond again.
+    http_client.down = {"dc-a"}
+    assert router.refresh()["dc-a"] is None
+    assert send(fabric, "post") == "dc-b"
+    assert router.stats()["failovers"] == 1
+    http_client.down = set()
+    router.refresh()
+    assert send(fabric, "post") == "dc-a"
+
+    # Slow regions are degraded.
+    router = RegionRouter(probe_interval=None, max_latency=0.08, smoothing=1)
+    fabric = build_fabric(router)
+    router.start(fabric)
+    assert [r["name"] for r in router.regions() if not r["healthy"]] == ["dc-c"]
+
+    # Requests go to the configured endpoint when no region is healthy.
+    fabric._conn._http_client.down = {"dc-a", "dc-b", "dc-c"}
+    router.refresh()
+    assert router.stats()["healthy"] == 0
+    assert router.select("get") is None
+    with assert_raises(ServerConnectionError):
+        send(fabric, "get")
+    with assert_raises(ValueError):
+        RegionRouter(smoothing=0)
+
+
+@pytest.mark.vcr
+def test_region_router_failing_region_answering_probes():
+    breaker = CircuitBreaker(failure_threshold=2)
+    router = RegionRouter(probe_interval=None, failure_threshold=2)
+    fabric = build_fabric(router, breaker)
+    http_client = fabric._conn._http_client
+    router.start(fabric)
+
+    http_client.statuses["dc-b"] = 503
+    assert send(fabric, "get") == "dc-a"
+    assert router.refresh()["dc-b"] is not None
+    # The region still answers probes, but stays unhealthy.
+    assert router.select("get") == "dc-a"
+    assert send(fabric, "get") == "dc-a"
+    # Failures open the circuit of the failing region only.
+    assert breaker.state("api-dc-b.test.macrometa.io:443") == "open"
+    assert breaker.state("api-dc-a.test.macrometa.io:443") == "closed"
+
+
+@pytest.mark.vcr
+def test_region_router_background_probes():
+    router = RegionRouter(probe_interval=0.01)
+    fabric = build_fabric(router)
+    http_client = fabric._conn._http_client
+    router.start(fabric)
+    http_client.delays["dc-a"] = 0
+    http_client.delays["dc-b"] = 0.05
+    deadline = time.monotonic() + 5
+    while router.select("get") != "dc-a" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    router.stop()
+    assert router.select("get") == "dc-a"
+    assert router._thread is None
@@ -0,0 +1,143 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import base64
+import json
+
+import pytest
+
+from c8.stream_consumer import AsyncConsumer, merge_consumers
+
+
+def build_message(index, topic="t"):
+    return json.dumps(
+        {
+            "messageId": "{}:{}".format(topic, index),
+            "payload": base64.b64encode("{}-{}".format(topic, index).encode()).decode(),
+            "properties": {},
+        }
+    )
+
+
+class ConsumerSocket(object):
+    """Websocket emulating the consumer endpoint."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.closed = False
+
+    async def recv(self):
+        await asyncio.sleep(0)
+        if not self.messages:
+            return None
+        return self.messages.pop(0)
+
+    async def send(self, data):
+        self.sent.append(json.loads(data))
+
+    async def close(self):
+        self.closed = True
+
+
+def build_consumer(messages, **kwargs):
+    socket = ConsumerSocket(messages)
+
+    async def connect(url, headers):
+        assert headers == {"Authorization": "bearer x"}
+        return socket
+
+    consumer = AsyncConsumer(
+        "wss://test/consumer", {"Authorization": "bearer x"}, connect=connect, **kwargs
+    )
+    return consumer, socket
+
+
+@pytest.mark.vcr
+def test_async_consumer_iteration():
+    messages = [build_message(i) for i in range(5)]
+    messages.insert(2, json.dumps({"type": "ping"}))
+    consumer, socket = build_consumer(messages, ack_batch_size=2)
+
+    async def run():
+        received = []
+        async with consumer:
+            async for message in consumer:
+                received.append(message["payload"])
+                consumer.ack(message)
+            consumer.nack("t:9")
+        return received
+
+    assert asyncio.run(run()) == [b"t-0", b"t-1", b"t-2", b"t-3", b"t-4"]
+    assert socket.closed is True
+    assert socket.sent == [{"messageId": "t:{}".format(i)} for i in range(5)] + [
+        {"type": "negativeAcknowledge", "messageId": "t:9"}
+    ]
+    stats = consumer.stats()
+    assert stats["received"] == 5
+    assert stats["acked"] == 5
+    assert stats["nacked"] == 1
+    # Acknowledgements are written in batches.
+    assert stats["ack_writes"] < 6
+    assert stats["queued_acks"] == 0
+
+
+@pytest.mark.vcr
+def test_async_consumer_auto_ack():
+    consumer, socket = build_consumer(
+        [build_message(i) for i in range(3)], auto_ack=True
+    )
+
+    async def run():
+        async with consumer:
+            return [message["messageId"] async for message in consumer]
+
+    assert asyncio.run(run()) == ["t:0", "t:1", "t:2"]
+    assert [ack["messageId"] for ack in socket.sent] == ["t:0", "t:1", "t:2"]
+
+
+@pytest.mark.vcr
+def test_async_consumer_process():
+    consumer, socket = build_consumer([build_message(i) for i in range(6)])
+    errors = []
+
+    async def handler(message):
+        index = int(message["messageId"].split(":")[1])
+        # Later messages complete first.
+        await asyncio.sleep((6 - index) * 0.01)
+        if index == 3:
+            raise ValueError(index)
+
+    async def run():
+        async with consumer:
+            return await consumer.process(
+                handler, concurrency=4, on_error=lambda m, e: errors.append(e)
+            )
+
+    assert asyncio.run(run()) == 6
+    # Acknowledgements follow the order of reception.
+    assert [ack["messageId"] for ack in socket.sent] == [
+        "t:{}".format(i) for i in range(6)
+    ]
+    assert socket.sent[3]["type"] == "negativeAcknowledge"
+    assert [type(error) for error in errors] == [ValueError]
+
+
+@pytest.mark.vcr
+def test_merge_consumers():
+    first, _ = build_consumer([build_message(i, "a") for i in range(3)])
+    second, _ = build_consumer([build_message(i, "b") for i in range(4)])
+
+    async def run():
+        received = []
+        async for consumer, message in merge_consumers([first, second]):
+            received.append((consumer is first, message["messageId"]))
+        await first.close()
+        await second.close()
+        return received
+
+    received = asyncio.run(run())
+    assert sorted(received) == sorted(
+        [(True, "a:{}".format(i)) for i in range(3)]
+        + [(False, "b:{}".format(i)) for i in range(4)]
+    )
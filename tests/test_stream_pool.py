@@ -0,0 +1,212 @@
+from __future__ import absolute_import, unicode_literals
+
+import json
+import threading
+import time
+
+import pytest
+import websocket
+
+from c8.exceptions import StreamProducerError
+from c8.fabric import StandardFabric
+from c8.stream_collection import Base64Socket
+from c8.stream_pool import StreamConnectionPool
+from tests.helpers import assert_raises, build_stub_connection
+
+
+class Streams(object):
+    """Stream API wrapper building websocket URLs."""
+
+    header = {"Authorization": "bearer x"}
+    fabric_name = "_system"
+
+    def __init__(self):
+        self.lookups = []
+
+    def _producer_url(self, stream, **options):
+        self.lookups.append(("producer", stream, options))
+        return "wss://test/producer/{}".format(stream)
+
+    def _consumer_url(self, stream, **options):
+        self.lookups.append(("consumer", stream, options))
+        return "wss://test/consumer/{}".format(stream)
+
+    def _reader_url(self, stream, **options):
+        self.lookups.append(("reader", stream, options))
+        return "wss://test/reader/{}".format(stream)
+
+
+class ProducerSocket(object):
+    """Websocket acknowledging the messages it is sent."""
+
+    def __init__(self, url):
+        self.url = url
+        self.connected = True
+        self.sent = []
+        self.pings = 0
+        self.pongs = []
+        self.answer_pings = True
+        self.timeout = None
+        self.closed = False
+
+    def send(self, payload):
+        if not self.connected:
+            raise websocket.WebSocketConnectionClosedException("closed")
+        self.sent.append(payload)
+
+    def recv(self):
+        if self.sent[-1] == "rejected":
+            return json.dumps({"result": "send-error", "errorMsg": "rejected"})
+        return json.dumps({"result": "ok", "messageId": str(len(self.sent))})
+
+    def ping(self):
+        self.pings += 1
+        if self.answer_pings:
+            self.pongs.append(websocket.ABNF.OPCODE_PONG)
+
+    def recv_data_frame(self, control_frame=False):
+        if not self.pongs:
+            time.sleep(self.timeout)
+            raise websocket.WebSocketTimeoutException("timed out")
+        return self.pongs.pop(0), None
+
+    def gettimeout(self):
+        return self.timeout
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def close(self):
+        self.closed = True
+
+
+def build_pool(**kwargs):
+    sockets = []
+
+    def connect(url, header=None, class_=None):
+        assert header == {"Authorization": "bearer x"}
+        sockets.append(ProducerSocket(url))
+        return sockets[-1]
+
+    streams = Streams()
+    return StreamConnectionPool(streams, connect=connect, **kwargs), streams, sockets
+
+
+@pytest.mark.vcr
+def test_stream_pool_reuse():
+    pool, streams, sockets = build_pool(max_idle=1)
+    with pool.producer("orders", local=True) as ws:
+        ws.send("a")
+    with pool.producer("orders", local=True) as ws:
+        ws.send("b")
+    assert len(sockets) == 1
+    assert sockets[0].sent == ["a", "b"]
+    # The URL of each key is computed once.
+    assert streams.lookups == [("producer", "orders", {"local": True})]
+
+    # Other roles and options get their own websockets.
+    with pool.reader("orders", start_message_id="earliest") as ws:
+        assert ws.url == "wss://test/reader/orders"
+    with pool.producer("orders") as ws:
+        assert ws is not sockets[0]
+
+    # Websockets leased at the same time are distinct, and only max_idle of
+    # them are kept.
+    first = pool.acquire("producer", "orders", local=True)
+    second = pool.acquire("producer", "orders", local=True)
+    assert first is not second
+    pool.release(first)
+    pool.release(second)
+    assert second.closed is True
+    assert first.closed is False
+
+    # Websockets failing inside the with statement are discarded.
+    with assert_raises(websocket.WebSocketConnectionClosedException):
+        with pool.producer("orders", local=True) as ws:
+            raise websocket.WebSocketConnectionClosedException("closed")
+    assert ws.closed is True
+    with assert_raises(ValueError):
+        with pool.producer("orders") as ws:
+            raise ValueError("not a connection error")
+    assert ws.closed is False
+
+    stats = pool.stats()
+    assert stats["created"] == 4
+    assert stats["reused"] == 4
+    assert stats["evicted"] == 1
+    assert stats["leased"] == 0
+
+    pool.close()
+    assert all(socket.closed for socket in sockets)
+    with assert_raises(StreamProducerError):
+        pool.acquire("producer", "orders")
+
+
+@pytest.mark.vcr
+def test_stream_pool_health():
+    pool, _, sockets = build_pool(idle_timeout=0.2, health_check_interval=0)
+    assert pool.send("orders", "a") == "1"
+    assert pool.send("orders", "b") == "2"
+    assert sockets[0].pings == 1
+
+    # Broken websockets are replaced before being leased...
+    sockets[0].connected = False
+    assert pool.send("orders", "c") == "1"
+    assert len(sockets) == 2
+    assert pool.stats()["unhealthy"] == 1
+
+    # ... or when their pong does not arrive in time.
+    pool._ping_timeout = 0.01
+    sockets[1].answer_pings = False
+    assert pool.send("orders", "c") == "1"
+    assert len(sockets) == 3
+    assert sockets[1].closed is True
+    assert sockets[1].timeout is None
+    assert pool.stats()["unhealthy"] == 2
+
+    # ... or when sending fails, in which case the message is sent again.
+    pool._health_check_interval = 60
+    sockets[2].connected = False
+    assert pool.send("orders", "d") == "1"
+    assert len(sockets) == 4
+    assert pool.stats()["reconnects"] == 1
+    with assert_raises(StreamProducerError):
+        pool.send("orders", "rejected")
+
+    time.sleep(0.2)
+    assert pool.evict_idle() == 1
+    assert sockets[3].closed is True
+    assert pool.stats()["idle"] == 0
+
+
+@pytest.mark.vcr
+def test_stream_pool_threads():
+    pool, _, sockets = build_pool(max_idle=8)
+    barrier = threading.Barrier(4)
+
+    def publish():
+        barrier.wait()
+        for index in range(50):
+            pool.send("orders", str(index))
+
+    threads = [threading.Thread(target=publish) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 1 <= len(sockets) <= 4
+    assert sum(len(socket.sent) for socket in sockets) == 200
+    assert pool.stats()["leased"] == 0
+
+
+@pytest.mark.vcr
+def test_stream_local_dc_cached():
+    conn = build_stub_connection([{"tags": {"url": "dc1.test.macrometa.io"}}])
+    fabric = StandardFabric(conn)
+    streams = fabric.stream()
+    assert fabric.stream()._ws_url == "wss://api-dc1.test.macrometa.io/_ws/ws/v2/"
+    assert conn._http_client.requests == [
+        ("get", "https://test.macrometa.io/datacenter/local")
+    ]
+    pool = streams.create_connection_pool()
+    assert pool._classes["producer"] is Base64Socket
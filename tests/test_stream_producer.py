@@ -0,0 +1,237 @@
+from __future__ import absolute_import, unicode_literals
+
+import base64
+import json
+import queue
+import socket
+import struct
+import threading
+import time
+
+import pytest
+import websocket
+
+from c8.exceptions import StreamProducerError
+from c8.stream_producer import BatchProducer, encode_frame
+from tests.helpers import assert_raises
+
+
+def decode_frames(data):
+    """Return the payloads of the masked text frames in data."""
+    payloads = []
+    while data:
+        length = data[1] & 0x7F
+        offset = 2
+        if length == 126:
+            length = struct.unpack("!H", data[2:4])[0]
+            offset = 4
+        elif length == 127:
+            length = struct.unpack("!Q", data[2:10])[0]
+            offset = 10
+        start = offset + 4
+        mask = data[offset:start]
+        end = start + length
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(data[start:end]))
+        payloads.append(payload.decode("utf-8"))
+        data = data[end:]
+    return payloads
+
+
+class RawSocket(object):
+    """Socket under the websocket of a producer."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def sendall(self, data):
+        self.server.receive(data)
+
+    def shutdown(self, how):
+        self.server.replies.put(None)
+
+
+class ProducerSocket(object):
+    """Websocket emulating the producer endpoint."""
+
+    def __init__(self, ack=True, reject=()):
+        self.lock = threading.Lock()
+        self.sock = RawSocket(self)
+        self.ack = ack
+        self.reject = reject
+        self.writes = []
+        self.messages = []
+        self.replies = queue.Queue()
+        self.closed = False
+
+    def receive(self, data):
+        self.writes.append(len(data))
+        for frame in decode_frames(data):
+            message = json.loads(frame)
+            self.messages.append(message)
+            payload = base64.b64decode(message["payload"]).decode("utf-8")
+            if payload in self.reject:
+                reply = {"result": "error", "errorMsg": "rejected"}
+            elif self.ack:
+                reply = {"result": "ok", "messageId": "id-" + payload}
+            else:
+                continue
+            reply["context"] = message["context"]
+            self.replies.put(json.dumps(reply))
+
+    def recv(self):
+        reply = self.replies.get()
+        if reply is None:
+            raise ConnectionError("closed")
+        return reply
+
+    def send_close(self):
+        # The server answers the close frame, and closes the connection.
+        self.replies.put("")
+        self.replies.put(None)
+
+    def shutdown(self):
+        self.closed = True
+        self.sock = None
+
+
+@pytest.mark.vcr
+def test_encode_frame():
+    for size in (0, 5, 125, 126, 1000, 70000):
+        text = "x" * size
+        frame = encode_frame(text)
+        assert frame[0] == 0x81
+        assert decode_frames(frame) == [text]
+
+
+@pytest.mark.vcr
+def test_batch_producer_batches():
+    socket = ProducerSocket()
+    producer = BatchProducer(socket, batch_max_messages=10, linger_ms=10000)
+    futures = [producer.send(str(i), key="k") for i in range(25)]
+    # Full batches are written right away, the rest waits for the linger.
+    assert len(socket.writes) == 2
+    assert producer.flush(5)
+    assert len(socket.writes) == 3
+    assert [future.result() for future in futures] == [
+        "id-{}".format(i) for i in range(25)
+    ]
+    assert socket.messages[0]["key"] == "k"
+    assert "properties" not in socket.messages[0]
+    assert producer.stats() == {
+        "messages": 25,
+        "bytes": sum(socket.writes),
+        "batches": 3,
+        "acked": 25,
+        "failed": 0,
+        "pending": 0,
+    }
+    producer.close()
+
+    socket = ProducerSocket()
+    producer = BatchProducer(socket, batch_max_bytes=200, linger_ms=10000)
+    producer.send(b"x" * 100, properties={"a": "b"})
+    assert socket.writes == []
+    producer.send("y" * 100)
+    assert len(socket.writes) == 1
+    assert socket.messages[0]["properties"] == {"a": "b"}
+    producer.close()
+
+
+@pytest.mark.vcr
+def test_batch_producer_linger_and_callbacks():
+    socket = ProducerSocket(reject=("bad",))
+    producer = BatchProducer(socket, linger_ms=20)
+    done = []
+    event = threading.Event()
+
+    def callback(future):
+        done.append(future)
+        if len(done) == 2:
+            event.set()
+
+    good = producer.send("good", callback=callback)
+    bad = producer.send("bad", callback=callback)
+    assert event.wait(5)
+    assert len(socket.writes) == 1
+    assert good.result() == "id-good"
+    with assert_raises(StreamProducerError) as err:
+        bad.result()
+    assert err.value.message == "rejected"
+    assert producer.stats()["failed"] == 1
+    producer.close()
+    with assert_raises(StreamProducerError):
+        producer.send("late")
+
+
+@pytest.mark.vcr
+def test_batch_producer_pending_limit():
+    socket = ProducerSocket(ack=False)
+    producer = BatchProducer(
+        socket,
+        linger_ms=1,
+        max_pending_messages=2,
+        block_if_queue_full=False,
+        send_timeout_ms=100,
+    )
+    first = producer.send("1")
+    producer.send("2")
+    with assert_raises(StreamProducerError):
+        producer.send("3")
+
+    # Messages which are not acknowledged in time fail and free their slot.
+    with assert_raises(StreamProducerError) as err:
+        first.result(5)
+    assert err.value.message == "send timed out"
+    time.sleep(0.05)
+    producer.send("3")
+    assert not producer.flush(0.01)
+    producer.close(0.01)
+    assert producer.stats()["pending"] == 0
+
+
+@pytest.mark.vcr
+def test_batch_producer_socket_failure():
+    socket = ProducerSocket(ack=False)
+    producer = BatchProducer(socket, linger_ms=10000)
+    future = producer.send("1")
+    socket.replies.put(None)
+    with assert_raises(StreamProducerError) as err:
+        future.result(5)
+    assert "producer socket failed" in err.value.message
+    with assert_raises(StreamProducerError):
+        producer.send("2")
+
+
+@pytest.mark.vcr
+def test_batch_producer_websocket():
+    client, server = socket.socketpair()
+    server.settimeout(5)
+    ws = websocket.WebSocket()
+    ws.sock = client
+    ws.connected = True
+    producer = BatchProducer(ws, linger_ms=1)
+    future = producer.send("1")
+
+    # The frames are written to the socket under the websocket.
+    message = json.loads(decode_frames(server.recv(65536))[0])
+    reply = json.dumps(
+        {"result": "ok", "messageId": "id-1", "context": message["context"]}
+    ).encode("utf-8")
+    server.sendall(struct.pack("!BB", 0x81, len(reply)) + reply)
+    assert future.result(5) == "id-1"
+
+    def answer_close():
+        assert server.recv(65536)[0] == 0x88
+        server.sendall(struct.pack("!BBH", 0x88, 2, 1000))
+        server.close()
+
+    # Closing sends a close frame, and stops the receiver once the server
+    # answered it.
+    thread = threading.Thread(target=answer_close)
+    thread.start()
+    started = time.monotonic()
+    producer.close()
+    thread.join()
+    assert time.monotonic() - started < 2
+    assert not producer._receiver.is_alive()
+    assert ws.sock is None
@@ -0,0 +1,82 @@
+from __future__ import absolute_import, unicode_literals
+
+import base64
+import json
+
+import pytest
+import websocket
+
+from c8.exceptions import StreamEventError
+from c8.stream_collection import Base64Socket
+from c8.stream_serde import JSONSerializer, MessageCodec, RawSerializer, get_serializer
+from tests.helpers import assert_raises
+
+
+class RecordingSocket(websocket.WebSocket):
+    def send(self, payload, **kwargs):
+        self.sent = payload
+
+
+class RecordingBase64Socket(Base64Socket, RecordingSocket):
+    pass
+
+
+def received(codec, value, properties=None):
+    """Return the message a consumer receives for a produced value."""
+    envelope = json.loads(codec.encode(value, properties))
+    envelope["messageId"] = "1"
+    return json.dumps(envelope).encode("utf-8")
+
+
+@pytest.mark.vcr
+def test_get_serializer():
+    assert isinstance(get_serializer(), RawSerializer)
+    assert isinstance(get_serializer("json"), JSONSerializer)
+    serializer = RawSerializer()
+    assert get_serializer(serializer) is serializer
+    with assert_raises(ValueError):
+        get_serializer("xml")
+    with assert_raises(ValueError):
+        MessageCodec(compression="brotli")
+
+
+@pytest.mark.vcr
+def test_message_codec_raw():
+    codec = MessageCodec()
+    data = bytearray(b"\x00\x01binary")
+    envelope = json.loads(codec.encode(memoryview(data), key="k"))
+    assert envelope == {"payload": base64.b64encode(data).decode(), "key": "k"}
+    assert codec.decode(received(codec, memoryview(data)))["payload"] == data
+    assert codec.decode(received(codec, "text"))["payload"] == b"text"
+    # Frames which are not messages are left alone.
+    assert codec.decode('{"result": "ok"}') == {"result": "ok"}
+    with assert_raises(StreamEventError):
+        codec.decode('{"messageId": "1", "payload": "a"}')
+
+
+@pytest.mark.vcr
+def test_message_codec_compression():
+    codec = MessageCodec("json", compression="zlib", min_compress_bytes=100)
+    small = {"id": 1}
+    large = {"readings": list(range(500))}
+
+    envelope = json.loads(codec.encode(small, {"a": "b"}))
+    assert envelope["properties"] == {"a": "b"}
+    envelope = json.loads(codec.encode(large, {"a": "b"}))
+    assert envelope["properties"] == {"a": "b", "c8-compression": "zlib"}
+    assert len(envelope["payload"]) < len(json.dumps(large))
+
+    # Consumers decompress without being configured for it.
+    consumer = MessageCodec("json")
+    assert consumer.decode(received(codec, small))["payload"] == small
+    assert consumer.decode(received(codec, large, {"a": "b"}))["payload"] == large
+    with assert_raises(StreamEventError):
+        consumer.decode_payload("AAAA", {"c8-compression": "zlib"})
+
+
+@pytest.mark.vcr
+def test_base64_socket_bytes():
+    socket = RecordingBase64Socket()
+    for payload in ("héllo", "héllo".encode(), memoryview("héllo".encode())):
+        socket.send(payload)
+        assert base64.b64decode(json.loads(socket.sent)["payload"]) == "héllo".encode()